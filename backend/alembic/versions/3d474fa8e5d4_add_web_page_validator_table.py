@@ -0,0 +1,55 @@
+"""add web page validator table
+
+Revision ID: 3d474fa8e5d4
+Revises: b558f51620b4
+Create Date: 2025-08-20 10:12:41.318204
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3d474fa8e5d4"
+down_revision = "b558f51620b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "web_page_validator",
+        sa.Column("connector_credential_pair_id", sa.Integer(), nullable=False),
+        sa.Column("search_settings_id", sa.Integer(), nullable=False),
+        sa.Column("url", sa.String(), nullable=False),
+        sa.Column("etag", sa.String(), nullable=True),
+        sa.Column("last_modified", sa.String(), nullable=True),
+        sa.Column("content_hash", sa.String(), nullable=False),
+        sa.Column("links", postgresql.JSONB(), nullable=False),
+        sa.Column("poll_range_end", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "time_updated",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["connector_credential_pair_id"],
+            ["connector_credential_pair.id"],
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["search_settings_id"],
+            ["search_settings.id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "connector_credential_pair_id", "search_settings_id", "url"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("web_page_validator")
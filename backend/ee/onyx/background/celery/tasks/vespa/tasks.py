@@ -8,6 +8,7 @@ from ee.onyx.db.user_group import fetch_user_group
 from ee.onyx.db.user_group import mark_user_group_as_synced
 from ee.onyx.db.user_group import prepare_user_group_for_deletion
 from onyx.background.celery.apps.app_base import task_logger
+from onyx.configs.app_configs import VESPA_METADATA_SYNC_BATCH_SIZE
 from onyx.db.enums import SyncStatus
 from onyx.db.enums import SyncType
 from onyx.db.sync_record import update_sync_record_status
@@ -51,7 +52,8 @@ def monitor_usergroup_taskset(
             entity_id=usergroup_id,
             sync_type=SyncType.USER_GROUP,
             sync_status=SyncStatus.IN_PROGRESS,
-            num_docs_synced=count,
+            # upper bound of the documents left, each task syncs a batch
+            num_docs_synced=min(initial_count, count * VESPA_METADATA_SYNC_BATCH_SIZE),
         )
         return
 
@@ -1,6 +1,13 @@
 import asyncio
+import hashlib
 import json
 import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from contextlib import suppress
+from dataclasses import dataclass
 from types import TracebackType
 from typing import Any
 from typing import cast
@@ -8,6 +15,7 @@ from typing import Optional
 
 import aioboto3  # type: ignore
 import httpx
+import numpy as np
 import openai
 import vertexai  # type: ignore
 import voyageai  # type: ignore
@@ -15,6 +23,7 @@ from cohere import AsyncClient as CohereAsyncClient
 from fastapi import APIRouter
 from fastapi import HTTPException
 from fastapi import Request
+from fastapi import Response
 from google.oauth2 import service_account  # type: ignore
 from litellm import aembedding
 from litellm.exceptions import RateLimitError
@@ -34,9 +43,17 @@ from model_server.utils import pass_aws_key
 from model_server.utils import simple_log_function_time
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import API_BASED_EMBEDDING_TIMEOUT
+from shared_configs.configs import CLOUD_EMBEDDING_CLIENT_CACHE_SIZE
+from shared_configs.configs import CLOUD_EMBEDDING_CLIENT_IDLE_TIMEOUT
 from shared_configs.configs import INDEXING_ONLY
+from shared_configs.configs import LOCAL_EMBEDDING_BATCH_MAX_WAIT_MS
+from shared_configs.configs import LOCAL_EMBEDDING_MAX_BATCH_SIZE
 from shared_configs.configs import OPENAI_EMBEDDING_TIMEOUT
 from shared_configs.configs import VERTEXAI_EMBEDDING_LOCAL_BATCH_SIZE
+from shared_configs.embedding_transport import embeddings_media_type
+from shared_configs.embedding_transport import encode_embeddings
+from shared_configs.embedding_transport import parse_embeddings_media_type
+from shared_configs.enums import EmbeddingTransport
 from shared_configs.enums import EmbedTextType
 from shared_configs.enums import RerankerProvider
 from shared_configs.model_server_models import Embedding
@@ -138,16 +155,27 @@ class CloudEmbedding:
         self._closed = False
         self.sanitized_api_key = api_key[:4] + "********" + api_key[-4:]
 
+        # provider SDK clients are created lazily and kept for the lifetime of this
+        # instance so their connection pools are reused across `embed` calls
+        self._openai_client: openai.AsyncOpenAI | None = None
+        self._cohere_client: CohereAsyncClient | None = None
+        self._voyage_client: voyageai.AsyncClient | None = None
+        self._vertex_credentials: service_account.Credentials | None = None
+        self._vertex_project_id: str | None = None
+        self._vertex_models: dict[str, TextEmbeddingModel] = {}
+
     async def _embed_openai(
         self, texts: list[str], model: str | None, reduced_dimension: int | None
     ) -> list[Embedding]:
         if not model:
             model = DEFAULT_OPENAI_MODEL
 
-        # Use the OpenAI specific timeout for this one
-        client = openai.AsyncOpenAI(
-            api_key=self.api_key, timeout=OPENAI_EMBEDDING_TIMEOUT
-        )
+        if self._openai_client is None:
+            # Use the OpenAI specific timeout for this one
+            self._openai_client = openai.AsyncOpenAI(
+                api_key=self.api_key, timeout=OPENAI_EMBEDDING_TIMEOUT
+            )
+        client = self._openai_client
 
         final_embeddings: list[Embedding] = []
 
@@ -168,7 +196,11 @@ class CloudEmbedding:
         if not model:
             model = DEFAULT_COHERE_MODEL
 
-        client = CohereAsyncClient(api_key=self.api_key)
+        if self._cohere_client is None:
+            self._cohere_client = CohereAsyncClient(
+                api_key=self.api_key, httpx_client=self.http_client
+            )
+        client = self._cohere_client
 
         final_embeddings: list[Embedding] = []
         for text_batch in batch_list(texts, _COHERE_MAX_INPUT_LEN):
@@ -189,9 +221,11 @@ class CloudEmbedding:
         if not model:
             model = DEFAULT_VOYAGE_MODEL
 
-        client = voyageai.AsyncClient(
-            api_key=self.api_key, timeout=API_BASED_EMBEDDING_TIMEOUT
-        )
+        if self._voyage_client is None:
+            self._voyage_client = voyageai.AsyncClient(
+                api_key=self.api_key, timeout=API_BASED_EMBEDDING_TIMEOUT
+            )
+        client = self._voyage_client
 
         response = await client.embed(
             texts=texts,
@@ -221,12 +255,24 @@ class CloudEmbedding:
         if not model:
             model = DEFAULT_VERTEX_MODEL
 
-        credentials = service_account.Credentials.from_service_account_info(
-            json.loads(self.api_key)
+        if self._vertex_credentials is None:
+            service_account_info = json.loads(self.api_key)
+            self._vertex_credentials = (
+                service_account.Credentials.from_service_account_info(
+                    service_account_info
+                )
+            )
+            self._vertex_project_id = service_account_info["project_id"]
+
+        # vertexai keeps its config process-wide, so it is re-applied on every call in
+        # case another cached client (e.g. another project) changed it in between
+        vertexai.init(
+            project=self._vertex_project_id, credentials=self._vertex_credentials
         )
-        project_id = json.loads(self.api_key)["project_id"]
-        vertexai.init(project=project_id, credentials=credentials)
-        client = TextEmbeddingModel.from_pretrained(model)
+        client = self._vertex_models.get(model)
+        if client is None:
+            client = TextEmbeddingModel.from_pretrained(model)
+            self._vertex_models[model] = client
 
         inputs = [TextEmbeddingInput(text, embedding_type) for text in texts]
 
@@ -346,8 +392,12 @@ class CloudEmbedding:
     async def aclose(self) -> None:
         """Explicitly close the client."""
         if not self._closed:
-            await self.http_client.aclose()
             self._closed = True
+            try:
+                if self._openai_client is not None:
+                    await self._openai_client.close()
+            finally:
+                await self.http_client.aclose()
 
     async def __aenter__(self) -> "CloudEmbedding":
         return self
@@ -368,6 +418,149 @@ class CloudEmbedding:
             )
 
 
+@dataclass
+class _CloudEmbeddingCacheEntry:
+    client: CloudEmbedding
+    last_used: float
+    in_use: int = 0
+    evicted: bool = False
+
+
+class CloudEmbeddingClientCache:
+    """Keeps live `CloudEmbedding` clients around so that their http connection pools
+    (and the provider SDK clients built on top of them) are reused across requests
+    instead of paying a fresh TCP + TLS handshake for every embedding call.
+
+    Clients are keyed by provider, api key (hashed), api url and api version. The cache
+    is LRU-bounded and clients idle for longer than `idle_timeout` are evicted on the
+    next access. Evicted clients are closed once no request is using them anymore.
+
+    NOTE: all bookkeeping happens synchronously on the event loop, so no lock is needed.
+    """
+
+    def __init__(
+        self,
+        max_size: int = CLOUD_EMBEDDING_CLIENT_CACHE_SIZE,
+        idle_timeout: float = CLOUD_EMBEDDING_CLIENT_IDLE_TIMEOUT,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._entries: OrderedDict[
+            tuple[str, str, str | None, str | None], _CloudEmbeddingCacheEntry
+        ] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _make_key(
+        api_key: str,
+        provider: EmbeddingProvider,
+        api_url: str | None,
+        api_version: str | None,
+    ) -> tuple[str, str, str | None, str | None]:
+        # never keep the raw key around as part of the cache key
+        api_key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+        return (str(provider), api_key_hash, api_url, api_version)
+
+    def _evict(
+        self, key: tuple[str, str, str | None, str | None]
+    ) -> CloudEmbedding | None:
+        """Removes the entry and returns its client if it can be closed right away."""
+        entry = self._entries.pop(key)
+        entry.evicted = True
+        return entry.client if entry.in_use == 0 else None
+
+    def _evict_stale(self, now: float) -> list[CloudEmbedding]:
+        to_close: list[CloudEmbedding] = []
+
+        idle_keys = [
+            key
+            for key, entry in self._entries.items()
+            if entry.in_use == 0 and now - entry.last_used > self.idle_timeout
+        ]
+        for key in idle_keys:
+            client = self._evict(key)
+            if client is not None:
+                to_close.append(client)
+
+        while len(self._entries) > self.max_size:
+            lru_key = next(iter(self._entries))
+            client = self._evict(lru_key)
+            if client is not None:
+                to_close.append(client)
+
+        return to_close
+
+    @staticmethod
+    async def _close_clients(clients: list[CloudEmbedding]) -> None:
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception:
+                logger.exception(
+                    f"Failed to close cached embedding client for provider {client.provider}"
+                )
+
+    @asynccontextmanager
+    async def acquire(
+        self,
+        api_key: str,
+        provider: EmbeddingProvider,
+        api_url: str | None = None,
+        api_version: str | None = None,
+    ) -> AsyncIterator[CloudEmbedding]:
+        key = self._make_key(api_key, provider, api_url, api_version)
+        now = time.monotonic()
+
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _CloudEmbeddingCacheEntry(
+                client=CloudEmbedding.create(
+                    api_key=api_key,
+                    provider=provider,
+                    api_url=api_url,
+                    api_version=api_version,
+                ),
+                last_used=now,
+            )
+            self._entries[key] = entry
+        else:
+            self._entries.move_to_end(key)
+
+        # mark in use before evicting so the entry we hand out is never closed under us
+        entry.in_use += 1
+        entry.last_used = now
+        await self._close_clients(self._evict_stale(now))
+
+        try:
+            yield entry.client
+        finally:
+            entry.in_use -= 1
+            entry.last_used = time.monotonic()
+            if entry.evicted and entry.in_use == 0:
+                await self._close_clients([entry.client])
+
+    async def aclose(self) -> None:
+        """Closes every cached client. In-flight clients are closed on release."""
+        to_close: list[CloudEmbedding] = []
+        for key in list(self._entries):
+            client = self._evict(key)
+            if client is not None:
+                to_close.append(client)
+        await self._close_clients(to_close)
+
+
+_CLOUD_EMBEDDING_CLIENT_CACHE = CloudEmbeddingClientCache()
+
+
+async def close_cloud_embedding_clients() -> None:
+    await _CLOUD_EMBEDDING_CLIENT_CACHE.aclose()
+
+
 def get_embedding_model(
     model_name: str,
     max_context_length: int,
@@ -405,28 +598,198 @@ def get_local_reranking_model(
     return _RERANK_MODEL
 
 
-ENCODING_RETRIES = 3
-ENCODING_RETRY_DELAY = 0.1
+@dataclass
+class _PendingEmbedding:
+    texts: list[str]
+    normalize_embeddings: bool
+    max_context_length: int
+    future: "asyncio.Future[Any]"
 
 
-def _concurrent_embedding(
-    texts: list[str], model: "SentenceTransformer", normalize_embeddings: bool
-) -> Any:
-    """Synchronous wrapper for concurrent_embedding to use with run_in_executor."""
-    for _ in range(ENCODING_RETRIES):
-        try:
-            return model.encode(texts, normalize_embeddings=normalize_embeddings)
-        except RuntimeError as e:
-            # There is a concurrency bug in the SentenceTransformer library that causes
-            # the model to fail to encode texts. It's pretty rare and we want to allow
-            # concurrent embedding, hence we retry (the specific error is
-            # "RuntimeError: Already borrowed" and occurs in the transformers library)
-            logger.error(f"Error encoding texts, retrying: {e}")
-            time.sleep(ENCODING_RETRY_DELAY)
-    return model.encode(texts, normalize_embeddings=normalize_embeddings)
+class LocalEmbeddingBatcher:
+    """Coalesces concurrent embedding requests for one local model into batched
+    forward passes.
+
+    Requests are queued and a single worker per model drains the queue: the first
+    request waits up to `max_wait` seconds for others to join, up to `max_batch_size`
+    texts in total, then the whole batch is encoded at once and the results are fanned
+    back out to the callers. Encoding always happens on one dedicated thread per model,
+    so there are no concurrent `encode` calls on the same tokenizer (which used to fail
+    with "RuntimeError: Already borrowed" and had to be retried).
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_batch_size: int = LOCAL_EMBEDDING_MAX_BATCH_SIZE,
+        max_wait: float = LOCAL_EMBEDDING_BATCH_MAX_WAIT_MS / 1000,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="local_embedding"
+        )
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[_PendingEmbedding] | None = None
+        self._worker: asyncio.Task | None = None
+
+    def _ensure_worker(self) -> asyncio.Queue[_PendingEmbedding]:
+        loop = asyncio.get_running_loop()
+        if (
+            self._queue is None
+            or self._worker is None
+            or self._worker.done()
+            or self._loop is not loop
+        ):
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run(self._queue))
+        return self._queue
+
+    async def embed(
+        self, texts: list[str], normalize_embeddings: bool, max_context_length: int
+    ) -> Any:
+        queue = self._ensure_worker()
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        queue.put_nowait(
+            _PendingEmbedding(
+                texts=texts,
+                normalize_embeddings=normalize_embeddings,
+                max_context_length=max_context_length,
+                future=future,
+            )
+        )
+        return await future
+
+    async def _collect_batch(
+        self,
+        queue: asyncio.Queue[_PendingEmbedding],
+        carry_over: list[_PendingEmbedding],
+    ) -> list[_PendingEmbedding]:
+        batch = [carry_over.pop() if carry_over else await queue.get()]
+        batch_size = len(batch[0].texts)
+        deadline = time.monotonic() + self.max_wait
+
+        while batch_size < self.max_batch_size:
+            try:
+                if queue.empty():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    pending = await asyncio.wait_for(queue.get(), remaining)
+                else:
+                    pending = queue.get_nowait()
+            except asyncio.TimeoutError:
+                break
+
+            if batch_size + len(pending.texts) > self.max_batch_size:
+                # don't grow the batch past the limit, this one starts the next batch
+                carry_over.append(pending)
+                break
+
+            batch.append(pending)
+            batch_size += len(pending.texts)
+
+        return batch
+
+    def _encode(
+        self, texts: list[str], normalize_embeddings: bool, max_context_length: int
+    ) -> Any:
+        model = get_embedding_model(
+            model_name=self.model_name, max_context_length=max_context_length
+        )
+        return model.encode(texts, normalize_embeddings=normalize_embeddings)
+
+    async def _process(self, batch: list[_PendingEmbedding]) -> None:
+        # requests can only share a forward pass if they agree on the encode settings
+        groups: dict[tuple[bool, int], list[_PendingEmbedding]] = {}
+        for pending in batch:
+            if pending.future.done():
+                # the caller went away (e.g. client disconnected) before we got to it
+                continue
+            key = (pending.normalize_embeddings, pending.max_context_length)
+            groups.setdefault(key, []).append(pending)
+
+        loop = asyncio.get_running_loop()
+        for (normalize_embeddings, max_context_length), group in groups.items():
+            texts = [text for pending in group for text in pending.texts]
+            try:
+                embeddings = await loop.run_in_executor(
+                    self._executor,
+                    self._encode,
+                    texts,
+                    normalize_embeddings,
+                    max_context_length,
+                )
+                if len(embeddings) != len(texts):
+                    raise RuntimeError(
+                        f"Expected {len(texts)} embeddings from {self.model_name}, "
+                        f"got {len(embeddings)}"
+                    )
+            except Exception as e:
+                for pending in group:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+                continue
+
+            logger.debug(
+                f"Embedded batch of {len(texts)} texts from {len(group)} requests "
+                f"with local model {self.model_name}"
+            )
+            offset = 0
+            for pending in group:
+                end = offset + len(pending.texts)
+                if not pending.future.done():
+                    pending.future.set_result(embeddings[offset:end])
+                offset = end
+
+    async def _run(self, queue: asyncio.Queue[_PendingEmbedding]) -> None:
+        carry_over: list[_PendingEmbedding] = []
+        while True:
+            batch = await self._collect_batch(queue, carry_over)
+            try:
+                await self._process(batch)
+            except Exception as e:
+                logger.exception("Unexpected error while processing embedding batch")
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+
+    async def aclose(self) -> None:
+        """Stops the worker and cancels requests that have not been picked up yet."""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._worker
+        self._worker = None
+
+        if self._queue is not None:
+            while not self._queue.empty():
+                self._queue.get_nowait().future.cancel()
+            self._queue = None
+
+        self._executor.shutdown(wait=False)
+
+
+_LOCAL_EMBEDDING_BATCHERS: dict[str, LocalEmbeddingBatcher] = {}
+
+
+def get_local_embedding_batcher(model_name: str) -> LocalEmbeddingBatcher:
+    if model_name not in _LOCAL_EMBEDDING_BATCHERS:
+        _LOCAL_EMBEDDING_BATCHERS[model_name] = LocalEmbeddingBatcher(model_name)
+    return _LOCAL_EMBEDDING_BATCHERS[model_name]
+
+
+async def close_local_embedding_batchers() -> None:
+    while _LOCAL_EMBEDDING_BATCHERS:
+        _, batcher = _LOCAL_EMBEDDING_BATCHERS.popitem()
+        await batcher.aclose()
 
 
-@simple_log_function_time()
 async def embed_text(
     texts: list[str],
     text_type: EmbedTextType,
@@ -442,6 +805,45 @@ async def embed_text(
     reduced_dimension: int | None,
     gpu_type: str = "UNKNOWN",
 ) -> list[Embedding]:
+    embeddings = await _embed_text(
+        texts=texts,
+        text_type=text_type,
+        model_name=model_name,
+        deployment_name=deployment_name,
+        max_context_length=max_context_length,
+        normalize_embeddings=normalize_embeddings,
+        api_key=api_key,
+        provider_type=provider_type,
+        prefix=prefix,
+        api_url=api_url,
+        api_version=api_version,
+        reduced_dimension=reduced_dimension,
+        gpu_type=gpu_type,
+    )
+    return [
+        embedding if isinstance(embedding, list) else embedding.tolist()
+        for embedding in embeddings
+    ]
+
+
+@simple_log_function_time()
+async def _embed_text(
+    texts: list[str],
+    text_type: EmbedTextType,
+    model_name: str | None,
+    deployment_name: str | None,
+    max_context_length: int,
+    normalize_embeddings: bool,
+    api_key: str | None,
+    provider_type: EmbeddingProvider | None,
+    prefix: str | None,
+    api_url: str | None,
+    api_version: str | None,
+    reduced_dimension: int | None,
+    gpu_type: str = "UNKNOWN",
+) -> list[Embedding] | np.ndarray:
+    """Local models return the raw array from the encoder so that binary transports
+    can serialize it without a round trip through python floats."""
     if not all(texts):
         logger.error("Empty strings provided for embedding")
         raise ValueError("Empty strings are not allowed for embedding.")
@@ -472,7 +874,7 @@ async def embed_text(
                 "Cloud models take an explicit text type instead."
             )
 
-        async with CloudEmbedding(
+        async with _CLOUD_EMBEDDING_CLIENT_CACHE.acquire(
             api_key=api_key,
             provider=provider_type,
             api_url=api_url,
@@ -508,20 +910,12 @@ async def embed_text(
 
         prefixed_texts = [f"{prefix}{text}" for text in texts] if prefix else texts
 
-        local_model = get_embedding_model(
-            model_name=model_name, max_context_length=max_context_length
-        )
-        # Run CPU-bound embedding in a thread pool
-        embeddings_vectors = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: _concurrent_embedding(
-                prefixed_texts, local_model, normalize_embeddings
-            ),
+        # CPU-bound, batched together with concurrent requests for the same model
+        embeddings = await get_local_embedding_batcher(model_name).embed(
+            prefixed_texts,
+            normalize_embeddings=normalize_embeddings,
+            max_context_length=max_context_length,
         )
-        embeddings = [
-            embedding if isinstance(embedding, list) else embedding.tolist()
-            for embedding in embeddings_vectors
-        ]
 
         elapsed = time.monotonic() - start
         logger.info(
@@ -626,17 +1020,23 @@ async def litellm_rerank(
         ]
 
 
-@router.post("/bi-encoder-embed")
+@router.post("/bi-encoder-embed", response_model=EmbedResponse)
 async def route_bi_encoder_embed(
     request: Request,
     embed_request: EmbedRequest,
-) -> EmbedResponse:
-    return await process_embed_request(embed_request, request.app.state.gpu_type)
+) -> EmbedResponse | Response:
+    # clients opt into binary embeddings via the Accept header, everyone else gets json
+    transport = parse_embeddings_media_type(request.headers.get("accept"))
+    return await process_embed_request(
+        embed_request, request.app.state.gpu_type, transport=transport
+    )
 
 
 async def process_embed_request(
-    embed_request: EmbedRequest, gpu_type: str = "UNKNOWN"
-) -> EmbedResponse:
+    embed_request: EmbedRequest,
+    gpu_type: str = "UNKNOWN",
+    transport: EmbeddingTransport = EmbeddingTransport.JSON,
+) -> EmbedResponse | Response:
     if not embed_request.texts:
         raise HTTPException(status_code=400, detail="No texts to be embedded")
 
@@ -651,7 +1051,7 @@ async def process_embed_request(
         else:
             prefix = None
 
-        embeddings = await embed_text(
+        embeddings = await _embed_text(
             texts=embed_request.texts,
             model_name=embed_request.model_name,
             deployment_name=embed_request.deployment_name,
@@ -666,7 +1066,18 @@ async def process_embed_request(
             prefix=prefix,
             gpu_type=gpu_type,
         )
-        return EmbedResponse(embeddings=embeddings)
+        if transport != EmbeddingTransport.JSON:
+            return Response(
+                content=encode_embeddings(embeddings, transport),
+                media_type=embeddings_media_type(transport),
+            )
+
+        return EmbedResponse(
+            embeddings=[
+                embedding if isinstance(embedding, list) else embedding.tolist()
+                for embedding in embeddings
+            ]
+        )
     except AuthenticationError as e:
         # Handle authentication errors consistently
         logger.error(f"Authentication error: {e.provider}")
@@ -17,6 +17,8 @@ from transformers import logging as transformer_logging  # type:ignore
 from model_server.custom_models import router as custom_models_router
 from model_server.custom_models import warm_up_information_content_model
 from model_server.custom_models import warm_up_intent_model
+from model_server.encoders import close_cloud_embedding_clients
+from model_server.encoders import close_local_embedding_batchers
 from model_server.encoders import router as encoders_router
 from model_server.management_endpoints import router as management_router
 from model_server.utils import get_gpu_type
@@ -104,6 +106,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
 
     yield
 
+    await close_local_embedding_batchers()
+    await close_cloud_embedding_clients()
+
 
 def get_model_app() -> FastAPI:
     application = FastAPI(
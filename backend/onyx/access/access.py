@@ -3,6 +3,8 @@ from typing import cast
 
 from sqlalchemy.orm import Session
 
+from onyx.access.acl_cache import get_cached_user_acl
+from onyx.access.acl_cache import UserAcl
 from onyx.access.models import DocumentAccess
 from onyx.access.utils import prefix_user_email
 from onyx.configs.constants import DocumentSource
@@ -107,11 +109,20 @@ def _get_acl_for_user(user: User | None, db_session: Session) -> set[str]:
     return {PUBLIC_DOC_PAT}
 
 
-def get_acl_for_user(user: User | None, db_session: Session | None = None) -> set[str]:
+def get_user_acl(user: User | None, db_session: Session | None = None) -> UserAcl:
+    """The user's ACL, cached until the tenant's ACL version is bumped (see
+    onyx.access.acl_cache)."""
     versioned_acl_for_user_fn = fetch_versioned_implementation(
         "onyx.access.access", "_get_acl_for_user"
     )
-    return versioned_acl_for_user_fn(user, db_session)  # type: ignore
+    return get_cached_user_acl(
+        user.id if user else None,
+        lambda: versioned_acl_for_user_fn(user, db_session),  # type: ignore
+    )
+
+
+def get_acl_for_user(user: User | None, db_session: Session | None = None) -> set[str]:
+    return set(get_user_acl(user, db_session).entries)
 
 
 def source_should_fetch_permissions_during_indexing(source: DocumentSource) -> bool:
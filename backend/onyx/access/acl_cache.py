@@ -0,0 +1,175 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from uuid import UUID
+
+from prometheus_client import Counter
+
+from onyx.configs.app_configs import USER_ACL_CACHE_SIZE
+from onyx.configs.app_configs import USER_ACL_CACHE_TTL_SECONDS
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+# per tenant (the Redis client prefixes the keys with the tenant id)
+_USER_ACL_VERSION_KEY = "user_acl_version"
+
+USER_ACL_CACHE_LOOKUPS = Counter(
+    "onyx_user_acl_cache_lookups_total",
+    "User ACL cache lookups by result",
+    ["result"],
+)
+
+
+@dataclass(frozen=True)
+class UserAcl:
+    entries: frozenset[str]
+    # sorted, so the same ACL always gives the same index filters (and filter string)
+    filters: tuple[str, ...]
+
+    @classmethod
+    def build(cls, entries: set[str]) -> "UserAcl":
+        return cls(entries=frozenset(entries), filters=tuple(sorted(entries)))
+
+
+@dataclass
+class UserAclCacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def get_user_acl_version() -> str | None:
+    """The ACL version of the current tenant, created on first use. Returns None if it
+    can't be read, in which case nothing should be cached."""
+    try:
+        redis_client = get_redis_client()
+        version = redis_client.get(_USER_ACL_VERSION_KEY)
+        if version is None:
+            # a new version (e.g. after a Redis flush) never matches cached entries
+            redis_client.set(_USER_ACL_VERSION_KEY, uuid.uuid4().hex, nx=True)
+            version = redis_client.get(_USER_ACL_VERSION_KEY)
+    except Exception:
+        logger.exception("Failed to read the user ACL version from Redis")
+        return None
+
+    if version is None:
+        return None
+    return version.decode() if isinstance(version, bytes) else str(version)
+
+
+def bump_user_acl_version() -> None:
+    """Invalidates the cached ACLs of all the users of the current tenant, in every
+    process. Must be called after committing changes to user group or external group
+    memberships, otherwise a concurrent lookup could cache the old memberships under
+    the new version."""
+    try:
+        get_redis_client().set(_USER_ACL_VERSION_KEY, uuid.uuid4().hex)
+    except Exception:
+        logger.exception(
+            "Failed to bump the user ACL version, cached ACLs will only be refreshed "
+            "once they expire"
+        )
+
+
+class UserAclCache:
+    """Thread-safe LRU + TTL cache of user ACLs. Entries are only valid for the ACL
+    version of the tenant they were computed at."""
+
+    def __init__(
+        self,
+        max_size: int = USER_ACL_CACHE_SIZE,
+        ttl_seconds: int = USER_ACL_CACHE_TTL_SECONDS,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.stats = UserAclCacheStats()
+        # (tenant id, user id) -> (ACL version, expiry time, ACL)
+        self._entries: OrderedDict[
+            tuple[str, UUID | None], tuple[str, float, UserAcl]
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, tenant_id: str, user_id: UUID | None, version: str) -> UserAcl | None:
+        key = (tenant_id, user_id)
+        acl: UserAcl | None = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_version, expires_at, entry_acl = entry
+                if entry_version == version and expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    acl = entry_acl
+                else:
+                    del self._entries[key]
+
+        if acl is None:
+            self.stats.misses += 1
+            USER_ACL_CACHE_LOOKUPS.labels(result="miss").inc()
+        else:
+            self.stats.hits += 1
+            USER_ACL_CACHE_LOOKUPS.labels(result="hit").inc()
+        return acl
+
+    def set(
+        self, tenant_id: str, user_id: UUID | None, version: str, acl: UserAcl
+    ) -> None:
+        if self.max_size <= 0:
+            return
+
+        key = (tenant_id, user_id)
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self.ttl_seconds, acl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+_USER_ACL_CACHE = UserAclCache()
+
+
+def get_user_acl_cache() -> UserAclCache:
+    return _USER_ACL_CACHE
+
+
+def get_cached_user_acl(
+    user_id: UUID | None, compute_acl: Callable[[], set[str]]
+) -> UserAcl:
+    """Returns the cached ACL of the user, computing (and caching) it with compute_acl
+    if it is missing, expired or from an older ACL version of the tenant."""
+    cache = get_user_acl_cache()
+    if not cache.enabled:
+        return UserAcl.build(compute_acl())
+
+    # read before computing, so a bump while computing invalidates the new entry
+    version = get_user_acl_version()
+    if version is None:
+        USER_ACL_CACHE_LOOKUPS.labels(result="unavailable").inc()
+        return UserAcl.build(compute_acl())
+
+    tenant_id = get_current_tenant_id()
+    acl = cache.get(tenant_id, user_id, version)
+    if acl is None:
+        acl = UserAcl.build(compute_acl())
+        cache.set(tenant_id, user_id, version, acl)
+    return acl
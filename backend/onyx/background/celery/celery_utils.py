@@ -36,21 +36,21 @@ def document_batch_to_ids(
         yield {doc.id for doc in doc_list}
 
 
-def extract_ids_from_runnable_connector(
+def iter_ids_from_runnable_connector(
     runnable_connector: BaseConnector,
     callback: IndexingHeartbeatInterface | None = None,
-) -> set[str]:
+) -> Generator[set[str], None, None]:
     """
     If the SlimConnector hasnt been implemented for the given connector, just pull
     all docs using the load_from_state and grab out the IDs.
 
+    Yields the IDs batch by batch (a batch may repeat IDs of previous ones).
+
     Optionally, a callback can be passed to handle the length of each document batch.
     """
-    all_connector_doc_ids: set[str] = set()
-
     if isinstance(runnable_connector, SlimConnector):
         for metadata_batch in runnable_connector.retrieve_all_slim_documents():
-            all_connector_doc_ids.update({doc.id for doc in metadata_batch})
+            yield {doc.id for doc in metadata_batch}
 
     doc_batch_id_generator = None
 
@@ -92,11 +92,21 @@ def extract_ids_from_runnable_connector(
                     "extract_ids_from_runnable_connector: Stop signal detected"
                 )
 
-        all_connector_doc_ids.update(doc_batch_processing_func(doc_batch_ids))
+        yield doc_batch_processing_func(doc_batch_ids)
 
         if callback:
             callback.progress("extract_ids_from_runnable_connector", len(doc_batch_ids))
 
+
+def extract_ids_from_runnable_connector(
+    runnable_connector: BaseConnector,
+    callback: IndexingHeartbeatInterface | None = None,
+) -> set[str]:
+    """All the IDs of iter_ids_from_runnable_connector in memory. Prefer iterating
+    over the batches for connectors that may have a large number of documents."""
+    all_connector_doc_ids: set[str] = set()
+    for doc_batch_ids in iter_ids_from_runnable_connector(runnable_connector, callback):
+        all_connector_doc_ids.update(doc_batch_ids)
     return all_connector_doc_ids
 
 
@@ -16,6 +16,7 @@ from sqlalchemy.orm import Session
 from onyx.background.celery.apps.app_base import task_logger
 from onyx.background.celery.celery_redis import celery_get_queue_length
 from onyx.background.celery.celery_redis import celery_get_queued_task_ids
+from onyx.configs.app_configs import DOCUMENT_CLEANUP_BATCH_SIZE
 from onyx.configs.app_configs import JOB_TIMEOUT
 from onyx.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
 from onyx.configs.constants import OnyxCeleryQueues
@@ -50,6 +51,9 @@ from onyx.db.sync_record import cleanup_sync_records
 from onyx.db.sync_record import insert_sync_record
 from onyx.db.sync_record import update_sync_record_status
 from onyx.db.tag import delete_orphan_tags__no_commit
+from onyx.db.web_page_validator import (
+    delete_web_page_validators_for_cc_pair__no_commit,
+)
 from onyx.redis.redis_connector import RedisConnector
 from onyx.redis.redis_connector_delete import RedisConnectorDelete
 from onyx.redis.redis_connector_delete import RedisConnectorDeletePayload
@@ -321,12 +325,12 @@ def try_generate_document_cc_pair_cleanup_tasks(
         task_logger.info(
             f"RedisConnectorDeletion.generate_tasks starting. cc_pair={cc_pair_id}"
         )
-        tasks_generated = redis_connector.delete.generate_tasks(
-            app, db_session, lock_beat
-        )
-        if tasks_generated is None:
+        result = redis_connector.delete.generate_tasks(app, db_session, lock_beat)
+        if result is None:
             raise ValueError("RedisConnectorDeletion.generate_tasks returned None")
 
+        tasks_generated, docs_generated = result
+
         try:
             insert_sync_record(
                 db_session=db_session,
@@ -352,11 +356,14 @@ def try_generate_document_cc_pair_cleanup_tasks(
 
         task_logger.info(
             "RedisConnectorDeletion.generate_tasks finished. "
-            f"cc_pair={cc_pair_id} tasks_generated={tasks_generated}"
+            f"cc_pair={cc_pair_id} "
+            f"tasks_generated={tasks_generated} "
+            f"docs_generated={docs_generated}"
         )
 
         # set this only after all tasks have been added
         fence_payload.num_tasks = tasks_generated
+        fence_payload.num_docs = docs_generated
         redis_connector.delete.set_fence(fence_payload)
 
     return tasks_generated
@@ -386,9 +393,14 @@ def monitor_connector_deletion_taskset(
         # the fence is setting up but isn't ready yet
         return
 
+    num_docs = (
+        fence_data.num_docs if fence_data.num_docs is not None else fence_data.num_tasks
+    )
+
     remaining = redis_connector.delete.get_remaining()
     task_logger.info(
-        f"Connector deletion progress: cc_pair={cc_pair_id} remaining={remaining} initial={fence_data.num_tasks}"
+        f"Connector deletion progress: cc_pair={cc_pair_id} remaining={remaining} "
+        f"initial={fence_data.num_tasks} docs={num_docs}"
     )
     if remaining > 0:
         with get_session_with_current_tenant() as db_session:
@@ -397,7 +409,9 @@ def monitor_connector_deletion_taskset(
                 entity_id=cc_pair_id,
                 sync_type=SyncType.CONNECTOR_DELETION,
                 sync_status=SyncStatus.IN_PROGRESS,
-                num_docs_synced=remaining,
+                # the taskset tracks batches, so this is an upper bound of the
+                # documents left to delete
+                num_docs_synced=min(num_docs, remaining * DOCUMENT_CLEANUP_BATCH_SIZE),
             )
         return
 
@@ -426,7 +440,7 @@ def monitor_connector_deletion_taskset(
                     "Connector deletion - documents still found after taskset completion. "
                     "Clearing the current deletion attempt and allowing deletion to restart: "
                     f"cc_pair={cc_pair_id} "
-                    f"docs_deleted={fence_data.num_tasks} "
+                    f"docs_deleted={num_docs} "
                     f"docs_remaining={len(doc_ids)}"
                 )
 
@@ -465,6 +479,12 @@ def monitor_connector_deletion_taskset(
             # delete orphan tags
             delete_orphan_tags__no_commit(db_session)
 
+            # web connector page validators
+            delete_web_page_validators_for_cc_pair__no_commit(
+                db_session=db_session,
+                cc_pair_id=cc_pair_id,
+            )
+
             # Store IDs before potentially expiring cc_pair
             connector_id_to_delete = cc_pair.connector_id
             credential_id_to_delete = cc_pair.credential_id
@@ -513,7 +533,7 @@ def monitor_connector_deletion_taskset(
                 entity_id=cc_pair_id,
                 sync_type=SyncType.CONNECTOR_DELETION,
                 sync_status=SyncStatus.SUCCESS,
-                num_docs_synced=fence_data.num_tasks,
+                num_docs_synced=num_docs,
             )
 
         except Exception as e:
@@ -527,7 +547,7 @@ def monitor_connector_deletion_taskset(
                 entity_id=cc_pair_id,
                 sync_type=SyncType.CONNECTOR_DELETION,
                 sync_status=SyncStatus.FAILED,
-                num_docs_synced=fence_data.num_tasks,
+                num_docs_synced=num_docs,
             )
 
             task_logger.exception(
@@ -541,7 +561,7 @@ def monitor_connector_deletion_taskset(
         f"cc_pair={cc_pair_id} "
         f"connector={connector_id_to_delete} "
         f"credential={credential_id_to_delete} "
-        f"docs_deleted={fence_data.num_tasks}"
+        f"docs_deleted={num_docs}"
     )
 
     redis_connector.delete.reset()
@@ -20,11 +20,13 @@ from onyx.background.celery.celery_redis import celery_find_task
 from onyx.background.celery.celery_redis import celery_get_queue_length
 from onyx.background.celery.celery_redis import celery_get_queued_task_ids
 from onyx.background.celery.celery_redis import celery_get_unacked_task_ids
-from onyx.background.celery.celery_utils import extract_ids_from_runnable_connector
+from onyx.background.celery.celery_utils import iter_ids_from_runnable_connector
 from onyx.background.celery.tasks.beat_schedule import CLOUD_BEAT_MULTIPLIER_DEFAULT
 from onyx.background.celery.tasks.docprocessing.utils import IndexingCallbackBase
 from onyx.configs.app_configs import ALLOW_SIMULTANEOUS_PRUNING
+from onyx.configs.app_configs import DB_YIELD_PER_DEFAULT
 from onyx.configs.app_configs import JOB_TIMEOUT
+from onyx.configs.app_configs import PRUNING_MAX_IDS_IN_MEMORY
 from onyx.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
 from onyx.configs.constants import CELERY_PRUNING_LOCK_TIMEOUT
 from onyx.configs.constants import CELERY_TASK_WAIT_FOR_FENCE_TIMEOUT
@@ -41,7 +43,9 @@ from onyx.db.connector import mark_ccpair_as_pruned
 from onyx.db.connector_credential_pair import get_connector_credential_pair
 from onyx.db.connector_credential_pair import get_connector_credential_pair_from_id
 from onyx.db.connector_credential_pair import get_connector_credential_pairs
-from onyx.db.document import get_documents_for_connector_credential_pair
+from onyx.db.document import (
+    construct_sorted_document_id_select_for_connector_credential_pair,
+)
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.enums import ConnectorCredentialPairStatus
 from onyx.db.enums import SyncStatus
@@ -57,6 +61,8 @@ from onyx.redis.redis_pool import get_redis_client
 from onyx.redis.redis_pool import get_redis_replica_client
 from onyx.server.runtime.onyx_runtime import OnyxRuntime
 from onyx.server.utils import make_short_id
+from onyx.utils.external_sort import ExternalStringSorter
+from onyx.utils.external_sort import iter_sorted_difference
 from onyx.utils.logger import format_error_for_logging
 from onyx.utils.logger import LoggerContextVars
 from onyx.utils.logger import pruning_ctx
@@ -525,46 +531,52 @@ def connector_pruning_generator_task(
                 r,
             )
 
-            # a list of docs in the source
-            all_connector_doc_ids: set[str] = extract_ids_from_runnable_connector(
-                runnable_connector, callback
-            )
-
-            # a list of docs in our local index
-            all_indexed_document_ids = {
-                doc.id
-                for doc in get_documents_for_connector_credential_pair(
-                    db_session=db_session,
-                    connector_id=connector_id,
-                    credential_id=credential_id,
+            # the docs in the source, spilled to disk past PRUNING_MAX_IDS_IN_MEMORY so
+            # that memory stays flat however large the connector is
+            with ExternalStringSorter(PRUNING_MAX_IDS_IN_MEMORY) as connector_doc_ids:
+                for doc_batch_ids in iter_ids_from_runnable_connector(
+                    runnable_connector, callback
+                ):
+                    connector_doc_ids.add(doc_batch_ids)
+
+                task_logger.info(
+                    "Pruning set collected: "
+                    f"cc_pair={cc_pair_id} "
+                    f"connector_source={cc_pair.connector.source} "
+                    f"spilled_runs={connector_doc_ids.num_spilled_runs}"
                 )
-            }
 
-            # generate list of docs to remove (no longer in the source)
-            doc_ids_to_remove = list(all_indexed_document_ids - all_connector_doc_ids)
+                # the docs in our local index, in the same order
+                indexed_doc_ids = db_session.scalars(
+                    construct_sorted_document_id_select_for_connector_credential_pair(
+                        connector_id, credential_id
+                    )
+                ).yield_per(DB_YIELD_PER_DEFAULT)
 
-            task_logger.info(
-                "Pruning set collected: "
-                f"cc_pair={cc_pair_id} "
-                f"connector_source={cc_pair.connector.source} "
-                f"docs_to_remove={len(doc_ids_to_remove)}"
-            )
+                # docs to remove (no longer in the source), merged as the cleanup tasks
+                # are generated
+                doc_ids_to_remove = iter_sorted_difference(
+                    indexed_doc_ids, connector_doc_ids.iter_sorted()
+                )
 
-            task_logger.info(
-                f"RedisConnector.prune.generate_tasks starting. cc_pair={cc_pair_id}"
-            )
-            tasks_generated = redis_connector.prune.generate_tasks(
-                set(doc_ids_to_remove), self.app, db_session, None
-            )
-            if tasks_generated is None:
-                return None
+                task_logger.info(
+                    f"RedisConnector.prune.generate_tasks starting. cc_pair={cc_pair_id}"
+                )
+                result = redis_connector.prune.generate_tasks(
+                    doc_ids_to_remove, self.app, db_session, None
+                )
+                if result is None:
+                    return None
 
+            tasks_generated, docs_generated = result
             task_logger.info(
                 "RedisConnector.prune.generate_tasks finished. "
-                f"cc_pair={cc_pair_id} tasks_generated={tasks_generated}"
+                f"cc_pair={cc_pair_id} "
+                f"tasks_generated={tasks_generated} "
+                f"docs_generated={docs_generated}"
             )
 
-            redis_connector.prune.generator_complete = tasks_generated
+            redis_connector.prune.generator_complete = docs_generated
     except Exception as e:
         task_logger.exception(
             f"Pruning exceptioned: cc_pair={cc_pair_id} "
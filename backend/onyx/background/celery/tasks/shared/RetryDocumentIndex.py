@@ -1,11 +1,19 @@
+from collections.abc import Callable
+from collections.abc import Mapping
+
 import httpx
 from tenacity import retry
 from tenacity import retry_if_exception_type
+from tenacity import retry_if_result
+from tenacity import Retrying
 from tenacity import stop_after_delay
 from tenacity import wait_random_exponential
 
+from onyx.document_index.interfaces import DocumentBatchResult
+from onyx.document_index.interfaces import DocumentFailureType
 from onyx.document_index.interfaces import DocumentIndex
 from onyx.document_index.interfaces import VespaDocumentFields
+from onyx.document_index.interfaces import VespaDocumentUpdate
 from onyx.document_index.interfaces import VespaDocumentUserFields
 
 
@@ -63,3 +71,68 @@ class RetryDocumentIndex:
             fields=fields,
             user_fields=user_fields,
         )
+
+    def _run_batch_with_retries(
+        self,
+        doc_ids: list[str],
+        run_batch: Callable[[list[str]], DocumentBatchResult],
+    ) -> DocumentBatchResult:
+        """Batch calls report failures per document instead of raising, so the retry
+        decorator can't be used. Instead, the documents that failed with a read timeout
+        are rerun with the same backoff and deadline."""
+        result = DocumentBatchResult()
+        pending = doc_ids
+
+        def _run_pending() -> list[str]:
+            nonlocal pending
+            batch_result = run_batch(pending)
+            for doc_id, chunks_affected in batch_result.chunks_affected.items():
+                result.failures.pop(doc_id, None)
+                result.failure_types.pop(doc_id, None)
+                result.chunks_affected[doc_id] = chunks_affected
+            result.failures.update(batch_result.failures)
+            result.failure_types.update(batch_result.failure_types)
+
+            pending = batch_result.get_failed_doc_ids(DocumentFailureType.READ_TIMEOUT)
+            return pending
+
+        retrying = Retrying(
+            retry=retry_if_result(bool),
+            wait=wait_random_exponential(multiplier=1, max=self.MAX_WAIT),
+            stop=stop_after_delay(self.STOP_AFTER),
+            # out of time, the remaining read timeouts stay in the failures
+            retry_error_callback=lambda _: None,
+        )
+        retrying(_run_pending)
+        return result
+
+    def delete_batch(
+        self,
+        doc_id_to_chunk_count: Mapping[str, int | None],
+        *,
+        tenant_id: str,
+    ) -> DocumentBatchResult:
+        return self._run_batch_with_retries(
+            list(doc_id_to_chunk_count),
+            lambda doc_ids: self.index.delete_batch(
+                {doc_id: doc_id_to_chunk_count[doc_id] for doc_id in doc_ids},
+                tenant_id=tenant_id,
+            ),
+        )
+
+    def update_batch(
+        self,
+        updates: list[VespaDocumentUpdate],
+        *,
+        tenant_id: str,
+    ) -> DocumentBatchResult:
+        def _update_batch(doc_ids: list[str]) -> DocumentBatchResult:
+            doc_id_set = set(doc_ids)
+            return self.index.update_batch(
+                [update for update in updates if update.doc_id in doc_id_set],
+                tenant_id=tenant_id,
+            )
+
+        return self._run_batch_with_retries(
+            list(dict.fromkeys(update.doc_id for update in updates)), _update_batch
+        )
@@ -5,28 +5,40 @@ from http import HTTPStatus
 import httpx
 from celery import shared_task
 from celery import Task
+from celery.exceptions import Retry
 from celery.exceptions import SoftTimeLimitExceeded
 from redis import Redis
+from sqlalchemy.orm import Session
 from tenacity import RetryError
 
 from onyx.access.access import get_access_for_document
+from onyx.access.access import get_access_for_documents
 from onyx.background.celery.apps.app_base import task_logger
 from onyx.background.celery.tasks.shared.RetryDocumentIndex import RetryDocumentIndex
 from onyx.configs.constants import ONYX_CELERY_BEAT_HEARTBEAT_KEY
 from onyx.configs.constants import OnyxCeleryTask
 from onyx.db.document import delete_document_by_connector_credential_pair__no_commit
+from onyx.db.document import delete_documents_by_connector_credential_pair__no_commit
 from onyx.db.document import delete_documents_complete__no_commit
 from onyx.db.document import fetch_chunk_count_for_document
 from onyx.db.document import get_document
 from onyx.db.document import get_document_connector_count
+from onyx.db.document import get_document_connector_counts
+from onyx.db.document import get_documents_by_ids
 from onyx.db.document import mark_document_as_modified
 from onyx.db.document import mark_document_as_synced
+from onyx.db.document import mark_documents_as_modified__no_commit
+from onyx.db.document import mark_documents_as_synced__no_commit
 from onyx.db.document_set import fetch_document_sets_for_document
+from onyx.db.document_set import fetch_document_sets_for_documents
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
+from onyx.db.models import Document as DbDocument
 from onyx.db.relationships import delete_document_references_from_kg
 from onyx.db.search_settings import get_active_search_settings
 from onyx.document_index.factory import get_default_document_index
+from onyx.document_index.interfaces import DocumentFailureType
 from onyx.document_index.interfaces import VespaDocumentFields
+from onyx.document_index.interfaces import VespaDocumentUpdate
 from onyx.httpx.httpx_pool import HttpxPool
 from onyx.redis.redis_pool import get_redis_client
 from onyx.server.documents.models import ConnectorCredentialPairIdentifier
@@ -38,6 +50,10 @@ DOCUMENT_BY_CC_PAIR_CLEANUP_MAX_RETRIES = 3
 LIGHT_SOFT_TIME_LIMIT = 105
 LIGHT_TIME_LIMIT = LIGHT_SOFT_TIME_LIMIT + 15
 
+# batch tasks do the work of many light tasks (bulk fed to Vespa), so give them longer
+LIGHT_BATCH_SOFT_TIME_LIMIT = 300
+LIGHT_BATCH_TIME_LIMIT = LIGHT_BATCH_SOFT_TIME_LIMIT + 15
+
 
 class OnyxCeleryTaskCompletionStatus(str, Enum):
     """The different statuses the watchdog can finish with.
@@ -268,6 +284,309 @@ def document_by_cc_pair_cleanup_task(
     return True
 
 
+@shared_task(
+    name=OnyxCeleryTask.DOCUMENT_BY_CC_PAIR_CLEANUP_BATCH_TASK,
+    soft_time_limit=LIGHT_BATCH_SOFT_TIME_LIMIT,
+    time_limit=LIGHT_BATCH_TIME_LIMIT,
+    max_retries=DOCUMENT_BY_CC_PAIR_CLEANUP_MAX_RETRIES,
+    bind=True,
+)
+def document_by_cc_pair_cleanup_batch_task(
+    self: Task,
+    document_ids: list[str],
+    connector_id: int,
+    credential_id: int,
+    tenant_id: str,
+) -> bool:
+    """Batched version of document_by_cc_pair_cleanup_task. Connector counts, access
+    and document sets are fetched with one query each for the whole batch and Vespa
+    deletes / updates are fed in bulk.
+
+    Documents that fail in Vespa are retried (only those) with a retry of this task.
+    On the last attempt, or right away if Vespa rejected them (HTTP 4xx), they are
+    handed to stale document reconciliation instead."""
+    task_logger.debug(f"Task start: num_docs={len(document_ids)}")
+
+    start = time.monotonic()
+
+    completion_status = OnyxCeleryTaskCompletionStatus.UNDEFINED
+    cc_pair_identifier = ConnectorCredentialPairIdentifier(
+        connector_id=connector_id,
+        credential_id=credential_id,
+    )
+    failures: dict[str, str] = {}
+    # failed documents that will fail the same way if retried
+    rejected_doc_ids: set[str] = set()
+
+    try:
+        with get_session_with_current_tenant() as db_session:
+            active_search_settings = get_active_search_settings(db_session)
+            doc_index = get_default_document_index(
+                active_search_settings.primary,
+                active_search_settings.secondary,
+                httpx_client=HttpxPool.get("vespa"),
+            )
+
+            retry_index = RetryDocumentIndex(doc_index)
+
+            doc_id_to_count = dict(
+                get_document_connector_counts(db_session, document_ids)
+            )
+            id_to_doc = {
+                doc.id: doc for doc in get_documents_by_ids(db_session, document_ids)
+            }
+
+            # count == 1 means this is the only remaining cc_pair reference to the doc
+            # delete it from vespa and the db
+            doc_ids_to_delete = [
+                doc_id for doc_id in document_ids if doc_id_to_count.get(doc_id) == 1
+            ]
+            # count > 1 means the document still has cc_pair references, resync it
+            doc_ids_to_update = [
+                doc_id
+                for doc_id in document_ids
+                if doc_id_to_count.get(doc_id, 0) > 1 and doc_id in id_to_doc
+            ]
+
+            chunks_affected = 0
+            deleted_doc_ids: list[str] = []
+            if doc_ids_to_delete:
+                delete_result = retry_index.delete_batch(
+                    {
+                        doc_id: (
+                            id_to_doc[doc_id].chunk_count
+                            if doc_id in id_to_doc
+                            else None
+                        )
+                        for doc_id in doc_ids_to_delete
+                    },
+                    tenant_id=tenant_id,
+                )
+                failures.update(delete_result.failures)
+                rejected_doc_ids.update(
+                    delete_result.get_failed_doc_ids(DocumentFailureType.CLIENT_ERROR)
+                )
+                deleted_doc_ids = list(delete_result.chunks_affected)
+                chunks_affected += sum(delete_result.chunks_affected.values())
+
+                if deleted_doc_ids:
+                    delete_documents_complete__no_commit(
+                        db_session=db_session,
+                        document_ids=deleted_doc_ids,
+                    )
+
+            updated_doc_ids: list[str] = []
+            if doc_ids_to_update:
+                # update Vespa. OK if doc doesn't exist
+                update_result = retry_index.update_batch(
+                    build_vespa_document_updates(
+                        [id_to_doc[doc_id] for doc_id in doc_ids_to_update],
+                        db_session,
+                    ),
+                    tenant_id=tenant_id,
+                )
+                failures.update(update_result.failures)
+                rejected_doc_ids.update(
+                    update_result.get_failed_doc_ids(DocumentFailureType.CLIENT_ERROR)
+                )
+                updated_doc_ids = list(update_result.chunks_affected)
+                chunks_affected += sum(update_result.chunks_affected.values())
+
+                if updated_doc_ids:
+                    # there are still other cc_pair references to the docs, so just
+                    # remove this cc_pair's
+                    delete_documents_by_connector_credential_pair__no_commit(
+                        db_session=db_session,
+                        document_ids=updated_doc_ids,
+                        connector_credential_pair_identifier=cc_pair_identifier,
+                    )
+                    mark_documents_as_synced__no_commit(updated_doc_ids, db_session)
+
+            db_session.commit()
+
+            elapsed = time.monotonic() - start
+            task_logger.info(
+                f"num_docs={len(document_ids)} "
+                f"deleted={len(deleted_doc_ids)} "
+                f"updated={len(updated_doc_ids)} "
+                f"skipped={len(document_ids) - len(doc_ids_to_delete) - len(doc_ids_to_update)} "
+                f"failed={len(failures)} "
+                f"chunks={chunks_affected} "
+                f"elapsed={elapsed:.2f}"
+            )
+
+        if not failures:
+            completion_status = OnyxCeleryTaskCompletionStatus.SUCCEEDED
+        else:
+            for doc_id, error in failures.items():
+                task_logger.warning(
+                    f"document_by_cc_pair_cleanup_batch_task document failed: "
+                    f"doc={doc_id} error={error}"
+                )
+
+            if rejected_doc_ids:
+                task_logger.warning(
+                    f"Non-retryable document failures. Marking docs as dirty for "
+                    f"reconciliation: num_docs={len(rejected_doc_ids)}"
+                )
+                _mark_documents_dirty(list(rejected_doc_ids), cc_pair_identifier)
+
+            retry_doc_ids = [
+                doc_id for doc_id in failures if doc_id not in rejected_doc_ids
+            ]
+            completion_status = OnyxCeleryTaskCompletionStatus.RETRYABLE_EXCEPTION
+            if not retry_doc_ids:
+                completion_status = (
+                    OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+                )
+            elif (
+                self.max_retries is not None
+                and self.request.retries >= self.max_retries
+            ):
+                task_logger.warning(
+                    f"Max celery task retries reached. Marking docs as dirty for "
+                    f"reconciliation: num_docs={len(retry_doc_ids)}"
+                )
+                _mark_documents_dirty(retry_doc_ids, cc_pair_identifier)
+                completion_status = (
+                    OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+                )
+            else:
+                # retry only the failed documents. Keeps the same task id, so the
+                # taskset accounting is unchanged
+                countdown = 2 ** (self.request.retries + 4)
+                self.retry(
+                    kwargs=dict(
+                        document_ids=retry_doc_ids,
+                        connector_id=connector_id,
+                        credential_id=credential_id,
+                        tenant_id=tenant_id,
+                    ),
+                    countdown=countdown,
+                )
+    except SoftTimeLimitExceeded:
+        task_logger.info(
+            f"SoftTimeLimitExceeded exception. num_docs={len(document_ids)}"
+        )
+        completion_status = OnyxCeleryTaskCompletionStatus.SOFT_TIME_LIMIT
+    except Retry:
+        raise
+    except Exception as ex:
+        e: Exception | None = None
+        while True:
+            if isinstance(ex, RetryError):
+                task_logger.warning(
+                    f"Tenacity retry failed: num_attempts={ex.last_attempt.attempt_number}"
+                )
+
+                # only set the inner exception if it is of type Exception
+                e_temp = ex.last_attempt.exception()
+                if isinstance(e_temp, Exception):
+                    e = e_temp
+            else:
+                e = ex
+
+            if isinstance(e, httpx.HTTPStatusError):
+                if e.response.status_code == HTTPStatus.BAD_REQUEST:
+                    task_logger.exception(
+                        f"Non-retryable HTTPStatusError: "
+                        f"num_docs={len(document_ids)} "
+                        f"status={e.response.status_code}"
+                    )
+                completion_status = (
+                    OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+                )
+                break
+
+            task_logger.exception(
+                f"document_by_cc_pair_cleanup_batch_task exceptioned: "
+                f"num_docs={len(document_ids)}"
+            )
+
+            completion_status = OnyxCeleryTaskCompletionStatus.RETRYABLE_EXCEPTION
+            if (
+                self.max_retries is not None
+                and self.request.retries >= self.max_retries
+            ):
+                task_logger.warning(
+                    f"Max celery task retries reached. Marking docs as dirty for "
+                    f"reconciliation: num_docs={len(document_ids)}"
+                )
+                _mark_documents_dirty(document_ids, cc_pair_identifier)
+                completion_status = (
+                    OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+                )
+                break
+
+            # Exponential backoff from 2^4 to 2^6 ... i.e. 16, 32, 64
+            countdown = 2 ** (self.request.retries + 4)
+            self.retry(exc=e, countdown=countdown)  # this will raise a celery exception
+            break  # we won't hit this, but it looks weird not to have it
+    finally:
+        task_logger.info(
+            f"document_by_cc_pair_cleanup_batch_task completed: "
+            f"status={completion_status.value} num_docs={len(document_ids)}"
+        )
+
+    if completion_status != OnyxCeleryTaskCompletionStatus.SUCCEEDED:
+        return False
+
+    task_logger.info(
+        f"document_by_cc_pair_cleanup_batch_task finished: num_docs={len(document_ids)}"
+    )
+    return True
+
+
+def build_vespa_document_updates(
+    docs: list[DbDocument],
+    db_session: Session,
+) -> list[VespaDocumentUpdate]:
+    """Builds the metadata (access, document sets, boost, hidden) update for each
+    document with one grouped query per field for the whole batch."""
+    document_ids = [doc.id for doc in docs]
+
+    # the below functions do not include cc_pairs being deleted.
+    # i.e. they will correctly omit access for the current cc_pair
+    doc_id_to_access = get_access_for_documents(
+        document_ids=document_ids, db_session=db_session
+    )
+    doc_id_to_doc_sets = dict(
+        fetch_document_sets_for_documents(document_ids, db_session)
+    )
+
+    return [
+        VespaDocumentUpdate(
+            doc_id=doc.id,
+            chunk_count=doc.chunk_count,
+            fields=VespaDocumentFields(
+                document_sets=set(doc_id_to_doc_sets.get(doc.id, [])),
+                access=doc_id_to_access[doc.id],
+                boost=doc.boost,
+                hidden=doc.hidden,
+            ),
+        )
+        for doc in docs
+    ]
+
+
+def _mark_documents_dirty(
+    document_ids: list[str],
+    cc_pair_identifier: ConnectorCredentialPairIdentifier,
+) -> None:
+    """Marks the documents as dirty in the db so that they eventually get fixed out
+    of band via stale document reconciliation"""
+    with get_session_with_current_tenant() as db_session:
+        # delete the cc pair relationship now and let reconciliation clean it up
+        # in vespa
+        delete_documents_by_connector_credential_pair__no_commit(
+            db_session=db_session,
+            document_ids=document_ids,
+            connector_credential_pair_identifier=cc_pair_identifier,
+        )
+        mark_documents_as_modified__no_commit(document_ids, db_session)
+        db_session.commit()
+
+
 @shared_task(name=OnyxCeleryTask.CELERY_BEAT_HEARTBEAT, ignore_result=True, bind=True)
 def celery_beat_heartbeat(self: Task, *, tenant_id: str) -> None:
     """When this task runs, it writes a key to Redis with a TTL.
@@ -8,6 +8,7 @@ import httpx
 from celery import Celery
 from celery import shared_task
 from celery import Task
+from celery.exceptions import Retry
 from celery.exceptions import SoftTimeLimitExceeded
 from redis import Redis
 from redis.lock import Lock as RedisLock
@@ -17,6 +18,9 @@ from tenacity import RetryError
 from onyx.access.access import get_access_for_document
 from onyx.background.celery.apps.app_base import task_logger
 from onyx.background.celery.tasks.shared.RetryDocumentIndex import RetryDocumentIndex
+from onyx.background.celery.tasks.shared.tasks import build_vespa_document_updates
+from onyx.background.celery.tasks.shared.tasks import LIGHT_BATCH_SOFT_TIME_LIMIT
+from onyx.background.celery.tasks.shared.tasks import LIGHT_BATCH_TIME_LIMIT
 from onyx.background.celery.tasks.shared.tasks import LIGHT_SOFT_TIME_LIMIT
 from onyx.background.celery.tasks.shared.tasks import LIGHT_TIME_LIMIT
 from onyx.background.celery.tasks.shared.tasks import OnyxCeleryTaskCompletionStatus
@@ -28,13 +32,16 @@ from onyx.background.celery.tasks.vespa.document_sync import (
     try_generate_stale_document_sync_tasks,
 )
 from onyx.configs.app_configs import JOB_TIMEOUT
+from onyx.configs.app_configs import VESPA_METADATA_SYNC_BATCH_SIZE
 from onyx.configs.app_configs import VESPA_SYNC_MAX_TASKS
 from onyx.configs.constants import CELERY_VESPA_SYNC_BEAT_LOCK_TIMEOUT
 from onyx.configs.constants import OnyxCeleryTask
 from onyx.configs.constants import OnyxRedisConstants
 from onyx.configs.constants import OnyxRedisLocks
 from onyx.db.document import get_document
+from onyx.db.document import get_documents_by_ids
 from onyx.db.document import mark_document_as_synced
+from onyx.db.document import mark_documents_as_synced__no_commit
 from onyx.db.document_set import delete_document_set
 from onyx.db.document_set import fetch_document_sets
 from onyx.db.document_set import fetch_document_sets_for_document
@@ -256,7 +263,7 @@ def try_generate_document_set_sync_tasks(
     if result is None:
         return None
 
-    tasks_generated = result[0]
+    tasks_generated, docs_generated = result
     # Currently we are allowing the sync to proceed with 0 tasks.
     # It's possible for sets/groups to be generated initially with no entries
     # and they still need to be marked as up to date.
@@ -265,7 +272,9 @@ def try_generate_document_set_sync_tasks(
 
     task_logger.info(
         f"RedisDocumentSet.generate_tasks finished. "
-        f"document_set={document_set.id} tasks_generated={tasks_generated}"
+        f"document_set={document_set.id} "
+        f"tasks_generated={tasks_generated} "
+        f"docs_generated={docs_generated}"
     )
 
     # create before setting fence to avoid race condition where the monitoring
@@ -279,8 +288,9 @@ def try_generate_document_set_sync_tasks(
     except Exception:
         task_logger.exception("insert_sync_record exceptioned.")
 
-    # set this only after all tasks have been added
-    rds.set_fence(tasks_generated)
+    # set this only after all tasks have been added. The fence holds the number of
+    # documents, the taskset tracks the batches
+    rds.set_fence(docs_generated)
     return tasks_generated
 
 
@@ -332,7 +342,7 @@ def try_generate_user_group_sync_tasks(
     if result is None:
         return None
 
-    tasks_generated = result[0]
+    tasks_generated, docs_generated = result
     # Currently we are allowing the sync to proceed with 0 tasks.
     # It's possible for sets/groups to be generated initially with no entries
     # and they still need to be marked as up to date.
@@ -341,7 +351,9 @@ def try_generate_user_group_sync_tasks(
 
     task_logger.info(
         f"RedisUserGroup.generate_tasks finished. "
-        f"usergroup={usergroup.id} tasks_generated={tasks_generated}"
+        f"usergroup={usergroup.id} "
+        f"tasks_generated={tasks_generated} "
+        f"docs_generated={docs_generated}"
     )
 
     # create before setting fence to avoid race condition where the monitoring
@@ -355,8 +367,9 @@ def try_generate_user_group_sync_tasks(
     except Exception:
         task_logger.exception("insert_sync_record exceptioned.")
 
-    # set this only after all tasks have been added
-    rug.set_fence(tasks_generated)
+    # set this only after all tasks have been added. The fence holds the number of
+    # documents, the taskset tracks the batches
+    rug.set_fence(docs_generated)
 
     return tasks_generated
 
@@ -405,7 +418,8 @@ def monitor_document_set_taskset(
             entity_id=document_set_id,
             sync_type=SyncType.DOCUMENT_SET,
             sync_status=SyncStatus.IN_PROGRESS,
-            num_docs_synced=count,
+            # upper bound of the documents left, each task syncs a batch
+            num_docs_synced=min(initial_count, count * VESPA_METADATA_SYNC_BATCH_SIZE),
         )
         return
 
@@ -568,3 +582,149 @@ def vespa_metadata_sync_task(self: Task, document_id: str, *, tenant_id: str) ->
         )
 
     return completion_status == OnyxCeleryTaskCompletionStatus.SUCCEEDED
+
+
+@shared_task(
+    name=OnyxCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK,
+    bind=True,
+    soft_time_limit=LIGHT_BATCH_SOFT_TIME_LIMIT,
+    time_limit=LIGHT_BATCH_TIME_LIMIT,
+    max_retries=3,
+)
+def vespa_metadata_sync_batch_task(
+    self: Task, document_ids: list[str], *, tenant_id: str
+) -> bool:
+    """Batched version of vespa_metadata_sync_task. Access, document sets and boosts
+    are fetched with grouped queries for the whole batch, the Vespa partial updates
+    are fed in bulk and the batch is marked synced in one commit.
+
+    Only the documents that failed in Vespa are retried."""
+    start = time.monotonic()
+
+    completion_status = OnyxCeleryTaskCompletionStatus.UNDEFINED
+
+    try:
+        with get_session_with_current_tenant() as db_session:
+            active_search_settings = get_active_search_settings(db_session)
+            doc_index = get_default_document_index(
+                search_settings=active_search_settings.primary,
+                secondary_search_settings=active_search_settings.secondary,
+                httpx_client=HttpxPool.get("vespa"),
+            )
+
+            retry_index = RetryDocumentIndex(doc_index)
+
+            docs = get_documents_by_ids(db_session, document_ids)
+
+            # update Vespa. OK if doc doesn't exist
+            update_result = retry_index.update_batch(
+                build_vespa_document_updates(docs, db_session),
+                tenant_id=tenant_id,
+            )
+
+            # update db last. Worst case = we crash right before this and
+            # the sync might repeat again later
+            synced_doc_ids = list(update_result.chunks_affected)
+            if synced_doc_ids:
+                mark_documents_as_synced__no_commit(synced_doc_ids, db_session)
+                db_session.commit()
+
+            elapsed = time.monotonic() - start
+            task_logger.info(
+                f"num_docs={len(document_ids)} "
+                f"action=sync "
+                f"synced={len(synced_doc_ids)} "
+                f"skipped={len(document_ids) - len(docs)} "
+                f"failed={len(update_result.failures)} "
+                f"chunks={sum(update_result.chunks_affected.values())} "
+                f"elapsed={elapsed:.2f}"
+            )
+
+        if not update_result.failures:
+            completion_status = OnyxCeleryTaskCompletionStatus.SUCCEEDED
+        else:
+            for doc_id, error in update_result.failures.items():
+                task_logger.warning(
+                    f"vespa_metadata_sync_batch_task document failed: "
+                    f"doc={doc_id} error={error}"
+                )
+
+            completion_status = OnyxCeleryTaskCompletionStatus.RETRYABLE_EXCEPTION
+            if (
+                self.max_retries is not None
+                and self.request.retries >= self.max_retries
+            ):
+                # the failed documents still need a sync and will be picked up again
+                completion_status = (
+                    OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+                )
+            else:
+                # retry only the failed documents. Keeps the same task id, so the
+                # taskset accounting is unchanged
+                countdown = 2 ** (self.request.retries + 4)
+                self.retry(
+                    kwargs=dict(
+                        document_ids=list(update_result.failures),
+                        tenant_id=tenant_id,
+                    ),
+                    countdown=countdown,
+                )
+    except SoftTimeLimitExceeded:
+        task_logger.info(
+            f"SoftTimeLimitExceeded exception. num_docs={len(document_ids)}"
+        )
+        completion_status = OnyxCeleryTaskCompletionStatus.SOFT_TIME_LIMIT
+    except Retry:
+        raise
+    except Exception as ex:
+        e: Exception | None = None
+        while True:
+            if isinstance(ex, RetryError):
+                task_logger.warning(
+                    f"Tenacity retry failed: num_attempts={ex.last_attempt.attempt_number}"
+                )
+
+                # only set the inner exception if it is of type Exception
+                e_temp = ex.last_attempt.exception()
+                if isinstance(e_temp, Exception):
+                    e = e_temp
+            else:
+                e = ex
+
+            if isinstance(e, httpx.HTTPStatusError):
+                if e.response.status_code == HTTPStatus.BAD_REQUEST:
+                    task_logger.exception(
+                        f"Non-retryable HTTPStatusError: "
+                        f"num_docs={len(document_ids)} "
+                        f"status={e.response.status_code}"
+                    )
+                completion_status = (
+                    OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+                )
+                break
+
+            task_logger.exception(
+                f"vespa_metadata_sync_batch_task exceptioned: "
+                f"num_docs={len(document_ids)}"
+            )
+
+            completion_status = OnyxCeleryTaskCompletionStatus.RETRYABLE_EXCEPTION
+            if (
+                self.max_retries is not None
+                and self.request.retries >= self.max_retries
+            ):
+                completion_status = (
+                    OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+                )
+
+            # Exponential backoff from 2^4 to 2^6 ... i.e. 16, 32, 64
+            countdown = 2 ** (self.request.retries + 4)
+            self.retry(exc=e, countdown=countdown)  # this will raise a celery exception
+            break  # we won't hit this, but it looks weird not to have it
+    finally:
+        task_logger.info(
+            f"vespa_metadata_sync_batch_task completed: "
+            f"status={completion_status.value} num_docs={len(document_ids)}"
+        )
+
+    return completion_status == OnyxCeleryTaskCompletionStatus.SUCCEEDED
@@ -110,6 +110,9 @@ def _get_connector_runner(
             connector_specific_config=attempt.connector_credential_pair.connector.connector_specific_config,
             credential=attempt.connector_credential_pair.credential,
         )
+        runnable_connector.set_indexing_context(
+            attempt.connector_credential_pair.id, attempt.search_settings_id
+        )
 
         # validate the connector settings
         if not INTEGRATION_TESTS_MODE:
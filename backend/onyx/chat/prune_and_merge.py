@@ -1,6 +1,6 @@
 import json
 from collections import defaultdict
-from copy import deepcopy
+from typing import cast
 from typing import TypeVar
 
 from pydantic import BaseModel
@@ -17,6 +17,7 @@ from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
 from onyx.context.search.models import InferenceChunk
 from onyx.context.search.models import InferenceSection
 from onyx.llm.interfaces import LLMConfig
+from onyx.natural_language_processing.utils import BaseTokenizer
 from onyx.natural_language_processing.utils import get_tokenizer
 from onyx.natural_language_processing.utils import tokenizer_trim_content
 from onyx.prompts.prompt_utils import build_doc_context_str
@@ -163,6 +164,54 @@ def _remove_sections_to_ignore(
     ]
 
 
+def _section_content_token_count(
+    section: InferenceSection, llm_tokenizer: BaseTokenizer
+) -> int:
+    """Number of tokens of the combined content, from the token counts of its chunks
+    (computed at indexing time) when the content is the chunks joined by newlines (see
+    inference_section_from_chunks), else by tokenizing it."""
+    key = llm_tokenizer.token_count_key
+    chunks = section.chunks
+    if key is not None and chunks:
+        chunk_token_counts = [chunk.llm_token_counts.get(key) for chunk in chunks]
+        if (
+            None not in chunk_token_counts
+            and len(section.combined_content)
+            == sum(len(chunk.content) for chunk in chunks) + len(chunks) - 1
+        ):
+            # one token per newline separator
+            return sum(cast(list[int], chunk_token_counts)) + len(chunks) - 1
+
+    return len(llm_tokenizer.encode(section.combined_content))
+
+
+def _section_overhead_token_count(
+    section: InferenceSection,
+    ind: int,
+    using_tool_message: bool,
+    llm_tokenizer: BaseTokenizer,
+) -> int:
+    """Number of tokens the section takes in the prompt besides its content (title,
+    source, metadata...). Only these few lines are tokenized."""
+    if using_tool_message:
+        # If using tool message, it will be a bit of an overestimate as the extra json text around the section
+        # will be counted towards the token count. However, once the Sections are merged, the extra json parts
+        # that overlap will not be counted multiple times like it is in the pruning step.
+        section_dict = section_to_dict(section, ind)
+        section_dict["content"] = ""
+        section_str = json.dumps(section_dict)
+    else:
+        section_str = build_doc_context_str(
+            semantic_identifier=section.center_chunk.semantic_identifier,
+            source_type=section.center_chunk.source_type,
+            content="",
+            metadata_dict=section.center_chunk.metadata,
+            updated_at=section.center_chunk.updated_at,
+            ind=ind,
+        )
+    return len(llm_tokenizer.encode(section_str))
+
+
 def _apply_pruning(
     sections: list[InferenceSection],
     section_relevance_list: list[bool] | None,
@@ -178,8 +227,9 @@ def _apply_pruning(
         model_name=llm_config.model_name,
     )
 
-    # combine the section lists, making sure to add the keep_sections first
-    sections = deepcopy(keep_sections) + deepcopy(sections)
+    # combine the section lists, making sure to add the keep_sections first.
+    # the sections themselves are not modified, the ones that get trimmed are copied
+    sections = keep_sections + sections
 
     # build combined relevance list, treating the keep_sections as relevant
     if section_relevance_list is not None:
@@ -199,28 +249,16 @@ def _apply_pruning(
     sections = _remove_sections_to_ignore(sections=sections)
 
     section_idx_token_count: dict[int, int] = {}
+    section_idx_content_token_count: dict[int, int] = {}
 
     ind = 0
     final_section_ind = None
     total_tokens = 0
     for ind, section in enumerate(sections):
-        section_str = (
-            # If using tool message, it will be a bit of an overestimate as the extra json text around the section
-            # will be counted towards the token count. However, once the Sections are merged, the extra json parts
-            # that overlap will not be counted multiple times like it is in the pruning step.
-            json.dumps(section_to_dict(section, ind))
-            if using_tool_message
-            else build_doc_context_str(
-                semantic_identifier=section.center_chunk.semantic_identifier,
-                source_type=section.center_chunk.source_type,
-                content=section.combined_content,
-                metadata_dict=section.center_chunk.metadata,
-                updated_at=section.center_chunk.updated_at,
-                ind=ind,
-            )
+        content_token_count = _section_content_token_count(section, llm_tokenizer)
+        section_token_count = content_token_count + _section_overhead_token_count(
+            section, ind, using_tool_message, llm_tokenizer
         )
-
-        section_token_count = len(llm_tokenizer.encode(section_str))
         # if not using sections (specifically, using Sections where each section maps exactly to the one center chunk),
         # truncate chunks that are way too long. This can happen if the embedding model tokenizer is different
         # than the LLM tokenizer
@@ -242,15 +280,21 @@ def _apply_pruning(
                     "Found more tokens in Section than expected, "
                     "likely mismatch between embedding and LLM tokenizers. Trimming content..."
                 )
-            section.combined_content = tokenizer_trim_content(
-                content=section.combined_content,
-                desired_length=DOC_EMBEDDING_CONTEXT_SIZE,
-                tokenizer=llm_tokenizer,
+            sections[ind] = section.model_copy(
+                update={
+                    "combined_content": tokenizer_trim_content(
+                        content=section.combined_content,
+                        desired_length=DOC_EMBEDDING_CONTEXT_SIZE,
+                        tokenizer=llm_tokenizer,
+                    )
+                }
             )
             section_token_count = DOC_EMBEDDING_CONTEXT_SIZE
+            content_token_count = min(content_token_count, DOC_EMBEDDING_CONTEXT_SIZE)
 
         total_tokens += section_token_count
         section_idx_token_count[ind] = section_token_count
+        section_idx_content_token_count[ind] = content_token_count
 
         if total_tokens > token_limit:
             final_section_ind = ind
@@ -284,11 +328,11 @@ def _apply_pruning(
                     )
 
             amount_to_truncate = total_tokens - token_limit
-            # NOTE: need to recalculate the length here, since the previous calculation included
-            # overhead from JSON-fying the doc / the metadata
-            final_doc_content_length = len(
-                llm_tokenizer.encode(sections[final_section_ind].combined_content)
-            ) - (amount_to_truncate)
+            # NOTE: only the content can be truncated, not the overhead from JSON-fying
+            # the doc / the metadata
+            final_doc_content_length = (
+                section_idx_content_token_count[final_section_ind] - amount_to_truncate
+            )
             # this could occur if we only have space for the title / metadata
             # not ideal, but it's the most reasonable thing to do
             # NOTE: the frontend prevents documents from being selected if
@@ -301,10 +345,15 @@ def _apply_pruning(
                 )
                 sections.pop()
             else:
-                sections[final_section_ind].combined_content = tokenizer_trim_content(
-                    content=sections[final_section_ind].combined_content,
-                    desired_length=final_doc_content_length,
-                    tokenizer=llm_tokenizer,
+                final_section = sections[final_section_ind]
+                sections[final_section_ind] = final_section.model_copy(
+                    update={
+                        "combined_content": tokenizer_trim_content(
+                            content=final_section.combined_content,
+                            desired_length=final_doc_content_length,
+                            tokenizer=llm_tokenizer,
+                        )
+                    }
                 )
         else:
             # For search on chunk level (Section is just a chunk), don't truncate the final Chunk/Section unless it's the only one
@@ -312,12 +361,17 @@ def _apply_pruning(
             if final_section_ind != 0:
                 sections = sections[:final_section_ind]
             else:
-                sections[0].combined_content = tokenizer_trim_content(
-                    content=sections[0].combined_content,
-                    desired_length=token_limit - _METADATA_TOKEN_ESTIMATE,
-                    tokenizer=llm_tokenizer,
-                )
-                sections = [sections[0]]
+                sections = [
+                    sections[0].model_copy(
+                        update={
+                            "combined_content": tokenizer_trim_content(
+                                content=sections[0].combined_content,
+                                desired_length=token_limit - _METADATA_TOKEN_ESTIMATE,
+                                tokenizer=llm_tokenizer,
+                            )
+                        }
+                    )
+                ]
 
     # sort by relevance, then by score (as we added the keep_sections first)
     sections.sort(
@@ -17,6 +17,40 @@ def in_code_block(llm_text: str) -> bool:
     return count % 2 != 0
 
 
+def ends_with_possible_citation(text: str) -> bool:
+    """Whether the text ends with something that could still become a citation:
+    '[', '[[', '[1', '[[1', '[1,', '[1, ', '[1,2', '[1, 2,', etc.
+
+    Only looks at the text after the last '[', so it's linear in the length of the
+    (potential) citation rather than the whole text, and never backtracks."""
+    # mirrors the regex `\[+(?:\d+,? ?)*$`, where `$` also matches before a final newline
+    if text.endswith("\n"):
+        text = text[:-1]
+
+    bracket_idx = text.rfind("[")
+    if bracket_idx == -1:
+        return False
+
+    # after the brackets: groups of digits, each optionally followed by ',' and/or ' '
+    expect_digit = True
+    separator = ""
+    for char in text[bracket_idx + 1 :]:
+        if char.isdecimal():
+            expect_digit = False
+            separator = ""
+        elif expect_digit:
+            return False
+        elif char == "," and separator == "":
+            separator = ","
+        elif char == " " and separator in ("", ","):
+            separator += " "
+            # after the space only digits can follow
+            expect_digit = True
+        else:
+            return False
+    return True
+
+
 class CitationProcessor:
     def __init__(
         self,
@@ -31,7 +65,6 @@ class CitationProcessor:
         self.max_citation_num = len(context_docs)
         self.stop_stream = stop_stream
 
-        self.llm_out = ""  # entire output so far
         self.curr_segment = ""  # tokens held for citation processing
         self.hold = ""  # tokens held for stop token processing
 
@@ -39,8 +72,10 @@ class CitationProcessor:
         self.cited_documents: set[str] = set()  # docs cited in the entire stream
         self.non_citation_count = 0
 
-        # '[', '[[', '[1', '[[1', '[1,', '[1, ', '[1,2', '[1, 2,', etc.
-        self.possible_citation_pattern = re.compile(r"(\[+(?:\d+,? ?)*$)")
+        # code fence state of the entire output so far, tracked incrementally so that
+        # each token costs O(len(token)) instead of rescanning the whole output
+        self.code_fence_count = 0  # number of (non-overlapping) ``` seen so far
+        self.trailing_backticks = 0  # backticks at the end not yet part of a ```
 
         # group 1: '[[1]]', [[2]], etc.
         # group 2: '[1]', '[1, 2]', '[1,2,16]', etc.
@@ -65,7 +100,7 @@ class CitationProcessor:
             self.hold = ""
 
         self.curr_segment += token
-        self.llm_out += token
+        self._track_code_fences(token)
 
         # Handle code blocks without language tags
         if "`" in self.curr_segment:
@@ -73,16 +108,19 @@ class CitationProcessor:
                 pass
             elif "```" in self.curr_segment:
                 piece_that_comes_after = self.curr_segment.split("```")[1][0]
-                if piece_that_comes_after == "\n" and in_code_block(self.llm_out):
+                if piece_that_comes_after == "\n" and self.in_code_block:
                     self.curr_segment = self.curr_segment.replace("```", "```plaintext")
 
-        citation_matches = list(self.citation_pattern.finditer(self.curr_segment))
-        possible_citation_found = bool(
-            re.search(self.possible_citation_pattern, self.curr_segment)
+        # every citation ends with a ']'
+        citation_matches = (
+            list(self.citation_pattern.finditer(self.curr_segment))
+            if "]" in self.curr_segment
+            else []
         )
+        possible_citation_found = ends_with_possible_citation(self.curr_segment)
 
         result = ""
-        if citation_matches and not in_code_block(self.llm_out):
+        if citation_matches and not self.in_code_block:
             match_idx = 0
             for match in citation_matches:
                 match_span = match.span()
@@ -117,6 +155,27 @@ class CitationProcessor:
         if result:
             yield OnyxAnswerPiece(answer_piece=result)
 
+    @property
+    def in_code_block(self) -> bool:
+        return self.code_fence_count % 2 != 0
+
+    def _track_code_fences(self, text: str) -> None:
+        """Equivalent to re-counting TRIPLE_BACKTICK over the entire output so far,
+        but only looks at the new text."""
+        if "`" not in text:
+            if text:
+                self.trailing_backticks = 0
+            return
+
+        for char in text:
+            if char != "`":
+                self.trailing_backticks = 0
+                continue
+            self.trailing_backticks += 1
+            if self.trailing_backticks == len(TRIPLE_BACKTICK):
+                self.code_fence_count += 1
+                self.trailing_backticks = 0
+
     def process_citation(self, match: re.Match) -> tuple[str, list[CitationInfo]]:
         """
         Process a single citation match and return the citation string and the
@@ -26,6 +26,16 @@ APP_API_PREFIX = os.environ.get("API_PREFIX", "")
 
 SKIP_WARM_UP = os.environ.get("SKIP_WARM_UP", "").lower() == "true"
 
+# Sizes of the process wide thread pools that run_functions_tuples_in_parallel and the
+# other parallel helpers submit to. Calls fanning out to more functions than this are
+# queued up instead of each starting their own threads
+THREADPOOL_DEFAULT_MAX_WORKERS = int(
+    os.environ.get("THREADPOOL_DEFAULT_MAX_WORKERS") or 32
+)
+THREADPOOL_LLM_MAX_WORKERS = int(os.environ.get("THREADPOOL_LLM_MAX_WORKERS") or 16)
+THREADPOOL_VESPA_MAX_WORKERS = int(os.environ.get("THREADPOOL_VESPA_MAX_WORKERS") or 32)
+THREADPOOL_IO_MAX_WORKERS = int(os.environ.get("THREADPOOL_IO_MAX_WORKERS") or 32)
+
 #####
 # User Facing Features Configs
 #####
@@ -153,6 +163,13 @@ TRACK_EXTERNAL_IDP_EXPIRY = (
     os.environ.get("TRACK_EXTERNAL_IDP_EXPIRY", "").lower() == "true"
 )
 
+# The ACL of each user (their email, user groups and external groups) is cached per
+# process so searches don't query them every time. Entries are dropped when the
+# tenant's ACL version is bumped (group syncs, user group changes) or after the TTL.
+# Set the size to 0 to disable the cache
+USER_ACL_CACHE_SIZE = int(os.environ.get("USER_ACL_CACHE_SIZE") or 1024)
+USER_ACL_CACHE_TTL_SECONDS = int(os.environ.get("USER_ACL_CACHE_TTL_SECONDS") or 300)
+
 
 #####
 # DB Configs
@@ -347,9 +364,16 @@ CELERY_WORKER_KG_PROCESSING_CONCURRENCY = int(
 
 # The maximum number of tasks that can be queued up to sync to Vespa in a single pass
 VESPA_SYNC_MAX_TASKS = 8192
+# Number of documents synced to Vespa by each metadata sync task
+VESPA_METADATA_SYNC_BATCH_SIZE = int(
+    os.environ.get("VESPA_METADATA_SYNC_BATCH_SIZE") or 64
+)
 
 DB_YIELD_PER_DEFAULT = 64
 
+# Number of documents cleaned up by each connector deletion / pruning subtask
+DOCUMENT_CLEANUP_BATCH_SIZE = int(os.environ.get("DOCUMENT_CLEANUP_BATCH_SIZE") or 64)
+
 #####
 # Connector Configs
 #####
@@ -384,6 +408,28 @@ WEB_CONNECTOR_OAUTH_CLIENT_ID = os.environ.get("WEB_CONNECTOR_OAUTH_CLIENT_ID")
 WEB_CONNECTOR_OAUTH_CLIENT_SECRET = os.environ.get("WEB_CONNECTOR_OAUTH_CLIENT_SECRET")
 WEB_CONNECTOR_OAUTH_TOKEN_URL = os.environ.get("WEB_CONNECTOR_OAUTH_TOKEN_URL")
 WEB_CONNECTOR_VALIDATE_URLS = os.environ.get("WEB_CONNECTOR_VALIDATE_URLS")
+# Number of pages the web connector scrapes at the same time, each worker with its own
+# browser. 1 crawls page by page like before
+WEB_CONNECTOR_MAX_CONCURRENCY = int(
+    os.environ.get("WEB_CONNECTOR_MAX_CONCURRENCY") or 1
+)
+# Try a plain HTTP request before falling back to the browser, pages that already have
+# their content without running JavaScript skip the browser entirely
+WEB_CONNECTOR_HTTP_FAST_PATH = (
+    os.environ.get("WEB_CONNECTOR_HTTP_FAST_PATH", "").lower() == "true"
+)
+# Politeness limits of concurrent crawls, per host
+WEB_CONNECTOR_MAX_CONCURRENT_REQUESTS_PER_HOST = int(
+    os.environ.get("WEB_CONNECTOR_MAX_CONCURRENT_REQUESTS_PER_HOST") or 4
+)
+WEB_CONNECTOR_MIN_REQUEST_INTERVAL_SECONDS = float(
+    os.environ.get("WEB_CONNECTOR_MIN_REQUEST_INTERVAL_SECONDS") or 0.1
+)
+# Remember the ETag / Last-Modified / content hash of every scraped page, so that
+# scheduled recrawls can use conditional requests and skip the unchanged pages
+WEB_CONNECTOR_CONDITIONAL_RECRAWL = (
+    os.environ.get("WEB_CONNECTOR_CONDITIONAL_RECRAWL", "true").lower() != "false"
+)
 
 HTML_BASED_CONNECTOR_TRANSFORM_LINKS_STRATEGY = os.environ.get(
     "HTML_BASED_CONNECTOR_TRANSFORM_LINKS_STRATEGY",
@@ -538,6 +584,12 @@ MAX_PRUNING_DOCUMENT_RETRIEVAL_PER_MINUTE = int(
     os.environ.get("MAX_PRUNING_DOCUMENT_RETRIEVAL_PER_MINUTE", 0)
 )
 
+# Number of source document IDs a pruning job keeps in memory. Beyond that, the IDs
+# are spilled to sorted temporary files on disk and merged with the indexed IDs.
+PRUNING_MAX_IDS_IN_MEMORY = int(
+    os.environ.get("PRUNING_MAX_IDS_IN_MEMORY") or 1_000_000
+)
+
 # comma delimited list of zendesk article labels to skip indexing for
 ZENDESK_CONNECTOR_SKIP_ARTICLE_LABELS = os.environ.get(
     "ZENDESK_CONNECTOR_SKIP_ARTICLE_LABELS", ""
@@ -608,6 +660,22 @@ MAX_FILE_SIZE_BYTES = int(
     os.environ.get("MAX_FILE_SIZE_BYTES") or 2 * 1024 * 1024 * 1024
 )  # 2GB in bytes
 
+# PDFs with at least this many pages are extracted page by page by
+# PDF_EXTRACTION_NUM_PROCESSES worker subprocesses. Set the number of processes to 1
+# to disable.
+PDF_PARALLEL_EXTRACTION_MIN_PAGES = int(
+    os.environ.get("PDF_PARALLEL_EXTRACTION_MIN_PAGES") or 64
+)
+PDF_EXTRACTION_NUM_PROCESSES = int(
+    os.environ.get("PDF_EXTRACTION_NUM_PROCESSES") or min(4, os.cpu_count() or 1)
+)
+# In the worker subprocesses, pages taking longer than this are skipped (left empty)
+PDF_PAGE_EXTRACTION_TIMEOUT_SECONDS = float(
+    os.environ.get("PDF_PAGE_EXTRACTION_TIMEOUT_SECONDS") or 60
+)
+# Maximum number of embedded images extracted from a single PDF
+PDF_MAX_EXTRACTED_IMAGES = int(os.environ.get("PDF_MAX_EXTRACTED_IMAGES") or 200)
+
 # Use document summary for contextual rag
 USE_DOCUMENT_SUMMARY = os.environ.get("USE_DOCUMENT_SUMMARY", "true").lower() == "true"
 # Use chunk summary for contextual rag
@@ -675,6 +743,16 @@ CUSTOM_ANSWER_VALIDITY_CONDITIONS = json.loads(
 
 VESPA_REQUEST_TIMEOUT = int(os.environ.get("VESPA_REQUEST_TIMEOUT") or "15")
 
+# If set to `true`, indexing / updates / deletes stream their operations to Vespa through
+# a bounded-concurrency feed client instead of waiting on fixed size batches of requests
+VESPA_BULK_FEED_ENABLED = (
+    os.environ.get("VESPA_BULK_FEED_ENABLED", "").lower() == "true"
+)
+# Max number of outstanding document/v1 requests per feed client
+VESPA_FEED_MAX_IN_FLIGHT = int(os.environ.get("VESPA_FEED_MAX_IN_FLIGHT") or "64")
+# Retries per operation when Vespa throttles (429) or is temporarily unavailable
+VESPA_FEED_MAX_RETRIES = int(os.environ.get("VESPA_FEED_MAX_RETRIES") or "5")
+
 SYSTEM_RECURSION_LIMIT = int(os.environ.get("SYSTEM_RECURSION_LIMIT") or "1000")
 
 PARSE_WITH_TRAFILATURA = os.environ.get("PARSE_WITH_TRAFILATURA", "").lower() == "true"
@@ -835,6 +913,40 @@ S3_VERIFY_SSL = os.environ.get("S3_VERIFY_SSL", "").lower() == "true"
 S3_AWS_ACCESS_KEY_ID = os.environ.get("S3_AWS_ACCESS_KEY_ID")
 S3_AWS_SECRET_ACCESS_KEY = os.environ.get("S3_AWS_SECRET_ACCESS_KEY")
 
+# Files larger than this are uploaded in parts of S3_MULTIPART_CHUNK_SIZE_BYTES, at most
+# S3_MULTIPART_MAX_CONCURRENCY parts in flight (and buffered in memory) at a time
+S3_MULTIPART_THRESHOLD_BYTES = int(
+    os.environ.get("S3_MULTIPART_THRESHOLD_BYTES") or 16 * 1024 * 1024
+)
+S3_MULTIPART_CHUNK_SIZE_BYTES = int(
+    os.environ.get("S3_MULTIPART_CHUNK_SIZE_BYTES") or 8 * 1024 * 1024
+)
+S3_MULTIPART_MAX_CONCURRENCY = int(os.environ.get("S3_MULTIPART_MAX_CONCURRENCY") or 4)
+# Files read from the file store are kept in memory up to this size, larger files are
+# spooled to a temporary file on disk
+S3_READ_SPOOL_MAX_BYTES = int(
+    os.environ.get("S3_READ_SPOOL_MAX_BYTES") or 16 * 1024 * 1024
+)
+# Local directory for a read-through cache of file store blobs (chat files, images,
+# etc.). Leave blank to disable. Can be shared by all worker processes on a host
+FILE_STORE_DISK_CACHE_DIR = os.environ.get("FILE_STORE_DISK_CACHE_DIR") or None
+# Least recently used files are evicted once the cache grows beyond this size
+FILE_STORE_DISK_CACHE_MAX_BYTES = int(
+    os.environ.get("FILE_STORE_DISK_CACHE_MAX_BYTES") or 1024 * 1024 * 1024
+)
+# Files larger than this are always read from the file store and never cached
+FILE_STORE_DISK_CACHE_MAX_FILE_BYTES = int(
+    os.environ.get("FILE_STORE_DISK_CACHE_MAX_FILE_BYTES") or 64 * 1024 * 1024
+)
+
+# Docfetching -> docprocessing batches are written as zstd compressed msgpack instead of
+# JSON. Both formats are always readable, set to false while rolling back to (or running
+# alongside) versions that can only read JSON batches
+DOCUMENT_BATCH_COMPACT_FORMAT_ENABLED = (
+    os.environ.get("DOCUMENT_BATCH_COMPACT_FORMAT_ENABLED", "true").lower() == "true"
+)
+DOCUMENT_BATCH_ZSTD_LEVEL = int(os.environ.get("DOCUMENT_BATCH_ZSTD_LEVEL") or 3)
+
 # Forcing Vespa Language
 # English: en, German:de, etc. See: https://docs.vespa.ai/en/linguistics.html
 VESPA_LANGUAGE_OVERRIDE = os.environ.get("VESPA_LANGUAGE_OVERRIDE")
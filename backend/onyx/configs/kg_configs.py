@@ -135,6 +135,9 @@ KG_CLUSTERING_THRESHOLD: float = float(
     os.environ.get("KG_CLUSTERING_THRESHOLD", "0.96")
 )
 
+# Number of staged entities / relationships clustered and written per transaction
+KG_CLUSTERING_PAGE_SIZE: int = int(os.environ.get("KG_CLUSTERING_PAGE_SIZE", "1000"))
+
 KG_MAX_SEARCH_DOCUMENTS: int = int(os.environ.get("KG_MAX_SEARCH_DOCUMENTS", "15"))
 
 KG_MAX_DECOMPOSITION_SEGMENTS: int = int(
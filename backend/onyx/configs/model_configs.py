@@ -1,6 +1,8 @@
 import json
 import os
 
+from shared_configs.enums import EmbeddingTransport
+
 #####
 # Embedding/Reranking Model Configs
 #####
@@ -46,6 +48,53 @@ EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE") or 0) or None
 BATCH_SIZE_ENCODE_CHUNKS = EMBEDDING_BATCH_SIZE or 8
 # don't send over too many chunks at once, as sending too many could cause timeouts
 BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES = EMBEDDING_BATCH_SIZE or 512
+# Wire format requested from the model server for embeddings. "json" (default) returns
+# lists of floats, "float32" / "float16" return compact little-endian binary buffers.
+# float16 halves the payload again at the cost of ~3 significant digits of precision.
+# Model servers that predate the binary format ignore the request and answer with json.
+EMBEDDING_TRANSPORT = EmbeddingTransport.JSON
+_EMBEDDING_TRANSPORT_RAW = os.environ.get("EMBEDDING_TRANSPORT")
+if _EMBEDDING_TRANSPORT_RAW:
+    try:
+        EMBEDDING_TRANSPORT = EmbeddingTransport(_EMBEDDING_TRANSPORT_RAW.lower())
+    except ValueError:
+        # need to import here to avoid circular imports
+        from onyx.utils.logger import setup_logger
+
+        logger = setup_logger()
+        logger.error(
+            f"Invalid EMBEDDING_TRANSPORT '{_EMBEDDING_TRANSPORT_RAW}', must be one of "
+            f"{[transport.value for transport in EmbeddingTransport]}. Falling back to json"
+        )
+
+# All calls to the model server (embedding, reranking, query analysis, classification)
+# go through one pooled keep-alive client per process. Pool size should be at least the
+# number of threads that embed concurrently (see INDEXING_EMBEDDING_MODEL_NUM_THREADS)
+MODEL_SERVER_CLIENT_POOL_SIZE = int(
+    os.environ.get("MODEL_SERVER_CLIENT_POOL_SIZE") or 32
+)
+MODEL_SERVER_CLIENT_CONNECT_TIMEOUT = float(
+    os.environ.get("MODEL_SERVER_CLIENT_CONNECT_TIMEOUT") or 10
+)
+# API based embedding providers can take a long time for large indexing batches
+MODEL_SERVER_CLIENT_READ_TIMEOUT = float(
+    os.environ.get("MODEL_SERVER_CLIENT_READ_TIMEOUT") or 600
+)
+# Idle keep-alive connections are closed after this many seconds
+MODEL_SERVER_CLIENT_KEEPALIVE_EXPIRY = float(
+    os.environ.get("MODEL_SERVER_CLIENT_KEEPALIVE_EXPIRY") or 60
+)
+
+# Query embeddings are cached per process (LRU + TTL) so repeated / expanded queries
+# don't go back to the model server. Set the size to 0 to disable the in-process cache
+QUERY_EMBEDDING_CACHE_SIZE = int(os.environ.get("QUERY_EMBEDDING_CACHE_SIZE") or 2048)
+QUERY_EMBEDDING_CACHE_TTL_SECONDS = int(
+    os.environ.get("QUERY_EMBEDDING_CACHE_TTL_SECONDS") or 3600
+)
+# Also share cached query embeddings across processes through Redis
+QUERY_EMBEDDING_CACHE_REDIS_ENABLED = (
+    os.environ.get("QUERY_EMBEDDING_CACHE_REDIS_ENABLED", "").lower() == "true"
+)
 # For score display purposes, only way is to know the expected ranges
 CROSS_ENCODER_RANGE_MAX = 1
 CROSS_ENCODER_RANGE_MIN = 0
@@ -86,6 +135,16 @@ GEN_AI_HISTORY_CUTOFF = 3000
 GEN_AI_SINGLE_USER_MESSAGE_EXPECTED_MAX_TOKENS = 512
 GEN_AI_TEMPERATURE = float(os.environ.get("GEN_AI_TEMPERATURE") or 0)
 
+# Chunk token counts are precomputed at indexing time with the tokenizer of the default
+# LLM, so that documents can be fit in the LLM context without tokenizing them on every
+# chat turn. Extra tiktoken encodings to precompute counts for (e.g. for personas that
+# use a different OpenAI model), comma separated
+LLM_TOKEN_COUNT_ENCODINGS = [
+    encoding.strip()
+    for encoding in (os.environ.get("LLM_TOKEN_COUNT_ENCODINGS") or "").split(",")
+    if encoding.strip()
+]
+
 # should be used if you are using a custom LLM inference provider that doesn't support
 # streaming format AND you are still using the langchain/litellm LLM class
 DISABLE_LITELLM_STREAMING = (
@@ -74,6 +74,7 @@ from onyx.utils.logger import setup_logger
 from onyx.utils.retry_wrapper import retry_builder
 from onyx.utils.threadpool_concurrency import parallel_yield
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.threadpool_concurrency import ThreadPoolName
 from onyx.utils.threadpool_concurrency import ThreadSafeDict
 
 logger = setup_logger()
@@ -714,7 +715,9 @@ class GoogleDriveConnector(
             )
             for email in non_completed_org_emails
         ]
-        yield from parallel_yield(user_retrieval_gens, max_workers=MAX_DRIVE_WORKERS)
+        yield from parallel_yield(
+            user_retrieval_gens, max_workers=MAX_DRIVE_WORKERS, pool=ThreadPoolName.IO
+        )
 
         # if there are more emails to process, don't mark as complete
         if not email_batch_takes_us_to_completion:
@@ -1145,7 +1148,9 @@ class GoogleDriveConnector(
                 ]
                 results = cast(
                     list[Document | ConnectorFailure | None],
-                    run_functions_tuples_in_parallel(func_with_args, max_workers=8),
+                    run_functions_tuples_in_parallel(
+                        func_with_args, max_workers=8, pool=ThreadPoolName.IO
+                    ),
                 )
                 logger.debug(
                     f"finished processing batch {batches_complete} with {len(results)} results"
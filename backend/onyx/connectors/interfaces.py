@@ -76,6 +76,10 @@ class BaseConnector(abc.ABC, Generic[CT]):
         """Implement if the underlying connector wants to skip/allow image downloading
         based on the application level image analysis setting."""
 
+    def set_indexing_context(self, cc_pair_id: int, search_settings_id: int) -> None:
+        """Implement if the underlying connector keeps state across runs that belongs
+        to the cc-pair and the index (search settings) being indexed into."""
+
     def build_dummy_checkpoint(self) -> CT:
         # TODO: find a way to make this work without type: ignore
         return ConnectorCheckpoint(has_more=True)  # type: ignore
@@ -36,6 +36,7 @@ from onyx.connectors.salesforce.utils import MODIFIED_FIELD
 from onyx.connectors.salesforce.utils import NAME_FIELD
 from onyx.connectors.salesforce.utils import USER_OBJECT_TYPE
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
+from onyx.utils.batching import batch_generator
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import MULTI_TENANT
 
@@ -192,6 +193,7 @@ class SalesforceConnector(LoadConnector, PollConnector, SlimConnector):
 
     MAX_BATCH_BYTES = 1024 * 1024
     LOG_INTERVAL = 10.0  # how often to log stats in loop heavy parts of the connector
+    PARENT_LOOKUP_BATCH_SIZE = 500  # parent records read from sqlite at once
 
     def __init__(
         self,
@@ -530,73 +532,76 @@ class SalesforceConnector(LoadConnector, PollConnector, SlimConnector):
 
             last_log_time = 0.0
 
-            for (
-                parent_type,
-                parent_id,
-                examined_ids,
-            ) in sf_db.get_changed_parent_ids_by_type(
+            changed_parents = sf_db.get_changed_parent_ids_by_type(
                 changed_ids=list(changed_ids_to_type.keys()),
                 parent_types=ctx.parent_types,
+            )
+            for changed_parent_batch in batch_generator(
+                changed_parents, SalesforceConnector.PARENT_LOOKUP_BATCH_SIZE
             ):
-                now = time.monotonic()
-
-                processed = examined_ids - 1
-                if now - last_log_time > SalesforceConnector.LOG_INTERVAL:
-                    logger.info(
-                        f"Processing stats: {type_to_processed} "
-                        f"file_size={sf_db.file_size} "
-                        f"processed={processed} "
-                        f"remaining={len(changed_ids_to_type) - processed}"
-                    )
-                    last_log_time = now
-
-                type_to_processed[parent_type] = (
-                    type_to_processed.get(parent_type, 0) + 1
+                parent_objects = sf_db.get_records(
+                    [parent_id for _, parent_id, _ in changed_parent_batch]
                 )
+                for parent_type, parent_id, examined_ids in changed_parent_batch:
+                    now = time.monotonic()
+
+                    processed = examined_ids - 1
+                    if now - last_log_time > SalesforceConnector.LOG_INTERVAL:
+                        logger.info(
+                            f"Processing stats: {type_to_processed} "
+                            f"file_size={sf_db.file_size} "
+                            f"processed={processed} "
+                            f"remaining={len(changed_ids_to_type) - processed}"
+                        )
+                        last_log_time = now
 
-                parent_object = sf_db.get_record(parent_id, parent_type)
-                if not parent_object:
-                    logger.warning(
-                        f"Failed to get parent object {parent_id} for {parent_type}"
+                    type_to_processed[parent_type] = (
+                        type_to_processed.get(parent_type, 0) + 1
                     )
-                    continue
-
-                # use the db to create a document we can yield
-                doc = convert_sf_object_to_doc(
-                    sf_db,
-                    sf_object=parent_object,
-                    sf_instance=self.sf_client.sf_instance,
-                )
-
-                doc.metadata["object_type"] = parent_type
-
-                # Add default attributes to the metadata
-                for (
-                    sf_attribute,
-                    canonical_attribute,
-                ) in _DEFAULT_ATTRIBUTES_TO_KEEP.get(parent_type, {}).items():
-                    if sf_attribute in parent_object.data:
-                        doc.metadata[canonical_attribute] = parent_object.data[
-                            sf_attribute
-                        ]
 
-                doc_sizeof = sys.getsizeof(doc)
-                docs_to_yield_bytes += doc_sizeof
-                docs_to_yield.append(doc)
-                parents_changed += 1
+                    parent_object = parent_objects.get(parent_id)
+                    if not parent_object:
+                        logger.warning(
+                            f"Failed to get parent object {parent_id} for {parent_type}"
+                        )
+                        continue
 
-                # memory usage is sensitive to the input length, so we're yielding immediately
-                # if the batch exceeds a certain byte length
-                if (
-                    len(docs_to_yield) >= self.batch_size
-                    or docs_to_yield_bytes > SalesforceConnector.MAX_BATCH_BYTES
-                ):
-                    yield docs_to_yield
-                    docs_to_yield = []
-                    docs_to_yield_bytes = 0
+                    # use the db to create a document we can yield
+                    doc = convert_sf_object_to_doc(
+                        sf_db,
+                        sf_object=parent_object,
+                        sf_instance=self.sf_client.sf_instance,
+                    )
 
-                    # observed a memory leak / size issue with the account table if we don't gc.collect here.
-                    gc.collect()
+                    doc.metadata["object_type"] = parent_type
+
+                    # Add default attributes to the metadata
+                    for (
+                        sf_attribute,
+                        canonical_attribute,
+                    ) in _DEFAULT_ATTRIBUTES_TO_KEEP.get(parent_type, {}).items():
+                        if sf_attribute in parent_object.data:
+                            doc.metadata[canonical_attribute] = parent_object.data[
+                                sf_attribute
+                            ]
+
+                    doc_sizeof = sys.getsizeof(doc)
+                    docs_to_yield_bytes += doc_sizeof
+                    docs_to_yield.append(doc)
+                    parents_changed += 1
+
+                    # memory usage is sensitive to the input length, so we're yielding immediately
+                    # if the batch exceeds a certain byte length
+                    if (
+                        len(docs_to_yield) >= self.batch_size
+                        or docs_to_yield_bytes > SalesforceConnector.MAX_BATCH_BYTES
+                    ):
+                        yield docs_to_yield
+                        docs_to_yield = []
+                        docs_to_yield_bytes = 0
+
+                        # observed a memory leak / size issue with the account table if we don't gc.collect here.
+                        gc.collect()
 
             yield docs_to_yield
         except Exception:
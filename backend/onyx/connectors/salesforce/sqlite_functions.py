@@ -3,6 +3,7 @@ import json
 import os
 import sqlite3
 import time
+from collections import defaultdict
 from collections.abc import Iterator
 from pathlib import Path
 from typing import Any
@@ -19,6 +20,9 @@ from shared_configs.utils import batch_list
 
 logger = setup_logger()
 
+# SQLite typically has a limit of 999 variables
+_MAX_QUERY_VARIABLES = 500
+
 
 class OnyxSalesforceSQLite:
     """Notes on context management using 'with self.conn':
@@ -31,6 +35,12 @@ class OnyxSalesforceSQLite:
     # might be appropriate here.
     NULL_ID_STRING = "N/A"
 
+    # number of CSV rows written per executemany / transaction
+    CSV_INGEST_BATCH_SIZE = 4096
+    # negative means KiB, so 2GB. Only an upper bound, grows as needed
+    CACHE_SIZE = -2000000
+    MMAP_SIZE = 256 * 1024 * 1024
+
     def __init__(self, filename: str, isolation_level: str | None = None):
         self.filename = filename
         self.isolation_level = isolation_level
@@ -69,6 +79,14 @@ class OnyxSalesforceSQLite:
         if self.isolation_level is not None:
             conn.isolation_level = self.isolation_level
 
+        # WAL mode for better concurrent access and write performance. Unlike the
+        # journal mode, the other settings only last as long as the connection.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA cache_size={self.CACHE_SIZE}")
+        conn.execute(f"PRAGMA mmap_size={self.MMAP_SIZE}")
+
         self._conn = conn
 
     def close(self) -> None:
@@ -111,14 +129,6 @@ class OnyxSalesforceSQLite:
                 file_path = Path(self.filename)
                 file_size = file_path.stat().st_size
                 logger.info(f"init_db - found existing sqlite db: len={file_size}")
-            else:
-                # NOTE(rkuo): why is this only if the db doesn't exist?
-
-                # Enable WAL mode for better concurrent access and write performance
-                cursor.execute("PRAGMA journal_mode=WAL")
-                cursor.execute("PRAGMA synchronous=NORMAL")
-                cursor.execute("PRAGMA temp_store=MEMORY")
-                cursor.execute("PRAGMA cache_size=-2000000")  # Use 2GB memory for cache
 
             # Main table for storing Salesforce objects
             cursor.execute(
@@ -533,7 +543,9 @@ class OnyxSalesforceSQLite:
 
             with open(csv_download_path, "r", newline="", encoding="utf-8") as f:
                 reader = csv.DictReader(f)
-                uncommitted_rows = 0
+                # id -> (json data, parent ids). Later rows for the same id win, same
+                # as when writing the rows one by one
+                records: dict[str, tuple[str, set[str]]] = {}
                 for row in reader:
                     if "Id" not in row:
                         logger.warning(
@@ -546,29 +558,19 @@ class OnyxSalesforceSQLite:
                     normalized_record, parent_ids = (
                         OnyxSalesforceSQLite.normalize_record(row, remove_ids)
                     )
-                    normalized_record_json_str = json.dumps(normalized_record)
-
-                    # Update main object data
                     # NOTE(rkuo): looks like we take a list and dump it as json into the db
-                    cursor.execute(
-                        """
-                        INSERT OR REPLACE INTO salesforce_objects (id, object_type, data)
-                        VALUES (?, ?, ?)
-                        """,
-                        (row_id, object_type, normalized_record_json_str),
-                    )
-
-                    # Update relationships using the same connection
-                    OnyxSalesforceSQLite._update_relationship_tables(
-                        cursor, row_id, parent_ids
-                    )
+                    records[row_id] = (json.dumps(normalized_record), parent_ids)
                     updated_ids.append(row_id)
 
-                    # periodically commit or else memory will balloon
-                    uncommitted_rows += 1
-                    if uncommitted_rows >= 1024:
+                    if len(records) >= self.CSV_INGEST_BATCH_SIZE:
+                        OnyxSalesforceSQLite._write_records(
+                            cursor, object_type, records
+                        )
+                        records = {}
+                        # periodically commit or else memory will balloon
                         self._conn.commit()
-                        uncommitted_rows = 0
+
+                OnyxSalesforceSQLite._write_records(cursor, object_type, records)
 
             # If we're updating User objects, update the email map
             if object_type == USER_OBJECT_TYPE:
@@ -576,6 +578,31 @@ class OnyxSalesforceSQLite:
 
         return updated_ids
 
+    @staticmethod
+    def _write_records(
+        cursor: sqlite3.Cursor,
+        object_type: str,
+        records: dict[str, tuple[str, set[str]]],
+    ) -> None:
+        """Upserts a batch of records of the same type and their relationships."""
+        if not records:
+            return
+
+        cursor.executemany(
+            """
+            INSERT OR REPLACE INTO salesforce_objects (id, object_type, data)
+            VALUES (?, ?, ?)
+            """,
+            [
+                (record_id, object_type, data)
+                for record_id, (data, _) in records.items()
+            ],
+        )
+        OnyxSalesforceSQLite._update_relationship_tables_batch(
+            cursor,
+            {record_id: parent_ids for record_id, (_, parent_ids) in records.items()},
+        )
+
     def get_child_ids(self, parent_id: str) -> set[str]:
         """Get all child IDs for a given parent ID."""
         if self._conn is None:
@@ -612,55 +639,78 @@ class OnyxSalesforceSQLite:
         self, object_id: str, object_type: str | None = None, isChild: bool = False
     ) -> SalesforceObject | None:
         """Retrieve the record and return it as a SalesforceObject."""
+        sf_object = self.get_records(
+            [object_id], isChild=isChild or object_type == ACCOUNT_OBJECT_TYPE
+        ).get(object_id)
+        if not sf_object:
+            logger.warning(f"Object ID {object_id} not found")
+            return None
+
+        if object_type is not None:
+            sf_object.type = object_type
+        return sf_object
+
+    def get_records(
+        self, object_ids: list[str], isChild: bool = False
+    ) -> dict[str, SalesforceObject]:
+        """Batch version of get_record, returns the found records by id.
+
+        Unless isChild is set, the parent account of each (non account) record is
+        added to its data, with its id as AccountId and its name as Account."""
         if self._conn is None:
             raise RuntimeError("Database connection is closed")
 
-        if object_type is None:
-            object_type = self.get_type_from_id(object_id)
-            if not object_type:
-                return None
-
+        records: dict[str, SalesforceObject] = {}
         with self._conn:
             cursor = self._conn.cursor()
-            # Get the object data and account data
-            if object_type == ACCOUNT_OBJECT_TYPE or isChild:
-                cursor.execute(
-                    "SELECT data FROM salesforce_objects WHERE id = ?", (object_id,)
-                )
-            else:
+            for batch_ids in batch_list(list(set(object_ids)), _MAX_QUERY_VARIABLES):
+                id_placeholders = ",".join(["?" for _ in batch_ids])
                 cursor.execute(
-                    "SELECT pso.data, r.parent_id as parent_id, sso.object_type FROM salesforce_objects pso \
-                        LEFT JOIN relationships r on r.child_id = pso.id \
-                        LEFT JOIN salesforce_objects sso on r.parent_id = sso.id \
-                        WHERE pso.id = ? ",
-                    (object_id,),
+                    f"""
+                    SELECT id, object_type, data FROM salesforce_objects
+                    WHERE id IN ({id_placeholders})
+                    """,
+                    batch_ids,
                 )
-            result = cursor.fetchall()
-            if not result:
-                logger.warning(f"Object ID {object_id} not found")
-                return None
-
-            data = json.loads(result[0][0])
-
-            if object_type != ACCOUNT_OBJECT_TYPE:
-
-                # convert any account ids of the relationships back into data fields, with name
-                for row in result:
+                batch_records = {
+                    row_id: SalesforceObject(
+                        id=row_id, type=row_type, data=json.loads(row_data)
+                    )
+                    for row_id, row_type, row_data in cursor.fetchall()
+                }
+                records.update(batch_records)
+                if isChild:
+                    continue
 
-                    # the following skips Account objects.
-                    if len(row) < 3:
-                        continue
+                # convert any account ids of the relationships back into data
+                # fields, with name
+                child_ids = [
+                    record_id
+                    for record_id, record in batch_records.items()
+                    if record.type != ACCOUNT_OBJECT_TYPE
+                ]
+                if not child_ids:
+                    continue
 
-                    if row[1] and row[2] and row[2] == ACCOUNT_OBJECT_TYPE:
-                        data["AccountId"] = row[1]
-                        cursor.execute(
-                            "SELECT data FROM salesforce_objects WHERE id = ?",
-                            (row[1],),
-                        )
-                        account_data = json.loads(cursor.fetchone()[0])
-                        data[ACCOUNT_OBJECT_TYPE] = account_data.get(NAME_FIELD, "")
+                child_id_placeholders = ",".join(["?" for _ in child_ids])
+                cursor.execute(
+                    f"""
+                    SELECT r.child_id, r.parent_id, json_extract(a.data, '$.{NAME_FIELD}')
+                    FROM relationships r
+                    JOIN salesforce_objects a ON a.id = r.parent_id
+                    WHERE r.child_id IN ({child_id_placeholders})
+                    AND a.object_type = ?
+                    """,
+                    child_ids + [ACCOUNT_OBJECT_TYPE],
+                )
+                for child_id, account_id, account_name in cursor.fetchall():
+                    data = batch_records[child_id].data
+                    data["AccountId"] = account_id
+                    data[ACCOUNT_OBJECT_TYPE] = (
+                        account_name if account_name is not None else ""
+                    )
 
-            return SalesforceObject(id=object_id, type=object_type, data=data)
+        return records
 
     def find_ids_by_type(self, object_type: str) -> list[str]:
         """Find all object IDs for rows of the specified type."""
@@ -687,58 +737,100 @@ class OnyxSalesforceSQLite:
             child_id: The ID of the child record
             parent_ids: Set of parent IDs to link to
         """
+        OnyxSalesforceSQLite._update_relationship_tables_batch(
+            cursor, {child_id: parent_ids}
+        )
+
+    @staticmethod
+    def _update_relationship_tables_batch(
+        cursor: sqlite3.Cursor, parent_ids_by_child_id: dict[str, set[str]]
+    ) -> None:
+        """Batch version of _update_relationship_tables, with set based lookups of the
+        existing relationships and of the parent types."""
 
         try:
             # Get existing parent IDs
-            cursor.execute(
-                "SELECT parent_id FROM relationships WHERE child_id = ?", (child_id,)
-            )
-            old_parent_ids = {row[0] for row in cursor.fetchall()}
+            old_parent_ids_by_child_id: dict[str, set[str]] = defaultdict(set)
+            for batch_ids in batch_list(
+                list(parent_ids_by_child_id), _MAX_QUERY_VARIABLES
+            ):
+                id_placeholders = ",".join(["?" for _ in batch_ids])
+                cursor.execute(
+                    f"""
+                    SELECT child_id, parent_id FROM relationships
+                    WHERE child_id IN ({id_placeholders})
+                    """,
+                    batch_ids,
+                )
+                for child_id, parent_id in cursor.fetchall():
+                    old_parent_ids_by_child_id[child_id].add(parent_id)
 
             # Calculate differences
-            parent_ids_to_remove = old_parent_ids - parent_ids
-            parent_ids_to_add = parent_ids - old_parent_ids
+            relationships_to_remove: list[tuple[str, str]] = []
+            relationships_to_add: list[tuple[str, str]] = []
+            for child_id, parent_ids in parent_ids_by_child_id.items():
+                old_parent_ids = old_parent_ids_by_child_id.get(child_id, set())
+                relationships_to_remove.extend(
+                    (child_id, parent_id) for parent_id in old_parent_ids - parent_ids
+                )
+                relationships_to_add.extend(
+                    (child_id, parent_id) for parent_id in parent_ids - old_parent_ids
+                )
 
             # Remove old relationships
-            if parent_ids_to_remove:
+            if relationships_to_remove:
                 cursor.executemany(
                     "DELETE FROM relationships WHERE child_id = ? AND parent_id = ?",
-                    [(child_id, parent_id) for parent_id in parent_ids_to_remove],
+                    relationships_to_remove,
                 )
                 # Also remove from relationship_types
                 cursor.executemany(
                     "DELETE FROM relationship_types WHERE child_id = ? AND parent_id = ?",
-                    [(child_id, parent_id) for parent_id in parent_ids_to_remove],
+                    relationships_to_remove,
                 )
 
+            if not relationships_to_add:
+                return
+
             # Add new relationships
-            if parent_ids_to_add:
-                # First add to relationships table
-                cursor.executemany(
-                    "INSERT INTO relationships (child_id, parent_id) VALUES (?, ?)",
-                    [(child_id, parent_id) for parent_id in parent_ids_to_add],
+            # First add to relationships table
+            cursor.executemany(
+                "INSERT INTO relationships (child_id, parent_id) VALUES (?, ?)",
+                relationships_to_add,
+            )
+
+            # Then get the types of the parent objects and add to relationship_types
+            parent_types: dict[str, str] = {}
+            for batch_ids in batch_list(
+                list({parent_id for _, parent_id in relationships_to_add}),
+                _MAX_QUERY_VARIABLES,
+            ):
+                id_placeholders = ",".join(["?" for _ in batch_ids])
+                cursor.execute(
+                    f"""
+                    SELECT id, object_type FROM salesforce_objects
+                    WHERE id IN ({id_placeholders})
+                    """,
+                    batch_ids,
                 )
+                parent_types.update(cursor.fetchall())
 
-                # Then get the types of the parent objects and add to relationship_types
-                for parent_id in parent_ids_to_add:
-                    cursor.execute(
-                        "SELECT object_type FROM salesforce_objects WHERE id = ?",
-                        (parent_id,),
-                    )
-                    result = cursor.fetchone()
-                    if result:
-                        parent_type = result[0]
-                        cursor.execute(
-                            """
-                            INSERT INTO relationship_types (child_id, parent_id, parent_type)
-                            VALUES (?, ?, ?)
-                            """,
-                            (child_id, parent_id, parent_type),
-                        )
+            cursor.executemany(
+                """
+                INSERT INTO relationship_types (child_id, parent_id, parent_type)
+                VALUES (?, ?, ?)
+                """,
+                [
+                    (child_id, parent_id, parent_types[parent_id])
+                    for child_id, parent_id in relationships_to_add
+                    if parent_id in parent_types
+                ],
+            )
 
         except Exception:
             logger.exception(
-                f"Error updating relationship tables: child_id={child_id} parent_ids={parent_ids}"
+                "Error updating relationship tables: "
+                f"num_child_ids={len(parent_ids_by_child_id)}"
             )
             raise
 
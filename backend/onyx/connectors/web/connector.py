@@ -1,8 +1,13 @@
 import io
 import ipaddress
+import queue
 import random
 import socket
+import threading
 import time
+from collections.abc import Iterable
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime
 from datetime import timezone
 from enum import Enum
@@ -22,6 +27,11 @@ from requests_oauthlib import OAuth2Session  # type:ignore
 from urllib3.exceptions import MaxRetryError
 
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
+from onyx.configs.app_configs import WEB_CONNECTOR_CONDITIONAL_RECRAWL
+from onyx.configs.app_configs import WEB_CONNECTOR_HTTP_FAST_PATH
+from onyx.configs.app_configs import WEB_CONNECTOR_MAX_CONCURRENCY
+from onyx.configs.app_configs import WEB_CONNECTOR_MAX_CONCURRENT_REQUESTS_PER_HOST
+from onyx.configs.app_configs import WEB_CONNECTOR_MIN_REQUEST_INTERVAL_SECONDS
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_CLIENT_ID
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_CLIENT_SECRET
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_TOKEN_URL
@@ -33,12 +43,20 @@ from onyx.connectors.exceptions import InsufficientPermissionsError
 from onyx.connectors.exceptions import UnexpectedValidationError
 from onyx.connectors.interfaces import GenerateDocumentsOutput
 from onyx.connectors.interfaces import LoadConnector
+from onyx.connectors.interfaces import PollConnector
+from onyx.connectors.interfaces import SecondsSinceUnixEpoch
 from onyx.connectors.models import Document
 from onyx.connectors.models import TextSection
+from onyx.connectors.web.page_validators import get_conditional_headers
+from onyx.connectors.web.page_validators import hash_page_content
+from onyx.connectors.web.page_validators import PageValidatorStore
+from onyx.db.models import WebPageValidator
 from onyx.file_processing.extract_file_text import read_pdf_file
+from onyx.file_processing.html_utils import ParsedHTML
 from onyx.file_processing.html_utils import web_html_cleanup
 from onyx.utils.logger import setup_logger
 from onyx.utils.sitemap import list_pages_for_site
+from onyx.utils.threadpool_concurrency import run_in_background
 from shared_configs.configs import MULTI_TENANT
 
 logger = setup_logger()
@@ -47,15 +65,23 @@ logger = setup_logger()
 class ScrapeSessionContext:
     """Session level context for scraping"""
 
-    def __init__(self, base_url: str, to_visit: list[str]):
+    def __init__(
+        self,
+        base_url: str,
+        to_visit: list[str],
+        validator_store: PageValidatorStore | None = None,
+    ):
         self.base_url = base_url
         self.to_visit = to_visit
         self.visited_links: set[str] = set()
         self.content_hashes: set[int] = set()
+        # only set when recrawling, to skip unchanged pages
+        self.validator_store = validator_store
 
         self.doc_batch: list[Document] = []
 
         self.at_least_one_doc: bool = False
+        self.num_unchanged: int = 0
         self.last_error: str | None = None
         self.needs_retry: bool = False
 
@@ -75,6 +101,148 @@ class ScrapeSessionContext:
             self.playwright.stop()
             self.playwright = None
 
+    def mark_visited(self, url: str) -> bool:
+        """Returns False if the url was already visited"""
+        if url in self.visited_links:
+            return False
+        self.visited_links.add(url)
+        return True
+
+    def enqueue_links(self, links: Iterable[str]) -> None:
+        for link in links:
+            if link not in self.visited_links:
+                self.to_visit.append(link)
+
+    def add_content_hash(self, hashed_text: int) -> bool:
+        """Returns False if the same content was already scraped"""
+        if hashed_text in self.content_hashes:
+            return False
+        self.content_hashes.add(hashed_text)
+        return True
+
+    @contextmanager
+    def request_slot(self, url: str) -> Iterator[None]:
+        # no limits when scraping one page at a time
+        yield
+
+
+class CrawlFrontier:
+    """Thread safe, deduplicated queue of the urls left to visit, shared by all the
+    workers of a concurrent crawl"""
+
+    def __init__(self, urls: list[str]):
+        self._condition = threading.Condition()
+        self._to_visit = list(urls)
+        self._visited: set[str] = set()
+        self._in_progress = 0
+        self._stopped = False
+
+    def add(self, urls: Iterable[str]) -> None:
+        with self._condition:
+            self._to_visit.extend(url for url in urls if url not in self._visited)
+            self._condition.notify_all()
+
+    def mark_visited(self, url: str) -> bool:
+        with self._condition:
+            if url in self._visited:
+                return False
+            self._visited.add(url)
+            return True
+
+    def get(self) -> tuple[int, str] | None:
+        """Returns the index and url of the next page to visit. Blocks while other
+        workers may still find new links, returns None once the crawl is over.
+        Every returned url must be followed by a call to task_done."""
+        with self._condition:
+            while not self._stopped:
+                while self._to_visit:
+                    url = self._to_visit.pop()
+                    if url in self._visited:
+                        continue
+                    self._visited.add(url)
+                    self._in_progress += 1
+                    return len(self._visited), url
+
+                if self._in_progress == 0:
+                    return None
+                self._condition.wait()
+            return None
+
+    def task_done(self) -> None:
+        with self._condition:
+            self._in_progress -= 1
+            self._condition.notify_all()
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+
+class HostPoliteness:
+    """Limits the number of concurrent requests and the request rate per host"""
+
+    def __init__(self, max_concurrent_requests: int, min_request_interval: float):
+        self.max_concurrent_requests = max_concurrent_requests
+        self.min_request_interval = min_request_interval
+        self._lock = threading.Lock()
+        self._semaphores: dict[str, threading.Semaphore] = {}
+        self._next_request_times: dict[str, float] = {}
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        host = urlparse(url).netloc
+        with self._lock:
+            semaphore = self._semaphores.setdefault(
+                host, threading.Semaphore(self.max_concurrent_requests)
+            )
+
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                request_time = max(now, self._next_request_times.get(host, now))
+                self._next_request_times[host] = (
+                    request_time + self.min_request_interval
+                )
+            if request_time > now:
+                time.sleep(request_time - now)
+            yield
+
+
+class ConcurrentScrapeSessionContext(ScrapeSessionContext):
+    """Scraping context of one worker of a concurrent crawl. Each worker has its own
+    browser, the frontier and content hashes are shared across workers."""
+
+    def __init__(
+        self,
+        base_url: str,
+        frontier: CrawlFrontier,
+        politeness: HostPoliteness,
+        content_hashes: set[int],
+        content_hashes_lock: threading.Lock,
+        validator_store: PageValidatorStore | None = None,
+    ):
+        super().__init__(base_url, [], validator_store)
+        self.frontier = frontier
+        self.politeness = politeness
+        self.content_hashes = content_hashes
+        self.content_hashes_lock = content_hashes_lock
+
+    def mark_visited(self, url: str) -> bool:
+        return self.frontier.mark_visited(url)
+
+    def enqueue_links(self, links: Iterable[str]) -> None:
+        self.frontier.add(links)
+
+    def add_content_hash(self, hashed_text: int) -> bool:
+        with self.content_hashes_lock:
+            return super().add_content_hash(hashed_text)
+
+    @contextmanager
+    def request_slot(self, url: str) -> Iterator[None]:
+        with self.politeness.slot(url):
+            yield
+
 
 class ScrapeResult:
     doc: Document | None = None
@@ -86,6 +254,9 @@ WEB_CONNECTOR_MAX_SCROLL_ATTEMPTS = 20
 IFRAME_TEXT_LENGTH_THRESHOLD = 700
 # Message indicating JavaScript is disabled, which often appears when scraping fails
 JAVASCRIPT_DISABLED_MESSAGE = "You have JavaScript disabled in your browser"
+# Pages fetched without a browser with less text than this are assumed to need
+# JavaScript to render their content, and are scraped again with the browser
+HTTP_FAST_PATH_MIN_TEXT_LENGTH = 200
 
 # Define common headers that mimic a real browser
 DEFAULT_USER_AGENT = (
@@ -428,7 +599,42 @@ def _handle_cookies(context: BrowserContext, url: str) -> None:
         )
 
 
-class WebConnector(LoadConnector):
+def _build_pdf_document(url: str, response: requests.Response) -> Document:
+    page_text, metadata, images = read_pdf_file(file=io.BytesIO(response.content))
+    last_modified = response.headers.get("Last-Modified")
+
+    return Document(
+        id=url,
+        sections=[TextSection(link=url, text=page_text)],
+        source=DocumentSource.WEB,
+        semantic_identifier=url.split("/")[-1],
+        metadata=metadata,
+        doc_updated_at=(
+            _get_datetime_from_last_modified_header(last_modified)
+            if last_modified
+            else None
+        ),
+    )
+
+
+def _build_document(
+    url: str, parsed_html: ParsedHTML, last_modified: str | None
+) -> Document:
+    return Document(
+        id=url,
+        sections=[TextSection(link=url, text=parsed_html.cleaned_text)],
+        source=DocumentSource.WEB,
+        semantic_identifier=parsed_html.title or url,
+        metadata={},
+        doc_updated_at=(
+            _get_datetime_from_last_modified_header(last_modified)
+            if last_modified
+            else None
+        ),
+    )
+
+
+class WebConnector(LoadConnector, PollConnector):
     MAX_RETRIES = 3
 
     def __init__(
@@ -438,12 +644,20 @@ class WebConnector(LoadConnector):
         mintlify_cleanup: bool = True,  # Mostly ok to apply to other websites as well
         batch_size: int = INDEX_BATCH_SIZE,
         scroll_before_scraping: bool = False,
+        max_concurrency: int = WEB_CONNECTOR_MAX_CONCURRENCY,
+        http_fast_path: bool = WEB_CONNECTOR_HTTP_FAST_PATH,
         **kwargs: Any,
     ) -> None:
         self.mintlify_cleanup = mintlify_cleanup
         self.batch_size = batch_size
         self.recursive = False
         self.scroll_before_scraping = scroll_before_scraping
+        self.max_concurrency = max(1, max_concurrency)
+        # only known when run by the indexing, see set_indexing_context
+        self.cc_pair_id: int | None = None
+        self.search_settings_id: int | None = None
+        # the fast path can't scroll to load more content
+        self.http_fast_path = http_fast_path and not scroll_before_scraping
         self.web_connector_type = web_connector_type
         if web_connector_type == WEB_CONNECTOR_VALID_SETTINGS.RECURSIVE.value:
             self.recursive = True
@@ -474,11 +688,166 @@ class WebConnector(LoadConnector):
                 "Invalid Web Connector Config, must choose a valid type between: " ""
             )
 
+    def set_indexing_context(self, cc_pair_id: int, search_settings_id: int) -> None:
+        self.cc_pair_id = cc_pair_id
+        self.search_settings_id = search_settings_id
+
     def load_credentials(self, credentials: dict[str, Any]) -> dict[str, Any] | None:
         if credentials:
             logger.warning("Unexpected credentials provided for Web Connector")
         return None
 
+    def _unchanged_result(
+        self,
+        index: int,
+        initial_url: str,
+        session_ctx: ScrapeSessionContext,
+        links: Iterable[str],
+    ) -> ScrapeResult:
+        """The page was not modified since it was last indexed, so there is nothing to
+        index. Its links are still followed to find the other (maybe changed) pages."""
+        logger.info(f"{index}: {initial_url} is unchanged since it was last indexed")
+        if self.recursive:
+            session_ctx.enqueue_links(links)
+        session_ctx.num_unchanged += 1
+        return ScrapeResult()
+
+    def _record_scraped_page(
+        self,
+        index: int,
+        initial_url: str,
+        session_ctx: ScrapeSessionContext,
+        validator: WebPageValidator | None,
+        doc: Document,
+        content_hash: str,
+        etag: str | None,
+        last_modified: str | None,
+        links: set[str],
+    ) -> ScrapeResult:
+        """Stores the validators of the scraped page for the next recrawl, and drops
+        the document if its content did not change since it was last indexed"""
+        validator_store = session_ctx.validator_store
+        unchanged = validator is not None and validator.content_hash == content_hash
+        if validator_store is not None:
+            validator_store.record(
+                url=initial_url,
+                etag=etag,
+                last_modified=last_modified,
+                content_hash=content_hash,
+                links=sorted(links),
+                unchanged_since=validator if unchanged else None,
+            )
+
+        if unchanged:
+            # the links were already followed
+            return self._unchanged_result(index, initial_url, session_ctx, links=[])
+
+        result = ScrapeResult()
+        result.doc = doc
+        return result
+
+    def _try_http_scrape(
+        self,
+        index: int,
+        initial_url: str,
+        session_ctx: ScrapeSessionContext,
+        validator: WebPageValidator | None,
+    ) -> ScrapeResult | None:
+        """Scrapes the page with a plain HTTP request. Returns None if the page
+        has to be scraped with the browser instead."""
+        response = requests.get(
+            initial_url,
+            headers={
+                **DEFAULT_HEADERS,
+                **(get_conditional_headers(validator) if validator else {}),
+            },
+            allow_redirects=True,
+            timeout=30,
+        )
+        if validator and response.status_code == 304:
+            return self._unchanged_result(
+                index, initial_url, session_ctx, validator.links
+            )
+
+        if is_pdf_content(response) or initial_url.lower().endswith(".pdf"):
+            return self._record_pdf(
+                index, initial_url, session_ctx, validator, response
+            )
+
+        content_type = response.headers.get("content-type", "").lower()
+        if response.status_code >= 400 or "html" not in content_type:
+            return None
+
+        soup = BeautifulSoup(response.text, "html.parser")
+        # links have to be collected before the cleanup strips them from the soup
+        internal_links = (
+            get_internal_links(session_ctx.base_url, response.url, soup)
+            if self.recursive
+            else set()
+        )
+        parsed_html = web_html_cleanup(soup, self.mintlify_cleanup)
+        if (
+            len(parsed_html.cleaned_text) < HTTP_FAST_PATH_MIN_TEXT_LENGTH
+            or JAVASCRIPT_DISABLED_MESSAGE in parsed_html.cleaned_text
+        ):
+            logger.debug(f"{index}: {initial_url} needs a browser to be scraped")
+            return None
+
+        result = ScrapeResult()
+        final_url = response.url
+        if final_url != initial_url:
+            protected_url_check(final_url)
+            if not session_ctx.mark_visited(final_url):
+                logger.info(
+                    f"{index}: {initial_url} redirected to {final_url} - already indexed"
+                )
+                return result
+
+            logger.info(f"{index}: {initial_url} redirected to {final_url}")
+
+        session_ctx.enqueue_links(internal_links)
+
+        hashed_text = hash((parsed_html.title, parsed_html.cleaned_text))
+        if not session_ctx.add_content_hash(hashed_text):
+            logger.info(f"{index}: Skipping duplicate title + content for {final_url}")
+            return result
+
+        last_modified = response.headers.get("Last-Modified")
+        return self._record_scraped_page(
+            index,
+            initial_url,
+            session_ctx,
+            validator,
+            doc=_build_document(final_url, parsed_html, last_modified),
+            content_hash=hash_page_content(parsed_html.title, parsed_html.cleaned_text),
+            etag=response.headers.get("ETag"),
+            last_modified=last_modified,
+            links=internal_links,
+        )
+
+    def _record_pdf(
+        self,
+        index: int,
+        initial_url: str,
+        session_ctx: ScrapeSessionContext,
+        validator: WebPageValidator | None,
+        response: requests.Response,
+    ) -> ScrapeResult:
+        doc = _build_pdf_document(initial_url, response)
+        return self._record_scraped_page(
+            index,
+            initial_url,
+            session_ctx,
+            validator,
+            doc=doc,
+            content_hash=hash_page_content(
+                doc.semantic_identifier, cast(TextSection, doc.sections[0]).text
+            ),
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            links=set(),
+        )
+
     def _do_scrape(
         self,
         index: int,
@@ -487,8 +856,23 @@ class WebConnector(LoadConnector):
     ) -> ScrapeResult:
         """Returns a ScrapeResult object with a doc and retry flag."""
 
-        if session_ctx.playwright is None:
-            raise RuntimeError("scrape_context.playwright is None")
+        requested_url = initial_url
+        validator = (
+            session_ctx.validator_store.get_trusted(initial_url)
+            if session_ctx.validator_store
+            else None
+        )
+
+        if self.http_fast_path:
+            fast_path_result = self._try_http_scrape(
+                index, initial_url, session_ctx, validator
+            )
+            if fast_path_result is not None:
+                return fast_path_result
+
+        # the browser is only started once a page actually needs it
+        if session_ctx.playwright is None or session_ctx.playwright_context is None:
+            session_ctx.initialize()
 
         if session_ctx.playwright_context is None:
             raise RuntimeError("scrape_context.playwright_context is None")
@@ -499,34 +883,29 @@ class WebConnector(LoadConnector):
         _handle_cookies(session_ctx.playwright_context, initial_url)
 
         # First do a HEAD request to check content type without downloading the entire content
+        # (or whether the page changed at all, if it was already indexed)
         head_response = requests.head(
-            initial_url, headers=DEFAULT_HEADERS, allow_redirects=True
+            initial_url,
+            headers={
+                **DEFAULT_HEADERS,
+                **(get_conditional_headers(validator) if validator else {}),
+            },
+            allow_redirects=True,
         )
+        if validator and head_response.status_code == 304:
+            return self._unchanged_result(
+                index, initial_url, session_ctx, validator.links
+            )
+
         is_pdf = is_pdf_content(head_response)
 
         if is_pdf or initial_url.lower().endswith(".pdf"):
             # PDF files are not checked for links
             response = requests.get(initial_url, headers=DEFAULT_HEADERS)
-            page_text, metadata, images = read_pdf_file(
-                file=io.BytesIO(response.content)
-            )
-            last_modified = response.headers.get("Last-Modified")
-
-            result.doc = Document(
-                id=initial_url,
-                sections=[TextSection(link=initial_url, text=page_text)],
-                source=DocumentSource.WEB,
-                semantic_identifier=initial_url.split("/")[-1],
-                metadata=metadata,
-                doc_updated_at=(
-                    _get_datetime_from_last_modified_header(last_modified)
-                    if last_modified
-                    else None
-                ),
+            return self._record_pdf(
+                index, initial_url, session_ctx, validator, response
             )
 
-            return result
-
         page = session_ctx.playwright_context.new_page()
         try:
             # Can't use wait_until="networkidle" because it interferes with the scrolling behavior
@@ -543,7 +922,7 @@ class WebConnector(LoadConnector):
             if final_url != initial_url:
                 protected_url_check(final_url)
                 initial_url = final_url
-                if initial_url in session_ctx.visited_links:
+                if not session_ctx.mark_visited(initial_url):
                     logger.info(
                         f"{index}: {initial_url} redirected to {final_url} - already indexed"
                     )
@@ -551,7 +930,6 @@ class WebConnector(LoadConnector):
                     return result
 
                 logger.info(f"{index}: {initial_url} redirected to {final_url}")
-                session_ctx.visited_links.add(initial_url)
 
             # If we got here, the request was successful
             if self.scroll_before_scraping:
@@ -572,13 +950,12 @@ class WebConnector(LoadConnector):
             content = page.content()
             soup = BeautifulSoup(content, "html.parser")
 
-            if self.recursive:
-                internal_links = get_internal_links(
-                    session_ctx.base_url, initial_url, soup
-                )
-                for link in internal_links:
-                    if link not in session_ctx.visited_links:
-                        session_ctx.to_visit.append(link)
+            internal_links = (
+                get_internal_links(session_ctx.base_url, initial_url, soup)
+                if self.recursive
+                else set()
+            )
+            session_ctx.enqueue_links(internal_links)
 
             if page_response and str(page_response.status)[0] in ("4", "5"):
                 session_ctx.last_error = f"Skipped indexing {initial_url} due to HTTP {page_response.status} response"
@@ -612,107 +989,251 @@ class WebConnector(LoadConnector):
             # Sometimes pages with #! will serve duplicate content
             # There are also just other ways this can happen
             hashed_text = hash((parsed_html.title, parsed_html.cleaned_text))
-            if hashed_text in session_ctx.content_hashes:
+            if not session_ctx.add_content_hash(hashed_text):
                 logger.info(
                     f"{index}: Skipping duplicate title + content for {initial_url}"
                 )
                 return result
 
-            session_ctx.content_hashes.add(hashed_text)
-
-            result.doc = Document(
-                id=initial_url,
-                sections=[TextSection(link=initial_url, text=parsed_html.cleaned_text)],
-                source=DocumentSource.WEB,
-                semantic_identifier=parsed_html.title or initial_url,
-                metadata={},
-                doc_updated_at=(
-                    _get_datetime_from_last_modified_header(last_modified)
-                    if last_modified
-                    else None
+            result = self._record_scraped_page(
+                index,
+                requested_url,
+                session_ctx,
+                validator,
+                doc=_build_document(initial_url, parsed_html, last_modified),
+                content_hash=hash_page_content(
+                    parsed_html.title, parsed_html.cleaned_text
                 ),
+                etag=page_response.header_value("ETag") if page_response else None,
+                last_modified=last_modified,
+                links=internal_links,
             )
         finally:
             page.close()
 
         return result
 
-    def load_from_state(self) -> GenerateDocumentsOutput:
-        """Traverses through all pages found on the website
-        and converts them into documents"""
-
-        if not self.to_visit_list:
-            raise ValueError("No URLs to visit")
+    def _scrape_with_retries(
+        self,
+        index: int,
+        initial_url: str,
+        session_ctx: ScrapeSessionContext,
+    ) -> Document | None:
+        try:
+            protected_url_check(initial_url)
+        except Exception as e:
+            session_ctx.last_error = f"Invalid URL {initial_url} due to {e}"
+            logger.warning(session_ctx.last_error)
+            return None
 
-        base_url = self.to_visit_list[0]  # For the recursive case
-        check_internet_connection(base_url)  # make sure we can connect to the base url
+        logger.info(f"{index}: Visiting {initial_url}")
 
-        session_ctx = ScrapeSessionContext(base_url, self.to_visit_list)
-        session_ctx.initialize()
+        # Add retry mechanism with exponential backoff
+        retry_count = 0
 
-        while session_ctx.to_visit:
-            initial_url = session_ctx.to_visit.pop()
-            if initial_url in session_ctx.visited_links:
-                continue
-            session_ctx.visited_links.add(initial_url)
+        while retry_count < self.MAX_RETRIES:
+            if retry_count > 0:
+                # Add a random delay between retries (exponential backoff)
+                delay = min(2**retry_count + random.uniform(0, 1), 10)
+                logger.info(
+                    f"Retry {retry_count}/{self.MAX_RETRIES} for {initial_url} after {delay:.2f}s delay"
+                )
+                time.sleep(delay)
 
             try:
-                protected_url_check(initial_url)
+                with session_ctx.request_slot(initial_url):
+                    result = self._do_scrape(index, initial_url, session_ctx)
+                if result.retry:
+                    continue
+
+                return result.doc
             except Exception as e:
-                session_ctx.last_error = f"Invalid URL {initial_url} due to {e}"
-                logger.warning(session_ctx.last_error)
+                session_ctx.last_error = f"Failed to fetch '{initial_url}': {e}"
+                logger.exception(session_ctx.last_error)
+                # the browser is restarted on the next attempt
+                session_ctx.stop()
                 continue
+            finally:
+                retry_count += 1
 
-            index = len(session_ctx.visited_links)
-            logger.info(f"{index}: Visiting {initial_url}")
-
-            # Add retry mechanism with exponential backoff
-            retry_count = 0
-
-            while retry_count < self.MAX_RETRIES:
-                if retry_count > 0:
-                    # Add a random delay between retries (exponential backoff)
-                    delay = min(2**retry_count + random.uniform(0, 1), 10)
-                    logger.info(
-                        f"Retry {retry_count}/{self.MAX_RETRIES} for {initial_url} after {delay:.2f}s delay"
-                    )
-                    time.sleep(delay)
+        return None
 
+    def _crawl_worker(
+        self,
+        session_ctx: ConcurrentScrapeSessionContext,
+        results: "queue.Queue[Document | None]",
+    ) -> None:
+        """Scrapes pages from the shared frontier until the crawl is over, then puts
+        None on the results queue"""
+        try:
+            num_scraped = 0
+            while (next_page := session_ctx.frontier.get()) is not None:
+                index, initial_url = next_page
                 try:
-                    result = self._do_scrape(index, initial_url, session_ctx)
-                    if result.retry:
-                        continue
+                    doc = self._scrape_with_retries(index, initial_url, session_ctx)
+                finally:
+                    session_ctx.frontier.task_done()
+
+                if doc:
+                    results.put(doc)
+
+                num_scraped += 1
+                if num_scraped % self.batch_size == 0:
+                    # same as in the serial crawl, don't keep a browser around forever
+                    session_ctx.stop()
+        except Exception:
+            # should not happen, _scrape_with_retries handles scraping failures
+            logger.exception("Web Connector crawl worker failed")
+            session_ctx.frontier.stop()
+        finally:
+            session_ctx.stop()
+            results.put(None)
+
+    def _load_concurrently(
+        self, base_url: str, validator_store: PageValidatorStore | None
+    ) -> GenerateDocumentsOutput:
+        frontier = CrawlFrontier(self.to_visit_list)
+        politeness = HostPoliteness(
+            max_concurrent_requests=WEB_CONNECTOR_MAX_CONCURRENT_REQUESTS_PER_HOST,
+            min_request_interval=WEB_CONNECTOR_MIN_REQUEST_INTERVAL_SECONDS,
+        )
+        content_hashes: set[int] = set()
+        content_hashes_lock = threading.Lock()
+        worker_ctxs = [
+            ConcurrentScrapeSessionContext(
+                base_url,
+                frontier,
+                politeness,
+                content_hashes,
+                content_hashes_lock,
+                validator_store,
+            )
+            for _ in range(self.max_concurrency)
+        ]
+
+        # bounded so that the workers don't get too far ahead of the indexing
+        results: queue.Queue[Document | None] = queue.Queue(maxsize=self.batch_size * 2)
+        workers = [
+            run_in_background(self._crawl_worker, worker_ctx, results)
+            for worker_ctx in worker_ctxs
+        ]
+        num_finished = 0
 
-                    if result.doc:
-                        session_ctx.doc_batch.append(result.doc)
-                except Exception as e:
-                    session_ctx.last_error = f"Failed to fetch '{initial_url}': {e}"
-                    logger.exception(session_ctx.last_error)
-                    session_ctx.initialize()
+        doc_batch: list[Document] = []
+        at_least_one_doc = False
+        try:
+            while num_finished < len(workers):
+                doc = results.get()
+                if doc is None:
+                    num_finished += 1
                     continue
-                finally:
-                    retry_count += 1
 
-                break  # success / don't retry
+                doc_batch.append(doc)
+                if len(doc_batch) >= self.batch_size:
+                    if validator_store:
+                        validator_store.flush()
+                    at_least_one_doc = True
+                    yield doc_batch
+                    doc_batch = []
+        finally:
+            frontier.stop()
+            # unblock the workers still waiting to put their results
+            while num_finished < len(workers):
+                if results.get() is None:
+                    num_finished += 1
+            for worker in workers:
+                worker.join()
+
+        if validator_store:
+            validator_store.flush()
+
+        if doc_batch:
+            at_least_one_doc = True
+            yield doc_batch
+
+        if not at_least_one_doc and not any(ctx.num_unchanged for ctx in worker_ctxs):
+            last_errors = [ctx.last_error for ctx in worker_ctxs if ctx.last_error]
+            if last_errors:
+                raise RuntimeError(last_errors[-1])
+            raise RuntimeError("No valid pages found.")
+
+    def _crawl(
+        self, validator_store: PageValidatorStore | None
+    ) -> GenerateDocumentsOutput:
+        if not self.to_visit_list:
+            raise ValueError("No URLs to visit")
+
+        base_url = self.to_visit_list[0]  # For the recursive case
+        check_internet_connection(base_url)  # make sure we can connect to the base url
+
+        if self.max_concurrency > 1 and (self.recursive or len(self.to_visit_list) > 1):
+            yield from self._load_concurrently(base_url, validator_store)
+            return
+
+        session_ctx = ScrapeSessionContext(
+            base_url, list(self.to_visit_list), validator_store
+        )
+
+        while session_ctx.to_visit:
+            initial_url = session_ctx.to_visit.pop()
+            if not session_ctx.mark_visited(initial_url):
+                continue
+
+            index = len(session_ctx.visited_links)
+            doc = self._scrape_with_retries(index, initial_url, session_ctx)
+            if doc:
+                session_ctx.doc_batch.append(doc)
 
             if len(session_ctx.doc_batch) >= self.batch_size:
-                session_ctx.initialize()
+                session_ctx.stop()
+                if validator_store:
+                    validator_store.flush()
                 session_ctx.at_least_one_doc = True
                 yield session_ctx.doc_batch
                 session_ctx.doc_batch = []
 
+        if validator_store:
+            validator_store.flush()
+
         if session_ctx.doc_batch:
             session_ctx.stop()
             session_ctx.at_least_one_doc = True
             yield session_ctx.doc_batch
 
-        if not session_ctx.at_least_one_doc:
+        if not session_ctx.at_least_one_doc and not session_ctx.num_unchanged:
             if session_ctx.last_error:
                 raise RuntimeError(session_ctx.last_error)
             raise RuntimeError("No valid pages found.")
 
         session_ctx.stop()
 
+    def load_from_state(self) -> GenerateDocumentsOutput:
+        """Traverses through all pages found on the website
+        and converts them into documents"""
+        # always a full crawl, e.g. pruning relies on getting every page
+        yield from self._crawl(validator_store=None)
+
+    def poll_source(
+        self, start: SecondsSinceUnixEpoch, end: SecondsSinceUnixEpoch
+    ) -> GenerateDocumentsOutput:
+        """Same as load_from_state, except that the pages which did not change since
+        the last successful run are skipped"""
+        # the validators are stored per cc-pair and index, without them every page
+        # is indexed
+        validator_store = (
+            PageValidatorStore(
+                self.cc_pair_id,
+                self.search_settings_id,
+                poll_range_start=datetime.fromtimestamp(start, tz=timezone.utc),
+                poll_range_end=datetime.fromtimestamp(end, tz=timezone.utc),
+            )
+            if WEB_CONNECTOR_CONDITIONAL_RECRAWL
+            and self.cc_pair_id is not None
+            and self.search_settings_id is not None
+            else None
+        )
+        yield from self._crawl(validator_store)
+
     def validate_connector_settings(self) -> None:
         # Make sure we have at least one valid URL to check
         if not self.to_visit_list:
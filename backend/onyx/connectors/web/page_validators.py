@@ -0,0 +1,114 @@
+"""
+Persisted per page validators (ETag, Last-Modified and content hash) of the web
+connector, so that recrawls can skip the pages that did not change since they were
+last indexed.
+
+A validator is only trusted once the crawl that stored it is known to have been
+indexed successfully, i.e. when the poll window of that crawl ended before the start
+of the current poll window (minus the overlap between windows). Validators stored by
+a failed crawl are ignored and the pages are indexed again.
+"""
+
+import hashlib
+import threading
+from datetime import datetime
+from datetime import timedelta
+
+from onyx.configs.app_configs import POLL_CONNECTOR_OFFSET
+from onyx.db.engine.sql_engine import get_session_with_current_tenant
+from onyx.db.models import WebPageValidator
+from onyx.db.web_page_validator import get_web_page_validator
+from onyx.db.web_page_validator import upsert_web_page_validators
+
+_FLUSH_BATCH_SIZE = 100
+
+
+def hash_page_content(title: str | None, text: str) -> str:
+    # unlike hash(), stable across processes
+    return hashlib.sha256(f"{title or ''}\n{text}".encode()).hexdigest()
+
+
+def get_conditional_headers(validator: WebPageValidator) -> dict[str, str]:
+    headers = {}
+    if validator.etag:
+        headers["If-None-Match"] = validator.etag
+    if validator.last_modified:
+        headers["If-Modified-Since"] = validator.last_modified
+    return headers
+
+
+class PageValidatorStore:
+    """Validators of the pages crawled by one cc-pair for one index (search settings)
+    during one poll window. Lookups go to the DB page by page, updates are buffered
+    and written in batches."""
+
+    def __init__(
+        self,
+        cc_pair_id: int,
+        search_settings_id: int,
+        poll_range_start: datetime,
+        poll_range_end: datetime,
+    ):
+        self.cc_pair_id = cc_pair_id
+        self.search_settings_id = search_settings_id
+        self.poll_range_end = poll_range_end
+        self._trusted_until = poll_range_start + timedelta(
+            minutes=POLL_CONNECTOR_OFFSET
+        )
+        self._lock = threading.Lock()
+        self._pending: list[WebPageValidator] = []
+
+    def get_trusted(self, url: str) -> WebPageValidator | None:
+        validator = self._load(url)
+        if validator is None or validator.poll_range_end > self._trusted_until:
+            return None
+        return validator
+
+    def record(
+        self,
+        url: str,
+        etag: str | None,
+        last_modified: str | None,
+        content_hash: str,
+        links: list[str],
+        unchanged_since: WebPageValidator | None = None,
+    ) -> None:
+        """Stores the validators of a scraped page. If the content is unchanged, keeps
+        the poll window of the crawl that indexed it since this crawl won't"""
+        validator = WebPageValidator(
+            connector_credential_pair_id=self.cc_pair_id,
+            search_settings_id=self.search_settings_id,
+            url=url,
+            etag=etag,
+            last_modified=last_modified,
+            content_hash=content_hash,
+            links=links,
+            poll_range_end=(
+                unchanged_since.poll_range_end
+                if unchanged_since
+                else self.poll_range_end
+            ),
+        )
+        with self._lock:
+            self._pending.append(validator)
+            if len(self._pending) < _FLUSH_BATCH_SIZE:
+                return
+            pending, self._pending = self._pending, []
+        self._save(pending)
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        self._save(pending)
+
+    def _load(self, url: str) -> WebPageValidator | None:
+        with get_session_with_current_tenant() as db_session:
+            return get_web_page_validator(
+                db_session, self.cc_pair_id, self.search_settings_id, url
+            )
+
+    def _save(self, validators: list[WebPageValidator]) -> None:
+        if not validators:
+            return
+        with get_session_with_current_tenant() as db_session:
+            upsert_web_page_validators(db_session, validators)
@@ -31,6 +31,7 @@ from onyx.llm.utils import message_to_string
 from onyx.prompts.federated_search import SLACK_QUERY_EXPANSION_PROMPT
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.threadpool_concurrency import ThreadPoolName
 from onyx.utils.timing import log_function_time
 
 logger = setup_logger()
@@ -300,7 +301,8 @@ def slack_retrieval(
         [
             (query_slack, (query_string, query, access_token, limit))
             for query_string in query_strings
-        ]
+        ],
+        pool=ThreadPoolName.IO,
     )
     slack_messages, docid_to_message = merge_slack_messages(results)
     slack_messages = slack_messages[: limit or len(slack_messages)]
@@ -312,7 +314,8 @@ def slack_retrieval(
         [
             (get_contextualized_thread_text, (slack_message, access_token))
             for slack_message in slack_messages
-        ]
+        ],
+        pool=ThreadPoolName.IO,
     )
     for slack_message, thread_text in zip(slack_messages, thread_texts):
         slack_message.text = thread_text
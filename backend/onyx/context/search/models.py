@@ -253,6 +253,10 @@ class InferenceChunk(BaseChunk):
     primary_owners: list[str] | None = None
     secondary_owners: list[str] | None = None
     large_chunk_reference_ids: list[int] = Field(default_factory=list)
+    # Number of tokens of the content for the common LLM tokenizers, by
+    # BaseTokenizer.token_count_key. Computed at indexing time, empty for chunks
+    # indexed before that or not coming from the index
+    llm_token_counts: dict[str, int] = Field(default_factory=dict)
 
     is_federated: bool = False
 
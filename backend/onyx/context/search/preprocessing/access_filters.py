@@ -1,13 +1,12 @@
 from sqlalchemy.orm import Session
 
-from onyx.access.access import get_acl_for_user
+from onyx.access.access import get_user_acl
 from onyx.context.search.models import IndexFilters
 from onyx.db.models import User
 
 
 def build_access_filters_for_user(user: User | None, session: Session) -> list[str]:
-    user_acl = get_acl_for_user(user, session)
-    return list(user_acl)
+    return list(get_user_acl(user, session).filters)
 
 
 def build_user_only_filters(user: User | None, db_session: Session) -> IndexFilters:
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+from prometheus_client import Counter
+
+from onyx.configs.model_configs import QUERY_EMBEDDING_CACHE_REDIS_ENABLED
+from onyx.configs.model_configs import QUERY_EMBEDDING_CACHE_SIZE
+from onyx.configs.model_configs import QUERY_EMBEDDING_CACHE_TTL_SECONDS
+from onyx.db.models import SearchSettings
+from onyx.redis.redis_pool import get_shared_redis_client
+from onyx.utils.logger import setup_logger
+from shared_configs.model_server_models import Embedding
+
+logger = setup_logger()
+
+_REDIS_KEY_PREFIX = "query_embedding"
+
+QUERY_EMBEDDING_CACHE_LOOKUPS = Counter(
+    "onyx_query_embedding_cache_lookups_total",
+    "Query embedding cache lookups by cache tier and result",
+    ["tier", "result"],
+)
+
+
+def normalize_query_text(text: str) -> str:
+    """Collapses whitespace so trivially different spellings of a query share a cache
+    entry. The normalized text is also what gets embedded, so a cached embedding is
+    always exactly the one the model server would return for it."""
+    return " ".join(text.split()) or text
+
+
+def build_query_embedding_cache_key(
+    search_settings: SearchSettings, normalized_text: str, tenant_id: str
+) -> str:
+    # everything that changes the vector the model server returns for a query. The
+    # search settings id is included so a settings swap never serves stale vectors,
+    # even from other processes / the Redis tier
+    key_fields = [
+        tenant_id,
+        search_settings.id,
+        search_settings.model_name,
+        search_settings.provider_type,
+        search_settings.deployment_name,
+        search_settings.query_prefix,
+        search_settings.final_embedding_dim,
+        search_settings.normalize,
+        normalized_text,
+    ]
+    return hashlib.sha256(json.dumps(key_fields, default=str).encode()).hexdigest()
+
+
+@dataclass
+class QueryEmbeddingCacheStats:
+    memory_hits: int = 0
+    redis_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.memory_hits + self.redis_hits + self.misses
+        return (self.memory_hits + self.redis_hits) / total if total else 0.0
+
+
+class QueryEmbeddingCache:
+    """Thread-safe LRU + TTL cache of query embeddings with an optional Redis tier.
+    Entries found only in Redis are promoted into the in-process tier."""
+
+    def __init__(
+        self,
+        max_size: int = QUERY_EMBEDDING_CACHE_SIZE,
+        ttl_seconds: int = QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+        redis_enabled: bool = QUERY_EMBEDDING_CACHE_REDIS_ENABLED,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.redis_enabled = redis_enabled
+        self.stats = QueryEmbeddingCacheStats()
+        # key -> (expiry time, embedding)
+        self._entries: OrderedDict[str, tuple[float, Embedding]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 or self.redis_enabled
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _get_from_memory(self, keys: Sequence[str]) -> dict[str, Embedding]:
+        found: dict[str, Embedding] = {}
+        if self.max_size <= 0:
+            return found
+
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                expires_at, embedding = entry
+                if expires_at <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = embedding
+        return found
+
+    def _set_in_memory(self, embeddings: dict[str, Embedding]) -> None:
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for key, embedding in embeddings.items():
+                self._entries[key] = (expires_at, embedding)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _get_from_redis(self, keys: Sequence[str]) -> dict[str, Embedding]:
+        found: dict[str, Embedding] = {}
+        if not self.redis_enabled or not keys:
+            return found
+
+        try:
+            pipe = get_shared_redis_client().pipeline(transaction=False)
+            for key in keys:
+                pipe.get(f"{_REDIS_KEY_PREFIX}:{key}")
+            values = pipe.execute()
+        except Exception:
+            logger.exception("Failed to read query embeddings from Redis")
+            return found
+
+        for key, value in zip(keys, values):
+            if value is not None:
+                found[key] = np.frombuffer(value, dtype=np.float32).tolist()
+        return found
+
+    def _set_in_redis(self, embeddings: dict[str, Embedding]) -> None:
+        if not self.redis_enabled or not embeddings:
+            return
+
+        try:
+            pipe = get_shared_redis_client().pipeline(transaction=False)
+            for key, embedding in embeddings.items():
+                pipe.set(
+                    f"{_REDIS_KEY_PREFIX}:{key}",
+                    np.asarray(embedding, dtype=np.float32).tobytes(),
+                    ex=self.ttl_seconds,
+                )
+            pipe.execute()
+        except Exception:
+            logger.exception("Failed to write query embeddings to Redis")
+
+    def get_many(self, keys: Sequence[str]) -> dict[str, Embedding]:
+        found = self._get_from_memory(keys)
+        memory_hits = len(found)
+
+        remaining = [key for key in keys if key not in found]
+        from_redis = self._get_from_redis(remaining)
+        if from_redis:
+            self._set_in_memory(from_redis)
+            found.update(from_redis)
+
+        misses = len(keys) - len(found)
+        self.stats.memory_hits += memory_hits
+        self.stats.redis_hits += len(from_redis)
+        self.stats.misses += misses
+        QUERY_EMBEDDING_CACHE_LOOKUPS.labels(tier="memory", result="hit").inc(
+            memory_hits
+        )
+        QUERY_EMBEDDING_CACHE_LOOKUPS.labels(tier="redis", result="hit").inc(
+            len(from_redis)
+        )
+        QUERY_EMBEDDING_CACHE_LOOKUPS.labels(tier="all", result="miss").inc(misses)
+        return found
+
+    def set_many(self, embeddings: dict[str, Embedding]) -> None:
+        self._set_in_memory(embeddings)
+        self._set_in_redis(embeddings)
+
+
+_QUERY_EMBEDDING_CACHE = QueryEmbeddingCache()
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    return _QUERY_EMBEDDING_CACHE
+
+
+def invalidate_query_embedding_cache() -> None:
+    """Drops this process's cached query embeddings. Entries are keyed by search
+    settings, so other processes and the Redis tier never serve stale vectors after a
+    swap either, their old entries just age out."""
+    _QUERY_EMBEDDING_CACHE.clear()
@@ -34,6 +34,7 @@ from onyx.secondary_llm_flows.query_expansion import multilingual_query_expansio
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 from onyx.utils.threadpool_concurrency import run_in_background
+from onyx.utils.threadpool_concurrency import ThreadPoolName
 from onyx.utils.threadpool_concurrency import TimeoutThread
 from onyx.utils.threadpool_concurrency import wait_on_background
 from onyx.utils.timing import log_function_time
@@ -390,7 +391,9 @@ def retrieve_chunks(
                 (doc_index_retrieval, (q_copy, document_index, db_session))
             )
 
-    parallel_search_results = run_functions_tuples_in_parallel(run_queries)
+    parallel_search_results = run_functions_tuples_in_parallel(
+        run_queries, pool=ThreadPoolName.VESPA
+    )
     top_chunks = combine_retrieval_results(parallel_search_results)
 
     if not top_chunks:
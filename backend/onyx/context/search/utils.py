@@ -12,12 +12,17 @@ from onyx.context.search.models import InferenceSection
 from onyx.context.search.models import SavedSearchDoc
 from onyx.context.search.models import SavedSearchDocWithContent
 from onyx.context.search.models import SearchDoc
+from onyx.context.search.query_embedding_cache import build_query_embedding_cache_key
+from onyx.context.search.query_embedding_cache import get_query_embedding_cache
+from onyx.context.search.query_embedding_cache import normalize_query_text
 from onyx.db.models import SearchDoc as DBSearchDoc
+from onyx.db.models import SearchSettings
 from onyx.db.search_settings import get_current_search_settings
 from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import MODEL_SERVER_HOST
 from shared_configs.configs import MODEL_SERVER_PORT
+from shared_configs.contextvars import get_current_tenant_id
 from shared_configs.enums import EmbedTextType
 from shared_configs.model_server_models import Embedding
 
@@ -171,7 +176,38 @@ def remove_stop_words_and_punctuation(keywords: list[str]) -> list[str]:
 
 def get_query_embeddings(queries: list[str], db_session: Session) -> list[Embedding]:
     search_settings = get_current_search_settings(db_session)
+    cache = get_query_embedding_cache()
 
+    if not cache.enabled:
+        return _embed_queries(queries, search_settings)
+
+    tenant_id = get_current_tenant_id()
+    texts = [normalize_query_text(query) for query in queries]
+    keys = [
+        build_query_embedding_cache_key(search_settings, text, tenant_id)
+        for text in texts
+    ]
+    embeddings = cache.get_many(keys)
+
+    # dedupe so repeated queries within one call are only embedded once
+    missing = {key: text for key, text in zip(keys, texts) if key not in embeddings}
+    if missing:
+        new_embeddings = dict(
+            zip(missing, _embed_queries(list(missing.values()), search_settings))
+        )
+        cache.set_many(new_embeddings)
+        embeddings.update(new_embeddings)
+
+    logger.debug(
+        f"Query embedding cache: {len(keys) - len(missing)} of {len(keys)} hits, "
+        f"hit rate {cache.stats.hit_rate:.2%}"
+    )
+    return [embeddings[key] for key in keys]
+
+
+def _embed_queries(
+    queries: list[str], search_settings: SearchSettings
+) -> list[Embedding]:
     model = EmbeddingModel.from_db_model(
         search_settings=search_settings,
         # The below are globally set, this flow always uses the indexing one
@@ -179,8 +215,7 @@ def get_query_embeddings(queries: list[str], db_session: Session) -> list[Embedd
         server_port=MODEL_SERVER_PORT,
     )
 
-    query_embedding = model.encode(queries, text_type=EmbedTextType.QUERY)
-    return query_embedding
+    return model.encode(queries, text_type=EmbedTextType.QUERY)
 
 
 def get_query_embedding(query: str, db_session: Session) -> Embedding:
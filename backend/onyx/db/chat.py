@@ -10,6 +10,7 @@ from fastapi import HTTPException
 from sqlalchemy import delete
 from sqlalchemy import desc
 from sqlalchemy import func
+from sqlalchemy import insert
 from sqlalchemy import nullsfirst
 from sqlalchemy import or_
 from sqlalchemy import Row
@@ -824,11 +825,8 @@ def update_search_docs_table_with_relevance(
     db_session.commit()
 
 
-def create_db_search_doc(
-    server_search_doc: ServerSearchDoc,
-    db_session: Session,
-) -> SearchDoc:
-    db_search_doc = SearchDoc(
+def _db_search_doc_values(server_search_doc: ServerSearchDoc) -> dict[str, Any]:
+    return dict(
         document_id=server_search_doc.document_id,
         chunk_ind=server_search_doc.chunk_ind,
         semantic_id=server_search_doc.semantic_identifier,
@@ -849,11 +847,40 @@ def create_db_search_doc(
         is_internet=server_search_doc.is_internet,
     )
 
+
+def create_db_search_doc(
+    server_search_doc: ServerSearchDoc,
+    db_session: Session,
+) -> SearchDoc:
+    db_search_doc = SearchDoc(**_db_search_doc_values(server_search_doc))
+
     db_session.add(db_search_doc)
     db_session.commit()
     return db_search_doc
 
 
+def create_db_search_docs(
+    server_search_docs: Sequence[ServerSearchDoc],
+    db_session: Session,
+    commit: bool = True,
+) -> list[SearchDoc]:
+    """Same as create_db_search_doc for many docs, with a single INSERT ... RETURNING
+    and a single commit. The returned SearchDocs are in the order of the input."""
+    if not server_search_docs:
+        return []
+
+    db_search_docs = list(
+        db_session.scalars(
+            insert(SearchDoc).returning(SearchDoc, sort_by_parameter_order=True),
+            [_db_search_doc_values(doc) for doc in server_search_docs],
+        )
+    )
+
+    if commit:
+        db_session.commit()
+    return db_search_docs
+
+
 def get_db_search_doc_by_id(doc_id: int, db_session: Session) -> DBSearchDoc | None:
     """There are no safety checks here like user permission etc., use with caution"""
     search_doc = db_session.query(SearchDoc).filter(SearchDoc.id == doc_id).first()
@@ -1174,10 +1201,9 @@ def log_agent_sub_question_results(
             search_docs = chunks_or_sections_to_search_docs(
                 sub_query.retrieved_documents
             )
-            for doc in search_docs:
-                db_doc = create_db_search_doc(doc, db_session)
-                db_session.add(db_doc)
-                sub_query_object.search_docs.append(db_doc)
+            sub_query_object.search_docs.extend(
+                create_db_search_docs(search_docs, db_session, commit=False)
+            )
             db_session.commit()
 
     return None
@@ -1,5 +1,6 @@
 import contextlib
 import time
+from collections.abc import Collection
 from collections.abc import Generator
 from collections.abc import Iterable
 from collections.abc import Sequence
@@ -122,6 +123,25 @@ def construct_document_id_select_for_connector_credential_pair(
     return stmt
 
 
+def construct_sorted_document_id_select_for_connector_credential_pair(
+    connector_id: int, credential_id: int
+) -> Select:
+    """The document IDs of a cc pair in code point order (the "C" collation), which
+    is how python sorts strings, whatever the collation of the DB. This returns a
+    statement that should be executed using .yield_per()."""
+    # the (id, connector_id, credential_id) primary key makes the IDs unique
+    return (
+        select(DocumentByConnectorCredentialPair.id)
+        .where(
+            and_(
+                DocumentByConnectorCredentialPair.connector_id == connector_id,
+                DocumentByConnectorCredentialPair.credential_id == credential_id,
+            )
+        )
+        .order_by(DocumentByConnectorCredentialPair.id.collate("C"))
+    )
+
+
 def construct_document_select_for_connector_credential_pair(
     connector_id: int, credential_id: int | None = None
 ) -> Select:
@@ -552,6 +572,28 @@ def mark_document_as_synced(document_id: str, db_session: Session) -> None:
     db_session.commit()
 
 
+def mark_documents_as_modified__no_commit(
+    document_ids: list[str],
+    db_session: Session,
+) -> None:
+    db_session.execute(
+        update(DbDocument)
+        .where(DbDocument.id.in_(document_ids))
+        .values(last_modified=datetime.now(timezone.utc))
+    )
+
+
+def mark_documents_as_synced__no_commit(
+    document_ids: list[str],
+    db_session: Session,
+) -> None:
+    db_session.execute(
+        update(DbDocument)
+        .where(DbDocument.id.in_(document_ids))
+        .values(last_synced=datetime.now(timezone.utc))
+    )
+
+
 def delete_document_by_connector_credential_pair__no_commit(
     db_session: Session,
     document_id: str,
@@ -991,6 +1033,24 @@ def update_document_kg_info(
     db_session.execute(stmt)
 
 
+def update_documents_kg_info(
+    db_session: Session, document_ids: Collection[str], kg_stage: KGStage
+) -> None:
+    """Same as update_document_kg_info for many documents, with a single update."""
+    if not document_ids:
+        return
+
+    stmt = (
+        update(DbDocument)
+        .where(DbDocument.id.in_(document_ids))
+        .values(
+            kg_stage=kg_stage,
+            kg_processing_time=datetime.now(timezone.utc),
+        )
+    )
+    db_session.execute(stmt)
+
+
 def update_document_kg_stage(
     db_session: Session,
     document_id: str,
@@ -1,4 +1,5 @@
 from sqlalchemy import and_
+from sqlalchemy import func
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
@@ -8,6 +9,10 @@ from onyx.configs.constants import FileType
 from onyx.db.models import FileRecord
 
 
+class FileRecordNotFoundError(RuntimeError):
+    pass
+
+
 def get_query_history_export_files(
     db_session: Session,
 ) -> list[FileRecord]:
@@ -38,7 +43,9 @@ def get_filerecord_by_file_id(
     filestore = db_session.query(FileRecord).filter_by(file_id=file_id).first()
 
     if not filestore:
-        raise RuntimeError(f"File by id {file_id} does not exist or was deleted")
+        raise FileRecordNotFoundError(
+            f"File by id {file_id} does not exist or was deleted"
+        )
 
     return filestore
 
@@ -81,6 +88,9 @@ def upsert_filerecord(
         filestore.file_metadata = file_metadata
         filestore.bucket_name = bucket_name
         filestore.object_key = object_key
+        # set explicitly, onupdate only fires if one of the other columns changed.
+        # Readers (e.g. the file store disk cache) use it as the content version
+        filestore.updated_at = func.now()  # type: ignore
     else:
         filestore = FileRecord(
             file_id=file_id,
@@ -1284,6 +1284,39 @@ class ChunkStats(Base):
     )
 
 
+class WebPageValidator(Base):
+    """HTTP validators and content hash of a page scraped by the web connector, used to
+    skip unchanged pages when the site is crawled again"""
+
+    __tablename__ = "web_page_validator"
+
+    # per cc-pair, so that connectors crawling the same site don't share validators
+    connector_credential_pair_id: Mapped[int] = mapped_column(
+        ForeignKey("connector_credential_pair.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # and per index, since during an embedding model swap the primary and secondary
+    # index attempts of a cc-pair run concurrently, each with its own poll windows
+    search_settings_id: Mapped[int] = mapped_column(
+        ForeignKey("search_settings.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    url: Mapped[str] = mapped_column(String, primary_key=True)
+
+    etag: Mapped[str | None] = mapped_column(String, nullable=True)
+    last_modified: Mapped[str | None] = mapped_column(String, nullable=True)
+    content_hash: Mapped[str] = mapped_column(String)
+    # internal links found on the page, still needed to crawl the rest of the site
+    # when the page itself is unchanged
+    links: Mapped[list[str]] = mapped_column(postgresql.JSONB(), default=[])
+    # end of the poll window of the crawl that indexed this version of the page
+    poll_range_end: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True))
+
+    time_updated: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
 class Tag(Base):
     __tablename__ = "tag"
 
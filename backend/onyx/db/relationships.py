@@ -1,11 +1,13 @@
+from typing import Any
 from typing import List
 
+from sqlalchemy import and_
 from sqlalchemy import or_
+from sqlalchemy import tuple_
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
-import onyx.db.document as dbdocument
 from onyx.db.models import KGEntity
 from onyx.db.models import KGEntityExtractionStaging
 from onyx.db.models import KGRelationship
@@ -89,7 +91,10 @@ def upsert_staging_relationship(
 
     # Update the document's kg_stage if source_document is provided
     if source_document_id is not None:
-        dbdocument.update_document_kg_info(
+        # onyx.db.document imports this module
+        from onyx.db.document import update_document_kg_info
+
+        update_document_kg_info(
             db_session,
             document_id=source_document_id,
             kg_stage=KGStage.EXTRACTED,
@@ -165,25 +170,30 @@ def upsert_relationship(
     return new_relationship
 
 
-def transfer_relationship(
+def transfer_relationships(
     db_session: Session,
-    relationship: KGRelationshipExtractionStaging,
+    relationships: list[KGRelationshipExtractionStaging],
     entity_translations: dict[str, str],
-) -> KGRelationship:
+) -> None:
     """
-    Transfer a relationship from the staging table to the normalized table.
+    Transfer relationships from the staging table to the normalized table, with a
+    single insert. Relationships that become the same once their nodes are translated
+    are combined.
     """
-    # Translate the source and target nodes
-    source_node = entity_translations[relationship.source_node]
-    target_node = entity_translations[relationship.target_node]
-    relationship_id_name = make_relationship_id(
-        source_node, relationship.type, target_node
-    )
+    relationship_values: dict[tuple[str, str | None], dict[str, Any]] = {}
+    for relationship in relationships:
+        # Translate the source and target nodes
+        source_node = entity_translations[relationship.source_node]
+        target_node = entity_translations[relationship.target_node]
+        relationship_id_name = make_relationship_id(
+            source_node, relationship.type, target_node
+        )
 
-    # Create the transferred relationship
-    stmt = (
-        pg_insert(KGRelationship)
-        .values(
+        key = (relationship_id_name, relationship.source_document)
+        if key in relationship_values:
+            relationship_values[key]["occurrences"] += relationship.occurrences
+            continue
+        relationship_values[key] = dict(
             id_name=relationship_id_name,
             source_node=source_node,
             target_node=target_node,
@@ -194,30 +204,44 @@ def transfer_relationship(
             source_document=relationship.source_document,
             occurrences=relationship.occurrences,
         )
-        .on_conflict_do_update(
-            index_elements=["id_name", "source_document"],
-            set_=dict(
-                occurrences=KGRelationship.occurrences + relationship.occurrences,
-            ),
-        )
-        .returning(KGRelationship)
+    if not relationship_values:
+        return
+
+    # Create the transferred relationships
+    stmt = pg_insert(KGRelationship).values(list(relationship_values.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["id_name", "source_document"],
+        set_=dict(occurrences=KGRelationship.occurrences + stmt.excluded.occurrences),
     )
+    db_session.execute(stmt)
 
-    new_relationship = db_session.execute(stmt).scalar()
-    if new_relationship is None:
-        raise RuntimeError(
-            f"Failed to transfer relationship with id_name: {relationship.id_name}"
-        )
-
-    # Update transferred
+    # Update transferred (tuple IN doesn't match NULL source documents)
     db_session.query(KGRelationshipExtractionStaging).filter(
-        KGRelationshipExtractionStaging.id_name == relationship.id_name,
-        KGRelationshipExtractionStaging.source_document == relationship.source_document,
-    ).update({"transferred": True})
+        or_(
+            tuple_(
+                KGRelationshipExtractionStaging.id_name,
+                KGRelationshipExtractionStaging.source_document,
+            ).in_(
+                [
+                    (relationship.id_name, relationship.source_document)
+                    for relationship in relationships
+                    if relationship.source_document is not None
+                ]
+            ),
+            and_(
+                KGRelationshipExtractionStaging.source_document.is_(None),
+                KGRelationshipExtractionStaging.id_name.in_(
+                    [
+                        relationship.id_name
+                        for relationship in relationships
+                        if relationship.source_document is None
+                    ]
+                ),
+            ),
+        )
+    ).update({"transferred": True}, synchronize_session=False)
     db_session.flush()
 
-    return new_relationship
-
 
 def upsert_staging_relationship_type(
     db_session: Session,
@@ -0,0 +1,68 @@
+from sqlalchemy import delete
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from onyx.db.models import WebPageValidator
+
+
+def get_web_page_validator(
+    db_session: Session, cc_pair_id: int, search_settings_id: int, url: str
+) -> WebPageValidator | None:
+    return db_session.get(WebPageValidator, (cc_pair_id, search_settings_id, url))
+
+
+def upsert_web_page_validators(
+    db_session: Session, validators: list[WebPageValidator]
+) -> None:
+    """NOTE: this function is Postgres specific. Not all DBs support the ON CONFLICT clause."""
+    # the same row can't be updated twice by the same statement
+    unique_validators = {
+        (
+            validator.connector_credential_pair_id,
+            validator.search_settings_id,
+            validator.url,
+        ): validator
+        for validator in validators
+    }
+    if not unique_validators:
+        return
+
+    insert_stmt = pg_insert(WebPageValidator).values(
+        [
+            {
+                "connector_credential_pair_id": validator.connector_credential_pair_id,
+                "search_settings_id": validator.search_settings_id,
+                "url": validator.url,
+                "etag": validator.etag,
+                "last_modified": validator.last_modified,
+                "content_hash": validator.content_hash,
+                "links": validator.links,
+                "poll_range_end": validator.poll_range_end,
+            }
+            for validator in unique_validators.values()
+        ]
+    )
+    on_conflict_stmt = insert_stmt.on_conflict_do_update(
+        index_elements=["connector_credential_pair_id", "search_settings_id", "url"],
+        set_={
+            "etag": insert_stmt.excluded.etag,
+            "last_modified": insert_stmt.excluded.last_modified,
+            "content_hash": insert_stmt.excluded.content_hash,
+            "links": insert_stmt.excluded.links,
+            "poll_range_end": insert_stmt.excluded.poll_range_end,
+            "time_updated": func.now(),
+        },
+    )
+    db_session.execute(on_conflict_stmt)
+    db_session.commit()
+
+
+def delete_web_page_validators_for_cc_pair__no_commit(
+    db_session: Session, cc_pair_id: int
+) -> None:
+    db_session.execute(
+        delete(WebPageValidator).where(
+            WebPageValidator.connector_credential_pair_id == cc_pair_id
+        )
+    )
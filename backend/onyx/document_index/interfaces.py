@@ -1,8 +1,14 @@
 import abc
+from collections.abc import Mapping
 from dataclasses import dataclass
+from dataclasses import field
 from datetime import datetime
+from enum import Enum
+from http import HTTPStatus
 from typing import Any
 
+import httpx
+
 from onyx.access.models import DocumentAccess
 from onyx.access.models import ExternalAccess
 from onyx.agents.agent_search.shared_graph_utils.models import QueryExpansionType
@@ -120,6 +126,80 @@ class VespaDocumentUserFields:
     user_folder_id: str | None = None
 
 
+@dataclass
+class VespaDocumentUpdate:
+    """
+    The fields to update for a single document, used for batched updates where every
+    document can get different values (e.g. its own access control list).
+    """
+
+    doc_id: str
+    chunk_count: int | None
+    fields: VespaDocumentFields | None = None
+    user_fields: VespaDocumentUserFields | None = None
+
+
+class DocumentFailureType(str, Enum):
+    # timed out waiting for the document index, worth retrying right away
+    READ_TIMEOUT = "read_timeout"
+    # rejected with an HTTP 4xx, retrying the same request fails the same way
+    CLIENT_ERROR = "client_error"
+    OTHER = "other"
+
+    @classmethod
+    def from_status_code(cls, status_code: int | None) -> "DocumentFailureType":
+        # throttling is transient even though it is a 4xx
+        if (
+            status_code is not None
+            and 400 <= status_code < 500
+            and status_code != HTTPStatus.TOO_MANY_REQUESTS
+        ):
+            return cls.CLIENT_ERROR
+        return cls.OTHER
+
+    @classmethod
+    def from_exception(cls, e: BaseException) -> "DocumentFailureType":
+        if isinstance(e, httpx.ReadTimeout):
+            return cls.READ_TIMEOUT
+        if isinstance(e, httpx.HTTPStatusError):
+            return cls.from_status_code(e.response.status_code)
+        return cls.OTHER
+
+
+@dataclass
+class DocumentBatchResult:
+    """
+    Per document outcome of a batched delete / update. Documents are either in
+    chunks_affected (succeeded) or in failures (document id -> error), never both.
+    failure_types tells why each document in failures failed.
+    """
+
+    chunks_affected: dict[str, int] = field(default_factory=dict)
+    failures: dict[str, str] = field(default_factory=dict)
+    failure_types: dict[str, DocumentFailureType] = field(default_factory=dict)
+
+    def add_failure(
+        self,
+        doc_id: str,
+        error: str,
+        failure_type: DocumentFailureType = DocumentFailureType.OTHER,
+    ) -> None:
+        self.failures[doc_id] = error
+        self.failure_types[doc_id] = failure_type
+
+    def add_exception(self, doc_id: str, e: BaseException) -> None:
+        self.add_failure(
+            doc_id, f"{type(e).__name__}: {e}", DocumentFailureType.from_exception(e)
+        )
+
+    def get_failed_doc_ids(self, failure_type: DocumentFailureType) -> list[str]:
+        return [
+            doc_id
+            for doc_id in self.failures
+            if self.failure_types.get(doc_id, DocumentFailureType.OTHER) == failure_type
+        ]
+
+
 @dataclass
 class UpdateRequest:
     """
@@ -256,6 +336,29 @@ class Deletable(abc.ABC):
         """
         raise NotImplementedError
 
+    def delete_batch(
+        self,
+        doc_id_to_chunk_count: Mapping[str, int | None],
+        *,
+        tenant_id: str,
+    ) -> DocumentBatchResult:
+        """
+        Hard deletes several documents. Failures are reported per document rather than
+        raised, so callers can handle the documents that went through.
+
+        The default implementation deletes one document at a time, implementations
+        should override this if they can do better.
+        """
+        result = DocumentBatchResult()
+        for doc_id, chunk_count in doc_id_to_chunk_count.items():
+            try:
+                result.chunks_affected[doc_id] = self.delete_single(
+                    doc_id, tenant_id=tenant_id, chunk_count=chunk_count
+                )
+            except Exception as e:
+                result.add_exception(doc_id, e)
+        return result
+
 
 class Updatable(abc.ABC):
     """
@@ -293,6 +396,34 @@ class Updatable(abc.ABC):
         """
         raise NotImplementedError
 
+    def update_batch(
+        self,
+        updates: list[VespaDocumentUpdate],
+        *,
+        tenant_id: str,
+    ) -> DocumentBatchResult:
+        """
+        Applies per document updates to several documents. Like `update_single`,
+        documents that don't exist are a no-op. Failures are reported per document
+        rather than raised.
+
+        The default implementation updates one document at a time, implementations
+        should override this if they can do better.
+        """
+        result = DocumentBatchResult()
+        for update in updates:
+            try:
+                result.chunks_affected[update.doc_id] = self.update_single(
+                    update.doc_id,
+                    tenant_id=tenant_id,
+                    chunk_count=update.chunk_count,
+                    fields=update.fields,
+                    user_fields=update.user_fields,
+                )
+            except Exception as e:
+                result.add_exception(update.doc_id, e)
+        return result
+
     @abc.abstractmethod
     def update(self, update_requests: list[UpdateRequest], *, tenant_id: str) -> None:
         """
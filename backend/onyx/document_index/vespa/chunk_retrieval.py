@@ -36,6 +36,7 @@ from onyx.document_index.vespa_constants import DOCUMENT_ID_ENDPOINT
 from onyx.document_index.vespa_constants import HIDDEN
 from onyx.document_index.vespa_constants import IMAGE_FILE_NAME
 from onyx.document_index.vespa_constants import LARGE_CHUNK_REFERENCE_IDS
+from onyx.document_index.vespa_constants import LLM_TOKEN_COUNTS
 from onyx.document_index.vespa_constants import MAX_ID_SEARCH_QUERY_SIZE
 from onyx.document_index.vespa_constants import MAX_OR_CONDITIONS
 from onyx.document_index.vespa_constants import METADATA
@@ -53,6 +54,7 @@ from onyx.document_index.vespa_constants import TITLE
 from onyx.document_index.vespa_constants import YQL_BASE
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.threadpool_concurrency import ThreadPoolName
 from shared_configs.configs import MULTI_TENANT
 
 logger = setup_logger()
@@ -139,6 +141,9 @@ def _vespa_hit_to_inference_chunk(
         source_type=fields[SOURCE_TYPE],
         # still called `image_file_name` in Vespa for backwards compatibility
         image_file_id=fields.get(IMAGE_FILE_NAME),
+        llm_token_counts=(
+            json.loads(fields[LLM_TOKEN_COUNTS]) if fields.get(LLM_TOKEN_COUNTS) else {}
+        ),
         title=fields.get(TITLE),
         semantic_identifier=fields[SEMANTIC_IDENTIFIER],
         boost=fields.get(BOOST, 1),
@@ -303,7 +308,7 @@ def parallel_visit_api_retrieval(
     ]
 
     parallel_results = run_functions_tuples_in_parallel(
-        functions_with_args, allow_failures=True
+        functions_with_args, allow_failures=True, pool=ThreadPoolName.VESPA
     )
 
     # Any failures to retrieve would give a None, drop the Nones and empty lists
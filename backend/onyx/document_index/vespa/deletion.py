@@ -4,6 +4,8 @@ from uuid import UUID
 import httpx
 from retry import retry
 
+from onyx.document_index.vespa.feed import VespaFeedOperation
+from onyx.document_index.vespa.feed import VespaFeedOperationType
 from onyx.document_index.vespa_constants import DOCUMENT_ID_ENDPOINT
 from onyx.document_index.vespa_constants import NUM_THREADS
 from onyx.utils.logger import setup_logger
@@ -59,3 +61,18 @@ def delete_vespa_chunks(
     finally:
         if not external_executor:
             executor.shutdown(wait=True)
+
+
+def build_vespa_chunk_remove_operations(
+    doc_chunk_ids: list[UUID],
+    index_name: str,
+    document_id: str,
+) -> list[VespaFeedOperation]:
+    return [
+        VespaFeedOperation(
+            operation_type=VespaFeedOperationType.REMOVE,
+            url=f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{doc_chunk_id}",
+            document_id=document_id,
+        )
+        for doc_chunk_id in doc_chunk_ids
+    ]
@@ -0,0 +1,320 @@
+import atexit
+import concurrent.futures
+import os
+import random
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from dataclasses import field
+from enum import Enum
+from http import HTTPStatus
+from types import TracebackType
+
+import httpx
+
+from onyx.configs.app_configs import VESPA_FEED_MAX_IN_FLIGHT
+from onyx.configs.app_configs import VESPA_FEED_MAX_RETRIES
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Vespa answers with 429 when its feed buffers are full and 503/504 when a content
+# node is temporarily unavailable. These are safe to retry.
+_RETRYABLE_STATUS_CODES = {
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+}
+_BACKOFF_BASE_SECONDS = 0.5
+_BACKOFF_MAX_SECONDS = 10.0
+
+
+class VespaFeedOperationType(str, Enum):
+    PUT = "put"
+    UPDATE = "update"
+    REMOVE = "remove"
+
+
+@dataclass
+class VespaFeedOperation:
+    operation_type: VespaFeedOperationType
+    url: str
+    # the onyx document id, only used for reporting
+    document_id: str
+    body: dict | None = None
+
+
+@dataclass
+class VespaFeedResult:
+    operation: VespaFeedOperation
+    status_code: int | None
+    attempts: int
+    latency: float
+    error: str | None = None
+    # set when the last attempt failed without a response (e.g. a read timeout)
+    exception: httpx.TransportError | None = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class VespaFeedStats:
+    operation_counts: dict[VespaFeedOperationType, int] = field(default_factory=dict)
+    succeeded: int = 0
+    failed: int = 0
+    retries: int = 0
+    elapsed: float = 0.0
+    total_latency: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return self.succeeded + self.failed
+
+    @property
+    def ops_per_second(self) -> float:
+        return self.total / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.total if self.total else 0.0
+
+    def record(self, result: VespaFeedResult) -> None:
+        op_type = result.operation.operation_type
+        self.operation_counts[op_type] = self.operation_counts.get(op_type, 0) + 1
+        if result.success:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        self.retries += result.attempts - 1
+        self.total_latency += result.latency
+
+    def __str__(self) -> str:
+        counts = ", ".join(
+            f"{op_type.value}={count}"
+            for op_type, count in sorted(
+                self.operation_counts.items(), key=lambda item: item[0].value
+            )
+        )
+        return (
+            f"ops={self.total} ({counts}) succeeded={self.succeeded} "
+            f"failed={self.failed} retries={self.retries} "
+            f"elapsed={self.elapsed:.2f}s throughput={self.ops_per_second:.1f} ops/s "
+            f"mean_latency={self.mean_latency * 1000:.1f}ms"
+        )
+
+
+@dataclass
+class VespaFeedSummary:
+    results: list[VespaFeedResult]
+    stats: VespaFeedStats
+
+    @property
+    def failures(self) -> list[VespaFeedResult]:
+        return [result for result in self.results if not result.success]
+
+    def raise_for_failures(self) -> None:
+        failures = self.failures
+        if not failures:
+            return
+
+        failed_doc_ids = sorted({f.operation.document_id for f in failures})
+        first_failure = failures[0]
+        raise RuntimeError(
+            f"Vespa feed failed for {len(failures)} of {len(self.results)} operations. "
+            f"documents={failed_doc_ids[:10]}{'...' if len(failed_doc_ids) > 10 else ''} "
+            f"first_error={first_failure.error}"
+        )
+
+
+class VespaFeedClient:
+    """Streams operations to Vespa over a single (HTTP/2) httpx client with bounded
+    concurrency. Vespa has no multi-document write in document/v1, so the way to feed
+    at volume is to multiplex many requests over one connection. Operations are pulled
+    lazily, at most `max_in_flight` are outstanding, throttled / transient failures are
+    retried with backoff, and every operation gets a `VespaFeedResult`.
+
+    Reuse one instance for several `feed` calls to keep the worker threads warm. The
+    http client can be bound at construction or passed per `feed` call, so one feed
+    client (and its threads) can serve short lived http clients.
+
+    NOTE: operations within a single `feed` call are not ordered. If two operations
+    touch the same Vespa document (e.g. remove then put), feed them in separate calls.
+    """
+
+    def __init__(
+        self,
+        http_client: httpx.Client | None = None,
+        max_in_flight: int = VESPA_FEED_MAX_IN_FLIGHT,
+        max_retries: int = VESPA_FEED_MAX_RETRIES,
+    ) -> None:
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        self._http_client = http_client
+        self._max_in_flight = max_in_flight
+        self._max_retries = max_retries
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_in_flight, thread_name_prefix="vespa_feed"
+        )
+
+    def __enter__(self) -> "VespaFeedClient":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    @staticmethod
+    def _send_once(
+        http_client: httpx.Client, operation: VespaFeedOperation
+    ) -> httpx.Response:
+        if operation.operation_type == VespaFeedOperationType.REMOVE:
+            return http_client.delete(operation.url)
+
+        if operation.operation_type == VespaFeedOperationType.PUT:
+            return http_client.post(
+                operation.url,
+                headers={"Content-Type": "application/json"},
+                json=operation.body,
+            )
+
+        return http_client.put(
+            operation.url,
+            headers={"Content-Type": "application/json"},
+            json=operation.body,
+        )
+
+    def _send(
+        self, http_client: httpx.Client, operation: VespaFeedOperation
+    ) -> VespaFeedResult:
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            status_code: int | None = None
+            exception: httpx.TransportError | None = None
+            try:
+                response = self._send_once(http_client, operation)
+                status_code = response.status_code
+                if response.is_success:
+                    return VespaFeedResult(
+                        operation=operation,
+                        status_code=status_code,
+                        attempts=attempt,
+                        latency=time.monotonic() - start,
+                    )
+                error = f"HTTP {status_code}: {response.text}"
+                retryable = status_code in _RETRYABLE_STATUS_CODES
+            except httpx.TransportError as e:
+                exception = e
+                error = f"{type(e).__name__}: {e}"
+                retryable = True
+
+            if not retryable or attempt > self._max_retries:
+                if status_code == HTTPStatus.INSUFFICIENT_STORAGE:
+                    logger.error(
+                        "NOTE: HTTP Status 507 Insufficient Storage usually means "
+                        "you need to allocate more memory or disk space to the "
+                        "Vespa/index container."
+                    )
+                return VespaFeedResult(
+                    operation=operation,
+                    status_code=status_code,
+                    attempts=attempt,
+                    latency=time.monotonic() - start,
+                    error=error,
+                    exception=exception,
+                )
+
+            # exponential backoff with jitter so throttled operations don't retry in lockstep
+            backoff = min(
+                _BACKOFF_BASE_SECONDS * 2 ** (attempt - 1), _BACKOFF_MAX_SECONDS
+            )
+            time.sleep(backoff * random.uniform(0.5, 1.0))
+
+    def feed(
+        self,
+        operations: Iterable[VespaFeedOperation],
+        http_client: httpx.Client | None = None,
+    ) -> VespaFeedSummary:
+        """Feeds all operations and returns a result per operation. Never raises for
+        individual operation failures - use `VespaFeedSummary.raise_for_failures`.
+        `http_client` overrides the client bound at construction."""
+        http_client = http_client or self._http_client
+        if http_client is None:
+            raise ValueError("No http client to feed with")
+
+        stats = VespaFeedStats()
+        results: list[VespaFeedResult] = []
+        in_flight: set[concurrent.futures.Future[VespaFeedResult]] = set()
+
+        def _collect(done: set[concurrent.futures.Future[VespaFeedResult]]) -> None:
+            for future in done:
+                result = future.result()
+                results.append(result)
+                stats.record(result)
+                if not result.success:
+                    logger.error(
+                        f"Vespa feed operation failed: "
+                        f"op={result.operation.operation_type.value} "
+                        f"doc_id={result.operation.document_id} "
+                        f"attempts={result.attempts} error={result.error}"
+                    )
+
+        start = time.monotonic()
+        for operation in operations:
+            if len(in_flight) >= self._max_in_flight:
+                done, in_flight = concurrent.futures.wait(
+                    in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                _collect(done)
+            in_flight.add(self._executor.submit(self._send, http_client, operation))
+
+        done, _ = concurrent.futures.wait(in_flight)
+        _collect(done)
+        stats.elapsed = time.monotonic() - start
+
+        return VespaFeedSummary(results=results, stats=stats)
+
+
+_shared_feed_client: VespaFeedClient | None = None
+_shared_feed_client_pid: int | None = None
+_shared_feed_client_lock = threading.Lock()
+
+
+def get_shared_feed_client() -> VespaFeedClient:
+    """Returns the feed client shared by the whole process, so the worker threads are
+    started once instead of on every write. It has no bound http client - pass one to
+    `feed`. Recreated after a fork (the threads don't survive it) and shut down at
+    interpreter exit."""
+    global _shared_feed_client, _shared_feed_client_pid
+
+    with _shared_feed_client_lock:
+        if _shared_feed_client is None or _shared_feed_client_pid != os.getpid():
+            _shared_feed_client = VespaFeedClient()
+            _shared_feed_client_pid = os.getpid()
+        return _shared_feed_client
+
+
+def close_shared_feed_client() -> None:
+    global _shared_feed_client, _shared_feed_client_pid
+
+    with _shared_feed_client_lock:
+        if _shared_feed_client is not None and _shared_feed_client_pid == os.getpid():
+            _shared_feed_client.close()
+        _shared_feed_client = None
+        _shared_feed_client_pid = None
+
+
+atexit.register(close_shared_feed_client)
@@ -7,6 +7,8 @@ import re
 import time
 import urllib
 import zipfile
+from collections.abc import Iterable
+from collections.abc import Mapping
 from dataclasses import dataclass
 from datetime import datetime
 from datetime import timedelta
@@ -22,6 +24,7 @@ from pydantic import BaseModel
 from retry import retry
 
 from onyx.agents.agent_search.shared_graph_utils.models import QueryExpansionType
+from onyx.configs.app_configs import VESPA_BULK_FEED_ENABLED
 from onyx.configs.chat_configs import DOC_TIME_DECAY
 from onyx.configs.chat_configs import NUM_RETURNED_HITS
 from onyx.configs.chat_configs import TITLE_CONTENT_RATIO
@@ -32,6 +35,8 @@ from onyx.context.search.models import InferenceChunkUncleaned
 from onyx.db.enums import EmbeddingPrecision
 from onyx.document_index.document_index_utils import get_document_chunk_ids
 from onyx.document_index.document_index_utils import get_uuid_from_chunk_info
+from onyx.document_index.interfaces import DocumentBatchResult
+from onyx.document_index.interfaces import DocumentFailureType
 from onyx.document_index.interfaces import DocumentIndex
 from onyx.document_index.interfaces import DocumentInsertionRecord
 from onyx.document_index.interfaces import EnrichedDocumentIndexingInfo
@@ -40,15 +45,24 @@ from onyx.document_index.interfaces import MinimalDocumentIndexingInfo
 from onyx.document_index.interfaces import UpdateRequest
 from onyx.document_index.interfaces import VespaChunkRequest
 from onyx.document_index.interfaces import VespaDocumentFields
+from onyx.document_index.interfaces import VespaDocumentUpdate
 from onyx.document_index.interfaces import VespaDocumentUserFields
 from onyx.document_index.vespa.chunk_retrieval import batch_search_api_retrieval
 from onyx.document_index.vespa.chunk_retrieval import (
     parallel_visit_api_retrieval,
 )
 from onyx.document_index.vespa.chunk_retrieval import query_vespa
+from onyx.document_index.vespa.deletion import build_vespa_chunk_remove_operations
 from onyx.document_index.vespa.deletion import delete_vespa_chunks
+from onyx.document_index.vespa.feed import get_shared_feed_client
+from onyx.document_index.vespa.feed import VespaFeedClient
+from onyx.document_index.vespa.feed import VespaFeedOperation
+from onyx.document_index.vespa.feed import VespaFeedOperationType
 from onyx.document_index.vespa.indexing_utils import BaseHTTPXClientContext
 from onyx.document_index.vespa.indexing_utils import batch_index_vespa_chunks
+from onyx.document_index.vespa.indexing_utils import (
+    build_vespa_chunk_put_operations,
+)
 from onyx.document_index.vespa.indexing_utils import check_for_final_chunk_existence
 from onyx.document_index.vespa.indexing_utils import clean_chunk_id_copy
 from onyx.document_index.vespa.indexing_utils import GlobalHTTPXClientContext
@@ -150,6 +164,79 @@ def generate_kg_update_request(
     return kg_update_dict
 
 
+def _feed_or_raise(
+    feed_client: VespaFeedClient,
+    http_client: httpx.Client,
+    operations: Iterable[VespaFeedOperation],
+    description: str,
+) -> int:
+    """Feeds the operations, logs throughput and raises if any operation failed.
+    Returns the number of operations fed."""
+    summary = feed_client.feed(operations, http_client=http_client)
+    logger.info(f"Vespa bulk feed ({description}): {summary.stats}")
+    summary.raise_for_failures()
+    return summary.stats.total
+
+
+def _collect_feed_failures(
+    feed_client: VespaFeedClient,
+    http_client: httpx.Client,
+    operations: Iterable[VespaFeedOperation],
+    description: str,
+    failures: DocumentBatchResult,
+) -> None:
+    """Feeds the operations and logs throughput like `_feed_or_raise`, but adds the
+    first error per failed document to `failures` instead of raising."""
+    summary = feed_client.feed(operations, http_client=http_client)
+    logger.info(f"Vespa bulk feed ({description}): {summary.stats}")
+    for failure in summary.failures:
+        doc_id = failure.operation.document_id
+        if doc_id in failures.failures:
+            continue
+        failures.add_failure(
+            doc_id,
+            failure.error or "unknown",
+            (
+                DocumentFailureType.from_exception(failure.exception)
+                if failure.exception
+                else DocumentFailureType.from_status_code(failure.status_code)
+            ),
+        )
+
+
+def _build_update_dict(
+    fields: VespaDocumentFields | None,
+    user_fields: VespaDocumentUserFields | None,
+) -> dict[str, dict]:
+    update_dict: dict[str, dict] = {"fields": {}}
+
+    if fields is not None:
+        if fields.boost is not None:
+            update_dict["fields"][BOOST] = {"assign": fields.boost}
+
+        if fields.document_sets is not None:
+            update_dict["fields"][DOCUMENT_SETS] = {
+                "assign": {document_set: 1 for document_set in fields.document_sets}
+            }
+
+        if fields.access is not None:
+            update_dict["fields"][ACCESS_CONTROL_LIST] = {
+                "assign": {acl_entry: 1 for acl_entry in fields.access.to_acl()}
+            }
+
+        if fields.hidden is not None:
+            update_dict["fields"][HIDDEN] = {"assign": fields.hidden}
+
+    if user_fields is not None:
+        if user_fields.user_file_id is not None:
+            update_dict["fields"][USER_FILE] = {"assign": user_fields.user_file_id}
+
+        if user_fields.user_folder_id is not None:
+            update_dict["fields"][USER_FOLDER] = {"assign": user_fields.user_folder_id}
+
+    return update_dict
+
+
 def in_memory_zip_from_file_bytes(file_contents: dict[str, bytes]) -> BinaryIO:
     zip_buffer = io.BytesIO()
     with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
@@ -195,6 +282,8 @@ class VespaIndex(DocumentIndex):
         secondary_large_chunks_enabled: bool | None,
         multitenant: bool = False,
         httpx_client: httpx.Client | None = None,
+        bulk_feed: bool = VESPA_BULK_FEED_ENABLED,
+        feed_client: VespaFeedClient | None = None,
     ) -> None:
         self.index_name = index_name
         self.secondary_index_name = secondary_index_name
@@ -204,6 +293,13 @@ class VespaIndex(DocumentIndex):
 
         self.multitenant = multitenant
 
+        # if set, index / update / delete_single stream their writes through a
+        # VespaFeedClient instead of fixed size batches of parallel requests
+        self.bulk_feed = bulk_feed
+        # if not set, the process wide feed client is used. A passed in feed client
+        # is owned (and closed) by the caller
+        self.feed_client = feed_client
+
         self.httpx_client_context: BaseHTTPXClientContext
 
         if httpx_client:
@@ -220,6 +316,9 @@ class VespaIndex(DocumentIndex):
                 secondary_large_chunks_enabled
             )
 
+    def _get_feed_client(self) -> VespaFeedClient:
+        return self.feed_client or get_shared_feed_client()
+
     def ensure_indices_exist(
         self,
         primary_embedding_dim: int,
@@ -461,48 +560,85 @@ class VespaIndex(DocumentIndex):
             # documents that have `chunk_count` in the database, but not for
             # `old_version` documents.
 
-            enriched_doc_infos: list[EnrichedDocumentIndexingInfo] = [
-                VespaIndex.enrich_basic_chunk_info(
+            enriched_doc_infos: list[EnrichedDocumentIndexingInfo] = (
+                VespaIndex.enrich_basic_chunk_info_batch(
                     index_name=self.index_name,
                     http_client=http_client,
-                    document_id=doc_id,
-                    previous_chunk_count=doc_id_to_previous_chunk_cnt.get(doc_id, 0),
-                    new_chunk_count=doc_id_to_new_chunk_cnt.get(doc_id, 0),
+                    doc_id_to_previous_chunk_cnt={
+                        doc_id: doc_id_to_previous_chunk_cnt.get(doc_id, 0)
+                        for doc_id in doc_id_to_new_chunk_cnt.keys()
+                    },
+                    doc_id_to_new_chunk_cnt=doc_id_to_new_chunk_cnt,
+                    executor=executor,
                 )
-                for doc_id in doc_id_to_new_chunk_cnt.keys()
-            ]
+            )
 
             for cleaned_doc_info in enriched_doc_infos:
                 # If the document has previously indexed chunks, we know it previously existed
                 if cleaned_doc_info.chunk_end_index:
                     existing_docs.add(cleaned_doc_info.doc_id)
 
-            # Now, for each doc, we know exactly where to start and end our deletion
-            # So let's generate the chunk IDs for each chunk to delete
-            chunks_to_delete = get_document_chunk_ids(
-                enriched_document_info_list=enriched_doc_infos,
-                tenant_id=tenant_id,
-                large_chunks_enabled=large_chunks_enabled,
-            )
-
-            # Delete old Vespa documents
-            for doc_chunk_ids_batch in batch_generator(chunks_to_delete, BATCH_SIZE):
-                delete_vespa_chunks(
-                    doc_chunk_ids=doc_chunk_ids_batch,
-                    index_name=self.index_name,
-                    http_client=http_client,
-                    executor=executor,
+            if self.bulk_feed:
+                feed_client = self._get_feed_client()
+                # deletes must fully complete before the puts, since a new chunk
+                # may reuse the Vespa ID of a chunk being deleted
+                _feed_or_raise(
+                    feed_client,
+                    http_client,
+                    (
+                        operation
+                        for doc_info in enriched_doc_infos
+                        for operation in build_vespa_chunk_remove_operations(
+                            doc_chunk_ids=get_document_chunk_ids(
+                                enriched_document_info_list=[doc_info],
+                                tenant_id=tenant_id,
+                                large_chunks_enabled=large_chunks_enabled,
+                            ),
+                            index_name=self.index_name,
+                            document_id=doc_info.doc_id,
+                        )
+                    ),
+                    "index - delete old chunks",
                 )
-
-            for chunk_batch in batch_generator(cleaned_chunks, BATCH_SIZE):
-                batch_index_vespa_chunks(
-                    chunks=chunk_batch,
-                    index_name=self.index_name,
-                    http_client=http_client,
-                    multitenant=self.multitenant,
-                    executor=executor,
+                _feed_or_raise(
+                    feed_client,
+                    http_client,
+                    build_vespa_chunk_put_operations(
+                        chunks=cleaned_chunks,
+                        index_name=self.index_name,
+                        multitenant=self.multitenant,
+                    ),
+                    "index - put new chunks",
+                )
+            else:
+                # Now, for each doc, we know exactly where to start and end our deletion
+                # So let's generate the chunk IDs for each chunk to delete
+                chunks_to_delete = get_document_chunk_ids(
+                    enriched_document_info_list=enriched_doc_infos,
+                    tenant_id=tenant_id,
+                    large_chunks_enabled=large_chunks_enabled,
                 )
 
+                # Delete old Vespa documents
+                for doc_chunk_ids_batch in batch_generator(
+                    chunks_to_delete, BATCH_SIZE
+                ):
+                    delete_vespa_chunks(
+                        doc_chunk_ids=doc_chunk_ids_batch,
+                        index_name=self.index_name,
+                        http_client=http_client,
+                        executor=executor,
+                    )
+
+                for chunk_batch in batch_generator(cleaned_chunks, BATCH_SIZE):
+                    batch_index_vespa_chunks(
+                        chunks=chunk_batch,
+                        index_name=self.index_name,
+                        http_client=http_client,
+                        multitenant=self.multitenant,
+                        executor=executor,
+                    )
+
         all_cleaned_doc_ids = {chunk.source_document.id for chunk in cleaned_chunks}
 
         return {
@@ -621,23 +757,24 @@ class VespaIndex(DocumentIndex):
             index_names.append(self.secondary_index_name)
 
         chunk_id_start_time = time.monotonic()
+        doc_id_to_previous_chunk_cnt: dict[str, int | None] = {
+            doc_info.doc_id: doc_info.chunk_start_index
+            for update_request in update_requests
+            for doc_info in update_request.minimal_document_indexing_info
+        }
         with self.httpx_client_context as http_client:
-            for update_request in update_requests:
-                for doc_info in update_request.minimal_document_indexing_info:
-                    for index_name in index_names:
-                        doc_chunk_info = VespaIndex.enrich_basic_chunk_info(
-                            index_name=index_name,
-                            http_client=http_client,
-                            document_id=doc_info.doc_id,
-                            previous_chunk_count=doc_info.chunk_start_index,
-                            new_chunk_count=0,
-                        )
-                        doc_chunk_ids = get_document_chunk_ids(
-                            enriched_document_info_list=[doc_chunk_info],
-                            tenant_id=tenant_id,
-                            large_chunks_enabled=False,
-                        )
-                        all_doc_chunk_ids[doc_info.doc_id] = doc_chunk_ids
+            for index_name in index_names:
+                for doc_chunk_info in VespaIndex.enrich_basic_chunk_info_batch(
+                    index_name=index_name,
+                    http_client=http_client,
+                    doc_id_to_previous_chunk_cnt=doc_id_to_previous_chunk_cnt,
+                    doc_id_to_new_chunk_cnt={},
+                ):
+                    all_doc_chunk_ids[doc_chunk_info.doc_id] = get_document_chunk_ids(
+                        enriched_document_info_list=[doc_chunk_info],
+                        tenant_id=tenant_id,
+                        large_chunks_enabled=False,
+                    )
 
         logger.debug(
             f"Took {time.monotonic() - chunk_id_start_time:.2f} seconds to fetch all Vespa chunk IDs"
@@ -678,7 +815,24 @@ class VespaIndex(DocumentIndex):
                     )
 
         with self.httpx_client_context as httpx_client:
-            self._apply_updates_batched(processed_updates_requests, httpx_client)
+            if self.bulk_feed:
+                feed_client = self._get_feed_client()
+                _feed_or_raise(
+                    feed_client,
+                    httpx_client,
+                    (
+                        VespaFeedOperation(
+                            operation_type=VespaFeedOperationType.UPDATE,
+                            url=update.url,
+                            document_id=update.document_id,
+                            body=update.update_request,
+                        )
+                        for update in processed_updates_requests
+                    ),
+                    "update",
+                )
+            else:
+                self._apply_updates_batched(processed_updates_requests, httpx_client)
         logger.debug(
             "Finished updating Vespa documents in %.2f seconds",
             time.monotonic() - update_start,
@@ -746,33 +900,7 @@ class VespaIndex(DocumentIndex):
         Retries if we encounter transient HTTPStatusError (e.g., overload).
         """
 
-        update_dict: dict[str, dict] = {"fields": {}}
-
-        if fields is not None:
-            if fields.boost is not None:
-                update_dict["fields"][BOOST] = {"assign": fields.boost}
-
-            if fields.document_sets is not None:
-                update_dict["fields"][DOCUMENT_SETS] = {
-                    "assign": {document_set: 1 for document_set in fields.document_sets}
-                }
-
-            if fields.access is not None:
-                update_dict["fields"][ACCESS_CONTROL_LIST] = {
-                    "assign": {acl_entry: 1 for acl_entry in fields.access.to_acl()}
-                }
-
-            if fields.hidden is not None:
-                update_dict["fields"][HIDDEN] = {"assign": fields.hidden}
-
-        if user_fields is not None:
-            if user_fields.user_file_id is not None:
-                update_dict["fields"][USER_FILE] = {"assign": user_fields.user_file_id}
-
-            if user_fields.user_folder_id is not None:
-                update_dict["fields"][USER_FOLDER] = {
-                    "assign": user_fields.user_folder_id
-                }
+        update_dict = _build_update_dict(fields, user_fields)
 
         if not update_dict["fields"]:
             logger.error("Update request received but nothing to update.")
@@ -886,6 +1014,20 @@ class VespaIndex(DocumentIndex):
                     large_chunks_enabled=large_chunks_enabled,
                 )
 
+                if self.bulk_feed:
+                    feed_client = self._get_feed_client()
+                    total_chunks_deleted += _feed_or_raise(
+                        feed_client,
+                        http_client,
+                        build_vespa_chunk_remove_operations(
+                            doc_chunk_ids=chunks_to_delete,
+                            index_name=index_name,
+                            document_id=doc_id,
+                        ),
+                        "delete_single",
+                    )
+                    continue
+
                 for doc_chunk_ids_batch in batch_generator(
                     chunks_to_delete, BATCH_SIZE
                 ):
@@ -899,6 +1041,217 @@ class VespaIndex(DocumentIndex):
 
         return total_chunks_deleted
 
+    def _get_chunk_ids_for_documents(
+        self,
+        doc_id_to_chunk_count: Mapping[str, int | None],
+        http_client: httpx.Client,
+        tenant_id: str,
+        failures: DocumentBatchResult,
+    ) -> dict[str, list[tuple[str, list[UUID]]]]:
+        """Resolves the chunk ids of every document in every index, keyed by the
+        (cleaned) document id. Documents whose chunks could not be resolved are added
+        to `failures` and left out."""
+        doc_id_to_index_chunk_ids: dict[str, list[tuple[str, list[UUID]]]] = {
+            doc_id: [] for doc_id in doc_id_to_chunk_count
+        }
+        for (
+            index_name,
+            large_chunks_enabled,
+        ) in self.index_to_large_chunks_enabled.items():
+            remaining = {
+                doc_id: chunk_count
+                for doc_id, chunk_count in doc_id_to_chunk_count.items()
+                if doc_id not in failures.failures
+            }
+            try:
+                enriched_doc_infos = VespaIndex.enrich_basic_chunk_info_batch(
+                    index_name=index_name,
+                    http_client=http_client,
+                    doc_id_to_previous_chunk_cnt=remaining,
+                    doc_id_to_new_chunk_cnt={},
+                )
+            except Exception:
+                # only documents without a chunk count can fail here (they probe
+                # Vespa), so redo them one by one to find out which ones
+                enriched_doc_infos = []
+                for doc_id, chunk_count in remaining.items():
+                    try:
+                        enriched_doc_infos.append(
+                            VespaIndex.enrich_basic_chunk_info(
+                                index_name=index_name,
+                                http_client=http_client,
+                                document_id=doc_id,
+                                previous_chunk_count=chunk_count,
+                                new_chunk_count=0,
+                            )
+                        )
+                    except Exception as e:
+                        failures.add_exception(doc_id, e)
+
+            for enriched_doc_info in enriched_doc_infos:
+                doc_id_to_index_chunk_ids[enriched_doc_info.doc_id].append(
+                    (
+                        index_name,
+                        get_document_chunk_ids(
+                            enriched_document_info_list=[enriched_doc_info],
+                            tenant_id=tenant_id,
+                            large_chunks_enabled=large_chunks_enabled,
+                        ),
+                    )
+                )
+
+        return {
+            doc_id: index_chunk_ids
+            for doc_id, index_chunk_ids in doc_id_to_index_chunk_ids.items()
+            if doc_id not in failures.failures
+        }
+
+    def delete_batch(
+        self,
+        doc_id_to_chunk_count: Mapping[str, int | None],
+        *,
+        tenant_id: str,
+    ) -> DocumentBatchResult:
+        """Deletes all chunks of all the documents in a single bulk feed instead of
+        one document at a time."""
+        if not self.bulk_feed:
+            return super().delete_batch(doc_id_to_chunk_count, tenant_id=tenant_id)
+
+        delete_start = time.monotonic()
+        cleaned_to_doc_id = {
+            replace_invalid_doc_id_characters(doc_id): doc_id
+            for doc_id in doc_id_to_chunk_count
+        }
+        # keyed by the cleaned document ids
+        failures = DocumentBatchResult()
+        with self.httpx_client_context as http_client:
+            doc_id_to_index_chunk_ids = self._get_chunk_ids_for_documents(
+                doc_id_to_chunk_count={
+                    cleaned_doc_id: doc_id_to_chunk_count[doc_id]
+                    for cleaned_doc_id, doc_id in cleaned_to_doc_id.items()
+                },
+                http_client=http_client,
+                tenant_id=tenant_id,
+                failures=failures,
+            )
+            feed_client = self._get_feed_client()
+            _collect_feed_failures(
+                feed_client,
+                http_client,
+                (
+                    operation
+                    for cleaned_doc_id, index_chunk_ids in doc_id_to_index_chunk_ids.items()
+                    for index_name, chunk_ids in index_chunk_ids
+                    for operation in build_vespa_chunk_remove_operations(
+                        doc_chunk_ids=chunk_ids,
+                        index_name=index_name,
+                        document_id=cleaned_doc_id,
+                    )
+                ),
+                "delete_batch",
+                failures,
+            )
+
+        result = DocumentBatchResult()
+        for cleaned_doc_id, error in failures.failures.items():
+            result.add_failure(
+                cleaned_to_doc_id[cleaned_doc_id],
+                error,
+                failures.failure_types[cleaned_doc_id],
+            )
+        for cleaned_doc_id, index_chunk_ids in doc_id_to_index_chunk_ids.items():
+            if cleaned_doc_id not in failures.failures:
+                result.chunks_affected[cleaned_to_doc_id[cleaned_doc_id]] = sum(
+                    len(chunk_ids) for _, chunk_ids in index_chunk_ids
+                )
+        logger.debug(
+            f"Deleted {len(result.chunks_affected)} documents "
+            f"({len(result.failures)} failed) in {time.monotonic() - delete_start:.2f} seconds"
+        )
+        return result
+
+    def update_batch(
+        self,
+        updates: list[VespaDocumentUpdate],
+        *,
+        tenant_id: str,
+    ) -> DocumentBatchResult:
+        """Updates all chunks of all the documents in a single bulk feed instead of
+        one document at a time. Like `update_single`, updates of missing chunks are a
+        no-op (create=true on a chunk that doesn't exist is never indexed)."""
+        if not self.bulk_feed:
+            return super().update_batch(updates, tenant_id=tenant_id)
+
+        update_start = time.monotonic()
+        cleaned_to_update = {
+            replace_invalid_doc_id_characters(update.doc_id): update
+            for update in updates
+        }
+        cleaned_to_update_dict = {
+            cleaned_doc_id: _build_update_dict(update.fields, update.user_fields)
+            for cleaned_doc_id, update in cleaned_to_update.items()
+        }
+        for cleaned_doc_id, update_dict in cleaned_to_update_dict.items():
+            if not update_dict["fields"]:
+                logger.error(
+                    f"Update request received but nothing to update: doc_id={cleaned_doc_id}"
+                )
+
+        # keyed by the cleaned document ids
+        failures = DocumentBatchResult()
+        with self.httpx_client_context as http_client:
+            doc_id_to_index_chunk_ids = self._get_chunk_ids_for_documents(
+                doc_id_to_chunk_count={
+                    cleaned_doc_id: update.chunk_count
+                    for cleaned_doc_id, update in cleaned_to_update.items()
+                    if cleaned_to_update_dict[cleaned_doc_id]["fields"]
+                },
+                http_client=http_client,
+                tenant_id=tenant_id,
+                failures=failures,
+            )
+            feed_client = self._get_feed_client()
+            _collect_feed_failures(
+                feed_client,
+                http_client,
+                (
+                    VespaFeedOperation(
+                        operation_type=VespaFeedOperationType.UPDATE,
+                        url=(
+                            f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{chunk_id}"
+                            "?create=true"
+                        ),
+                        document_id=cleaned_doc_id,
+                        body=cleaned_to_update_dict[cleaned_doc_id],
+                    )
+                    for cleaned_doc_id, index_chunk_ids in doc_id_to_index_chunk_ids.items()
+                    for index_name, chunk_ids in index_chunk_ids
+                    for chunk_id in chunk_ids
+                ),
+                "update_batch",
+                failures,
+            )
+
+        result = DocumentBatchResult()
+        for cleaned_doc_id, error in failures.failures.items():
+            result.add_failure(
+                cleaned_to_update[cleaned_doc_id].doc_id,
+                error,
+                failures.failure_types[cleaned_doc_id],
+            )
+        for cleaned_doc_id, update in cleaned_to_update.items():
+            if cleaned_doc_id in failures.failures:
+                continue
+            result.chunks_affected[update.doc_id] = sum(
+                len(chunk_ids)
+                for _, chunk_ids in doc_id_to_index_chunk_ids.get(cleaned_doc_id, [])
+            )
+        logger.debug(
+            f"Updated {len(result.chunks_affected)} documents "
+            f"({len(result.failures)} failed) in {time.monotonic() - update_start:.2f} seconds"
+        )
+        return result
+
     def id_based_retrieval(
         self,
         chunk_requests: list[VespaChunkRequest],
@@ -1055,6 +1408,63 @@ class VespaIndex(DocumentIndex):
         )
         return enriched_doc_info
 
+    @classmethod
+    def enrich_basic_chunk_info_batch(
+        cls,
+        index_name: str,
+        http_client: httpx.Client,
+        doc_id_to_previous_chunk_cnt: Mapping[str, int | None],
+        doc_id_to_new_chunk_cnt: Mapping[str, int],
+        executor: concurrent.futures.ThreadPoolExecutor | None = None,
+    ) -> list[EnrichedDocumentIndexingInfo]:
+        """Batch version of `enrich_basic_chunk_info` for every document in
+        `doc_id_to_previous_chunk_cnt` (results are returned in the same order).
+
+        Documents with a known previous chunk count are resolved in memory. Only
+        documents without one (old chunk ID system) need to probe Vespa for their
+        final chunk, and those probes run concurrently on the executor instead of
+        blocking one document at a time."""
+        enriched_doc_infos: dict[str, EnrichedDocumentIndexingInfo] = {}
+        doc_ids_to_probe: list[str] = []
+        for doc_id, previous_chunk_count in doc_id_to_previous_chunk_cnt.items():
+            if previous_chunk_count is None:
+                doc_ids_to_probe.append(doc_id)
+                continue
+
+            enriched_doc_infos[doc_id] = EnrichedDocumentIndexingInfo(
+                doc_id=doc_id,
+                chunk_start_index=doc_id_to_new_chunk_cnt.get(doc_id, 0),
+                chunk_end_index=previous_chunk_count,
+                old_version=False,
+            )
+
+        if doc_ids_to_probe:
+            external_executor = executor is not None
+            probe_executor = executor or concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(NUM_THREADS, len(doc_ids_to_probe))
+            )
+            try:
+                future_to_doc_id = {
+                    probe_executor.submit(
+                        cls.enrich_basic_chunk_info,
+                        index_name=index_name,
+                        http_client=http_client,
+                        document_id=doc_id,
+                        previous_chunk_count=None,
+                        new_chunk_count=doc_id_to_new_chunk_cnt.get(doc_id, 0),
+                    ): doc_id
+                    for doc_id in doc_ids_to_probe
+                }
+                for future in concurrent.futures.as_completed(future_to_doc_id):
+                    enriched_doc_infos[future_to_doc_id[future]] = future.result()
+            finally:
+                if not external_executor:
+                    probe_executor.shutdown(wait=True)
+
+        return [
+            enriched_doc_infos[doc_id] for doc_id in doc_id_to_previous_chunk_cnt.keys()
+        ]
+
     @classmethod
     def delete_entries_by_tenant_id(
         cls,
@@ -4,6 +4,8 @@ import uuid
 from abc import ABC
 from abc import abstractmethod
 from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
 from datetime import datetime
 from datetime import timezone
 from http import HTTPStatus
@@ -17,6 +19,8 @@ from onyx.connectors.cross_connector_utils.miscellaneous_utils import (
 from onyx.document_index.document_index_utils import get_uuid_from_chunk
 from onyx.document_index.document_index_utils import get_uuid_from_chunk_info_old
 from onyx.document_index.interfaces import MinimalDocumentIndexingInfo
+from onyx.document_index.vespa.feed import VespaFeedOperation
+from onyx.document_index.vespa.feed import VespaFeedOperationType
 from onyx.document_index.vespa.shared_utils.utils import remove_invalid_unicode_chars
 from onyx.document_index.vespa.shared_utils.utils import (
     replace_invalid_doc_id_characters,
@@ -37,6 +41,7 @@ from onyx.document_index.vespa_constants import DOCUMENT_SETS
 from onyx.document_index.vespa_constants import EMBEDDINGS
 from onyx.document_index.vespa_constants import IMAGE_FILE_NAME
 from onyx.document_index.vespa_constants import LARGE_CHUNK_REFERENCE_IDS
+from onyx.document_index.vespa_constants import LLM_TOKEN_COUNTS
 from onyx.document_index.vespa_constants import METADATA
 from onyx.document_index.vespa_constants import METADATA_LIST
 from onyx.document_index.vespa_constants import METADATA_SUFFIX
@@ -126,22 +131,15 @@ def get_existing_documents_from_chunks(
     return document_ids
 
 
-@retry(tries=5, delay=1, backoff=2)
-def _index_vespa_chunk(
+def build_vespa_chunk_fields(
     chunk: DocMetadataAwareIndexChunk,
-    index_name: str,
-    http_client: httpx.Client,
     multitenant: bool,
-) -> None:
-    json_header = {
-        "Content-Type": "application/json",
-    }
+) -> dict:
+    """Builds the Vespa document fields for a single chunk"""
     document = chunk.source_document
 
     # No minichunk documents in vespa, minichunk vectors are stored in the chunk itself
 
-    vespa_chunk_id = str(get_uuid_from_chunk(chunk))
-
     embeddings = chunk.embeddings
 
     embeddings_name_vector_map = {"full_chunk": embeddings.full_embedding}
@@ -208,6 +206,7 @@ def _index_vespa_chunk(
         DOCUMENT_SETS: {document_set: 1 for document_set in chunk.document_sets},
         # still called `image_file_name` in Vespa for backwards compatibility
         IMAGE_FILE_NAME: chunk.image_file_id,
+        LLM_TOKEN_COUNTS: json.dumps(chunk.llm_token_counts),
         USER_FILE: chunk.user_file if chunk.user_file is not None else None,
         USER_FOLDER: chunk.user_folder if chunk.user_folder is not None else None,
         BOOST: chunk.boost,
@@ -217,6 +216,24 @@ def _index_vespa_chunk(
     if multitenant:
         if chunk.tenant_id:
             vespa_document_fields[TENANT_ID] = chunk.tenant_id
+
+    return vespa_document_fields
+
+
+@retry(tries=5, delay=1, backoff=2)
+def _index_vespa_chunk(
+    chunk: DocMetadataAwareIndexChunk,
+    index_name: str,
+    http_client: httpx.Client,
+    multitenant: bool,
+) -> None:
+    json_header = {
+        "Content-Type": "application/json",
+    }
+    document = chunk.source_document
+    vespa_chunk_id = str(get_uuid_from_chunk(chunk))
+    vespa_document_fields = build_vespa_chunk_fields(chunk, multitenant)
+
     vespa_url = f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{vespa_chunk_id}"
     logger.debug(f'Indexing to URL "{vespa_url}"')
     res = http_client.post(
@@ -268,6 +285,23 @@ def batch_index_vespa_chunks(
             executor.shutdown(wait=True)
 
 
+def build_vespa_chunk_put_operations(
+    chunks: Iterable[DocMetadataAwareIndexChunk],
+    index_name: str,
+    multitenant: bool,
+) -> Iterator[VespaFeedOperation]:
+    """Lazily builds feed operations so that the Vespa fields for a chunk are only
+    materialized right before the chunk is sent."""
+    for chunk in chunks:
+        vespa_chunk_id = str(get_uuid_from_chunk(chunk))
+        yield VespaFeedOperation(
+            operation_type=VespaFeedOperationType.PUT,
+            url=f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{vespa_chunk_id}",
+            document_id=chunk.source_document.id,
+            body={"fields": build_vespa_chunk_fields(chunk, multitenant)},
+        )
+
+
 def clean_chunk_id_copy(
     chunk: DocMetadataAwareIndexChunk,
 ) -> DocMetadataAwareIndexChunk:
@@ -1,6 +1,7 @@
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
+from functools import lru_cache
 
 from onyx.configs.constants import INDEX_SEPARATOR
 from onyx.context.search.models import IndexFilters
@@ -30,6 +31,20 @@ def build_tenant_id_filter(tenant_id: str, include_trailing_and: bool = False) -
     return filter_str
 
 
+@lru_cache(maxsize=1024)
+def _build_access_control_list_filter(access_control_list: tuple[str, ...]) -> str:
+    """The ACL part of the filters. Users with many (external) groups have ACLs of
+    thousands of entries, and the same user's ACL is used for every search, so the
+    string is built once per ACL."""
+    eq_elems = [
+        f'{ACCESS_CONTROL_LIST} contains "{val}"' for val in access_control_list if val
+    ]
+    if not eq_elems:
+        return ""
+    or_clause = " or ".join(eq_elems)
+    return f"({or_clause}) and "
+
+
 def build_vespa_filters(
     filters: IndexFilters,
     *,
@@ -150,8 +165,8 @@ def build_vespa_filters(
 
     # ACL filters
     if filters.access_control_list is not None:
-        filter_str += _build_or_filters(
-            ACCESS_CONTROL_LIST, filters.access_control_list
+        filter_str += _build_access_control_list_filter(
+            tuple(filters.access_control_list)
         )
 
     # Source type filters
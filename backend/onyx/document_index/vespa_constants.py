@@ -70,6 +70,8 @@ RECENCY_BIAS = "recency_bias"
 HIDDEN = "hidden"
 # for legacy reasons, called `name` in Vespa despite it really being an ID
 IMAGE_FILE_NAME = "image_file_name"
+# json of the per tokenizer token counts of the content
+LLM_TOKEN_COUNTS = "llm_token_counts"
 
 # Specific to Vespa, needed for highlighting matching keywords / section
 CONTENT_SUMMARY = "content_summary"
@@ -88,6 +90,7 @@ YQL_BASE = (
     f"{TITLE}, "
     f"{SECTION_CONTINUATION}, "
     f"{IMAGE_FILE_NAME}, "
+    f"{LLM_TOKEN_COUNTS}, "
     f"{BOOST}, "
     f"{AGGREGATED_CHUNK_BOOST_FACTOR}, "
     f"{HIDDEN}, "
@@ -22,15 +22,19 @@ from fastapi import UploadFile
 from markitdown import FileConversionException
 from markitdown import MarkItDown
 from markitdown import UnsupportedFormatException
-from PIL import Image
 from pypdf import PdfReader
 from pypdf.errors import PdfStreamError
 
+from onyx.configs.app_configs import PDF_EXTRACTION_NUM_PROCESSES
+from onyx.configs.app_configs import PDF_MAX_EXTRACTED_IMAGES
+from onyx.configs.app_configs import PDF_PAGE_EXTRACTION_TIMEOUT_SECONDS
+from onyx.configs.app_configs import PDF_PARALLEL_EXTRACTION_MIN_PAGES
 from onyx.configs.constants import FileOrigin
 from onyx.configs.constants import ONYX_METADATA_FILENAME
 from onyx.configs.llm_configs import get_image_extraction_and_analysis_enabled
 from onyx.file_processing.file_validation import TEXT_MIME_TYPE
 from onyx.file_processing.html_utils import parse_html_page_basic
+from onyx.file_processing.pdf_extraction import iter_pdf_pages
 from onyx.file_processing.unstructured import get_unstructured_api_key
 from onyx.file_processing.unstructured import unstructured_to_text
 from onyx.file_store.file_store import FileStore
@@ -280,23 +284,19 @@ def read_pdf_file(
                 ):
                     metadata[clean_key] = ", ".join(value)
 
-        text = TEXT_SECTION_SEPARATOR.join(
-            page.extract_text() for page in pdf_reader.pages
-        )
-
-        if extract_images:
-            for page_num, page in enumerate(pdf_reader.pages):
-                for image_file_object in page.images:
-                    image = Image.open(io.BytesIO(image_file_object.data))
-                    img_byte_arr = io.BytesIO()
-                    image.save(img_byte_arr, format=image.format)
-                    img_bytes = img_byte_arr.getvalue()
-
-                    image_name = (
-                        f"page_{page_num + 1}_image_{image_file_object.name}."
-                        f"{image.format.lower() if image.format else 'png'}"
-                    )
-                    extracted_images.append((img_bytes, image_name))
+        page_texts: list[str] = []
+        for page in iter_pdf_pages(
+            pdf_reader,
+            pdf_pass,
+            extract_images=extract_images,
+            max_images=PDF_MAX_EXTRACTED_IMAGES,
+            num_processes=PDF_EXTRACTION_NUM_PROCESSES,
+            parallel_min_pages=PDF_PARALLEL_EXTRACTION_MIN_PAGES,
+            page_timeout=PDF_PAGE_EXTRACTION_TIMEOUT_SECONDS,
+        ):
+            page_texts.append(page.text)
+            extracted_images.extend(page.images)
+        text = TEXT_SECTION_SEPARATOR.join(page_texts)
 
         return text, metadata, extracted_images
 
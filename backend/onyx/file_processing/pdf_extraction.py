@@ -0,0 +1,271 @@
+"""
+Page level PDF text / image extraction.
+
+Kept separate from (and much lighter to import than) extract_file_text, since the
+parallel mode imports this module in every worker subprocess. For the same reason,
+configs are passed in by the callers instead of being imported here.
+"""
+
+import io
+import os
+import pickle
+import select
+import subprocess
+import sys
+import time
+from collections import deque
+from collections.abc import Iterator
+from typing import Any
+from typing import cast
+from typing import IO
+from typing import NamedTuple
+
+from PIL import Image
+from pypdf import PageObject
+from pypdf import PdfReader
+
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+
+class PdfPage(NamedTuple):
+    """Text and images extracted from a single PDF page."""
+
+    page_num: int  # 1-based
+    text: str
+    images: list[tuple[bytes, str]]
+    # only possible when extracting in worker processes
+    timed_out: bool = False
+
+
+def extract_pdf_page(
+    page: PageObject, page_num: int, extract_images: bool, max_images: int
+) -> PdfPage:
+    images: list[tuple[bytes, str]] = []
+    if extract_images:
+        for image_file_object in page.images:
+            if len(images) >= max_images:
+                break
+            # the image data is already encoded, opening it only reads the header
+            # to figure out the format, no need to re-encode it
+            image_bytes = image_file_object.data
+            image_format = Image.open(io.BytesIO(image_bytes)).format
+            image_name = (
+                f"page_{page_num}_image_{image_file_object.name}."
+                f"{image_format.lower() if image_format else 'png'}"
+            )
+            images.append((image_bytes, image_name))
+
+    return PdfPage(page_num=page_num, text=page.extract_text(), images=images)
+
+
+def run_page_worker() -> None:
+    """Entry point of the worker subprocesses. Reads the PDF from stdin, answers that
+    it is ready and then extracts the pages it is sent, one at a time."""
+    # results go to the original stdout, anything printed (e.g. logs) to stderr
+    results_out = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    requests_in = sys.stdin.buffer
+
+    pdf_bytes, pdf_pass, extract_images, max_images = pickle.load(requests_in)
+    pdf_reader = PdfReader(io.BytesIO(pdf_bytes))
+    if pdf_reader.is_encrypted and pdf_pass is not None:
+        pdf_reader.decrypt(pdf_pass)
+    pickle.dump(True, results_out)
+    results_out.flush()
+
+    while True:
+        try:
+            page_index = pickle.load(requests_in)
+        except EOFError:
+            return
+
+        result: PdfPage | Exception
+        try:
+            result = extract_pdf_page(
+                pdf_reader.pages[page_index],
+                page_index + 1,
+                extract_images,
+                max_images,
+            )
+        except Exception as e:
+            # not every exception can be pickled
+            result = RuntimeError(f"{type(e).__name__}: {e}")
+        pickle.dump(result, results_out)
+        results_out.flush()
+
+
+_WORKER_COMMAND = (
+    "from onyx.file_processing.pdf_extraction import run_page_worker; "
+    "run_page_worker()"
+)
+
+
+class _PageWorker:
+    """A worker subprocess with at most one page in flight, so the deadline of a page
+    starts when the page does. Started with subprocess rather than multiprocessing,
+    since daemon processes (e.g. the docfetching jobs) can't have multiprocessing
+    children."""
+
+    def __init__(self, init_args: bytes, timeout: float) -> None:
+        self.process = subprocess.Popen(
+            [sys.executable, "-c", _WORKER_COMMAND],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env={
+                **os.environ,
+                "PYTHONPATH": os.pathsep.join(path for path in sys.path if path),
+            },
+        )
+        self._stdin = cast(IO[bytes], self.process.stdin)
+        self._stdout = cast(IO[bytes], self.process.stdout)
+        self.ready = False
+        self.page_index: int | None = None
+        # parsing the PDF must not stall either
+        self.deadline = time.monotonic() + timeout
+        self._stdin.write(init_args)
+        self._stdin.flush()
+
+    @property
+    def busy(self) -> bool:
+        return not self.ready or self.page_index is not None
+
+    def fileno(self) -> int:
+        return self._stdout.fileno()
+
+    def start_page(self, page_index: int, timeout: float) -> None:
+        pickle.dump(page_index, self._stdin)
+        self._stdin.flush()
+        self.page_index = page_index
+        self.deadline = time.monotonic() + timeout
+
+    def read(self) -> Any:
+        try:
+            return pickle.load(self._stdout)
+        except EOFError:
+            raise RuntimeError(
+                f"PDF extraction worker exited with code {self.process.wait()}"
+            )
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.wait()
+        self._stdin.close()
+        self._stdout.close()
+
+
+def _iter_pdf_pages_in_workers(
+    pdf_bytes: bytes,
+    pdf_pass: str | None,
+    num_pages: int,
+    extract_images: bool,
+    max_images: int,
+    num_processes: int,
+    page_timeout: float,
+) -> Iterator[PdfPage]:
+    init_args = pickle.dumps((pdf_bytes, pdf_pass, extract_images, max_images))
+    pending_page_indices = deque(range(num_pages))
+    extracted: dict[int, PdfPage] = {}
+    next_page_index = 0
+
+    workers = [
+        _PageWorker(init_args, page_timeout)
+        for _ in range(min(num_processes, num_pages))
+    ]
+    try:
+        while next_page_index < num_pages:
+            # pages are extracted in any order but yielded in page order
+            if next_page_index in extracted:
+                yield extracted.pop(next_page_index)
+                next_page_index += 1
+                continue
+
+            for worker in workers:
+                if not worker.busy and pending_page_indices:
+                    worker.start_page(pending_page_indices.popleft(), page_timeout)
+
+            busy_workers = [worker for worker in workers if worker.busy]
+            next_deadline = min(worker.deadline for worker in busy_workers)
+            readable, _, _ = select.select(
+                busy_workers, [], [], max(next_deadline - time.monotonic(), 0)
+            )
+            for worker in readable:
+                result = worker.read()
+                if isinstance(result, Exception):
+                    raise result
+                if worker.page_index is None:
+                    worker.ready = True
+                else:
+                    extracted[worker.page_index] = result
+                    worker.page_index = None
+
+            now = time.monotonic()
+            for worker in busy_workers:
+                if worker in readable or worker.deadline > now:
+                    continue
+                if worker.page_index is None:
+                    raise TimeoutError(
+                        f"PDF extraction worker did not start in {page_timeout}s"
+                    )
+
+                logger.warning(
+                    f"Extracting PDF page {worker.page_index + 1} timed out after "
+                    f"{page_timeout}s, skipping it"
+                )
+                extracted[worker.page_index] = PdfPage(
+                    page_num=worker.page_index + 1, text="", images=[], timed_out=True
+                )
+                # the worker is stuck on the page, replace it
+                worker.kill()
+                workers.remove(worker)
+                if pending_page_indices:
+                    workers.append(_PageWorker(init_args, page_timeout))
+    finally:
+        for worker in workers:
+            worker.kill()
+
+
+def iter_pdf_pages(
+    pdf_reader: PdfReader,
+    pdf_pass: str | None = None,
+    extract_images: bool = False,
+    max_images: int = 0,
+    num_processes: int = 1,
+    parallel_min_pages: int = 0,
+    page_timeout: float = 60,
+) -> Iterator[PdfPage]:
+    """Yields the pages of an (already decrypted) PDF in order, as they are extracted.
+
+    Large PDFs are extracted by `num_processes` worker subprocesses, where a page that
+    takes longer than `page_timeout` is skipped instead of stalling the whole
+    extraction. At most `max_images` images are extracted across all pages."""
+    num_pages = len(pdf_reader.pages)
+    use_workers = num_processes > 1 and num_pages >= parallel_min_pages
+
+    if not use_workers:
+        remaining_images = max_images if extract_images else 0
+        for page_index, page in enumerate(pdf_reader.pages):
+            pdf_page = extract_pdf_page(
+                page, page_index + 1, remaining_images > 0, remaining_images
+            )
+            remaining_images -= len(pdf_page.images)
+            yield pdf_page
+        return
+
+    pdf_reader.stream.seek(0)
+    remaining_images = max_images if extract_images else 0
+    for pdf_page in _iter_pdf_pages_in_workers(
+        pdf_bytes=pdf_reader.stream.read(),
+        pdf_pass=pdf_pass,
+        num_pages=num_pages,
+        extract_images=extract_images,
+        max_images=max_images,
+        num_processes=num_processes,
+        page_timeout=page_timeout,
+    ):
+        # each worker can extract up to max_images, drop whatever is over the limit
+        if len(pdf_page.images) > remaining_images:
+            pdf_page = pdf_page._replace(images=pdf_page.images[:remaining_images])
+        remaining_images -= len(pdf_page.images)
+        yield pdf_page
@@ -0,0 +1,425 @@
+import hashlib
+import io
+import mmap
+import os
+import shutil
+import tempfile
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from typing import Any
+from typing import cast
+from typing import IO
+
+import puremagic
+from filelock import FileLock
+from prometheus_client import Counter
+from prometheus_client import Gauge
+from sqlalchemy.orm import Session
+
+from onyx.configs.app_configs import FILE_STORE_DISK_CACHE_MAX_BYTES
+from onyx.configs.app_configs import FILE_STORE_DISK_CACHE_MAX_FILE_BYTES
+from onyx.configs.constants import FileOrigin
+from onyx.db.engine.sql_engine import get_session_with_current_tenant_if_none
+from onyx.db.models import FileRecord
+from onyx.file_store.file_store import FileStore
+from onyx.file_store.file_store import S3BackedFileStore
+from onyx.utils.file import FileWithMimeType
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+_READ_CHUNK_SIZE = 1024 * 1024
+# downloads left behind by killed processes are cleaned up after this long
+_STALE_TMP_FILE_SECONDS = 60 * 60
+# how often each process walks the whole cache even if it isn't over budget, to
+# clean up stale downloads and correct the stored total size
+_FULL_SCAN_INTERVAL_SECONDS = 60 * 60
+
+FILE_STORE_DISK_CACHE_LOOKUPS = Counter(
+    "onyx_file_store_disk_cache_lookups_total",
+    "File store disk cache lookups by result",
+    ["result"],
+)
+FILE_STORE_DISK_CACHE_EVICTIONS = Counter(
+    "onyx_file_store_disk_cache_evictions_total",
+    "Files evicted from the file store disk cache",
+)
+FILE_STORE_DISK_CACHE_BYTES = Gauge(
+    "onyx_file_store_disk_cache_bytes",
+    "Size of the file store disk cache as of the last insert",
+)
+
+
+class _MappedFileReader(io.RawIOBase):
+    """Seekable reader over a memory-mapped file. Reads are served straight from the
+    page cache, and the mapping stays valid even if the file is evicted (unlinked)
+    while it is being read."""
+
+    def __init__(self, file: IO[bytes]) -> None:
+        self._file = file
+        self._size = os.fstat(file.fileno()).st_size
+        # empty files can't be mapped
+        self._map = (
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if self._size else None
+        )
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: int | None = -1) -> bytes:
+        if self._map is None or self._pos >= self._size:
+            return b""
+        end = self._size if size is None or size < 0 else self._pos + size
+        end = min(end, self._size)
+        data = self._map[self._pos : end]
+        self._pos = end
+        return data
+
+    def readall(self) -> bytes:
+        return self.read()
+
+    def readinto(self, buffer: Any) -> int:
+        data = self.read(len(buffer))
+        memoryview(buffer).cast("B")[: len(data)] = data
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if pos < 0:
+            raise ValueError(f"Negative seek position {pos}")
+        self._pos = pos
+        return pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self) -> None:
+        if not self.closed:
+            if self._map is not None:
+                self._map.close()
+            self._file.close()
+        super().close()
+
+
+@dataclass
+class DiskCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class DiskCachedFileStore(FileStore):
+    """Read-through cache of file store blobs on local disk, in front of the S3 file
+    store. Entries are keyed by tenant + file id and versioned by the file record,
+    whose updated_at is bumped on every save. An overwritten file is never served
+    stale: the record lookup is kept, only the S3 download is skipped. Writes through
+    this store invalidate the local entries directly.
+
+    Safe to share one cache directory between processes: entries are downloaded to a
+    temporary file and atomically renamed into place, while inserts, invalidations and
+    LRU eviction (by mtime, bumped on every hit) happen under a file lock. The total
+    size of the entries is kept in a file next to them, so the cache directory is
+    only walked when the cache may be over budget."""
+
+    def __init__(
+        self,
+        file_store: S3BackedFileStore,
+        cache_dir: str,
+        max_bytes: int = FILE_STORE_DISK_CACHE_MAX_BYTES,
+        max_file_bytes: int = FILE_STORE_DISK_CACHE_MAX_FILE_BYTES,
+    ) -> None:
+        self._file_store = file_store
+        self._entries_dir = os.path.join(cache_dir, "entries")
+        self._tmp_dir = os.path.join(cache_dir, "tmp")
+        self._max_bytes = max_bytes
+        self._max_file_bytes = min(max_file_bytes, max_bytes)
+        os.makedirs(self._entries_dir, exist_ok=True)
+        os.makedirs(self._tmp_dir, exist_ok=True)
+        self._lock = FileLock(os.path.join(cache_dir, ".lock"))
+        self._size_path = os.path.join(cache_dir, ".size")
+        self._last_full_scan: float | None = None
+        self.stats = DiskCacheStats()
+
+    def _get_file_dir(self, file_id: str) -> str:
+        key = hashlib.sha256(
+            f"{get_current_tenant_id()}\0{file_id}".encode()
+        ).hexdigest()
+        return os.path.join(self._entries_dir, key[:2], key)
+
+    def _get_entry_path(self, file_record: FileRecord) -> str:
+        version = hashlib.sha256(
+            f"{file_record.bucket_name}/{file_record.object_key}@"
+            f"{file_record.updated_at.isoformat()}".encode()
+        ).hexdigest()
+        return os.path.join(self._get_file_dir(file_record.file_id), version)
+
+    def _open_entry(self, entry_path: str) -> IO[bytes] | None:
+        try:
+            file = open(entry_path, "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            # most recently used entries are evicted last
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return cast(IO[bytes], _MappedFileReader(file))
+
+    def _download_entry(
+        self, file_id: str, entry_path: str, db_session: Session
+    ) -> IO[bytes]:
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp_dir)
+        try:
+            size = 0
+            with os.fdopen(fd, "wb") as tmp_file, closing(
+                self._file_store.read_file_stream(file_id, db_session=db_session)
+            ) as body:
+                while chunk := body.read(_READ_CHUNK_SIZE):
+                    tmp_file.write(chunk)
+                    size += len(chunk)
+
+            # the open file stays readable after being renamed or evicted
+            file = open(tmp_path, "rb")
+            if size <= self._max_file_bytes:
+                try:
+                    self._insert_entry(tmp_path, entry_path, size)
+                except OSError:
+                    logger.exception(f"Failed to add file {file_id} to the disk cache")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return cast(IO[bytes], _MappedFileReader(file))
+
+    def _read_total_bytes_locked(self) -> int | None:
+        try:
+            with open(self._size_path) as size_file:
+                return int(size_file.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_total_bytes_locked(self, total_bytes: int) -> None:
+        with open(self._size_path, "w") as size_file:
+            size_file.write(str(total_bytes))
+        FILE_STORE_DISK_CACHE_BYTES.set(total_bytes)
+
+    def _remove_file_dir_locked(self, file_dir: str) -> int:
+        """Removes all the cached versions of a file, returns the bytes freed"""
+        removed_bytes = 0
+        if not os.path.isdir(file_dir):
+            return removed_bytes
+        for entry in os.scandir(file_dir):
+            try:
+                removed_bytes += entry.stat().st_size
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+        return removed_bytes
+
+    def _insert_entry(self, tmp_path: str, entry_path: str, size: int) -> None:
+        file_dir = os.path.dirname(entry_path)
+        with self._lock:
+            # only the latest version of a file is kept around
+            removed_bytes = self._remove_file_dir_locked(file_dir)
+            os.makedirs(file_dir, exist_ok=True)
+            os.replace(tmp_path, entry_path)
+
+            total_bytes = self._read_total_bytes_locked()
+            if (
+                total_bytes is None
+                or total_bytes - removed_bytes + size > self._max_bytes
+                or self._last_full_scan is None
+                or time.monotonic() - self._last_full_scan > _FULL_SCAN_INTERVAL_SECONDS
+            ):
+                self._evict_locked()
+            else:
+                self._write_total_bytes_locked(total_bytes - removed_bytes + size)
+
+    def _evict_locked(self) -> None:
+        """Walks the whole cache: removes stale downloads, evicts the least recently
+        used entries until the cache fits its budget and stores the total size."""
+        self._last_full_scan = time.monotonic()
+        now = time.time()
+        for entry in os.scandir(self._tmp_dir):
+            try:
+                if now - entry.stat().st_mtime > _STALE_TMP_FILE_SECONDS:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+        entries: list[tuple[float, int, str]] = []
+        for shard in os.scandir(self._entries_dir):
+            for file_dir in os.scandir(shard.path):
+                for entry in os.scandir(file_dir.path):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        if total_bytes > self._max_bytes:
+            entries.sort()
+            for _, size, path in entries:
+                if total_bytes <= self._max_bytes:
+                    break
+                os.remove(path)
+                total_bytes -= size
+                self.stats.evictions += 1
+                FILE_STORE_DISK_CACHE_EVICTIONS.inc()
+                entry_dir = os.path.dirname(path)
+                if not os.listdir(entry_dir):
+                    os.rmdir(entry_dir)
+
+        self._write_total_bytes_locked(total_bytes)
+
+    def _invalidate(self, file_id: str) -> None:
+        file_dir = self._get_file_dir(file_id)
+        if not os.path.isdir(file_dir):
+            return
+        with self._lock:
+            removed_bytes = self._remove_file_dir_locked(file_dir)
+            shutil.rmtree(file_dir, ignore_errors=True)
+            total_bytes = self._read_total_bytes_locked()
+            if total_bytes is not None and removed_bytes:
+                self._write_total_bytes_locked(max(total_bytes - removed_bytes, 0))
+
+    def initialize(self) -> None:
+        self._file_store.initialize()
+
+    def has_file(
+        self,
+        file_id: str,
+        file_origin: FileOrigin,
+        file_type: str,
+        db_session: Session | None = None,
+    ) -> bool:
+        return self._file_store.has_file(
+            file_id, file_origin, file_type, db_session=db_session
+        )
+
+    def save_file(
+        self,
+        content: IO,
+        display_name: str | None,
+        file_origin: FileOrigin,
+        file_type: str,
+        file_metadata: dict[str, Any] | None = None,
+        file_id: str | None = None,
+        db_session: Session | None = None,
+    ) -> str:
+        file_id = self._file_store.save_file(
+            content,
+            display_name,
+            file_origin,
+            file_type,
+            file_metadata=file_metadata,
+            file_id=file_id,
+            db_session=db_session,
+        )
+        self._invalidate(file_id)
+        return file_id
+
+    def read_file(
+        self,
+        file_id: str,
+        mode: str | None = None,
+        use_tempfile: bool = False,
+        db_session: Session | None = None,
+    ) -> IO[bytes]:
+        if use_tempfile:
+            # the caller owns (and may move or delete) the returned temporary file
+            return self._file_store.read_file(
+                file_id, mode=mode, use_tempfile=True, db_session=db_session
+            )
+
+        with get_session_with_current_tenant_if_none(db_session) as db_session:
+            file_record = self._file_store.read_file_record(
+                file_id, db_session=db_session
+            )
+            entry_path = self._get_entry_path(file_record)
+
+            cached = self._open_entry(entry_path)
+            if cached is not None:
+                self.stats.hits += 1
+                FILE_STORE_DISK_CACHE_LOOKUPS.labels(result="hit").inc()
+                return cached
+
+            self.stats.misses += 1
+            FILE_STORE_DISK_CACHE_LOOKUPS.labels(result="miss").inc()
+            try:
+                return self._download_entry(file_id, entry_path, db_session)
+            except OSError:
+                # a full or broken cache disk should never fail the read itself
+                logger.exception(f"Failed to cache file {file_id} on disk")
+                return self._file_store.read_file(
+                    file_id, mode=mode, db_session=db_session
+                )
+
+    def read_file_stream(
+        self, file_id: str, db_session: Session | None = None
+    ) -> IO[bytes]:
+        # streams are used for one-off reads (e.g. indexing batches), so they are
+        # served from the cache when possible but never populate it
+        with get_session_with_current_tenant_if_none(db_session) as db_session:
+            file_record = self._file_store.read_file_record(
+                file_id, db_session=db_session
+            )
+            cached = self._open_entry(self._get_entry_path(file_record))
+            if cached is not None:
+                self.stats.hits += 1
+                FILE_STORE_DISK_CACHE_LOOKUPS.labels(result="hit").inc()
+                return cached
+            return self._file_store.read_file_stream(file_id, db_session=db_session)
+
+    def read_file_record(
+        self, file_id: str, db_session: Session | None = None
+    ) -> FileRecord:
+        return self._file_store.read_file_record(file_id, db_session=db_session)
+
+    def delete_file(self, file_id: str, db_session: Session | None = None) -> None:
+        self._file_store.delete_file(file_id, db_session=db_session)
+        self._invalidate(file_id)
+
+    def get_file_with_mime_type(self, filename: str) -> FileWithMimeType | None:
+        mime_type: str = "application/octet-stream"
+        try:
+            with closing(self.read_file(filename, mode="b")) as file_io:
+                file_content = file_io.read()
+            matches = puremagic.magic_string(file_content)
+            if matches:
+                mime_type = cast(str, matches[0].mime_type)
+            return FileWithMimeType(data=file_content, mime_type=mime_type)
+        except Exception:
+            return None
+
+    def change_file_id(
+        self, old_file_id: str, new_file_id: str, db_session: Session | None = None
+    ) -> None:
+        self._file_store.change_file_id(old_file_id, new_file_id, db_session=db_session)
+        self._invalidate(old_file_id)
+        self._invalidate(new_file_id)
+
+    def list_files_by_prefix(self, prefix: str) -> list[FileRecord]:
+        return self._file_store.list_files_by_prefix(prefix)
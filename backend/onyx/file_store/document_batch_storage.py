@@ -1,18 +1,27 @@
 import json
 from abc import ABC
 from abc import abstractmethod
+from collections.abc import Iterator
+from contextlib import closing
 from enum import Enum
+from io import BytesIO
 from io import StringIO
+from typing import IO
 from typing import List
 from typing import Optional
 from typing import TypeAlias
 
+import msgpack  # type: ignore
+import zstandard
 from pydantic import BaseModel
 
+from onyx.configs.app_configs import DOCUMENT_BATCH_COMPACT_FORMAT_ENABLED
+from onyx.configs.app_configs import DOCUMENT_BATCH_ZSTD_LEVEL
 from onyx.configs.constants import FileOrigin
 from onyx.connectors.models import DocExtractionContext
 from onyx.connectors.models import DocIndexingContext
 from onyx.connectors.models import Document
+from onyx.db.file_record import FileRecordNotFoundError
 from onyx.file_store.file_store import FileStore
 from onyx.file_store.file_store import get_default_file_store
 from onyx.utils.logger import setup_logger
@@ -33,6 +42,87 @@ STATE_TYPE_TO_MODEL: dict[str, type[DocumentStorageState]] = {
 }
 
 
+class DocumentBatchFormat(str, Enum):
+    # pretty printed JSON list of documents, the original format
+    JSON = "json"
+    # zstd compressed stream of msgpack objects: a header followed by one object
+    # per document, so batches can be decoded one document at a time
+    COMPACT = "compact"
+
+
+BATCH_FORMAT_TO_FILE_SUFFIX: dict[DocumentBatchFormat, str] = {
+    DocumentBatchFormat.JSON: ".json",
+    DocumentBatchFormat.COMPACT: ".msgpack.zst",
+}
+BATCH_FORMAT_TO_FILE_TYPE: dict[DocumentBatchFormat, str] = {
+    DocumentBatchFormat.JSON: "application/json",
+    DocumentBatchFormat.COMPACT: "application/zstd",
+}
+
+COMPACT_BATCH_FORMAT_NAME = "onyx-document-batch"
+COMPACT_BATCH_FORMAT_VERSION = 1
+
+
+def get_batch_format_from_file_name(file_name: str) -> DocumentBatchFormat:
+    if file_name.endswith(BATCH_FORMAT_TO_FILE_SUFFIX[DocumentBatchFormat.COMPACT]):
+        return DocumentBatchFormat.COMPACT
+    return DocumentBatchFormat.JSON
+
+
+def encode_compact_document_batch(
+    documents: list[Document], level: int = DOCUMENT_BATCH_ZSTD_LEVEL
+) -> bytes:
+    buffer = BytesIO()
+    packer = msgpack.Packer()
+    compressor = zstandard.ZstdCompressor(level=level)
+    with compressor.stream_writer(buffer, closefd=False) as writer:
+        writer.write(
+            packer.pack(
+                {
+                    "format": COMPACT_BATCH_FORMAT_NAME,
+                    "version": COMPACT_BATCH_FORMAT_VERSION,
+                    "document_count": len(documents),
+                }
+            )
+        )
+        for doc in documents:
+            # mode='json' so datetimes, enums etc. round trip exactly like the JSON format
+            writer.write(packer.pack(doc.model_dump(mode="json")))
+    return buffer.getvalue()
+
+
+def iter_compact_document_batch(content: IO[bytes]) -> Iterator[Document]:
+    """Decodes a compact batch one document at a time, without ever holding the
+    whole decompressed batch in memory."""
+    decompressor = zstandard.ZstdDecompressor()
+    with decompressor.stream_reader(content, closefd=False) as reader:
+        unpacker = msgpack.Unpacker(reader, raw=False)
+        try:
+            header = next(unpacker)
+        except StopIteration:
+            raise ValueError("Empty document batch")
+        if (
+            not isinstance(header, dict)
+            or header.get("format") != COMPACT_BATCH_FORMAT_NAME
+        ):
+            raise ValueError("Not a compact document batch")
+        if header.get("version") != COMPACT_BATCH_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported document batch version: {header.get('version')}"
+            )
+
+        num_documents = 0
+        for doc_dict in unpacker:
+            num_documents += 1
+            yield Document.model_validate(doc_dict)
+
+        if num_documents != header.get("document_count"):
+            raise ValueError(
+                f"Truncated document batch: expected {header.get('document_count')} "
+                f"documents, got {num_documents}"
+            )
+
+
 class BatchStoragePathInfo(BaseModel):
     cc_pair_id: int
     index_attempt_id: int
@@ -93,6 +183,16 @@ class DocumentBatchStorage(ABC):
         doc_dicts = json.loads(data)
         return [Document.model_validate(doc_dict) for doc_dict in doc_dicts]
 
+    def _iter_deserialized_documents(
+        self, content: IO[bytes], batch_format: DocumentBatchFormat
+    ) -> Iterator[Document]:
+        """Deserialize documents stored in either batch format."""
+        if batch_format == DocumentBatchFormat.COMPACT:
+            yield from iter_compact_document_batch(content)
+            return
+
+        yield from self._deserialize_documents(content.read().decode("utf-8"))
+
     def _per_cc_pair_base_path(self) -> str:
         """Get the base path for the cc pair."""
         return f"iab/{self.cc_pair_id}"
@@ -101,27 +201,43 @@ class DocumentBatchStorage(ABC):
 class FileStoreDocumentBatchStorage(DocumentBatchStorage):
     """FileStore-based implementation of document batch storage."""
 
-    def __init__(self, cc_pair_id: int, index_attempt_id: int, file_store: FileStore):
+    def __init__(
+        self,
+        cc_pair_id: int,
+        index_attempt_id: int,
+        file_store: FileStore,
+        compact_format: bool = DOCUMENT_BATCH_COMPACT_FORMAT_ENABLED,
+    ):
         super().__init__(cc_pair_id, index_attempt_id)
         self.file_store = file_store
-
-    def _get_batch_file_name(self, batch_num: int) -> str:
+        # format new batches are written in. Batches in either format can be read
+        self.batch_format = (
+            DocumentBatchFormat.COMPACT if compact_format else DocumentBatchFormat.JSON
+        )
+
+    def _get_batch_file_name(
+        self, batch_num: int, batch_format: DocumentBatchFormat | None = None
+    ) -> str:
         """Generate file name for a document batch."""
-        return f"{self.base_path}/{batch_num}.json"
+        suffix = BATCH_FORMAT_TO_FILE_SUFFIX[batch_format or self.batch_format]
+        return f"{self.base_path}/{batch_num}{suffix}"
 
     def store_batch(self, batch_num: int, documents: list[Document]) -> None:
         """Store a batch of documents using FileStore."""
         file_name = self._get_batch_file_name(batch_num)
         try:
-            data = self._serialize_documents(documents)
-            content = StringIO(data)
+            content: IO
+            if self.batch_format == DocumentBatchFormat.COMPACT:
+                content = BytesIO(encode_compact_document_batch(documents))
+            else:
+                content = StringIO(self._serialize_documents(documents))
 
             self.file_store.save_file(
                 file_id=file_name,
                 content=content,
                 display_name=f"Document Batch {batch_num}",
                 file_origin=FileOrigin.OTHER,
-                file_type="application/json",
+                file_type=BATCH_FORMAT_TO_FILE_TYPE[self.batch_format],
                 file_metadata={
                     "batch_num": batch_num,
                     "document_count": str(len(documents)),
@@ -135,29 +251,55 @@ class FileStoreDocumentBatchStorage(DocumentBatchStorage):
             logger.error(f"Failed to store batch {batch_num}: {e}")
             raise
 
-    def get_batch(self, batch_num: int) -> list[Document] | None:
-        """Retrieve a batch of documents from FileStore."""
-        file_name = self._get_batch_file_name(batch_num)
-        try:
-            # Check if file exists
-            if not self.file_store.has_file(
+    def _batch_formats(self) -> list[DocumentBatchFormat]:
+        # the configured format first, then the other one (e.g. batches written
+        # before an upgrade)
+        return [self.batch_format] + [
+            batch_format
+            for batch_format in DocumentBatchFormat
+            if batch_format != self.batch_format
+        ]
+
+    def _find_batch_file(
+        self, batch_num: int
+    ) -> tuple[str, DocumentBatchFormat] | None:
+        for batch_format in self._batch_formats():
+            file_name = self._get_batch_file_name(batch_num, batch_format)
+            if self.file_store.has_file(
                 file_id=file_name,
                 file_origin=FileOrigin.OTHER,
-                file_type="application/json",
+                file_type=BATCH_FORMAT_TO_FILE_TYPE[batch_format],
             ):
-                logger.warning(
-                    f"Batch {batch_num} not found in FileStore with name {file_name}"
-                )
-                return None
+                return file_name, batch_format
+        return None
 
-            content_io = self.file_store.read_file(file_name)
-            data = content_io.read().decode("utf-8")
+    def get_batch(self, batch_num: int) -> list[Document] | None:
+        """Retrieve a batch of documents from FileStore."""
+        try:
+            # read directly instead of checking which format exists first, the
+            # other format is only tried if the batch is missing
+            for batch_format in self._batch_formats():
+                file_name = self._get_batch_file_name(batch_num, batch_format)
+                try:
+                    content_io = self.file_store.read_file_stream(file_name)
+                except FileRecordNotFoundError:
+                    continue
+
+                # stream the batch straight from the file store into the decoder
+                with closing(content_io):
+                    documents = list(
+                        self._iter_deserialized_documents(content_io, batch_format)
+                    )
+                logger.debug(
+                    f"Retrieved batch {batch_num} with {len(documents)} documents from FileStore"
+                )
+                return documents
 
-            documents = self._deserialize_documents(data)
-            logger.debug(
-                f"Retrieved batch {batch_num} with {len(documents)} documents from FileStore"
+            logger.warning(
+                f"Batch {batch_num} not found in FileStore with name "
+                f"{self._get_batch_file_name(batch_num)}"
             )
-            return documents
+            return None
         except Exception as e:
             logger.error(f"Failed to retrieve batch {batch_num}: {e}")
             raise
@@ -169,7 +311,10 @@ class FileStoreDocumentBatchStorage(DocumentBatchStorage):
 
     def delete_batch_by_num(self, batch_num: int) -> None:
         """Delete a specific batch from FileStore."""
-        batch_file_name = self._get_batch_file_name(batch_num)
+        batch_file = self._find_batch_file(batch_num)
+        batch_file_name = (
+            batch_file[0] if batch_file else self._get_batch_file_name(batch_num)
+        )
         self.delete_batch_by_name(batch_file_name)
         logger.debug(f"Deleted batch num {batch_num} {batch_file_name} from FileStore")
 
@@ -200,7 +345,10 @@ class FileStoreDocumentBatchStorage(DocumentBatchStorage):
                     f"Could not extract path info from batch file: {batch_file_name}"
                 )
                 continue
-            new_batch_file_name = self._get_batch_file_name(path_info.batch_num)
+            # keep the format the batch was written in
+            new_batch_file_name = self._get_batch_file_name(
+                path_info.batch_num, get_batch_format_from_file_name(batch_file_name)
+            )
             self.file_store.change_file_id(batch_file_name, new_batch_file_name)
 
     def extract_path_info(self, path: str) -> BatchStoragePathInfo | None:
@@ -214,7 +362,7 @@ class FileStoreDocumentBatchStorage(DocumentBatchStorage):
             return BatchStoragePathInfo(
                 cc_pair_id=int(cc_pair_id),
                 index_attempt_id=int(index_attempt_id),
-                batch_num=int(batch_num.split(".")[0]),  # remove .json
+                batch_num=int(batch_num.split(".")[0]),  # remove .json / .msgpack.zst
             )
         except Exception as e:
             logger.error(f"Failed to extract path info from {path}: {e}")
@@ -1,25 +1,35 @@
+import io
+import os
 import tempfile
+import threading
 import uuid
 from abc import ABC
 from abc import abstractmethod
 from io import BytesIO
+from io import TextIOBase
 from typing import Any
 from typing import cast
 from typing import IO
 
 import boto3
 import puremagic
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from botocore.exceptions import ClientError
 from mypy_boto3_s3 import S3Client
 from sqlalchemy.orm import Session
 
 from onyx.configs.app_configs import AWS_REGION_NAME
+from onyx.configs.app_configs import FILE_STORE_DISK_CACHE_DIR
 from onyx.configs.app_configs import S3_AWS_ACCESS_KEY_ID
 from onyx.configs.app_configs import S3_AWS_SECRET_ACCESS_KEY
 from onyx.configs.app_configs import S3_ENDPOINT_URL
 from onyx.configs.app_configs import S3_FILE_STORE_BUCKET_NAME
 from onyx.configs.app_configs import S3_FILE_STORE_PREFIX
+from onyx.configs.app_configs import S3_MULTIPART_CHUNK_SIZE_BYTES
+from onyx.configs.app_configs import S3_MULTIPART_MAX_CONCURRENCY
+from onyx.configs.app_configs import S3_MULTIPART_THRESHOLD_BYTES
+from onyx.configs.app_configs import S3_READ_SPOOL_MAX_BYTES
 from onyx.configs.app_configs import S3_VERIFY_SSL
 from onyx.configs.constants import FileOrigin
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
@@ -38,6 +48,75 @@ from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
+_READ_CHUNK_SIZE = 1024 * 1024
+
+
+class _EncodedTextReader(io.RawIOBase):
+    """Reads a text stream as utf-8 bytes, a chunk at a time."""
+
+    def __init__(self, text_stream: IO[str]) -> None:
+        self._text_stream = text_stream
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._pending:
+            text = self._text_stream.read(_READ_CHUNK_SIZE)
+            if not text:
+                return 0
+            self._pending = text.encode("utf-8")
+
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+class _PrefixedReader(io.RawIOBase):
+    """Reads the already consumed prefix of a stream, then the rest of the stream."""
+
+    def __init__(self, prefix: bytes, stream: IO[bytes]) -> None:
+        self._prefix = memoryview(prefix)
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        if self._prefix:
+            size = min(len(buffer), len(self._prefix))
+            buffer[:size] = self._prefix[:size]
+            self._prefix = self._prefix[size:]
+            return size
+
+        data = self._stream.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _read_up_to(stream: IO[bytes], size: int) -> bytes:
+    chunks: list[bytes] = []
+    remaining = size
+    while remaining > 0:
+        chunk = stream.read(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def _as_binary_stream(content: IO | bytes | str) -> IO[bytes]:
+    if isinstance(content, bytes):
+        return BytesIO(content)
+    if isinstance(content, str):
+        return BytesIO(content.encode("utf-8"))
+    if isinstance(content, TextIOBase):
+        return cast(IO[bytes], io.BufferedReader(_EncodedTextReader(content)))
+    return cast(IO[bytes], content)
+
 
 class FileStore(ABC):
     """
@@ -112,6 +191,20 @@ class FileStore(ABC):
             Contents of the file and metadata dict
         """
 
+    @abstractmethod
+    def read_file_stream(
+        self, file_id: str, db_session: Session | None = None
+    ) -> IO[bytes]:
+        """
+        Open the content of a given file as a forward only stream, without reading
+        the whole file first. The stream is not seekable and should be closed by the
+        caller once done with it.
+
+        Parameters:
+        - file_id: Unique ID of file to read
+        - db_session: Session to read the file record with, a new one is used if None
+        """
+
     @abstractmethod
     def read_file_record(self, file_id: str) -> FileStoreModel:
         """
@@ -163,6 +256,10 @@ class S3BackedFileStore(FileStore):
         s3_endpoint_url: str | None = None,
         s3_prefix: str | None = None,
         s3_verify_ssl: bool = True,
+        multipart_threshold: int = S3_MULTIPART_THRESHOLD_BYTES,
+        multipart_chunk_size: int = S3_MULTIPART_CHUNK_SIZE_BYTES,
+        multipart_max_concurrency: int = S3_MULTIPART_MAX_CONCURRENCY,
+        read_spool_max_bytes: int = S3_READ_SPOOL_MAX_BYTES,
     ) -> None:
         self._s3_client: S3Client | None = None
         self._bucket_name = bucket_name
@@ -172,6 +269,14 @@ class S3BackedFileStore(FileStore):
         self._s3_endpoint_url = s3_endpoint_url
         self._s3_prefix = s3_prefix or "onyx-files"
         self._s3_verify_ssl = s3_verify_ssl
+        self._multipart_threshold = multipart_threshold
+        self._transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunk_size,
+            max_concurrency=multipart_max_concurrency,
+            use_threads=multipart_max_concurrency > 1,
+        )
+        self._read_spool_max_bytes = read_spool_max_bytes
 
     def _get_s3_client(self) -> S3Client:
         """Initialize S3 client if not already done"""
@@ -320,21 +425,28 @@ class S3BackedFileStore(FileStore):
         bucket_name = self._get_bucket_name()
         s3_key = self._get_s3_key(file_id)
 
-        # Read content from IO object
-        if hasattr(content, "read"):
-            file_content = content.read()
-            if hasattr(content, "seek"):
-                content.seek(0)  # Reset position for potential re-reads
+        # Small files go up in a single request. Larger files are streamed as a
+        # multipart upload with parallel parts, so at most max_concurrency parts are
+        # held in memory instead of the whole file
+        stream = _as_binary_stream(content)
+        head = _read_up_to(stream, self._multipart_threshold + 1)
+        if len(head) <= self._multipart_threshold:
+            s3_client.put_object(
+                Bucket=bucket_name,
+                Key=s3_key,
+                Body=head,
+                ContentType=file_type,
+            )
         else:
-            file_content = content
-
-        # Upload to S3
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=s3_key,
-            Body=file_content,
-            ContentType=file_type,
-        )
+            s3_client.upload_fileobj(
+                io.BufferedReader(_PrefixedReader(head, stream)),
+                bucket_name,
+                s3_key,
+                ExtraArgs={"ContentType": file_type},
+                Config=self._transfer_config,
+            )
+        if hasattr(content, "seek") and content.seekable():
+            content.seek(0)  # Reset position for potential re-reads
 
         with get_session_with_current_tenant_if_none(db_session) as db_session:
             # Save metadata to database
@@ -373,16 +485,50 @@ class S3BackedFileStore(FileStore):
             logger.error(f"Failed to read file {file_id} from S3")
             raise
 
-        file_content = response["Body"].read()
-
+        # copy the body over in chunks so the whole file is never in memory twice.
+        # Small files stay in memory, large ones spill over to disk
+        file_io: IO[bytes]
         if use_tempfile:
-            # Always open in binary mode for temp files since we're writing bytes
-            temp_file = tempfile.NamedTemporaryFile(mode="w+b", delete=False)
-            temp_file.write(file_content)
-            temp_file.seek(0)
-            return temp_file
+            file_io = tempfile.NamedTemporaryFile(mode="w+b", delete=False)
         else:
-            return BytesIO(file_content)
+            file_io = cast(
+                IO[bytes],
+                tempfile.SpooledTemporaryFile(
+                    max_size=self._read_spool_max_bytes, mode="w+b"
+                ),
+            )
+
+        body = response["Body"]
+        try:
+            for chunk in body.iter_chunks(chunk_size=_READ_CHUNK_SIZE):
+                file_io.write(chunk)
+        except Exception:
+            file_io.close()
+            raise
+        finally:
+            body.close()
+
+        file_io.seek(0)
+        return file_io
+
+    def read_file_stream(
+        self, file_id: str, db_session: Session | None = None
+    ) -> IO[bytes]:
+        with get_session_with_current_tenant_if_none(db_session) as db_session:
+            file_record = get_filerecord_by_file_id(
+                file_id=file_id, db_session=db_session
+            )
+
+        s3_client = self._get_s3_client()
+        try:
+            response = s3_client.get_object(
+                Bucket=file_record.bucket_name, Key=file_record.object_key
+            )
+        except ClientError:
+            logger.error(f"Failed to read file {file_id} from S3")
+            raise
+
+        return cast(IO[bytes], response["Body"])
 
     def read_file_record(
         self, file_id: str, db_session: Session | None = None
@@ -532,6 +678,32 @@ def get_s3_file_store() -> S3BackedFileStore:
     )
 
 
+_disk_cached_file_store: FileStore | None = None
+_disk_cached_file_store_pid: int | None = None
+_disk_cached_file_store_lock = threading.Lock()
+
+
+def _get_disk_cached_file_store(cache_dir: str) -> FileStore:
+    """One disk cached file store per process, so the cache stats accumulate and the
+    cache directory is only set up once. Rebuilt after a fork so the S3 client isn't
+    shared with the parent."""
+    global _disk_cached_file_store, _disk_cached_file_store_pid
+
+    with _disk_cached_file_store_lock:
+        if (
+            _disk_cached_file_store is None
+            or _disk_cached_file_store_pid != os.getpid()
+        ):
+            # avoid circular imports
+            from onyx.file_store.disk_cache import DiskCachedFileStore
+
+            _disk_cached_file_store = DiskCachedFileStore(
+                get_s3_file_store(), cache_dir
+            )
+            _disk_cached_file_store_pid = os.getpid()
+        return _disk_cached_file_store
+
+
 def get_default_file_store() -> FileStore:
     """
     Returns the configured file store implementation.
@@ -556,5 +728,12 @@ def get_default_file_store() -> FileStore:
 
     Other S3-compatible storage (Digital Ocean, Linode, etc.):
     - Same as MinIO, but set appropriate S3_ENDPOINT_URL
+
+    Local read-through disk cache (optional):
+    - FILE_STORE_DISK_CACHE_DIR=<local-directory>
+    - FILE_STORE_DISK_CACHE_MAX_BYTES=<bytes> (optional, defaults to 1 GiB)
     """
+    if FILE_STORE_DISK_CACHE_DIR:
+        return _get_disk_cached_file_store(FILE_STORE_DISK_CACHE_DIR)
+
     return get_s3_file_store()
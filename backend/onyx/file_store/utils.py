@@ -19,6 +19,7 @@ from onyx.server.query_and_chat.chat_utils import mime_type_to_chat_file_type
 from onyx.utils.b64 import get_image_type
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.threadpool_concurrency import ThreadPoolName
 
 logger = setup_logger()
 
@@ -89,7 +90,8 @@ def load_all_chat_files(
             [
                 (load_chat_file, (file,))
                 for file in file_descriptors + file_descriptors_for_history
-            ]
+            ],
+            pool=ThreadPoolName.IO,
         ),
     )
     return files
@@ -181,7 +183,8 @@ def load_in_memory_chat_files(
         list[InMemoryChatFile],
         run_functions_tuples_in_parallel(
             # 1. Load files specified by individual IDs
-            [(load_user_file, (file_id, db_session)) for file_id in user_file_ids]
+            [(load_user_file, (file_id, db_session)) for file_id in user_file_ids],
+            pool=ThreadPoolName.IO,
         )
         # 2. Load all files within specified folders
         + [
@@ -327,7 +330,7 @@ def save_files(urls: list[str], base64_files: list[str]) -> list[str]:
         (save_file, (None, base64_file)) for base64_file in base64_files
     ]
 
-    return run_functions_tuples_in_parallel(funcs)
+    return run_functions_tuples_in_parallel(funcs, pool=ThreadPoolName.IO)
 
 
 def load_all_persona_files_for_chat(
@@ -349,7 +352,9 @@ def load_all_persona_files_for_chat(
     persona_file_calls = [
         (load_user_file, (user_file.id, db_session)) for user_file in persona.user_files
     ]
-    persona_loaded_files = run_functions_tuples_in_parallel(persona_file_calls)
+    persona_loaded_files = run_functions_tuples_in_parallel(
+        persona_file_calls, pool=ThreadPoolName.IO
+    )
 
     persona_folder_files = []
     persona_folder_file_ids = []
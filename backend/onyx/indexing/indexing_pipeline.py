@@ -1,3 +1,4 @@
+from collections import Counter
 from collections import defaultdict
 from collections.abc import Callable
 from typing import Protocol
@@ -10,6 +11,7 @@ from onyx.access.access import get_access_for_documents
 from onyx.access.models import DocumentAccess
 from onyx.configs.app_configs import DEFAULT_CONTEXTUAL_RAG_LLM_NAME
 from onyx.configs.app_configs import DEFAULT_CONTEXTUAL_RAG_LLM_PROVIDER
+from onyx.configs.app_configs import DISABLE_GENERATIVE_AI
 from onyx.configs.app_configs import ENABLE_CONTEXTUAL_RAG
 from onyx.configs.app_configs import MAX_DOCUMENT_CHARS
 from onyx.configs.app_configs import MAX_TOKENS_FOR_FULL_INCLUSION
@@ -41,6 +43,7 @@ from onyx.db.document import update_docs_updated_at__no_commit
 from onyx.db.document import upsert_document_by_connector_credential_pair
 from onyx.db.document import upsert_documents
 from onyx.db.document_set import fetch_document_sets_for_documents
+from onyx.db.llm import fetch_default_provider
 from onyx.db.models import Document as DBDocument
 from onyx.db.models import IndexModelStatus
 from onyx.db.search_settings import get_active_search_settings
@@ -76,6 +79,8 @@ from onyx.natural_language_processing.search_nlp_models import (
     InformationContentClassificationModel,
 )
 from onyx.natural_language_processing.utils import BaseTokenizer
+from onyx.natural_language_processing.utils import get_llm_token_count_tokenizers
+from onyx.natural_language_processing.utils import get_llm_token_counts
 from onyx.natural_language_processing.utils import get_tokenizer
 from onyx.natural_language_processing.utils import tokenizer_trim_middle
 from onyx.prompts.chat_prompts import CONTEXTUAL_RAG_PROMPT1
@@ -83,6 +88,7 @@ from onyx.prompts.chat_prompts import CONTEXTUAL_RAG_PROMPT2
 from onyx.prompts.chat_prompts import DOCUMENT_SUMMARY_PROMPT
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.threadpool_concurrency import ThreadPoolName
 from onyx.utils.timing import log_function_time
 from shared_configs.configs import (
     INDEXING_INFORMATION_CONTENT_CLASSIFICATION_CUTOFF_LENGTH,
@@ -627,7 +633,7 @@ def add_chunk_summaries(
             chunk.chunk_context = ""
 
     run_functions_tuples_in_parallel(
-        [(assign_context, (chunk,)) for chunk in chunks_by_doc]
+        [(assign_context, (chunk,)) for chunk in chunks_by_doc], pool=ThreadPoolName.LLM
     )
 
 
@@ -673,6 +679,21 @@ def add_contextual_summaries(
     return chunks
 
 
+def _get_default_llm_tokenizer(db_session: Session) -> BaseTokenizer | None:
+    if DISABLE_GENERATIVE_AI:
+        return None
+
+    llm_provider = fetch_default_provider(db_session)
+    if not llm_provider:
+        return None
+
+    # tiktoken for OpenAI models, the default tokenizer for the other providers
+    return get_tokenizer(
+        model_name=llm_provider.default_model_name,
+        provider_type=llm_provider.provider,
+    )
+
+
 @log_function_time(debug_only=True)
 def index_doc_batch(
     *,
@@ -766,6 +787,16 @@ def index_doc_batch(
             chunk_token_limit=chunker.chunk_token_limit * 2,
         )
 
+    # so that chat doesn't have to tokenize the retrieved chunks on every turn
+    token_count_tokenizers = get_llm_token_count_tokenizers(
+        _get_default_llm_tokenizer(db_session)
+    )
+    if token_count_tokenizers:
+        for chunk in chunks:
+            chunk.llm_token_counts = get_llm_token_counts(
+                chunk.content, token_count_tokenizers
+            )
+
     logger.debug("Starting embedding")
     chunks_with_embeddings, embedding_failures = (
         embed_chunks_with_failure_handling(
@@ -827,14 +858,11 @@ def index_doc_batch(
             )
         }
 
+        chunk_cnt_by_doc_id = Counter(
+            chunk.source_document.id for chunk in chunks_with_embeddings
+        )
         doc_id_to_new_chunk_cnt: dict[str, int] = {
-            document_id: len(
-                [
-                    chunk
-                    for chunk in chunks_with_embeddings
-                    if chunk.source_document.id == document_id
-                ]
-            )
+            document_id: chunk_cnt_by_doc_id[document_id]
             for document_id in updatable_ids
         }
 
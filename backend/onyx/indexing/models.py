@@ -64,6 +64,10 @@ class DocAwareChunk(BaseChunk):
 
     large_chunk_reference_ids: list[int] = Field(default_factory=list)
 
+    # Number of tokens of the content for the common LLM tokenizers, by
+    # BaseTokenizer.token_count_key
+    llm_token_counts: dict[str, int] = Field(default_factory=dict)
+
     def to_short_descriptor(self) -> str:
         """Used when logging the identity of a chunk"""
         return f"{self.source_document.to_short_descriptor()} Chunk ID: {self.chunk_id}"
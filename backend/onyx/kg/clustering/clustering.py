@@ -1,29 +1,46 @@
 import time
+import uuid
+from collections import defaultdict
 from collections.abc import Generator
+from datetime import datetime
 from typing import cast
 
+import numpy as np
+from rapidfuzz import process
 from rapidfuzz.fuzz import ratio
 from redis.lock import Lock as RedisLock
+from sqlalchemy import and_
+from sqlalchemy import Boolean
 from sqlalchemy import func
+from sqlalchemy import literal
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy import String
 from sqlalchemy import text
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
 
 from onyx.background.celery.tasks.kg_processing.utils import extend_lock
 from onyx.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
+from onyx.configs.kg_configs import KG_CLUSTERING_PAGE_SIZE
 from onyx.configs.kg_configs import KG_CLUSTERING_RETRIEVE_THRESHOLD
 from onyx.configs.kg_configs import KG_CLUSTERING_THRESHOLD
+from onyx.db.document import update_documents_kg_info
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.entities import KGEntity
 from onyx.db.entities import KGEntityExtractionStaging
-from onyx.db.entities import merge_entities
-from onyx.db.entities import transfer_entity
+from onyx.db.entities import set_staging_entities_transferred
+from onyx.db.entities import update_entities
+from onyx.db.entities import upsert_entities
 from onyx.db.kg_config import get_kg_config_settings
 from onyx.db.kg_config import validate_kg_settings
 from onyx.db.models import Document
 from onyx.db.models import KGEntityType
 from onyx.db.models import KGRelationshipExtractionStaging
 from onyx.db.models import KGRelationshipTypeExtractionStaging
-from onyx.db.relationships import transfer_relationship
 from onyx.db.relationships import transfer_relationship_type
+from onyx.db.relationships import transfer_relationships
 from onyx.db.relationships import upsert_relationship
 from onyx.db.relationships import upsert_relationship_type
 from onyx.document_index.vespa.kg_interactions import (
@@ -31,6 +48,8 @@ from onyx.document_index.vespa.kg_interactions import (
 )
 from onyx.document_index.vespa.kg_interactions import update_kg_chunks_vespa_info
 from onyx.kg.models import KGGroundingType
+from onyx.kg.models import KGStage
+from onyx.kg.utils.formatting_utils import make_entity_id
 from onyx.kg.utils.formatting_utils import make_relationship_id
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
@@ -144,151 +163,559 @@ def _get_batch_kg_processed_documents(
             offset += batch_size
 
 
-def _cluster_one_grounded_entity(
-    entity: KGEntityExtractionStaging,
-) -> tuple[KGEntity, bool]:
+def _has_digits(name: str) -> bool:
+    return any(map(str.isdigit, name))
+
+
+class _EntityCluster:
+    """A normalized entity and the staging entities of the page merged into it.
+
+    Merges are applied to the values here (same as merge_entities used to do for
+    each staging entity), and written to the db once for the whole page."""
+
+    def __init__(
+        self,
+        id_name: str,
+        name: str,
+        entity_type_id_name: str,
+        document_id: str | None,
+        alternative_names: list[str] | None,
+        occurrences: int,
+        attributes: dict,
+        entity_key: str | None,
+        parent_key: str | None,
+        event_time: datetime | None,
+        is_new: bool,
+    ) -> None:
+        self.id_name = id_name
+        self.name = name
+        self.entity_type_id_name = entity_type_id_name
+        self.document_id = document_id
+        # the document_id the entity is inserted with, see _write_entity_clusters
+        self.initial_document_id = document_id
+        self.alternative_names = set(alternative_names or [])
+        self.occurrences = occurrences
+        self.attributes = attributes
+        self.entity_key = entity_key
+        self.parent_key = parent_key
+        self.event_time = event_time
+        self.is_new = is_new
+        self.staging_id_names: list[str] = []
+        self.normalized_document_ids: set[str] = set()
+
+    @classmethod
+    def from_entity(cls, entity: KGEntity) -> "_EntityCluster":
+        return cls(
+            id_name=entity.id_name,
+            name=entity.name,
+            entity_type_id_name=entity.entity_type_id_name,
+            document_id=entity.document_id,
+            alternative_names=entity.alternative_names,
+            occurrences=entity.occurrences,
+            attributes=entity.attributes,
+            entity_key=entity.entity_key,
+            parent_key=entity.parent_key,
+            event_time=entity.event_time,
+            is_new=False,
+        )
+
+    @classmethod
+    def from_staging_entity(cls, entity: KGEntityExtractionStaging) -> "_EntityCluster":
+        cluster = cls(
+            id_name=make_entity_id(entity.entity_type_id_name, uuid.uuid4().hex[:20]),
+            name=entity.name.casefold(),
+            entity_type_id_name=entity.entity_type_id_name,
+            document_id=entity.document_id,
+            alternative_names=entity.alternative_names,
+            occurrences=entity.occurrences,
+            attributes=entity.attributes,
+            entity_key=entity.entity_key,
+            parent_key=entity.parent_key,
+            event_time=entity.event_time,
+            is_new=True,
+        )
+        cluster.staging_id_names.append(entity.id_name)
+        if entity.document_id is not None:
+            cluster.normalized_document_ids.add(entity.document_id)
+        return cluster
+
+    def merge(self, child: KGEntityExtractionStaging) -> None:
+        # only the parent's document_id, alternative_names, occurrences, attributes
+        # and keys are updated
+        if self.document_id is None and child.document_id is not None:
+            self.document_id = child.document_id
+            self.normalized_document_ids.add(child.document_id)
+        self.alternative_names.update(child.alternative_names or [])
+        self.alternative_names.add(child.name.lower())
+        self.alternative_names.discard(self.name)
+        self.occurrences += child.occurrences
+        self.attributes = self.attributes | child.attributes
+        self.entity_key = self.entity_key or child.entity_key
+        self.parent_key = self.parent_key or child.parent_key
+        self.staging_id_names.append(child.id_name)
+
+
+def _get_grounded_entity_names(
+    db_session: Session, entities: list[KGEntityExtractionStaging]
+) -> list[str]:
+    """The names the entities are clustered by: the document's semantic id for the
+    entities of a document, else the entity name."""
+    document_names: dict[str, str] = {
+        document_id: semantic_id
+        for document_id, semantic_id in db_session.query(
+            Document.id, Document.semantic_id
+        ).filter(
+            Document.id.in_(
+                {
+                    entity.document_id
+                    for entity in entities
+                    if entity.document_id is not None
+                }
+            )
+        )
+    }
+    return [
+        (
+            document_names.get(entity.document_id, entity.name)
+            if entity.document_id is not None
+            else entity.name
+        ).lower()
+        for entity in entities
+    ]
+
+
+def _get_similar_entities(
+    db_session: Session,
+    entity_type: str,
+    entities: list[KGEntityExtractionStaging],
+    entity_names: list[str],
+) -> list[list[KGEntity]]:
+    """Finds the existing entities of the type with a name similar to each entity
+    name (pg_trgm.similarity_threshold must be set), with a single query."""
+    similar_entities: list[list[KGEntity]] = [[] for _ in entities]
+
+    # skip those with numbers so we don't cluster version1 and version2, etc.
+    query_inds = [
+        ind
+        for ind, entity_name in enumerate(entity_names)
+        if not _has_digits(entity_name)
+    ]
+    if not query_inds:
+        return similar_entities
+
+    query_names = (
+        func.unnest(
+            literal([entity_names[ind] for ind in query_inds], ARRAY(String)),
+            literal(
+                [entities[ind].document_id is not None for ind in query_inds],
+                ARRAY(Boolean),
+            ),
+        )
+        .table_valued("name", "has_document", with_ordinality="ind")
+        .render_derived(name="query_names")
+    )
+    # find similar entities, uses GIN index, very efficient
+    rows = db_session.execute(
+        select(query_names.c.ind, KGEntity)
+        .select_from(query_names)
+        .join(
+            KGEntity,
+            and_(
+                # find entities of the same type with a similar name
+                KGEntity.entity_type_id_name == entity_type,
+                # entities of a document can only be merged into ones without
+                or_(
+                    query_names.c.has_document.is_(False),
+                    KGEntity.document_id.is_(None),
+                ),
+                getattr(func, POSTGRES_DEFAULT_SCHEMA).similarity_op(
+                    KGEntity.name, query_names.c.name
+                ),
+            ),
+        )
+    ).all()
+    for ordinality, similar_entity in rows:
+        similar_entities[query_inds[ordinality - 1]].append(similar_entity)
+
+    return similar_entities
+
+
+def _get_previous_similar_names(
+    names: list[str], score_cutoff: float
+) -> list[list[tuple[int, float]]]:
+    """For each name, the previous names with a ratio of at least score_cutoff, and
+    their score.
+
+    As ratio = 200 * matches / (len1 + len2), a ratio of at least score_cutoff is only
+    possible for names of similar lengths, so only those are compared."""
+    inds_by_length: dict[int, list[int]] = defaultdict(list)
+    for ind, name in enumerate(names):
+        inds_by_length[len(name)].append(ind)
+
+    similar_names: list[list[tuple[int, float]]] = [[] for _ in names]
+    for length, inds in inds_by_length.items():
+        if 0 < score_cutoff < 200:
+            # widened by one in case of rounding errors
+            min_length = int(length * score_cutoff / (200 - score_cutoff)) - 1
+            max_length = int(length * (200 - score_cutoff) / score_cutoff) + 1
+        else:
+            min_length, max_length = 0, max(inds_by_length)
+        other_inds = [
+            other_ind
+            for other_length in range(min_length, max_length + 1)
+            for other_ind in inds_by_length.get(other_length, [])
+        ]
+        scores = process.cdist(
+            [names[ind] for ind in inds],
+            [names[other_ind] for other_ind in other_inds],
+            scorer=ratio,
+            score_cutoff=score_cutoff,
+            dtype=np.float64,
+        )
+        for row, col in zip(*np.nonzero(scores)):
+            ind, other_ind = inds[row], other_inds[col]
+            if other_ind < ind:
+                similar_names[ind].append((other_ind, float(scores[row, col])))
+
+    return similar_names
+
+
+def _cluster_entities_of_type(
+    entities: list[KGEntityExtractionStaging],
+    entity_names: list[str],
+    similar_entities: list[list[KGEntity]],
+    existing_clusters: dict[str, _EntityCluster],
+) -> list[_EntityCluster]:
     """
-    Cluster a single grounded entity.
+    Clusters staged entities of the same type, in order: each entity is merged into
+    the most similar entity (an existing one, or one created by a previous entity of
+    the page) if similar enough, else a new entity is created for it.
+
+    The similarities are computed in bulk, for all the entities against all their
+    candidates and the previous entities of similar length. Returns the new entities; the existing entities that get merges are
+    added to existing_clusters (by id_name).
     """
-    with get_session_with_current_tenant() as db_session:
-        # get entity name and filtering conditions
-        if entity.document_id is not None:
-            entity_name = cast(
-                str,
-                db_session.query(Document.semantic_id)
-                .filter(Document.id == entity.document_id)
-                .scalar(),
-            ).lower()
-            filtering = [KGEntity.document_id.is_(None)]
+    score_cutoff = KG_CLUSTERING_THRESHOLD * 100
+
+    # skip those with numbers so we don't cluster version1 and version2, etc.
+    clusterable = [not _has_digits(entity_name) for entity_name in entity_names]
+
+    # score each entity against its candidates, all pairs at once
+    pair_inds: list[int] = []
+    pair_candidates: list[KGEntity] = []
+    for ind, entity_similar_entities in enumerate(similar_entities):
+        if clusterable[ind]:
+            pair_inds.extend([ind] * len(entity_similar_entities))
+            pair_candidates.extend(entity_similar_entities)
+    pair_scores = process.cpdist(
+        [entity_names[ind] for ind in pair_inds],
+        [candidate.name for candidate in pair_candidates],
+        scorer=ratio,
+        score_cutoff=score_cutoff,
+        dtype=np.float64,
+    )
+    # scores below the cutoff are 0
+    candidate_scores: list[list[tuple[KGEntity, float]]] = [[] for _ in entities]
+    for pair_ind in np.flatnonzero(pair_scores).tolist():
+        candidate = pair_candidates[pair_ind]
+        if not _has_digits(candidate.name):
+            candidate_scores[pair_inds[pair_ind]].append(
+                (candidate, float(pair_scores[pair_ind]))
+            )
+
+    # the entities created for the previous entities of the page are candidates too.
+    # Their name is the entity name (or the document's semantic id, set by trigger)
+    previous_entity_scores = _get_previous_similar_names(entity_names, score_cutoff)
+
+    new_clusters: list[_EntityCluster] = []
+    new_clusters_by_ind: dict[int, _EntityCluster] = {}
+    new_clusters_by_document_id: dict[str, _EntityCluster] = {}
+    for ind, (entity, entity_name) in enumerate(zip(entities, entity_names)):
+        best_score = -1.0
+        best_cluster: _EntityCluster | None = None
+        if clusterable[ind]:
+            best_candidate: KGEntity | None = None
+            for candidate, score in candidate_scores[ind]:
+                cluster = existing_clusters.get(candidate.id_name)
+                if (
+                    entity.document_id is not None
+                    and cluster is not None
+                    and cluster.document_id is not None
+                ):
+                    continue
+                if score > best_score:
+                    best_score = score
+                    best_candidate = candidate
+            if best_candidate is not None:
+                best_cluster = existing_clusters.get(
+                    best_candidate.id_name
+                ) or _EntityCluster.from_entity(best_candidate)
+
+            for previous_ind, score in previous_entity_scores[ind]:
+                cluster = new_clusters_by_ind.get(previous_ind)
+                if cluster is None or not clusterable[previous_ind]:
+                    continue
+                if entity.document_id is not None and cluster.document_id is not None:
+                    continue
+                if score > best_score:
+                    best_score = score
+                    best_cluster = cluster
+
+        if best_cluster is None and entity.document_id is not None:
+            # would be the same name, type and document as a previous entity, which
+            # is added to on insert anyway
+            best_cluster = new_clusters_by_document_id.get(entity.document_id)
+
+        # if there is a match, update the entity, otherwise create a new one
+        if best_cluster is not None:
+            logger.debug(f"Merged {entity.name} with {best_cluster.name}")
+            best_cluster.merge(entity)
+            if not best_cluster.is_new:
+                existing_clusters[best_cluster.id_name] = best_cluster
         else:
-            entity_name = entity.name.lower()
-            filtering = []
+            cluster = _EntityCluster.from_staging_entity(entity)
+            new_clusters.append(cluster)
+            new_clusters_by_ind[ind] = cluster
+            if entity.document_id is not None:
+                new_clusters_by_document_id[entity.document_id] = cluster
 
-        # skip those with numbers so we don't cluster version1 and version2, etc.
-        similar_entities: list[KGEntity] = []
-        if not any(char.isdigit() for char in entity_name):
-            # find similar entities, uses GIN index, very efficient
-            db_session.execute(
-                text(
-                    "SET pg_trgm.similarity_threshold = "
-                    + str(KG_CLUSTERING_RETRIEVE_THRESHOLD)
-                )
+    return new_clusters
+
+
+def _write_entity_clusters(
+    db_session: Session,
+    existing_clusters: list[_EntityCluster],
+    new_clusters: list[_EntityCluster],
+) -> None:
+    # update the existing entities first, the inserts add to them on conflict
+    update_entities(
+        db_session,
+        [
+            dict(
+                id_name=cluster.id_name,
+                document_id=cluster.document_id,
+                alternative_names=list(cluster.alternative_names),
+                occurrences=cluster.occurrences,
+                attributes=cluster.attributes,
+                entity_key=cluster.entity_key,
+                parent_key=cluster.parent_key,
             )
-            similar_entities = (
-                db_session.query(KGEntity)
-                .filter(
-                    # find entities of the same type with a similar name
-                    *filtering,
-                    KGEntity.entity_type_id_name == entity.entity_type_id_name,
-                    getattr(func, POSTGRES_DEFAULT_SCHEMA).similarity_op(
-                        KGEntity.name, entity_name
-                    ),
-                )
-                .all()
+            for cluster in existing_clusters
+        ],
+    )
+
+    # the name of an entity inserted with a document_id is set to the document's
+    # semantic id by trigger, so a document_id set by a merge is updated afterwards
+    upserted_entities = upsert_entities(
+        db_session,
+        [
+            dict(
+                id_name=cluster.id_name,
+                name=cluster.name,
+                entity_key=cluster.entity_key,
+                parent_key=cluster.parent_key,
+                alternative_names=list(cluster.alternative_names),
+                entity_type_id_name=cluster.entity_type_id_name,
+                document_id=cluster.initial_document_id,
+                occurrences=cluster.occurrences,
+                attributes=cluster.attributes,
+                event_time=cluster.event_time,
             )
+            for cluster in new_clusters
+        ],
+    )
+    # entities with a document_id may have been added to an existing entity
+    upserted_id_names = {
+        (entity.entity_type_id_name, entity.document_id): entity.id_name
+        for entity in upserted_entities
+        if entity.document_id is not None
+    }
+    for cluster in new_clusters:
+        if cluster.initial_document_id is not None:
+            cluster.id_name = upserted_id_names[
+                (cluster.entity_type_id_name, cluster.initial_document_id)
+            ]
+    update_entities(
+        db_session,
+        [
+            dict(id_name=cluster.id_name, document_id=cluster.document_id)
+            for cluster in new_clusters
+            if cluster.document_id != cluster.initial_document_id
+        ],
+    )
+
+    set_staging_entities_transferred(
+        db_session,
+        {
+            staging_id_name: cluster.id_name
+            for cluster in existing_clusters + new_clusters
+            for staging_id_name in cluster.staging_id_names
+        },
+    )
+    update_documents_kg_info(
+        db_session,
+        document_ids={
+            document_id
+            for cluster in existing_clusters + new_clusters
+            for document_id in cluster.normalized_document_ids
+        },
+        kg_stage=KGStage.NORMALIZED,
+    )
 
-    # find best match
-    best_score = -1.0
-    best_entity = None
-    for similar in similar_entities:
-        # skip those with numbers so we don't cluster version1 and version2, etc.
-        if any(char.isdigit() for char in similar.name):
-            continue
-        score = ratio(similar.name, entity_name)
-        if score >= KG_CLUSTERING_THRESHOLD * 100 and score > best_score:
-            best_score = score
-            best_entity = similar
-
-    # if there is a match, update the entity, otherwise create a new one
+
+def _cluster_grounded_entities(entities: list[KGEntityExtractionStaging]) -> None:
+    """
+    Cluster a page of grounded entities and transfer them, in a single transaction.
+    """
     with get_session_with_current_tenant() as db_session:
-        if best_entity:
-            logger.debug(f"Merged {entity.name} with {best_entity.name}")
-            update_vespa = (
-                best_entity.document_id is None and entity.document_id is not None
+        entity_names = _get_grounded_entity_names(db_session, entities)
+        db_session.execute(
+            text(
+                "SET pg_trgm.similarity_threshold = "
+                + str(KG_CLUSTERING_RETRIEVE_THRESHOLD)
             )
-            transferred_entity = merge_entities(
-                db_session=db_session, parent=best_entity, child=entity
+        )
+
+        entity_inds_by_type: dict[str, list[int]] = defaultdict(list)
+        for ind, entity in enumerate(entities):
+            entity_inds_by_type[entity.entity_type_id_name].append(ind)
+
+        existing_clusters: dict[str, _EntityCluster] = {}
+        new_clusters: list[_EntityCluster] = []
+        for entity_type, entity_inds in entity_inds_by_type.items():
+            type_entities = [entities[ind] for ind in entity_inds]
+            type_entity_names = [entity_names[ind] for ind in entity_inds]
+            similar_entities = _get_similar_entities(
+                db_session, entity_type, type_entities, type_entity_names
+            )
+            new_clusters.extend(
+                _cluster_entities_of_type(
+                    type_entities,
+                    type_entity_names,
+                    similar_entities,
+                    existing_clusters,
+                )
             )
-        else:
-            update_vespa = entity.document_id is not None
-            transferred_entity = transfer_entity(db_session=db_session, entity=entity)
 
+        _write_entity_clusters(
+            db_session, list(existing_clusters.values()), new_clusters
+        )
         db_session.commit()
 
-    return transferred_entity, update_vespa
 
-
-def _create_one_parent_child_relationship(entity: KGEntityExtractionStaging) -> None:
+def _create_parent_child_relationships(
+    entities: list[KGEntityExtractionStaging],
+) -> None:
     """
-    Creates a relationship between the entity and its parent, if it exists.
-    Then, updates the entity's parent to the next ancestor.
+    Creates a relationship between each entity and its parent, if it exists.
+    Then, updates the entities' parent to the next ancestor.
     """
     with get_session_with_current_tenant() as db_session:
-        # find the next ancestor
-        parent = (
-            db_session.query(KGEntity)
-            .filter(KGEntity.entity_key == entity.parent_key)
-            .first()
-        )
-
-        if parent is not None:
-            # create parent child relationship and relationship type
+        # find the next ancestors
+        parents: dict[str, KGEntity] = {}
+        for ancestor in db_session.query(KGEntity).filter(
+            KGEntity.entity_key.in_({entity.parent_key for entity in entities})
+        ):
+            parents.setdefault(ancestor.entity_key, ancestor)
+
+        relationship_type_counts: dict[tuple[str, str], int] = defaultdict(int)
+        relationship_counts: dict[tuple[str, str | None], int] = defaultdict(int)
+        next_ancestors: dict[str, str] = {}
+        for entity in entities:
+            parent = parents.get(cast(str, entity.parent_key))
+            if parent is not None:
+                relationship_type_counts[
+                    (parent.entity_type_id_name, entity.entity_type_id_name)
+                ] += 1
+                relationship_id_name = make_relationship_id(
+                    parent.id_name,
+                    "has_subcomponent",
+                    cast(str, entity.transferred_id_name),
+                )
+                relationship_counts[(relationship_id_name, entity.document_id)] += 1
+                next_ancestor = parent.parent_key or ""
+            else:
+                next_ancestor = ""
+            next_ancestors[entity.id_name] = next_ancestor
+
+        # create parent child relationships and relationship types
+        for (
+            source_entity_type,
+            target_entity_type,
+        ), count in relationship_type_counts.items():
             upsert_relationship_type(
                 db_session=db_session,
-                source_entity_type=parent.entity_type_id_name,
+                source_entity_type=source_entity_type,
                 relationship_type="has_subcomponent",
-                target_entity_type=entity.entity_type_id_name,
-            )
-            relationship_id_name = make_relationship_id(
-                parent.id_name,
-                "has_subcomponent",
-                cast(str, entity.transferred_id_name),
+                target_entity_type=target_entity_type,
+                extraction_count=count,
             )
+        for (
+            relationship_id_name,
+            source_document_id,
+        ), count in relationship_counts.items():
             upsert_relationship(
                 db_session=db_session,
                 relationship_id_name=relationship_id_name,
-                source_document_id=entity.document_id,
+                source_document_id=source_document_id,
+                occurrences=count,
             )
 
-            next_ancestor = parent.parent_key or ""
-        else:
-            next_ancestor = ""
-
-        # set the staging entity's parent to the next ancestor
+        # set the staging entities' parent to the next ancestor
         # if there is no parent or next ancestor, set to "" to differentiate from None
         # None will mess up the pagination in _get_batch_entities_with_parent
-        db_session.query(KGEntityExtractionStaging).filter(
-            KGEntityExtractionStaging.id_name == entity.id_name
-        ).update({"parent_key": next_ancestor})
+        if next_ancestors:
+            db_session.execute(
+                update(KGEntityExtractionStaging),
+                [
+                    {"id_name": id_name, "parent_key": next_ancestor}
+                    for id_name, next_ancestor in next_ancestors.items()
+                ],
+            )
         db_session.commit()
 
 
-def _transfer_one_relationship(
-    relationship: KGRelationshipExtractionStaging,
+def _transfer_relationships(
+    relationships: list[KGRelationshipExtractionStaging],
 ) -> None:
     with get_session_with_current_tenant() as db_session:
         # get the translations
-        staging_entity_id_names = {
-            relationship.source_node,
-            relationship.target_node,
-        }
         entity_translations: dict[str, str] = {
-            entity.id_name: entity.transferred_id_name
-            for entity in db_session.query(KGEntityExtractionStaging)
-            .filter(KGEntityExtractionStaging.id_name.in_(staging_entity_id_names))
+            id_name: transferred_id_name
+            for id_name, transferred_id_name in db_session.query(
+                KGEntityExtractionStaging.id_name,
+                KGEntityExtractionStaging.transferred_id_name,
+            )
+            .filter(
+                KGEntityExtractionStaging.id_name.in_(
+                    {
+                        node
+                        for relationship in relationships
+                        for node in (relationship.source_node, relationship.target_node)
+                    }
+                )
+            )
             .all()
-            if entity.transferred_id_name is not None
+            if transferred_id_name is not None
         }
-        if len(entity_translations) != len(staging_entity_id_names):
-            logger.error(
-                f"Missing entity translations for {staging_entity_id_names - entity_translations.keys()}"
-            )
-            return
 
-        # transfer the relationship
-        transfer_relationship(
+        transferable_relationships: list[KGRelationshipExtractionStaging] = []
+        for relationship in relationships:
+            staging_entity_id_names = {
+                relationship.source_node,
+                relationship.target_node,
+            }
+            if not staging_entity_id_names <= entity_translations.keys():
+                logger.error(
+                    f"Missing entity translations for {staging_entity_id_names - entity_translations.keys()}"
+                )
+                continue
+            transferable_relationships.append(relationship)
+
+        # transfer the relationships
+        transfer_relationships(
             db_session=db_session,
-            relationship=relationship,
+            relationships=transferable_relationships,
             entity_translations=entity_translations,
         )
         db_session.commit()
@@ -319,16 +746,13 @@ def kg_clustering(
 
     last_lock_time = time.monotonic()
 
-    # Cluster and transfer grounded entities sequentially
+    # Cluster and transfer grounded entities, a page at a time
     start_time = time.monotonic()
     i_batch = 0
     for i_batch, untransferred_grounded_entities in enumerate(
-        _get_batch_untransferred_grounded_entities(
-            batch_size=processing_chunk_batch_size
-        )
+        _get_batch_untransferred_grounded_entities(batch_size=KG_CLUSTERING_PAGE_SIZE)
     ):
-        for entity in untransferred_grounded_entities:
-            _cluster_one_grounded_entity(entity)
+        _cluster_grounded_entities(untransferred_grounded_entities)
         last_lock_time = extend_lock(
             lock, CELERY_GENERIC_BEAT_LOCK_TIMEOUT, last_lock_time
         )
@@ -339,17 +763,12 @@ def kg_clustering(
         f"Finished transferring {i_batch+1} entity batches in {time_delta:.2f}s"
     )
 
-    # Create parent-child relationships in parallel
+    # Create parent-child relationships, a page at a time
     for _ in range(kg_config_settings.KG_MAX_PARENT_RECURSION_DEPTH):
         for root_entities in _get_batch_entities_with_parent(
-            batch_size=processing_chunk_batch_size
+            batch_size=KG_CLUSTERING_PAGE_SIZE
         ):
-            run_functions_tuples_in_parallel(
-                [
-                    (_create_one_parent_child_relationship, (root_entity,))
-                    for root_entity in root_entities
-                ]
-            )
+            _create_parent_child_relationships(root_entities)
             last_lock_time = extend_lock(
                 lock, CELERY_GENERIC_BEAT_LOCK_TIMEOUT, last_lock_time
             )
@@ -376,18 +795,13 @@ def kg_clustering(
         f"Finished transferring {i_batch+1} relationship type batches in {time_delta:.2f}s"
     )
 
-    # Transfer the relationships in parallel
+    # Transfer the relationships, a page at a time
     start_time = time.monotonic()
     i_batch = 0
     for i_batch, relationships in enumerate(
-        _get_batch_untransferred_relationships(batch_size=processing_chunk_batch_size)
+        _get_batch_untransferred_relationships(batch_size=KG_CLUSTERING_PAGE_SIZE)
     ):
-        run_functions_tuples_in_parallel(
-            [
-                (_transfer_one_relationship, (relationship,))
-                for relationship in relationships
-            ]
-        )
+        _transfer_relationships(relationships)
         last_lock_time = extend_lock(
             lock, CELERY_GENERIC_BEAT_LOCK_TIMEOUT, last_lock_time
         )
@@ -1,17 +1,20 @@
 import re
 from collections import defaultdict
-from typing import cast
+from functools import lru_cache
 
 import numpy as np
 from nltk import ngrams  # type: ignore
 from rapidfuzz.distance.DamerauLevenshtein import normalized_similarity
+from sqlalchemy import Column
 from sqlalchemy import desc
 from sqlalchemy import Float
 from sqlalchemy import func
+from sqlalchemy import literal
 from sqlalchemy import MetaData
 from sqlalchemy import select
 from sqlalchemy import String
 from sqlalchemy import Table
+from sqlalchemy import true
 from sqlalchemy.dialects.postgresql import ARRAY
 
 from onyx.configs.kg_configs import KG_NORMALIZATION_RERANK_LEVENSHTEIN_WEIGHT
@@ -32,7 +35,6 @@ from onyx.kg.utils.formatting_utils import make_relationship_id
 from onyx.kg.utils.formatting_utils import split_entity_id
 from onyx.kg.utils.formatting_utils import split_relationship_id
 from onyx.utils.logger import setup_logger
-from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 from shared_configs.configs import POSTGRES_DEFAULT_SCHEMA
 
 logger = setup_logger()
@@ -54,106 +56,134 @@ def _clean_name(entity_name: str) -> str:
     )
 
 
-def _normalize_one_entity(
-    entity: str,
-    attributes: dict[str, str],
-    allowed_docs_temp_view_name: str | None = None,
-) -> str | None:
+@lru_cache(maxsize=128)
+def _get_allowed_docs_temp_view(allowed_docs_temp_view_name: str) -> Table:
     """
-    Matches a single entity to the best matching entity of the same type.
+    The allowed docs temp view as a table, built once per view. Its only column is
+    allowed_doc_id (see create_views), so it is declared rather than reflected.
     """
-    entity_type, entity_name = split_entity_id(entity)
-    if entity_name == "*":
-        return entity
-
-    cleaned_entity = _clean_name(entity_name)
-
-    # narrow filter to subtype if requested
-    type_filters = [KGEntity.entity_type_id_name == entity_type]
-    if "subtype" in attributes:
-        type_filters.append(
-            KGEntity.attributes.op("@>")({"subtype": attributes["subtype"]})
-        )
-
-    # step 1: find entities containing the entity_name or something similar
-    with get_session_with_current_tenant() as db_session:
-
-        # get allowed documents
-        metadata = MetaData()
-        if allowed_docs_temp_view_name is None:
-            raise ValueError("allowed_docs_temp_view_name is not available")
+    return Table(
+        allowed_docs_temp_view_name.split(".")[-1],
+        MetaData(),
+        Column("allowed_doc_id", String),
+    )
 
-        effective_schema_allowed_docs_temp_view_name = (
-            allowed_docs_temp_view_name.split(".")[-1]
-        )
 
-        allowed_docs_temp_view = Table(
-            effective_schema_allowed_docs_temp_view_name,
-            metadata,
-            autoload_with=db_session.get_bind(),
+def _get_entity_candidates(
+    query_entities: list[tuple[str, str, str | None]],
+    allowed_docs_temp_view_name: str,
+) -> list[list[tuple[str, str]]]:
+    """
+    Finds the (id_name, name) of the entities most similar to each of the
+    (entity type, cleaned entity name, subtype) query entities, with a single query.
+    """
+    candidates: list[list[tuple[str, str]]] = [[] for _ in query_entities]
+    if not query_entities:
+        return candidates
+
+    allowed_docs_temp_view = _get_allowed_docs_temp_view(allowed_docs_temp_view_name)
+
+    # generate trigrams of the queried entities Q
+    query_names = (
+        func.unnest(
+            literal(
+                [entity_type for entity_type, _, _ in query_entities], ARRAY(String)
+            ),
+            literal([name for _, name, _ in query_entities], ARRAY(String)),
+            literal([subtype for _, _, subtype in query_entities], ARRAY(String)),
         )
-
-        # generate trigrams of the queried entity Q
-        query_trigrams = db_session.query(
-            getattr(func, POSTGRES_DEFAULT_SCHEMA)
-            .show_trgm(cleaned_entity)
-            .cast(ARRAY(String(3)))
-            .label("trigrams")
-        ).cte("query")
-
-        candidates = cast(
-            list[tuple[str, str, float]],
-            db_session.query(
-                KGEntity.id_name,
-                KGEntity.name,
-                (
-                    # for each entity E, compute score = | Q ∩ E | / min(|Q|, |E|)
-                    func.cardinality(
-                        func.array(
-                            select(func.unnest(KGEntity.name_trigrams))
-                            .correlate(KGEntity)
-                            .intersect(
-                                select(
-                                    func.unnest(query_trigrams.c.trigrams)
-                                ).correlate(query_trigrams)
+        .table_valued("entity_type", "name", "subtype", with_ordinality="ind")
+        .render_derived(name="query_names")
+    )
+    query_trigrams = select(
+        query_names.c.ind,
+        query_names.c.entity_type,
+        query_names.c.subtype,
+        getattr(func, POSTGRES_DEFAULT_SCHEMA)
+        .show_trgm(query_names.c.name)
+        .cast(ARRAY(String(3)))
+        .label("trigrams"),
+    ).subquery("query")
+
+    # the best entities of each queried entity
+    entity_candidates = (
+        select(
+            KGEntity.id_name,
+            KGEntity.name,
+            (
+                # for each entity E, compute score = | Q ∩ E | / min(|Q|, |E|)
+                func.cardinality(
+                    func.array(
+                        select(func.unnest(KGEntity.name_trigrams))
+                        .correlate(KGEntity)
+                        .intersect(
+                            select(func.unnest(query_trigrams.c.trigrams)).correlate(
+                                query_trigrams
                             )
-                            .scalar_subquery()
                         )
-                    ).cast(Float)
-                    / func.least(
-                        func.cardinality(query_trigrams.c.trigrams),
-                        func.cardinality(KGEntity.name_trigrams),
+                        .scalar_subquery()
                     )
-                ).label("score"),
-            )
-            .select_from(KGEntity, query_trigrams)
-            .outerjoin(
-                allowed_docs_temp_view,
-                KGEntity.document_id == allowed_docs_temp_view.c.allowed_doc_id,
-            )
-            .filter(
-                *type_filters,
-                KGEntity.name_trigrams.overlap(query_trigrams.c.trigrams),
-                # Add filter for allowed docs - either document_id is NULL or it's in allowed_docs
-                (
-                    KGEntity.document_id.is_(None)
-                    | allowed_docs_temp_view.c.allowed_doc_id.isnot(None)
-                ),
-            )
-            .order_by(desc("score"))
-            .limit(KG_NORMALIZATION_RETRIEVE_ENTITIES_LIMIT)
-            .all(),
+                ).cast(Float)
+                / func.least(
+                    func.cardinality(query_trigrams.c.trigrams),
+                    func.cardinality(KGEntity.name_trigrams),
+                )
+            ).label("score"),
+        )
+        .outerjoin(
+            allowed_docs_temp_view,
+            KGEntity.document_id == allowed_docs_temp_view.c.allowed_doc_id,
         )
-    if not candidates:
-        return None
+        .where(
+            KGEntity.entity_type_id_name == query_trigrams.c.entity_type,
+            # narrow filter to subtype if requested
+            query_trigrams.c.subtype.is_(None)
+            | KGEntity.attributes.op("@>")(
+                func.jsonb_build_object("subtype", query_trigrams.c.subtype)
+            ),
+            KGEntity.name_trigrams.overlap(query_trigrams.c.trigrams),
+            # Add filter for allowed docs - either document_id is NULL or it's in allowed_docs
+            (
+                KGEntity.document_id.is_(None)
+                | allowed_docs_temp_view.c.allowed_doc_id.isnot(None)
+            ),
+        )
+        .order_by(desc("score"))
+        .limit(KG_NORMALIZATION_RETRIEVE_ENTITIES_LIMIT)
+        .lateral("candidates")
+    )
 
-    # step 2: do a weighted ngram analysis and damerau levenshtein distance to rerank
+    with get_session_with_current_tenant() as db_session:
+        rows = db_session.execute(
+            select(
+                query_trigrams.c.ind,
+                entity_candidates.c.id_name,
+                entity_candidates.c.name,
+            )
+            .select_from(query_trigrams)
+            .join(entity_candidates, true())
+        ).all()
+    for ordinality, id_name, name in rows:
+        candidates[ordinality - 1].append((id_name, name))
+
+    return candidates
+
+
+def _rerank_candidates(
+    cleaned_entity: str, candidates: list[tuple[str, str]]
+) -> str | None:
+    """
+    Reranks the candidates of an entity with a weighted ngram analysis and damerau
+    levenshtein distance, and returns the id_name of the best one (if good enough).
+    """
     n1, n2, n3 = (
         set(ngrams(cleaned_entity, 1)),
         set(ngrams(cleaned_entity, 2)),
         set(ngrams(cleaned_entity, 3)),
     )
-    for i, (candidate_id_name, candidate_name, _) in enumerate(candidates):
+    best_id_name: str | None = None
+    best_score = KG_NORMALIZATION_RERANK_THRESHOLD
+    for candidate_id_name, candidate_name in candidates:
         cleaned_candidate = _clean_name(candidate_name)
         h_n1, h_n2, h_n3 = (
             set(ngrams(cleaned_candidate, 1)),
@@ -175,20 +205,49 @@ def _normalize_one_entity(
         W_leven = KG_NORMALIZATION_RERANK_LEVENSHTEIN_WEIGHT
         leven_score = normalized_similarity(cleaned_entity, cleaned_candidate)
 
-        # combine scores
+        # combine scores, keeping the first of the best candidates
         score = (1.0 - W_leven) * ngram_score + W_leven * leven_score
-        candidates[i] = (candidate_id_name, candidate_name, score)
-    candidates = list(
-        sorted(
-            filter(lambda x: x[2] > KG_NORMALIZATION_RERANK_THRESHOLD, candidates),
-            key=lambda x: x[2],
-            reverse=True,
+        if score > best_score:
+            best_id_name, best_score = candidate_id_name, score
+
+    return best_id_name
+
+
+def _normalize_entities(
+    entities: list[str],
+    entity_attributes: list[dict[str, str]],
+    allowed_docs_temp_view_name: str | None = None,
+) -> list[str | None]:
+    """
+    Matches each entity to the best matching entity of the same type. The candidates
+    of all the entities are retrieved with a single query.
+    """
+    if allowed_docs_temp_view_name is None:
+        raise ValueError("allowed_docs_temp_view_name is not available")
+
+    normalized_entities: list[str | None] = [None] * len(entities)
+    query_inds: list[int] = []
+    query_entities: list[tuple[str, str, str | None]] = []
+    for ind, (entity, attributes) in enumerate(zip(entities, entity_attributes)):
+        entity_type, entity_name = split_entity_id(entity)
+        if entity_name == "*":
+            normalized_entities[ind] = entity
+            continue
+        query_inds.append(ind)
+        query_entities.append(
+            (entity_type, _clean_name(entity_name), attributes.get("subtype"))
         )
-    )
-    if not candidates:
-        return None
 
-    return candidates[0][0]
+    # step 1: find entities containing the entity_name or something similar
+    candidates = _get_entity_candidates(query_entities, allowed_docs_temp_view_name)
+
+    # step 2: do a weighted ngram analysis and damerau levenshtein distance to rerank
+    for ind, (_, cleaned_entity, _), entity_candidates in zip(
+        query_inds, query_entities, candidates
+    ):
+        normalized_entities[ind] = _rerank_candidates(cleaned_entity, entity_candidates)
+
+    return normalized_entities
 
 
 def _get_existing_normalized_relationships(
@@ -248,11 +307,8 @@ def normalize_entities(
         get_attributes(attr_entity) for attr_entity in raw_entities_w_attributes
     ]
 
-    mapping: list[str | None] = run_functions_tuples_in_parallel(
-        [
-            (_normalize_one_entity, (entity, attributes, allowed_docs_temp_view_name))
-            for entity, attributes in zip(raw_entities, entity_attributes)
-        ]
+    mapping = _normalize_entities(
+        raw_entities, entity_attributes, allowed_docs_temp_view_name
     )
     for entity, attributes, normalized_entity in zip(
         raw_entities, entity_attributes, mapping
@@ -1,3 +1,4 @@
+import os
 import threading
 import time
 from collections.abc import Callable
@@ -7,11 +8,9 @@ from functools import partial
 from functools import wraps
 from typing import Any
 
-import requests
+import httpx
 from httpx import HTTPError
-from requests import JSONDecodeError
-from requests import RequestException
-from requests import Response
+from prometheus_client import Histogram
 from retry import retry
 
 from onyx.configs.app_configs import INDEXING_EMBEDDING_MODEL_NUM_THREADS
@@ -22,6 +21,11 @@ from onyx.configs.model_configs import (
     BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES,
 )
 from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
+from onyx.configs.model_configs import EMBEDDING_TRANSPORT
+from onyx.configs.model_configs import MODEL_SERVER_CLIENT_CONNECT_TIMEOUT
+from onyx.configs.model_configs import MODEL_SERVER_CLIENT_KEEPALIVE_EXPIRY
+from onyx.configs.model_configs import MODEL_SERVER_CLIENT_POOL_SIZE
+from onyx.configs.model_configs import MODEL_SERVER_CLIENT_READ_TIMEOUT
 from onyx.connectors.models import ConnectorStopSignal
 from onyx.db.models import SearchSettings
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
@@ -35,7 +39,11 @@ from shared_configs.configs import INDEXING_MODEL_SERVER_HOST
 from shared_configs.configs import INDEXING_MODEL_SERVER_PORT
 from shared_configs.configs import MODEL_SERVER_HOST
 from shared_configs.configs import MODEL_SERVER_PORT
+from shared_configs.embedding_transport import decode_embeddings
+from shared_configs.embedding_transport import embeddings_media_type
+from shared_configs.embedding_transport import parse_embeddings_media_type
 from shared_configs.enums import EmbeddingProvider
+from shared_configs.enums import EmbeddingTransport
 from shared_configs.enums import EmbedTextType
 from shared_configs.enums import RerankerProvider
 from shared_configs.model_server_models import ConnectorClassificationRequest
@@ -61,6 +69,66 @@ WARM_UP_STRINGS = [
 ]
 
 
+MODEL_SERVER_REQUEST_LATENCY = Histogram(
+    "onyx_model_server_request_latency_seconds",
+    "Latency of requests from this process to the model server",
+    ["endpoint"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+
+
+# the model server speaks HTTP/1.1 only
+_MODEL_SERVER_CLIENT_KWARGS: dict[str, Any] = {
+    "http2": False,
+    "timeout": httpx.Timeout(
+        MODEL_SERVER_CLIENT_READ_TIMEOUT,
+        connect=MODEL_SERVER_CLIENT_CONNECT_TIMEOUT,
+    ),
+    "limits": httpx.Limits(
+        max_connections=MODEL_SERVER_CLIENT_POOL_SIZE,
+        max_keepalive_connections=MODEL_SERVER_CLIENT_POOL_SIZE,
+        keepalive_expiry=MODEL_SERVER_CLIENT_KEEPALIVE_EXPIRY,
+    ),
+}
+
+_model_server_client: httpx.Client | None = None
+_model_server_client_pid: int | None = None
+_model_server_client_lock = threading.Lock()
+
+
+def _get_model_server_client() -> httpx.Client:
+    """The keep-alive client shared by all model server calls of this process, so that
+    each request doesn't pay for a fresh TCP connection. Built once per PID: a forked
+    worker process builds its own client on first use instead of sharing the
+    connections of its parent."""
+    global _model_server_client, _model_server_client_pid
+
+    pid = os.getpid()
+    client = _model_server_client
+    if client is not None and _model_server_client_pid == pid:
+        return client
+
+    with _model_server_client_lock:
+        if _model_server_client is None or _model_server_client_pid != pid:
+            _model_server_client = httpx.Client(**_MODEL_SERVER_CLIENT_KWARGS)
+            _model_server_client_pid = pid
+        return _model_server_client
+
+
+def _post_to_model_server(
+    url: str,
+    json: Any,
+    headers: dict[str, str] | None = None,
+) -> httpx.Response:
+    start = time.monotonic()
+    try:
+        return _get_model_server_client().post(url, json=json, headers=headers)
+    finally:
+        MODEL_SERVER_REQUEST_LATENCY.labels(endpoint=httpx.URL(url).path).observe(
+            time.monotonic() - start
+        )
+
+
 def clean_model_name(model_str: str) -> str:
     return model_str.replace("/", "_").replace("-", "_").replace(".", "_")
 
@@ -96,6 +164,7 @@ class EmbeddingModel:
         api_version: str | None = None,
         deployment_name: str | None = None,
         reduced_dimension: int | None = None,
+        transport: EmbeddingTransport = EMBEDDING_TRANSPORT,
     ) -> None:
         self.api_key = api_key
         self.provider_type = provider_type
@@ -108,6 +177,7 @@ class EmbeddingModel:
         self.api_version = api_version
         self.deployment_name = deployment_name
         self.reduced_dimension = reduced_dimension
+        self.transport = transport
         self.tokenizer = get_tokenizer(
             model_name=model_name, provider_type=provider_type
         )
@@ -122,7 +192,7 @@ class EmbeddingModel:
         tenant_id: str | None = None,
         request_id: str | None = None,
     ) -> EmbedResponse:
-        def _make_request() -> Response:
+        def _make_request() -> httpx.Response:
             headers = {}
             if tenant_id:
                 headers["X-Onyx-Tenant-ID"] = tenant_id
@@ -130,7 +200,10 @@ class EmbeddingModel:
             if request_id:
                 headers["X-Onyx-Request-ID"] = request_id
 
-            response = requests.post(
+            if self.transport != EmbeddingTransport.JSON:
+                headers["Accept"] = embeddings_media_type(self.transport)
+
+            response = _post_to_model_server(
                 self.embed_server_endpoint,
                 headers=headers,
                 json=embed_request.model_dump(),
@@ -150,30 +223,39 @@ class EmbeddingModel:
             final_make_request_func = retry(
                 tries=3,
                 delay=5,
-                exceptions=(RequestException, ValueError, JSONDecodeError),
+                # ValueError includes json decoding errors
+                exceptions=(httpx.HTTPError, ValueError),
             )(final_make_request_func)
             # use 10 second delay as per Azure suggestion
             final_make_request_func = retry(
                 tries=10, delay=10, exceptions=ModelServerRateLimitError
             )(final_make_request_func)
 
-        response: Response | None = None
-
         try:
             response = final_make_request_func()
-            return EmbedResponse(**response.json())
-        except requests.HTTPError as e:
-            if not response:
-                raise HTTPError("HTTP error occurred - response is None.") from e
-
+            return self._parse_embed_response(response)
+        except httpx.HTTPStatusError as e:
             try:
-                error_detail = response.json().get("detail", str(e))
+                error_detail = e.response.json().get("detail", str(e))
             except Exception:
-                error_detail = response.text
+                error_detail = e.response.text
             raise HTTPError(f"HTTP error occurred: {error_detail}") from e
-        except requests.RequestException as e:
+        except httpx.RequestError as e:
             raise HTTPError(f"Request failed: {str(e)}") from e
 
+    @staticmethod
+    def _parse_embed_response(response: httpx.Response) -> EmbedResponse:
+        # older model servers don't support binary embeddings and always respond
+        # with json, so go by what was actually returned rather than what was asked for
+        transport = parse_embeddings_media_type(response.headers.get("Content-Type"))
+        if transport == EmbeddingTransport.JSON:
+            return EmbedResponse(**response.json())
+
+        # the decoded vectors are already well formed, skip pydantic validation
+        return EmbedResponse.model_construct(
+            embeddings=decode_embeddings(response.content, transport)
+        )
+
     def _batch_encode_texts(
         self,
         texts: list[str],
@@ -377,7 +459,7 @@ class RerankingModel:
             api_url=self.api_url,
         )
 
-        response = requests.post(
+        response = _post_to_model_server(
             self.rerank_server_endpoint, json=rerank_request.model_dump()
         )
         response.raise_for_status()
@@ -410,7 +492,7 @@ class QueryAnalysisModel:
             semantic_percent_threshold=self.semantic_percent_threshold,
         )
 
-        response = requests.post(
+        response = _post_to_model_server(
             self.intent_server_endpoint, json=intent_request.model_dump()
         )
         response.raise_for_status()
@@ -435,7 +517,7 @@ class InformationContentClassificationModel:
         self,
         queries: list[str],
     ) -> list[ContentClassificationPrediction]:
-        response = requests.post(self.content_server_endpoint, json=queries)
+        response = _post_to_model_server(self.content_server_endpoint, json=queries)
         response.raise_for_status()
 
         model_responses = InformationContentClassificationResponses(
@@ -465,7 +547,7 @@ class ConnectorClassificationModel:
             available_connectors=available_connectors,
             query=query,
         )
-        response = requests.post(
+        response = _post_to_model_server(
             self.connector_classification_endpoint,
             json=connector_classification_request.dict(),
         )
@@ -9,6 +9,7 @@ from transformers import logging as transformer_logging  # type:ignore
 
 from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
 from onyx.configs.model_configs import DOCUMENT_ENCODER_MODEL
+from onyx.configs.model_configs import LLM_TOKEN_COUNT_ENCODINGS
 from onyx.context.search.models import InferenceChunk
 from onyx.utils.logger import setup_logger
 from shared_configs.enums import EmbeddingProvider
@@ -35,6 +36,12 @@ class BaseTokenizer(ABC):
     def decode(self, tokens: list[int]) -> str:
         pass
 
+    @property
+    def token_count_key(self) -> str | None:
+        """Identifies the tokenizer in the token counts precomputed at indexing time
+        (see get_llm_token_counts). Tokenizers with the same key count the same."""
+        return None
+
 
 class TiktokenTokenizer(BaseTokenizer):
     _instances: dict[str, "TiktokenTokenizer"] = {}
@@ -48,7 +55,11 @@ class TiktokenTokenizer(BaseTokenizer):
         if not hasattr(self, "encoder"):
             import tiktoken
 
-            self.encoder = tiktoken.encoding_for_model(model_name)
+            try:
+                self.encoder = tiktoken.encoding_for_model(model_name)
+            except KeyError:
+                # also accept encoding names, e.g. cl100k_base
+                self.encoder = tiktoken.get_encoding(model_name)
 
     def encode(self, string: str) -> list[int]:
         # this ignores special tokens that the model is trained on, see encode_ordinary for details
@@ -68,9 +79,14 @@ class TiktokenTokenizer(BaseTokenizer):
     def decode(self, tokens: list[int]) -> str:
         return self.encoder.decode(tokens)
 
+    @property
+    def token_count_key(self) -> str | None:
+        return f"tiktoken:{self.encoder.name}"
+
 
 class HuggingFaceTokenizer(BaseTokenizer):
     def __init__(self, model_name: str):
+        self.model_name = model_name
         self.encoder: Tokenizer = Tokenizer.from_pretrained(model_name)
 
     def _safer_encode(self, string: str) -> Encoding:
@@ -96,6 +112,10 @@ class HuggingFaceTokenizer(BaseTokenizer):
     def decode(self, tokens: list[int]) -> str:
         return self.encoder.decode(tokens)
 
+    @property
+    def token_count_key(self) -> str | None:
+        return f"hf:{self.model_name}"
+
 
 _TOKENIZER_CACHE: dict[tuple[EmbeddingProvider | None, str | None], BaseTokenizer] = {}
 
@@ -170,6 +190,54 @@ def get_tokenizer(
     return _check_tokenizer_cache(provider_type, model_name)
 
 
+_EXTRA_LLM_TOKEN_COUNT_TOKENIZERS: list[BaseTokenizer] | None = None
+
+
+def _get_extra_llm_token_count_tokenizers() -> list[BaseTokenizer]:
+    global _EXTRA_LLM_TOKEN_COUNT_TOKENIZERS
+
+    if _EXTRA_LLM_TOKEN_COUNT_TOKENIZERS is None:
+        tokenizers: list[BaseTokenizer] = []
+        for encoding in LLM_TOKEN_COUNT_ENCODINGS:
+            try:
+                tokenizers.append(TiktokenTokenizer(encoding))
+            except Exception as e:
+                logger.warning(f"Token counts disabled for encoding {encoding}: {e}")
+        _EXTRA_LLM_TOKEN_COUNT_TOKENIZERS = tokenizers
+
+    return _EXTRA_LLM_TOKEN_COUNT_TOKENIZERS
+
+
+def get_llm_token_count_tokenizers(
+    llm_tokenizer: BaseTokenizer | None,
+) -> list[BaseTokenizer]:
+    """The tokenizer of the default LLM (if any) plus the ones for the extra
+    LLM_TOKEN_COUNT_ENCODINGS, deduplicated by BaseTokenizer.token_count_key."""
+    tokenizers: list[BaseTokenizer] = []
+    seen_keys: set[str] = set()
+    candidates = [llm_tokenizer] if llm_tokenizer else []
+    for tokenizer in candidates + _get_extra_llm_token_count_tokenizers():
+        key = tokenizer.token_count_key
+        if key is not None and key not in seen_keys:
+            seen_keys.add(key)
+            tokenizers.append(tokenizer)
+    return tokenizers
+
+
+def get_llm_token_counts(
+    content: str, tokenizers: list[BaseTokenizer]
+) -> dict[str, int]:
+    """Number of tokens of the content for each of the tokenizers, by
+    BaseTokenizer.token_count_key. Computed once at indexing time and carried on the
+    chunks, so that they can be fit in the LLM context without tokenizing them."""
+    token_counts: dict[str, int] = {}
+    for tokenizer in tokenizers:
+        key = tokenizer.token_count_key
+        if key is not None:
+            token_counts[key] = len(tokenizer.encode(content))
+    return token_counts
+
+
 def tokenizer_trim_content(
     content: str, desired_length: int, tokenizer: BaseTokenizer
 ) -> str:
@@ -1,4 +1,5 @@
 import time
+from collections.abc import Iterable
 from datetime import datetime
 from typing import cast
 from uuid import uuid4
@@ -9,6 +10,7 @@ from pydantic import BaseModel
 from redis.lock import Lock as RedisLock
 from sqlalchemy.orm import Session
 
+from onyx.configs.app_configs import DOCUMENT_CLEANUP_BATCH_SIZE
 from onyx.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
 from onyx.configs.constants import CELERY_PRUNING_LOCK_TIMEOUT
 from onyx.configs.constants import OnyxCeleryPriority
@@ -17,6 +19,8 @@ from onyx.configs.constants import OnyxCeleryTask
 from onyx.configs.constants import OnyxRedisConstants
 from onyx.db.connector_credential_pair import get_connector_credential_pair_from_id
 from onyx.redis.redis_pool import SCAN_ITER_COUNT_DEFAULT
+from onyx.redis.redis_task_sender import TasksetTaskSender
+from onyx.utils.batching import batch_generator
 
 
 class RedisConnectorPrunePayload(BaseModel):
@@ -132,7 +136,7 @@ class RedisConnectorPrune:
     @property
     def generator_complete(self) -> int | None:
         """the fence payload is an int representing the starting number of
-        pruning tasks to be processed ... just after the generator completes."""
+        documents to be pruned ... just after the generator completes."""
         fence_bytes = self.redis.get(self.generator_complete_key)
         if fence_bytes is None:
             return None
@@ -152,14 +156,17 @@ class RedisConnectorPrune:
 
     def generate_tasks(
         self,
-        documents_to_prune: set[str],
+        documents_to_prune: Iterable[str],
         celery_app: Celery,
         db_session: Session,
         lock: RedisLock | None,
-    ) -> int | None:
+    ) -> tuple[int, int] | None:
+        """Sends the cleanup tasks batch by batch while iterating over the documents.
+        Returns None if the cc_pair doesn't exist, else a tuple with the number of
+        generated tasks and documents.
+        """
         last_lock_time = time.monotonic()
 
-        async_results = []
         cc_pair = get_connector_credential_pair_from_id(
             db_session=db_session,
             cc_pair_id=int(self.id),
@@ -167,41 +174,41 @@ class RedisConnectorPrune:
         if not cc_pair:
             return None
 
-        for doc_id in documents_to_prune:
-            current_time = time.monotonic()
-            if lock and current_time - last_lock_time >= (
-                CELERY_GENERIC_BEAT_LOCK_TIMEOUT / 4
+        num_docs = 0
+        with TasksetTaskSender(self.redis, self.taskset_key, celery_app) as sender:
+            for doc_id_batch in batch_generator(
+                documents_to_prune, DOCUMENT_CLEANUP_BATCH_SIZE
             ):
-                lock.reacquire()
-                last_lock_time = current_time
-
-            # celery's default task id format is "dd32ded3-00aa-4884-8b21-42f8332e7fac"
-            # the actual redis key is "celery-task-meta-dd32ded3-00aa-4884-8b21-42f8332e7fac"
-            # we prefix the task id so it's easier to keep track of who created the task
-            # aka "documentset_1_6dd32ded3-00aa-4884-8b21-42f8332e7fac"
-            custom_task_id = f"{self.subtask_prefix}_{uuid4()}"
-
-            # add to the tracking taskset in redis BEFORE creating the celery task.
-            self.redis.sadd(self.taskset_key, custom_task_id)
-
-            # Priority on sync's triggered by new indexing should be medium
-            result = celery_app.send_task(
-                OnyxCeleryTask.DOCUMENT_BY_CC_PAIR_CLEANUP_TASK,
-                kwargs=dict(
-                    document_id=doc_id,
-                    connector_id=cc_pair.connector_id,
-                    credential_id=cc_pair.credential_id,
-                    tenant_id=self.tenant_id,
-                ),
-                queue=OnyxCeleryQueues.CONNECTOR_DELETION,
-                task_id=custom_task_id,
-                priority=OnyxCeleryPriority.MEDIUM,
-                ignore_result=True,
-            )
-
-            async_results.append(result)
-
-        return len(async_results)
+                current_time = time.monotonic()
+                if lock and current_time - last_lock_time >= (
+                    CELERY_GENERIC_BEAT_LOCK_TIMEOUT / 4
+                ):
+                    lock.reacquire()
+                    last_lock_time = current_time
+
+                # celery's default task id format is "dd32ded3-00aa-4884-8b21-42f8332e7fac"
+                # the actual redis key is "celery-task-meta-dd32ded3-00aa-4884-8b21-42f8332e7fac"
+                # we prefix the task id so it's easier to keep track of who created the task
+                # aka "documentset_1_6dd32ded3-00aa-4884-8b21-42f8332e7fac"
+                custom_task_id = f"{self.subtask_prefix}_{uuid4()}"
+
+                # Priority on sync's triggered by new indexing should be medium
+                sender.send_task(
+                    OnyxCeleryTask.DOCUMENT_BY_CC_PAIR_CLEANUP_BATCH_TASK,
+                    custom_task_id,
+                    kwargs=dict(
+                        document_ids=doc_id_batch,
+                        connector_id=cc_pair.connector_id,
+                        credential_id=cc_pair.credential_id,
+                        tenant_id=self.tenant_id,
+                    ),
+                    queue=OnyxCeleryQueues.CONNECTOR_DELETION,
+                    priority=OnyxCeleryPriority.MEDIUM,
+                    ignore_result=True,
+                )
+                num_docs += len(doc_id_batch)
+
+        return sender.num_tasks_sent, num_docs
 
     def reset(self) -> None:
         self.redis.srem(OnyxRedisConstants.ACTIVE_FENCES, self.fence_key)
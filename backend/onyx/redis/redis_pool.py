@@ -36,48 +36,81 @@ logger = setup_logger()
 SCAN_ITER_COUNT_DEFAULT = 4096
 
 
+# Regular methods that need simple prefixing
+_PREFIXED_METHODS = [
+    "lock",
+    "unlock",
+    "get",
+    "set",
+    "delete",
+    "exists",
+    "incrby",
+    "hset",
+    "hget",
+    "getset",
+    "owned",
+    "reacquire",
+    "create_lock",
+    "startswith",
+    "smembers",
+    "sismember",
+    "sadd",
+    "srem",
+    "scard",
+    "hexists",
+    "hdel",
+    "ttl",
+    "pttl",
+]
+_PREFIXED_SCAN_METHODS = ["scan_iter", "sscan_iter"]
+
+
 class TenantRedis(redis.Redis):
+    """Redis client prefixing the keys with the tenant id. The prefixing methods are
+    built once, when the module is loaded, and override the ones of redis.Redis."""
+
     def __init__(self, tenant_id: str, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
         self.tenant_id: str = tenant_id
+        self._prefix: str = f"{tenant_id}:"
+        self._prefix_bytes: bytes = self._prefix.encode()
 
     def _prefixed(self, key: str | bytes | memoryview) -> str | bytes | memoryview:
-        prefix: str = f"{self.tenant_id}:"
         if isinstance(key, str):
-            if key.startswith(prefix):
+            if key.startswith(self._prefix):
                 return key
             else:
-                return prefix + key
+                return self._prefix + key
         elif isinstance(key, bytes):
-            prefix_bytes = prefix.encode()
-            if key.startswith(prefix_bytes):
+            if key.startswith(self._prefix_bytes):
                 return key
             else:
-                return prefix_bytes + key
+                return self._prefix_bytes + key
         elif isinstance(key, memoryview):
             key_bytes = key.tobytes()
-            prefix_bytes = prefix.encode()
-            if key_bytes.startswith(prefix_bytes):
+            if key_bytes.startswith(self._prefix_bytes):
                 return key
             else:
-                return memoryview(prefix_bytes + key_bytes)
+                return memoryview(self._prefix_bytes + key_bytes)
         else:
             raise TypeError(f"Unsupported key type: {type(key)}")
 
-    def _prefix_method(self, method: Callable) -> Callable:
+    @staticmethod
+    def _prefix_method(method: Callable) -> Callable:
         @functools.wraps(method)
-        def wrapper(*args: Any, **kwargs: Any) -> Any:
+        def wrapper(self: "TenantRedis", *args: Any, **kwargs: Any) -> Any:
             if "name" in kwargs:
                 kwargs["name"] = self._prefixed(kwargs["name"])
             elif len(args) > 0:
                 args = (self._prefixed(args[0]),) + args[1:]
-            return method(*args, **kwargs)
+            return method(self, *args, **kwargs)
 
         return wrapper
 
-    def _prefix_scan_iter(self, method: Callable) -> Callable:
+    @staticmethod
+    def _prefix_scan_iter(method: Callable) -> Callable:
         @functools.wraps(method)
-        def wrapper(*args: Any, **kwargs: Any) -> Any:
+        def wrapper(self: "TenantRedis", *args: Any, **kwargs: Any) -> Any:
             # Prefix the match pattern if provided
             if "match" in kwargs:
                 kwargs["match"] = self._prefixed(kwargs["match"])
@@ -85,10 +118,10 @@ class TenantRedis(redis.Redis):
                 args = (self._prefixed(args[0]),) + args[1:]
 
             # Get the iterator
-            iterator = method(*args, **kwargs)
+            iterator = method(self, *args, **kwargs)
 
             # Remove prefix from returned keys
-            prefix = f"{self.tenant_id}:".encode()
+            prefix = self._prefix_bytes
             prefix_len = len(prefix)
 
             for key in iterator:
@@ -99,40 +132,18 @@ class TenantRedis(redis.Redis):
 
         return wrapper
 
-    def __getattribute__(self, item: str) -> Any:
-        original_attr = super().__getattribute__(item)
-        methods_to_wrap = [
-            "lock",
-            "unlock",
-            "get",
-            "set",
-            "delete",
-            "exists",
-            "incrby",
-            "hset",
-            "hget",
-            "getset",
-            "owned",
-            "reacquire",
-            "create_lock",
-            "startswith",
-            "smembers",
-            "sismember",
-            "sadd",
-            "srem",
-            "scard",
-            "hexists",
-            "hset",
-            "hdel",
-            "ttl",
-            "pttl",
-        ]  # Regular methods that need simple prefixing
-
-        if item == "scan_iter" or item == "sscan_iter":
-            return self._prefix_scan_iter(original_attr)
-        elif item in methods_to_wrap and callable(original_attr):
-            return self._prefix_method(original_attr)
-        return original_attr
+
+# names without a redis.Redis method (e.g. the Lock methods) are skipped
+for _method_name in _PREFIXED_METHODS:
+    _method = getattr(redis.Redis, _method_name, None)
+    if callable(_method):
+        setattr(TenantRedis, _method_name, TenantRedis._prefix_method(_method))
+for _method_name in _PREFIXED_SCAN_METHODS:
+    setattr(
+        TenantRedis,
+        _method_name,
+        TenantRedis._prefix_scan_iter(getattr(redis.Redis, _method_name)),
+    )
 
 
 class RedisPool:
@@ -0,0 +1,74 @@
+from types import TracebackType
+from typing import Any
+
+from celery import Celery
+from redis import Redis
+
+# number of tasks registered with one SADD and published with one producer
+TASK_SEND_BATCH_SIZE = 128
+
+
+class TasksetTaskSender:
+    """Sends celery tasks tracked in a redis taskset, in batches.
+
+    Each batch of task ids is added to the taskset with a single SADD before any of
+    its tasks is sent (so the taskset never misses a running task, same as adding the
+    ids one by one), then the tasks are published through a single producer instead
+    of acquiring one from the pool for every task.
+
+    Usage:
+        with TasksetTaskSender(r, taskset_key, celery_app) as sender:
+            for ...:
+                sender.send_task(task_name, task_id, kwargs=..., queue=...)
+        num_tasks_sent = sender.num_tasks_sent
+    """
+
+    def __init__(
+        self,
+        r: Redis,
+        taskset_key: str,
+        celery_app: Celery,
+        batch_size: int = TASK_SEND_BATCH_SIZE,
+    ) -> None:
+        self.r = r
+        self.taskset_key = taskset_key
+        self.celery_app = celery_app
+        self.batch_size = batch_size
+        self.num_tasks_sent = 0
+        self._pending: list[tuple[str, str, dict[str, Any]]] = []
+
+    def send_task(self, task_name: str, task_id: str, **options: Any) -> None:
+        """Queues the task, sent with the next batch. options are passed to
+        Celery.send_task."""
+        self._pending.append((task_name, task_id, options))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, []
+
+        # add to the tracking taskset in redis BEFORE creating the celery tasks.
+        self.r.sadd(self.taskset_key, *[task_id for _, task_id, _ in pending])
+
+        with self.celery_app.producer_or_acquire() as producer:  # type: ignore
+            for task_name, task_id, options in pending:
+                self.celery_app.send_task(
+                    task_name, task_id=task_id, producer=producer, **options
+                )
+                self.num_tasks_sent += 1
+
+    def __enter__(self) -> "TasksetTaskSender":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        # on errors, the pending tasks are dropped like the ones never generated
+        if exc_type is None:
+            self.flush()
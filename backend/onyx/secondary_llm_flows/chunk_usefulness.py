@@ -8,6 +8,7 @@ from onyx.prompts.llm_chunk_filter import NONUSEFUL_PAT
 from onyx.prompts.llm_chunk_filter import SECTION_FILTER_PROMPT
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.threadpool_concurrency import ThreadPoolName
 
 logger = setup_logger()
 
@@ -87,7 +88,7 @@ def llm_batch_eval_sections(
             "Running LLM usefulness eval in parallel (following logging may be out of order)"
         )
         parallel_results = run_functions_tuples_in_parallel(
-            functions_with_args, allow_failures=True
+            functions_with_args, allow_failures=True, pool=ThreadPoolName.LLM
         )
 
         # In case of failure/timeout, don't throw out the section
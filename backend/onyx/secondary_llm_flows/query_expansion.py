@@ -15,6 +15,7 @@ from onyx.prompts.miscellaneous_prompts import LANGUAGE_REPHRASE_PROMPT
 from onyx.utils.logger import setup_logger
 from onyx.utils.text_processing import count_punctuation
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.threadpool_concurrency import ThreadPoolName
 
 logger = setup_logger()
 
@@ -60,7 +61,9 @@ def multilingual_query_expansion(
             for language in languages
         ]
 
-        query_rephrases = run_functions_tuples_in_parallel(functions_with_args)
+        query_rephrases = run_functions_tuples_in_parallel(
+            functions_with_args, pool=ThreadPoolName.LLM
+        )
         return query_rephrases
 
     else:
@@ -37,6 +37,7 @@ from onyx.server.manage.llm.models import TestLLMRequest
 from onyx.server.manage.llm.models import VisionProviderResponse
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.threadpool_concurrency import ThreadPoolName
 
 logger = setup_logger()
 
@@ -107,7 +108,7 @@ def test_llm_configuration(
         functions_with_args.append((test_llm, (fast_llm,)))
 
     parallel_results = run_functions_tuples_in_parallel(
-        functions_with_args, allow_failures=False
+        functions_with_args, allow_failures=False, pool=ThreadPoolName.LLM
     )
     error = parallel_results[0] or (
         parallel_results[1] if len(parallel_results) > 1 else None
@@ -135,7 +136,7 @@ def test_default_provider(
         (test_llm, (fast_llm,)),
     ]
     parallel_results = run_functions_tuples_in_parallel(
-        functions_with_args, allow_failures=False
+        functions_with_args, allow_failures=False, pool=ThreadPoolName.LLM
     )
     error = parallel_results[0] or (
         parallel_results[1] if len(parallel_results) > 1 else None
@@ -29,6 +29,7 @@ from onyx.utils.headers import build_llm_extra_headers
 from onyx.utils.logger import setup_logger
 from onyx.utils.special_types import JSON_ro
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.threadpool_concurrency import ThreadPoolName
 
 
 logger = setup_logger()
@@ -295,7 +296,8 @@ class ImageGenerationTool(Tool[None]):
                         ),
                     )
                     for _ in range(self.num_imgs)
-                ]
+                ],
+                pool=ThreadPoolName.LLM,
             ),
         )
         yield ToolResponse(
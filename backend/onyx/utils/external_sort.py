@@ -0,0 +1,118 @@
+"""
+Set operations over more strings than comfortably fit in memory. Strings are
+buffered in memory up to a limit, then spilled to temporary files as sorted runs and
+merged back on read, so memory stays flat no matter how many strings are added.
+
+Strings are sorted by code point, which is also the order of Postgres' "C" collation
+(byte order of UTF-8), so they can be merged with rows sorted by the DB.
+"""
+
+import heapq
+import json
+import tempfile
+from collections.abc import Iterable
+from collections.abc import Iterator
+from types import TracebackType
+from typing import IO
+
+
+class ExternalStringSorter:
+    """Collects strings and yields them back sorted and deduplicated.
+
+    Usage:
+        with ExternalStringSorter(max_in_memory=1_000_000) as sorter:
+            for batch in batches:
+                sorter.add(batch)
+            for value in sorter.iter_sorted():
+                ...
+    """
+
+    def __init__(self, max_in_memory: int, directory: str | None = None) -> None:
+        if max_in_memory <= 0:
+            raise ValueError("max_in_memory must be positive")
+
+        self.max_in_memory = max_in_memory
+        self.directory = directory
+        self._buffer: set[str] = set()
+        self._runs: list[IO[str]] = []
+
+    @property
+    def num_spilled_runs(self) -> int:
+        return len(self._runs)
+
+    def add(self, values: Iterable[str]) -> None:
+        for value in values:
+            self._buffer.add(value)
+            if len(self._buffer) >= self.max_in_memory:
+                self._spill()
+
+    def iter_sorted(self) -> Iterator[str]:
+        """Yields each added string once, in code point order."""
+        runs: list[Iterator[str]] = [_read_run(run) for run in self._runs]
+        runs.append(iter(sorted(self._buffer)))
+
+        previous: str | None = None
+        for value in heapq.merge(*runs):
+            if value != previous:
+                yield value
+                previous = value
+
+    def close(self) -> None:
+        for run in self._runs:
+            run.close()
+        self._runs = []
+        self._buffer = set()
+
+    def __enter__(self) -> "ExternalStringSorter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _spill(self) -> None:
+        # deleted by the OS as soon as it's closed
+        run = tempfile.TemporaryFile(mode="w+", encoding="utf-8", dir=self.directory)
+        # one JSON string per line, so strings with line breaks round trip
+        run.writelines(f"{json.dumps(value)}\n" for value in sorted(self._buffer))
+        self._runs.append(run)
+        self._buffer = set()
+
+
+def _read_run(run: IO[str]) -> Iterator[str]:
+    run.seek(0)
+    for line in run:
+        yield json.loads(line)
+
+
+def iter_sorted_difference(
+    values: Iterable[str], values_to_exclude: Iterable[str]
+) -> Iterator[str]:
+    """Yields the values that are not in values_to_exclude, like a set difference
+    of two sorted iterables (code point order, see ExternalStringSorter) without
+    loading either of them in memory.
+
+    Raises a ValueError as soon as either iterable is found out of order, since the
+    merge would otherwise silently yield values that are in values_to_exclude."""
+    exclude_iter = iter(values_to_exclude)
+    excluded: str | None = next(exclude_iter, None)
+    previous: str | None = None
+    for value in values:
+        if previous is not None and value < previous:
+            raise ValueError(f"Values are not sorted: {previous!r} > {value!r}")
+        previous = value
+
+        while excluded is not None and excluded < value:
+            next_excluded = next(exclude_iter, None)
+            if next_excluded is not None and next_excluded < excluded:
+                raise ValueError(
+                    f"Values to exclude are not sorted: {excluded!r} > {next_excluded!r}"
+                )
+            excluded = next_excluded
+
+        if excluded != value:
+            yield value
@@ -1,17 +1,21 @@
 import collections.abc
 import contextvars
 import copy
+import os
 import threading
+import time
 import uuid
+from collections import deque
 from collections.abc import Callable
 from collections.abc import Iterator
 from collections.abc import MutableMapping
 from collections.abc import Sequence
-from concurrent.futures import as_completed
 from concurrent.futures import FIRST_COMPLETED
 from concurrent.futures import Future
 from concurrent.futures import ThreadPoolExecutor
 from concurrent.futures import wait
+from enum import Enum
+from functools import partial
 from typing import Any
 from typing import cast
 from typing import Generic
@@ -19,9 +23,15 @@ from typing import overload
 from typing import Protocol
 from typing import TypeVar
 
+from prometheus_client import Gauge
+from prometheus_client import Histogram
 from pydantic import GetCoreSchemaHandler
 from pydantic_core import core_schema
 
+from onyx.configs.app_configs import THREADPOOL_DEFAULT_MAX_WORKERS
+from onyx.configs.app_configs import THREADPOOL_IO_MAX_WORKERS
+from onyx.configs.app_configs import THREADPOOL_LLM_MAX_WORKERS
+from onyx.configs.app_configs import THREADPOOL_VESPA_MAX_WORKERS
 from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
@@ -170,6 +180,185 @@ class ThreadSafeDict(MutableMapping[KT, VT]):
             return val, new_val
 
 
+THREADPOOL_QUEUE_DEPTH = Gauge(
+    "onyx_threadpool_queue_depth",
+    "Tasks waiting for a worker in a shared thread pool",
+    ["pool"],
+)
+THREADPOOL_ACTIVE_WORKERS = Gauge(
+    "onyx_threadpool_active_workers",
+    "Workers of a shared thread pool currently running a task",
+    ["pool"],
+)
+THREADPOOL_WAIT_SECONDS = Histogram(
+    "onyx_threadpool_wait_seconds",
+    "Time tasks spent queued before a shared thread pool worker picked them up",
+    ["pool"],
+)
+
+
+class ThreadPoolName(str, Enum):
+    DEFAULT = "default"
+    # calls to LLM providers
+    LLM = "llm"
+    # requests to the document index
+    VESPA = "vespa"
+    # other network / file store / external API calls
+    IO = "io"
+
+
+_THREADPOOL_MAX_WORKERS: dict[ThreadPoolName, int] = {
+    ThreadPoolName.DEFAULT: THREADPOOL_DEFAULT_MAX_WORKERS,
+    ThreadPoolName.LLM: THREADPOOL_LLM_MAX_WORKERS,
+    ThreadPoolName.VESPA: THREADPOOL_VESPA_MAX_WORKERS,
+    ThreadPoolName.IO: THREADPOOL_IO_MAX_WORKERS,
+}
+
+# set on the worker threads of the shared pools
+_shared_pool_worker_state = threading.local()
+
+
+def _is_shared_pool_worker() -> bool:
+    return getattr(_shared_pool_worker_state, "is_worker", False)
+
+
+class SharedThreadPool:
+    """
+    A named, process wide thread pool with a fixed number of workers. Tasks run with a
+    copy of the submitting thread's contextvars (e.g. the tenant id) and report queue
+    depth, active workers and queue wait time per pool.
+    """
+
+    def __init__(self, name: ThreadPoolName, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"onyx-{name.value}"
+        )
+        self._queue_depth = THREADPOOL_QUEUE_DEPTH.labels(pool=name.value)
+        self._active_workers = THREADPOOL_ACTIVE_WORKERS.labels(pool=name.value)
+        self._wait_seconds = THREADPOOL_WAIT_SECONDS.labels(pool=name.value)
+
+    def submit(self, func: Callable[..., R], *args: Any, **kwargs: Any) -> Future[R]:
+        # The primary reason for propagating contextvars is to allow acquiring a db session
+        # that respects tenant id. Context.run is expected to be low-overhead, but if we later
+        # find that it is increasing latency we can make using it optional.
+        context = contextvars.copy_context()
+        submitted_at = time.monotonic()
+
+        def run() -> R:
+            self._queue_depth.dec()
+            self._wait_seconds.observe(time.monotonic() - submitted_at)
+            self._active_workers.inc()
+            _shared_pool_worker_state.is_worker = True
+            try:
+                return context.run(func, *args, **kwargs)
+            finally:
+                self._active_workers.dec()
+
+        def on_done(future: Future[R]) -> None:
+            # cancelled tasks never ran, so never left the queue
+            if future.cancelled():
+                self._queue_depth.dec()
+
+        self._queue_depth.inc()
+        future = self._executor.submit(run)
+        future.add_done_callback(on_done)
+        return future
+
+
+_shared_thread_pools: dict[ThreadPoolName, SharedThreadPool] = {}
+_shared_thread_pools_lock = threading.Lock()
+
+
+def get_shared_thread_pool(name: ThreadPoolName) -> SharedThreadPool:
+    pool = _shared_thread_pools.get(name)
+    if pool is not None:
+        return pool
+
+    with _shared_thread_pools_lock:
+        if name not in _shared_thread_pools:
+            _shared_thread_pools[name] = SharedThreadPool(
+                name, _THREADPOOL_MAX_WORKERS[name]
+            )
+        return _shared_thread_pools[name]
+
+
+def _reset_shared_thread_pools() -> None:
+    # the worker threads don't survive a fork, the child starts new pools on demand
+    global _shared_thread_pools_lock
+    _shared_thread_pools.clear()
+    _shared_thread_pools_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_shared_thread_pools)
+
+
+class _PooledCalls(Generic[KT, R]):
+    """
+    Runs calls in a shared thread pool with at most `max_in_flight` of them queued or
+    running at a time, and hands back their futures as they complete.
+
+    A shared pool worker waiting on calls queued behind other tasks could deadlock
+    once every worker of the pool(s) is doing the same, so when called from a worker,
+    calls that haven't started yet are run on the waiting thread instead.
+    """
+
+    def __init__(self, pool_name: ThreadPoolName, max_in_flight: int):
+        self._pool = get_shared_thread_pool(pool_name)
+        self._max_in_flight = max_in_flight
+        self._help_while_waiting = _is_shared_pool_worker()
+        self._queued: deque[tuple[KT, Callable[[], R]]] = deque()
+        self._in_flight: dict[Future[R], tuple[KT, Callable[[], R]]] = {}
+        self._done: deque[tuple[KT, Future[R]]] = deque()
+
+    def add(self, key: KT, call: Callable[[], R]) -> None:
+        self._queued.append((key, call))
+
+    def has_pending(self) -> bool:
+        return bool(self._queued or self._in_flight or self._done)
+
+    def _run_queued_call_inline(self) -> bool:
+        for future, (key, call) in reversed(self._in_flight.items()):
+            if future.cancel():
+                del self._in_flight[future]
+                inline_future: Future[R] = Future()
+                try:
+                    inline_future.set_result(contextvars.copy_context().run(call))
+                except Exception as e:
+                    inline_future.set_exception(e)
+                self._done.append((key, inline_future))
+                return True
+        return False
+
+    def next_completed(self) -> tuple[KT, Future[R]]:
+        while not self._done:
+            while self._queued and len(self._in_flight) < self._max_in_flight:
+                key, call = self._queued.popleft()
+                self._in_flight[self._pool.submit(call)] = (key, call)
+
+            completed = [future for future in self._in_flight if future.done()]
+            if not completed:
+                if self._help_while_waiting and self._run_queued_call_inline():
+                    continue
+                done, _ = wait(self._in_flight, return_when=FIRST_COMPLETED)
+                completed = list(done)
+
+            for future in completed:
+                key, _ = self._in_flight.pop(future)
+                self._done.append((key, future))
+
+        return self._done.popleft()
+
+    def close(self) -> None:
+        # like the per call executors used to, don't return while calls are running
+        for future in self._in_flight:
+            future.cancel()
+        wait(self._in_flight)
+        self._queued.clear()
+        self._in_flight.clear()
+
+
 class CallableProtocol(Protocol):
     def __call__(self, *args: Any, **kwargs: Any) -> Any: ...
 
@@ -178,6 +367,7 @@ def run_functions_tuples_in_parallel(
     functions_with_args: Sequence[tuple[CallableProtocol, tuple[Any, ...]]],
     allow_failures: bool = False,
     max_workers: int | None = None,
+    pool: ThreadPoolName = ThreadPoolName.DEFAULT,
 ) -> list[Any]:
     """
     Executes multiple functions in parallel and returns a list of the results for each function.
@@ -187,7 +377,8 @@ def run_functions_tuples_in_parallel(
     Args:
         functions_with_args: List of tuples each containing the function callable and a tuple of arguments.
         allow_failures: if set to True, then the function result will just be None
-        max_workers: Max number of worker threads
+        max_workers: Max number of functions of this call running at the same time
+        pool: Shared thread pool to run the functions in
 
     Returns:
         list: A list of results from each function, in the same order as the input functions.
@@ -201,18 +392,14 @@ def run_functions_tuples_in_parallel(
     if workers <= 0:
         return []
 
-    results = []
-    with ThreadPoolExecutor(max_workers=workers) as executor:
-        # The primary reason for propagating contextvars is to allow acquiring a db session
-        # that respects tenant id. Context.run is expected to be low-overhead, but if we later
-        # find that it is increasing latency we can make using it optional.
-        future_to_index = {
-            executor.submit(contextvars.copy_context().run, func, *args): i
-            for i, (func, args) in enumerate(functions_with_args)
-        }
+    calls: _PooledCalls[int, Any] = _PooledCalls(pool, workers)
+    for i, (func, args) in enumerate(functions_with_args):
+        calls.add(i, partial(func, *args))
 
-        for future in as_completed(future_to_index):
-            index = future_to_index[future]
+    results = []
+    try:
+        while calls.has_pending():
+            index, future = calls.next_completed()
             try:
                 results.append((index, future.result()))
             except Exception as e:
@@ -221,6 +408,8 @@ def run_functions_tuples_in_parallel(
 
                 if not allow_failures:
                     raise
+    finally:
+        calls.close()
 
     results.sort(key=lambda x: x[0])
     return [result for index, result in results]
@@ -247,6 +436,7 @@ class FunctionCall(Generic[R]):
 def run_functions_in_parallel(
     function_calls: list[FunctionCall],
     allow_failures: bool = False,
+    pool: ThreadPoolName = ThreadPoolName.DEFAULT,
 ) -> dict[str, Any]:
     """
     Executes a list of FunctionCalls in parallel and stores the results in a dictionary where the keys
@@ -257,16 +447,13 @@ def run_functions_in_parallel(
     if len(function_calls) == 0:
         return results
 
-    with ThreadPoolExecutor(max_workers=len(function_calls)) as executor:
-        future_to_id = {
-            executor.submit(
-                contextvars.copy_context().run, func_call.execute
-            ): func_call.result_id
-            for func_call in function_calls
-        }
+    calls: _PooledCalls[str, Any] = _PooledCalls(pool, len(function_calls))
+    for func_call in function_calls:
+        calls.add(func_call.result_id, func_call.execute)
 
-        for future in as_completed(future_to_id):
-            result_id = future_to_id[future]
+    try:
+        while calls.has_pending():
+            result_id, future = calls.next_completed()
             try:
                 results[result_id] = future.result()
             except Exception as e:
@@ -275,6 +462,8 @@ def run_functions_in_parallel(
 
                 if not allow_failures:
                     raise
+    finally:
+        calls.close()
 
     return results
 
@@ -353,11 +542,11 @@ def wait_on_background(task: TimeoutThread[R]) -> R:
     return task.result
 
 
-def _next_or_none(ind: int, gen: Iterator[R]) -> tuple[int, R | None]:
-    return ind, next(gen, None)
-
-
-def parallel_yield(gens: list[Iterator[R]], max_workers: int = 10) -> Iterator[R]:
+def parallel_yield(
+    gens: list[Iterator[R]],
+    max_workers: int = 10,
+    pool: ThreadPoolName = ThreadPoolName.DEFAULT,
+) -> Iterator[R]:
     """
     Runs the list of generators with thread-level parallelism, yielding
     results as available. The asynchronous nature of this yielding means
@@ -366,29 +555,25 @@ def parallel_yield(gens: list[Iterator[R]], max_workers: int = 10) -> Iterator[R
     if you are consuming all elements from the generators OR it is acceptable
     for some extra generator code to run and not have the result(s) yielded.
     """
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_index: dict[Future[tuple[int, R | None]], int] = {
-            executor.submit(_next_or_none, ind, gen): ind
-            for ind, gen in enumerate(gens)
-        }
-
-        next_ind = len(gens)
-        while future_to_index:
-            done, _ = wait(future_to_index, return_when=FIRST_COMPLETED)
-            for future in done:
-                ind, result = future.result()
-                if result is not None:
-                    yield result
-                    future_to_index[executor.submit(_next_or_none, ind, gens[ind])] = (
-                        next_ind
-                    )
-                    next_ind += 1
-                del future_to_index[future]
+    calls: _PooledCalls[int, R | None] = _PooledCalls(pool, max_workers)
+    for ind, gen in enumerate(gens):
+        calls.add(ind, partial(next, gen, None))
+
+    try:
+        while calls.has_pending():
+            ind, future = calls.next_completed()
+            result = future.result()
+            if result is not None:
+                yield result
+                calls.add(ind, partial(next, gens[ind], None))
+    finally:
+        calls.close()
 
 
 def parallel_yield_from_funcs(
     funcs: list[Callable[..., R]],
     max_workers: int = 10,
+    pool: ThreadPoolName = ThreadPoolName.DEFAULT,
 ) -> Iterator[R]:
     """
     Runs the list of functions with thread-level parallelism, yielding
@@ -403,5 +588,5 @@ def parallel_yield_from_funcs(
         yield func()
 
     yield from parallel_yield(
-        [func_wrapper(func) for func in funcs], max_workers=max_workers
+        [func_wrapper(func) for func in funcs], max_workers=max_workers, pool=pool
     )
@@ -80,6 +80,26 @@ OPENAI_EMBEDDING_TIMEOUT = int(
     os.environ.get("OPENAI_EMBEDDING_TIMEOUT", API_BASED_EMBEDDING_TIMEOUT)
 )
 
+# Concurrent embedding requests for the same local model are coalesced into a single
+# forward pass of at most this many texts (a single larger request still runs as is)
+LOCAL_EMBEDDING_MAX_BATCH_SIZE = int(
+    os.environ.get("LOCAL_EMBEDDING_MAX_BATCH_SIZE") or 128
+)
+# How long the first request of a local embedding batch waits for others to join it
+LOCAL_EMBEDDING_BATCH_MAX_WAIT_MS = float(
+    os.environ.get("LOCAL_EMBEDDING_BATCH_MAX_WAIT_MS") or 5
+)
+
+# Max number of live API-based embedding clients (one per provider / api key / url /
+# version) the model server keeps around for reuse across requests
+CLOUD_EMBEDDING_CLIENT_CACHE_SIZE = int(
+    os.environ.get("CLOUD_EMBEDDING_CLIENT_CACHE_SIZE") or 32
+)
+# Cached API-based embedding clients unused for this many seconds are closed
+CLOUD_EMBEDDING_CLIENT_IDLE_TIMEOUT = float(
+    os.environ.get("CLOUD_EMBEDDING_CLIENT_IDLE_TIMEOUT") or 300
+)
+
 # Whether or not to strictly enforce token limit for chunking.
 STRICT_CHUNK_TOKEN_LIMIT = (
     os.environ.get("STRICT_CHUNK_TOKEN_LIMIT", "").lower() == "true"
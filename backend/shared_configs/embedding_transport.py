@@ -0,0 +1,92 @@
+import struct
+from collections.abc import Sequence
+
+import numpy as np
+
+from shared_configs.enums import EmbeddingTransport
+from shared_configs.model_server_models import Embedding
+
+# Binary embeddings are sent as a header of two little-endian uint32s
+# (number of embeddings, embedding dimension) followed by the row-major vectors
+EMBEDDINGS_BINARY_MEDIA_TYPE = "application/vnd.onyx.embeddings"
+_HEADER = struct.Struct("<II")
+
+_TRANSPORT_TO_DTYPE: dict[EmbeddingTransport, np.dtype] = {
+    EmbeddingTransport.FLOAT32: np.dtype("<f4"),
+    EmbeddingTransport.FLOAT16: np.dtype("<f2"),
+}
+
+
+def embeddings_media_type(transport: EmbeddingTransport) -> str:
+    if transport == EmbeddingTransport.JSON:
+        return "application/json"
+    return f"{EMBEDDINGS_BINARY_MEDIA_TYPE}; dtype={transport.value}"
+
+
+def parse_embeddings_media_type(media_type: str | None) -> EmbeddingTransport:
+    """Returns the binary transport described by an Accept / Content-Type header,
+    or JSON if the header does not ask for (or contain) binary embeddings."""
+    if not media_type:
+        return EmbeddingTransport.JSON
+
+    for media_range in media_type.split(","):
+        main_type, *params = [part.strip() for part in media_range.split(";")]
+        if main_type.lower() != EMBEDDINGS_BINARY_MEDIA_TYPE:
+            continue
+
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() != "dtype":
+                continue
+            try:
+                transport = EmbeddingTransport(value.strip().lower())
+            except ValueError:
+                continue
+            if transport in _TRANSPORT_TO_DTYPE:
+                return transport
+
+    return EmbeddingTransport.JSON
+
+
+def encode_embeddings(
+    embeddings: Sequence[Sequence[float]] | np.ndarray,
+    transport: EmbeddingTransport,
+) -> bytes:
+    dtype = _TRANSPORT_TO_DTYPE[transport]
+    vectors = np.asarray(embeddings, dtype=dtype)
+    if vectors.ndim != 2:
+        raise ValueError(
+            f"Expected a 2D array of embeddings, got shape {vectors.shape}"
+        )
+
+    num_embeddings, dim = vectors.shape
+    return _HEADER.pack(num_embeddings, dim) + np.ascontiguousarray(vectors).tobytes()
+
+
+def decode_embeddings_array(
+    payload: bytes, transport: EmbeddingTransport
+) -> np.ndarray:
+    dtype = _TRANSPORT_TO_DTYPE[transport]
+    if len(payload) < _HEADER.size:
+        raise ValueError("Binary embeddings payload is missing its header")
+
+    num_embeddings, dim = _HEADER.unpack_from(payload)
+    expected_size = _HEADER.size + num_embeddings * dim * dtype.itemsize
+    if len(payload) != expected_size:
+        raise ValueError(
+            f"Binary embeddings payload has {len(payload)} bytes, "
+            f"expected {expected_size} for {num_embeddings}x{dim} {transport.value}"
+        )
+
+    return np.frombuffer(
+        payload, dtype=dtype, count=num_embeddings * dim, offset=_HEADER.size
+    ).reshape(num_embeddings, dim)
+
+
+def decode_embeddings(payload: bytes, transport: EmbeddingTransport) -> list[Embedding]:
+    # always hand float32 -> python floats to callers, regardless of the wire precision
+    return (
+        decode_embeddings_array(payload, transport)
+        .astype(np.float32, copy=False)
+        .tolist()
+    )
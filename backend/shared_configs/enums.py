@@ -19,3 +19,12 @@ class RerankerProvider(str, Enum):
 class EmbedTextType(str, Enum):
     QUERY = "query"
     PASSAGE = "passage"
+
+
+class EmbeddingTransport(str, Enum):
+    """Wire format of embeddings returned by the model server"""
+
+    JSON = "json"
+    # raw little-endian buffers, see shared_configs/embedding_transport.py
+    FLOAT32 = "float32"
+    FLOAT16 = "float16"
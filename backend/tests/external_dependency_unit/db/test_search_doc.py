@@ -0,0 +1,56 @@
+from datetime import datetime
+from datetime import timezone
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from onyx.configs.constants import DocumentSource
+from onyx.context.search.models import SearchDoc as ServerSearchDoc
+from onyx.db.chat import create_db_search_docs
+from onyx.db.chat import translate_db_search_doc_to_server_search_doc
+from onyx.db.models import SearchDoc
+
+
+def _server_search_doc(ind: int) -> ServerSearchDoc:
+    return ServerSearchDoc(
+        document_id=f"search_doc_test_{ind}",
+        chunk_ind=ind,
+        semantic_identifier=f"Document {ind}",
+        link=f"https://example.com/{ind}" if ind % 2 else None,
+        blurb=f"blurb {ind}",
+        source_type=DocumentSource.WEB,
+        boost=ind,
+        hidden=False,
+        metadata={"tags": ["a", "b"], "author": "someone"},
+        score=None if ind % 3 == 0 else float(ind),
+        match_highlights=[f"highlight {ind}"],
+        updated_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        primary_owners=["owner"],
+        secondary_owners=None,
+        is_internet=False,
+    )
+
+
+def test_create_db_search_docs(db_session: Session, tenant_context: None) -> None:
+    server_search_docs = [_server_search_doc(ind) for ind in range(25)]
+
+    db_search_docs = create_db_search_docs(server_search_docs, db_session)
+    try:
+        assert len({doc.id for doc in db_search_docs}) == len(server_search_docs)
+        for server_search_doc, db_search_doc in zip(server_search_docs, db_search_docs):
+            db_session.expire(db_search_doc)
+            translated = translate_db_search_doc_to_server_search_doc(db_search_doc)
+            assert translated.document_id == server_search_doc.document_id
+            assert translated.link == server_search_doc.link
+            assert translated.metadata == server_search_doc.metadata
+            assert translated.score == (server_search_doc.score or 0.0)
+            assert translated.match_highlights == server_search_doc.match_highlights
+
+        assert create_db_search_docs([], db_session) == []
+    finally:
+        db_session.execute(
+            delete(SearchDoc).where(
+                SearchDoc.id.in_([doc.id for doc in db_search_docs])
+            )
+        )
+        db_session.commit()
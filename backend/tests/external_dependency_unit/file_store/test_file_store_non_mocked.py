@@ -5,6 +5,7 @@ from collections.abc import Generator
 from concurrent.futures import as_completed
 from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
+from io import StringIO
 from typing import Any
 from typing import cast
 from typing import Dict
@@ -493,6 +494,70 @@ class TestS3BackedFileStore:
         assert len(read_content) == content_size
         assert read_content == content
 
+    def test_multipart_upload_and_streaming_read(
+        self, file_store: S3BackedFileStore
+    ) -> None:
+        """Test that files above the multipart threshold are uploaded in parts and
+        can be read back both spooled and as a stream"""
+        part_size = 5 * 1024 * 1024  # S3 minimum part size
+        multipart_store = S3BackedFileStore(
+            bucket_name=file_store._bucket_name,
+            aws_access_key_id=file_store._aws_access_key_id,
+            aws_secret_access_key=file_store._aws_secret_access_key,
+            aws_region_name=file_store._aws_region_name,
+            s3_endpoint_url=file_store._s3_endpoint_url,
+            s3_prefix=file_store._s3_prefix,
+            s3_verify_ssl=file_store._s3_verify_ssl,
+            multipart_threshold=part_size,
+            multipart_chunk_size=part_size,
+            multipart_max_concurrency=2,
+            read_spool_max_bytes=1024 * 1024,
+        )
+
+        file_id = f"{uuid.uuid4()}.bin"
+        content = os.urandom(2 * part_size + 1024)
+        multipart_store.save_file(
+            content=BytesIO(content),
+            display_name="Test Multipart File",
+            file_origin=FileOrigin.CONNECTOR,
+            file_type="application/octet-stream",
+            file_id=file_id,
+        )
+
+        # multipart uploads get an etag of the form "<md5 of part md5s>-<num parts>"
+        file_record = multipart_store.read_file_record(file_id)
+        head = multipart_store._get_s3_client().head_object(
+            Bucket=file_record.bucket_name, Key=file_record.object_key
+        )
+        assert head["ETag"].strip('"').endswith("-3")
+        assert head["ContentLength"] == len(content)
+
+        assert multipart_store.read_file(file_id).read() == content
+
+        stream = multipart_store.read_file_stream(file_id)
+        try:
+            chunks = []
+            while chunk := stream.read(1024 * 1024):
+                chunks.append(chunk)
+        finally:
+            stream.close()
+        assert b"".join(chunks) == content
+
+        # text content is encoded while streaming
+        text_file_id = f"{uuid.uuid4()}.txt"
+        text_content = "onyx \u00e9\n" * (part_size // 4)
+        multipart_store.save_file(
+            content=StringIO(text_content),
+            display_name="Test Multipart Text File",
+            file_origin=FileOrigin.OTHER,
+            file_type="text/plain",
+            file_id=text_file_id,
+        )
+        assert (
+            multipart_store.read_file(text_file_id).read().decode("utf-8")
+            == text_content
+        )
+
     def test_error_handling_nonexistent_file(
         self, file_store: S3BackedFileStore
     ) -> None:
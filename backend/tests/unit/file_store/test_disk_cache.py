@@ -0,0 +1,169 @@
+import os
+from datetime import datetime
+from datetime import timezone
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.configs.constants import FileOrigin
+from onyx.db.file_record import upsert_filerecord
+from onyx.db.models import FileRecord
+from onyx.file_store.disk_cache import DiskCachedFileStore
+from onyx.file_store.file_store import get_default_file_store
+
+
+def _s3_file_store() -> Any:
+    files: dict[str, bytes] = {}
+    records: dict[str, MagicMock] = {}
+
+    def put(file_id: str, data: bytes, updated_at: datetime) -> None:
+        files[file_id] = data
+        records[file_id] = MagicMock(
+            file_id=file_id,
+            bucket_name="bucket",
+            object_key=f"onyx-files/{file_id}",
+            updated_at=updated_at,
+        )
+
+    file_store = MagicMock()
+    file_store.put = put
+    file_store.read_file_record.side_effect = lambda file_id, **kwargs: records[file_id]
+    file_store.read_file_stream.side_effect = lambda file_id, **kwargs: BytesIO(
+        files[file_id]
+    )
+    return file_store
+
+
+def _read(cache: DiskCachedFileStore, file_id: str) -> bytes:
+    file_io = cache.read_file(file_id, db_session=MagicMock())
+    try:
+        return file_io.read()
+    finally:
+        file_io.close()
+
+
+def test_read_through_and_versioning(tmp_path: Path) -> None:
+    s3_file_store = _s3_file_store()
+    cache = DiskCachedFileStore(s3_file_store, str(tmp_path))
+
+    s3_file_store.put("a", b"first", datetime(2024, 1, 1, tzinfo=timezone.utc))
+    assert _read(cache, "a") == b"first"
+    assert _read(cache, "a") == b"first"
+    assert s3_file_store.read_file_stream.call_count == 1
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    # an overwritten file has a new version and replaces the cached one
+    s3_file_store.put("a", b"second", datetime(2024, 1, 2, tzinfo=timezone.utc))
+    assert _read(cache, "a") == b"second"
+    assert s3_file_store.read_file_stream.call_count == 2
+    cached_files = [files for _, _, files in os.walk(tmp_path / "entries") if files]
+    assert len(cached_files) == 1 and len(cached_files[0]) == 1
+
+    # empty files can't be memory mapped but are still cached
+    s3_file_store.put("empty", b"", datetime(2024, 1, 1, tzinfo=timezone.utc))
+    assert _read(cache, "empty") == b""
+    assert _read(cache, "empty") == b""
+    assert cache.stats.hits == 2
+
+    cache.delete_file("a")
+    assert _read(cache, "a") == b"second"
+    assert s3_file_store.read_file_stream.call_count == 4
+
+
+def test_lru_eviction_and_large_files(tmp_path: Path) -> None:
+    s3_file_store = _s3_file_store()
+    cache = DiskCachedFileStore(
+        s3_file_store, str(tmp_path), max_bytes=250, max_file_bytes=200
+    )
+    for file_id in ("a", "b", "c"):
+        s3_file_store.put(file_id, file_id.encode() * 100, datetime.now(timezone.utc))
+
+    assert _read(cache, "a") == b"a" * 100
+    assert _read(cache, "b") == b"b" * 100
+    # make "b" the least recently used entry
+    os.utime(cache._get_entry_path(s3_file_store.read_file_record("b")), (0, 0))
+    assert _read(cache, "a") == b"a" * 100
+
+    assert _read(cache, "c") == b"c" * 100
+    assert cache.stats.evictions == 1
+    assert _read(cache, "c") == b"c" * 100
+    assert _read(cache, "a") == b"a" * 100
+    assert (cache.stats.hits, cache.stats.misses) == (3, 3)
+
+    # larger files are returned but never cached
+    s3_file_store.put("large", b"x" * 300, datetime.now(timezone.utc))
+    file_io = cache.read_file("large", db_session=MagicMock())
+    file_io.seek(-10, os.SEEK_END)
+    assert file_io.read() == b"x" * 10
+    file_io.close()
+    assert _read(cache, "large") == b"x" * 300
+    assert cache.stats.misses == 5
+    assert os.listdir(tmp_path / "tmp") == []
+
+
+def test_inserts_keep_a_running_total(tmp_path: Path) -> None:
+    s3_file_store = _s3_file_store()
+    cache = DiskCachedFileStore(s3_file_store, str(tmp_path), max_bytes=1000)
+    for file_id in ("a", "b", "c"):
+        s3_file_store.put(file_id, file_id.encode() * 100, datetime.now(timezone.utc))
+
+    with patch.object(cache, "_evict_locked", wraps=cache._evict_locked) as mock_evict:
+        for file_id in ("a", "b", "c"):
+            _read(cache, file_id)
+        # only the first insert of the process walks the cache
+        assert mock_evict.call_count == 1
+        assert (tmp_path / ".size").read_text() == "300"
+
+        # replacing a version and invalidating update the total
+        s3_file_store.put("a", b"a" * 50, datetime.now(timezone.utc))
+        _read(cache, "a")
+        assert (tmp_path / ".size").read_text() == "250"
+        cache.delete_file("b")
+        assert (tmp_path / ".size").read_text() == "150"
+
+        # the cache is walked again once it may be over budget
+        s3_file_store.put("d", b"d" * 900, datetime.now(timezone.utc))
+        _read(cache, "d")
+        assert mock_evict.call_count == 2
+    # "c" is the least recently used entry
+    assert cache.stats.evictions == 1
+    assert (tmp_path / ".size").read_text() == "950"
+
+
+def test_resave_bumps_file_record_version() -> None:
+    file_record = FileRecord(
+        file_id="a",
+        bucket_name="bucket",
+        object_key="onyx-files/a",
+        updated_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+    db_session = MagicMock()
+    db_session.query.return_value.filter_by.return_value.first.return_value = (
+        file_record
+    )
+
+    # saving the same file again changes nothing but the content in S3
+    upsert_filerecord(
+        file_id="a",
+        display_name="a",
+        file_origin=FileOrigin.OTHER,
+        file_type="text/plain",
+        bucket_name="bucket",
+        object_key="onyx-files/a",
+        db_session=db_session,
+    )
+
+    assert file_record.updated_at != datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def test_default_file_store_shares_the_disk_cache(tmp_path: Path) -> None:
+    with (
+        patch("onyx.file_store.file_store.FILE_STORE_DISK_CACHE_DIR", str(tmp_path)),
+        patch("onyx.file_store.file_store.get_s3_file_store"),
+        patch("onyx.file_store.file_store._disk_cached_file_store", None),
+    ):
+        file_store = get_default_file_store()
+        assert isinstance(file_store, DiskCachedFileStore)
+        assert get_default_file_store() is file_store
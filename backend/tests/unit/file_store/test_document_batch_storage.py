@@ -0,0 +1,113 @@
+from datetime import datetime
+from datetime import timezone
+from io import BytesIO
+from typing import Any
+from typing import IO
+from unittest.mock import MagicMock
+
+import pytest
+
+from onyx.configs.constants import DocumentSource
+from onyx.configs.constants import FileOrigin
+from onyx.connectors.models import BasicExpertInfo
+from onyx.connectors.models import Document
+from onyx.connectors.models import ImageSection
+from onyx.connectors.models import TextSection
+from onyx.db.file_record import FileRecordNotFoundError
+from onyx.file_store.document_batch_storage import encode_compact_document_batch
+from onyx.file_store.document_batch_storage import FileStoreDocumentBatchStorage
+from onyx.file_store.document_batch_storage import iter_compact_document_batch
+
+
+def _make_documents(count: int) -> list[Document]:
+    return [
+        Document(
+            id=f"doc_{i}",
+            source=DocumentSource.GOOGLE_DRIVE,
+            semantic_identifier=f"Document {i}",
+            sections=[
+                TextSection(text=f"text of document {i}", link=f"https://doc/{i}"),
+                ImageSection(image_file_id=f"image_{i}", link=None),
+            ],
+            metadata={"tag": ["a", "b"], "owner": "someone"},
+            doc_updated_at=datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc),
+            primary_owners=[BasicExpertInfo(email=f"owner{i}@example.com")],
+        )
+        for i in range(count)
+    ]
+
+
+def _in_memory_file_store() -> Any:
+    files: dict[str, tuple[bytes, str]] = {}
+
+    def save_file(content: IO, file_type: str, file_id: str, **kwargs: Any) -> str:
+        data = content.read()
+        files[file_id] = (data.encode() if isinstance(data, str) else data, file_type)
+        return file_id
+
+    def has_file(file_id: str, file_origin: FileOrigin, file_type: str) -> bool:
+        return file_id in files and files[file_id][1] == file_type
+
+    def change_file_id(old_file_id: str, new_file_id: str) -> None:
+        files[new_file_id] = files.pop(old_file_id)
+
+    def read_file_stream(file_id: str) -> IO[bytes]:
+        if file_id not in files:
+            raise FileRecordNotFoundError(file_id)
+        return BytesIO(files[file_id][0])
+
+    file_store = MagicMock()
+    file_store.files = files
+    file_store.save_file.side_effect = save_file
+    file_store.has_file.side_effect = has_file
+    file_store.read_file_stream.side_effect = read_file_stream
+    file_store.delete_file.side_effect = lambda file_id: files.pop(file_id)
+    file_store.change_file_id.side_effect = change_file_id
+    return file_store
+
+
+def test_compact_batch_round_trip() -> None:
+    documents = _make_documents(5)
+    encoded = encode_compact_document_batch(documents)
+
+    assert list(iter_compact_document_batch(BytesIO(encoded))) == documents
+    assert encode_compact_document_batch([]) != b""
+    assert (
+        list(iter_compact_document_batch(BytesIO(encode_compact_document_batch([]))))
+        == []
+    )
+
+
+def test_compact_batch_rejects_truncated_batches() -> None:
+    encoded = encode_compact_document_batch(_make_documents(50))
+    with pytest.raises(Exception):
+        list(iter_compact_document_batch(BytesIO(encoded[: len(encoded) // 2])))
+
+
+def test_storage_reads_both_formats() -> None:
+    file_store = _in_memory_file_store()
+    documents = _make_documents(3)
+
+    legacy_storage = FileStoreDocumentBatchStorage(
+        1, 10, file_store, compact_format=False
+    )
+    legacy_storage.store_batch(0, documents)
+    storage = FileStoreDocumentBatchStorage(1, 10, file_store, compact_format=True)
+    storage.store_batch(1, documents)
+
+    assert set(file_store.files) == {"iab/1/10/0.json", "iab/1/10/1.msgpack.zst"}
+    assert storage.get_batch(0) == documents
+    assert storage.get_batch(1) == documents
+    assert storage.get_batch(2) is None
+    # batches are read without checking which format exists first
+    file_store.has_file.assert_not_called()
+
+    # batches keep their format when moved to a new index attempt
+    new_storage = FileStoreDocumentBatchStorage(1, 11, file_store, compact_format=True)
+    new_storage.update_old_batches_to_new_index_attempt(sorted(file_store.files))
+    assert set(file_store.files) == {"iab/1/11/0.json", "iab/1/11/1.msgpack.zst"}
+    assert new_storage.get_batch(0) == documents
+
+    new_storage.delete_batch_by_num(0)
+    new_storage.delete_batch_by_num(1)
+    assert file_store.files == {}
@@ -7,17 +7,29 @@ from unittest.mock import AsyncMock
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
+import numpy as np
 import pytest
+from fastapi import Response
 from httpx import AsyncClient
 from litellm.exceptions import RateLimitError
 
+from model_server.encoders import close_cloud_embedding_clients
+from model_server.encoders import close_local_embedding_batchers
 from model_server.encoders import CloudEmbedding
+from model_server.encoders import CloudEmbeddingClientCache
 from model_server.encoders import embed_text
 from model_server.encoders import local_rerank
+from model_server.encoders import LocalEmbeddingBatcher
 from model_server.encoders import process_embed_request
+from shared_configs.embedding_transport import decode_embeddings
+from shared_configs.embedding_transport import embeddings_media_type
+from shared_configs.embedding_transport import encode_embeddings
+from shared_configs.embedding_transport import parse_embeddings_media_type
 from shared_configs.enums import EmbeddingProvider
+from shared_configs.enums import EmbeddingTransport
 from shared_configs.enums import EmbedTextType
 from shared_configs.model_server_models import EmbedRequest
+from shared_configs.model_server_models import EmbedResponse
 
 
 @pytest.fixture
@@ -50,6 +62,77 @@ async def test_cloud_embedding_explicit_close() -> None:
     assert embedding._closed
 
 
+@pytest.mark.asyncio
+async def test_cloud_embedding_client_cache_reuses_clients() -> None:
+    cache = CloudEmbeddingClientCache(max_size=4, idle_timeout=60)
+
+    async with cache.acquire("key-1", EmbeddingProvider.OPENAI) as first:
+        pass
+    async with cache.acquire("key-1", EmbeddingProvider.OPENAI) as second:
+        pass
+    async with cache.acquire("key-2", EmbeddingProvider.OPENAI) as other_key:
+        pass
+    async with cache.acquire(
+        "key-1", EmbeddingProvider.AZURE, api_url="https://azure", api_version="v1"
+    ) as other_provider:
+        pass
+
+    assert first is second
+    assert not first._closed
+    assert other_key is not first
+    assert other_provider is not first
+    assert len(cache) == 3
+
+    await cache.aclose()
+    assert first._closed and other_key._closed and other_provider._closed
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_cloud_embedding_client_cache_evicts_lru_and_idle() -> None:
+    cache = CloudEmbeddingClientCache(max_size=2, idle_timeout=60)
+
+    async with cache.acquire("key-1", EmbeddingProvider.OPENAI) as client_1:
+        pass
+    async with cache.acquire("key-2", EmbeddingProvider.OPENAI) as client_2:
+        pass
+    async with cache.acquire("key-1", EmbeddingProvider.OPENAI):
+        pass
+    # key-2 is now the least recently used client
+    async with cache.acquire("key-3", EmbeddingProvider.OPENAI) as client_3:
+        pass
+
+    assert client_2._closed
+    assert not client_1._closed
+    assert len(cache) == 2
+
+    cache.idle_timeout = 0
+    time.sleep(0.01)
+    async with cache.acquire("key-1", EmbeddingProvider.OPENAI) as fresh_client_1:
+        pass
+
+    assert client_3._closed
+    # the requested client is never evicted out from under the caller
+    assert fresh_client_1 is client_1
+    assert not client_1._closed
+
+    await cache.aclose()
+
+
+@pytest.mark.asyncio
+async def test_cloud_embedding_client_cache_defers_close_while_in_use() -> None:
+    cache = CloudEmbeddingClientCache(max_size=1, idle_timeout=60)
+
+    async with cache.acquire("key-1", EmbeddingProvider.OPENAI) as in_use:
+        async with cache.acquire("key-2", EmbeddingProvider.OPENAI):
+            pass
+        # evicted by key-2, but still in use
+        assert not in_use._closed
+    assert in_use._closed
+
+    await cache.aclose()
+
+
 @pytest.mark.asyncio
 async def test_openai_embedding(
     mock_http_client: AsyncMock, sample_embeddings: List[List[float]]
@@ -62,10 +145,10 @@ async def test_openai_embedding(
         mock_response.data = [MagicMock(embedding=emb) for emb in sample_embeddings]
         mock_client.embeddings.create = AsyncMock(return_value=mock_response)
 
-        embedding = CloudEmbedding("fake-key", EmbeddingProvider.OPENAI)
-        result = await embedding._embed_openai(
-            ["test1", "test2"], "text-embedding-ada-002", None
-        )
+        async with CloudEmbedding("fake-key", EmbeddingProvider.OPENAI) as embedding:
+            result = await embedding._embed_openai(
+                ["test1", "test2"], "text-embedding-ada-002", None
+            )
 
         assert result == sample_embeddings
         mock_client.embeddings.create.assert_called_once()
@@ -95,6 +178,8 @@ async def test_embed_text_cloud_provider() -> None:
         assert result == [[0.1, 0.2], [0.3, 0.4]]
         mock_embed.assert_called_once()
 
+    await close_cloud_embedding_clients()
+
 
 @pytest.mark.asyncio
 async def test_embed_text_local_model() -> None:
@@ -121,6 +206,8 @@ async def test_embed_text_local_model() -> None:
         assert result == [[0.1, 0.2], [0.3, 0.4]]
         mock_model.encode.assert_called_once()
 
+    await close_local_embedding_batchers()
+
 
 @pytest.mark.asyncio
 async def test_local_rerank() -> None:
@@ -162,12 +249,52 @@ async def test_rate_limit_handling() -> None:
                 reduced_dimension=None,
             )
 
+    await close_cloud_embedding_clients()
+
+
+@pytest.mark.asyncio
+async def test_vertex_embedding_reuses_model_client() -> None:
+    service_account_info = '{"project_id": "fake-project"}'
+    with (
+        patch(
+            "model_server.encoders.service_account.Credentials.from_service_account_info"
+        ) as mock_credentials,
+        patch("model_server.encoders.vertexai.init") as mock_init,
+        patch(
+            "model_server.encoders.TextEmbeddingModel.from_pretrained"
+        ) as mock_from_pretrained,
+    ):
+        mock_model = MagicMock()
+        mock_model.get_embeddings_async = AsyncMock(
+            side_effect=lambda batch, auto_truncate: [
+                MagicMock(values=[0.1, 0.2]) for _ in batch
+            ]
+        )
+        mock_from_pretrained.return_value = mock_model
+
+        async with CloudEmbedding(
+            service_account_info, EmbeddingProvider.GOOGLE
+        ) as embedding:
+            for _ in range(2):
+                result = await embedding._embed_vertex(
+                    ["test1", "test2"], "text-embedding-005", "RETRIEVAL_QUERY"
+                )
+                assert result == [[0.1, 0.2], [0.1, 0.2]]
+
+    mock_credentials.assert_called_once_with({"project_id": "fake-project"})
+    mock_from_pretrained.assert_called_once_with("text-embedding-005")
+    assert mock_init.call_count == 2
+    assert mock_init.call_args.kwargs["project"] == "fake-project"
+
 
 @pytest.mark.asyncio
 async def test_concurrent_embeddings() -> None:
-    def mock_encode(*args: Any, **kwargs: Any) -> List[List[float]]:
+    encode_calls: list[list[str]] = []
+
+    def mock_encode(texts: list[str], **kwargs: Any) -> List[List[float]]:
+        encode_calls.append(texts)
         time.sleep(5)
-        return [[0.1, 0.2, 0.3]]
+        return [[0.1, 0.2, 0.3] for _ in texts]
 
     test_req = EmbedRequest(
         texts=["test"],
@@ -192,11 +319,139 @@ async def test_concurrent_embeddings() -> None:
         start_time = time.time()
 
         tasks = [process_embed_request(test_req) for _ in range(5)]
-        await asyncio.gather(*tasks)
+        responses = await asyncio.gather(*tasks)
 
         end_time = time.time()
 
-        # 5 * 5 seconds = 25 seconds, this test ensures that the embeddings are at least yielding the thread
-        # However, the developer may still introduce unnecessary blocking above the mock and this test will
-        # still pass as long as it's less than (7 - 5) / 5 seconds
+        # 5 * 5 seconds = 25 seconds, this test ensures that concurrent requests are
+        # coalesced into a single forward pass without blocking the event loop
         assert end_time - start_time < 7
+        assert len(encode_calls) == 1
+        assert len(encode_calls[0]) == 5
+        for response in responses:
+            assert isinstance(response, EmbedResponse)
+            assert response.embeddings == [[0.1, 0.2, 0.3]]
+
+    await close_local_embedding_batchers()
+
+
+@pytest.mark.asyncio
+async def test_local_embedding_batcher_respects_batch_size_and_settings() -> None:
+    encode_calls: list[tuple[list[str], bool]] = []
+
+    def mock_encode(texts: list[str], normalize_embeddings: bool) -> np.ndarray:
+        encode_calls.append((texts, normalize_embeddings))
+        return np.array([[float(text.split("-")[1])] for text in texts])
+
+    batcher = LocalEmbeddingBatcher("fake-local-model", max_batch_size=4, max_wait=0.01)
+    with patch("model_server.encoders.get_embedding_model") as mock_get_model:
+        mock_model = MagicMock()
+        mock_model.encode = mock_encode
+        mock_get_model.return_value = mock_model
+
+        results = await asyncio.gather(
+            batcher.embed(["a-0", "a-1"], True, 512),
+            batcher.embed(["b-2"], True, 512),
+            batcher.embed(["c-3", "c-4"], True, 512),
+            batcher.embed(["d-5"], False, 512),
+        )
+
+    assert [result.tolist() for result in results] == [
+        [[0.0], [1.0]],
+        [[2.0]],
+        [[3.0], [4.0]],
+        [[5.0]],
+    ]
+    # no forward pass grows past the max batch size or mixes encode settings
+    assert all(len(texts) <= 4 for texts, _ in encode_calls)
+    assert (["a-0", "a-1", "b-2"], True) in encode_calls
+    assert (["d-5"], False) in encode_calls
+
+    await batcher.aclose()
+
+
+@pytest.mark.asyncio
+async def test_local_embedding_batcher_propagates_errors() -> None:
+    batcher = LocalEmbeddingBatcher("fake-local-model", max_wait=0.01)
+    with patch("model_server.encoders.get_embedding_model") as mock_get_model:
+        mock_model = MagicMock()
+        mock_model.encode.side_effect = RuntimeError("boom")
+        mock_get_model.return_value = mock_model
+
+        results = await asyncio.gather(
+            batcher.embed(["a"], True, 512),
+            batcher.embed(["b"], True, 512),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+        # the batcher keeps serving requests after a failed batch
+        mock_model.encode.side_effect = None
+        mock_model.encode.return_value = np.array([[1.0]])
+        assert (await batcher.embed(["c"], True, 512)).tolist() == [[1.0]]
+
+    await batcher.aclose()
+
+
+@pytest.mark.parametrize(
+    "transport,tolerance",
+    [(EmbeddingTransport.FLOAT32, 1e-7), (EmbeddingTransport.FLOAT16, 1e-3)],
+)
+def test_binary_embeddings_round_trip(
+    transport: EmbeddingTransport, tolerance: float
+) -> None:
+    embeddings = np.random.default_rng(0).uniform(-1, 1, size=(3, 16))
+
+    payload = encode_embeddings(embeddings, transport)
+    decoded = decode_embeddings(payload, transport)
+
+    assert np.allclose(np.array(decoded), embeddings, atol=tolerance)
+    assert parse_embeddings_media_type(embeddings_media_type(transport)) == transport
+
+    with pytest.raises(ValueError):
+        decode_embeddings(payload[:-1], transport)
+
+
+def test_parse_embeddings_media_type_falls_back_to_json() -> None:
+    assert parse_embeddings_media_type(None) == EmbeddingTransport.JSON
+    assert parse_embeddings_media_type("application/json") == EmbeddingTransport.JSON
+    assert (
+        parse_embeddings_media_type("application/vnd.onyx.embeddings; dtype=int8")
+        == EmbeddingTransport.JSON
+    )
+    assert (
+        parse_embeddings_media_type(
+            "application/json, application/vnd.onyx.embeddings; dtype=float16"
+        )
+        == EmbeddingTransport.FLOAT16
+    )
+
+
+@pytest.mark.asyncio
+async def test_process_embed_request_binary_transport() -> None:
+    test_req = EmbedRequest(
+        texts=["test1", "test2"],
+        model_name="fake-local-model",
+        max_context_length=512,
+        normalize_embeddings=True,
+        text_type=EmbedTextType.QUERY,
+    )
+
+    with patch("model_server.encoders.get_embedding_model") as mock_get_model:
+        mock_model = MagicMock()
+        mock_model.encode.return_value = np.array([[0.1, 0.2], [0.3, 0.4]])
+        mock_get_model.return_value = mock_model
+
+        response = await process_embed_request(
+            test_req, transport=EmbeddingTransport.FLOAT32
+        )
+        await close_local_embedding_batchers()
+
+    assert isinstance(response, Response)
+    assert parse_embeddings_media_type(response.media_type) == (
+        EmbeddingTransport.FLOAT32
+    )
+    assert np.allclose(
+        decode_embeddings(response.body, EmbeddingTransport.FLOAT32),
+        [[0.1, 0.2], [0.3, 0.4]],
+    )
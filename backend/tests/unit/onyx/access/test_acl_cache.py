@@ -0,0 +1,92 @@
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+from uuid import uuid4
+
+from onyx.access.acl_cache import bump_user_acl_version
+from onyx.access.acl_cache import get_cached_user_acl
+from onyx.access.acl_cache import UserAcl
+from onyx.access.acl_cache import UserAclCache
+
+
+def _redis_client() -> Any:
+    redis_store: dict[str, bytes] = {}
+
+    def _set(key: str, value: str, nx: bool = False) -> None:
+        if not nx or key not in redis_store:
+            redis_store[key] = value.encode()
+
+    redis_client = MagicMock()
+    redis_client.get.side_effect = redis_store.get
+    redis_client.set.side_effect = _set
+    return redis_client
+
+
+def test_cached_acl_is_invalidated_by_version_bump() -> None:
+    cache = UserAclCache(max_size=10, ttl_seconds=60)
+    user_id = uuid4()
+    computed: list[set[str]] = []
+
+    def _compute_acl() -> set[str]:
+        computed.append({"user_email:a@example.com", f"group:{len(computed)}"})
+        return computed[-1]
+
+    with (
+        patch("onyx.access.acl_cache.get_redis_client", return_value=_redis_client()),
+        patch("onyx.access.acl_cache.get_user_acl_cache", return_value=cache),
+    ):
+        acl = get_cached_user_acl(user_id, _compute_acl)
+        assert acl.entries == {"user_email:a@example.com", "group:0"}
+        assert acl.filters == ("group:0", "user_email:a@example.com")
+
+        assert get_cached_user_acl(user_id, _compute_acl) is acl
+        assert len(computed) == 1
+
+        # other users are cached separately
+        get_cached_user_acl(None, _compute_acl)
+        assert len(computed) == 2
+
+        bump_user_acl_version()
+        acl = get_cached_user_acl(user_id, _compute_acl)
+        assert acl.entries == {"user_email:a@example.com", "group:2"}
+        assert len(computed) == 3
+
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 3
+    assert cache.stats.hit_rate == 0.25
+
+
+def test_acl_is_not_cached_without_redis() -> None:
+    cache = UserAclCache(max_size=10, ttl_seconds=60)
+    redis_client = MagicMock()
+    redis_client.get.side_effect = ConnectionError()
+
+    with (
+        patch("onyx.access.acl_cache.get_redis_client", return_value=redis_client),
+        patch("onyx.access.acl_cache.get_user_acl_cache", return_value=cache),
+    ):
+        acl = get_cached_user_acl(None, lambda: {"PUBLIC"})
+
+    assert acl.entries == {"PUBLIC"}
+    assert len(cache) == 0
+
+
+def test_cache_ttl_expiry_and_eviction() -> None:
+    cache = UserAclCache(max_size=2, ttl_seconds=60)
+    user_ids = [uuid4() for _ in range(3)]
+    acl = UserAcl.build({"PUBLIC"})
+
+    with patch("onyx.access.acl_cache.time.monotonic", return_value=0):
+        for user_id in user_ids:
+            cache.set("public", user_id, "v1", acl)
+        # the least recently used entry is evicted
+        assert len(cache) == 2
+        assert cache.get("public", user_ids[0], "v1") is None
+        assert cache.get("public", user_ids[1], "v1") is acl
+        # other tenants and versions don't match
+        assert cache.get("tenant_1", user_ids[1], "v1") is None
+        assert cache.get("public", user_ids[2], "v2") is None
+
+    with patch("onyx.access.acl_cache.time.monotonic", return_value=61):
+        assert cache.get("public", user_ids[1], "v1") is None
+    assert len(cache) == 0
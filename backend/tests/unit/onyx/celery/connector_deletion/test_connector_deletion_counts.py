@@ -0,0 +1,85 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from datetime import timezone
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.background.celery.tasks.connector_deletion.tasks import (
+    monitor_connector_deletion_taskset,
+)
+from onyx.db.enums import SyncStatus
+from onyx.redis.redis_connector_delete import RedisConnectorDelete
+from onyx.redis.redis_connector_delete import RedisConnectorDeletePayload
+
+_TASKS_MODULE = "onyx.background.celery.tasks.connector_deletion.tasks"
+
+
+def test_generate_tasks_counts_tasks_and_documents() -> None:
+    db_session = MagicMock()
+    db_session.scalars.return_value.yield_per.return_value = [
+        f"doc_{i}" for i in range(130)
+    ]
+    celery_app = MagicMock()
+
+    with patch(
+        "onyx.redis.redis_connector_delete.get_connector_credential_pair_from_id"
+    ) as mock_get_cc_pair:
+        mock_get_cc_pair.return_value = MagicMock(connector_id=1, credential_id=2)
+        result = RedisConnectorDelete("tenant_1", 5, MagicMock()).generate_tasks(
+            celery_app, db_session, MagicMock()
+        )
+
+    # one cleanup task per batch of 64 documents
+    assert result == (3, 130)
+    assert celery_app.send_task.call_count == 3
+
+
+def test_monitor_records_document_counts() -> None:
+    redis_connector = MagicMock()
+    redis_connector.delete.payload = RedisConnectorDeletePayload(
+        num_tasks=3, submitted=datetime.now(timezone.utc), num_docs=130
+    )
+
+    @contextmanager
+    def _session() -> Iterator[MagicMock]:
+        yield MagicMock()
+
+    with (
+        patch(f"{_TASKS_MODULE}.RedisConnector", return_value=redis_connector),
+        patch(f"{_TASKS_MODULE}.get_session_with_current_tenant", _session),
+        patch(f"{_TASKS_MODULE}.get_connector_credential_pair_from_id"),
+        patch(
+            f"{_TASKS_MODULE}.get_document_ids_for_connector_credential_pair",
+            return_value=[],
+        ),
+        patch(f"{_TASKS_MODULE}.delete_index_attempts"),
+        patch(f"{_TASKS_MODULE}.delete_document_set_cc_pair_relationship__no_commit"),
+        patch(f"{_TASKS_MODULE}.fetch_versioned_implementation_with_fallback"),
+        patch(f"{_TASKS_MODULE}.delete_orphan_tags__no_commit"),
+        patch(
+            f"{_TASKS_MODULE}.delete_all_documents_by_connector_credential_pair__no_commit"
+        ),
+        patch(f"{_TASKS_MODULE}.delete_userfiles_for_cc_pair__no_commit"),
+        patch(f"{_TASKS_MODULE}.delete_connector_credential_pair__no_commit"),
+        patch(f"{_TASKS_MODULE}.fetch_connector_by_id"),
+        patch(f"{_TASKS_MODULE}.update_sync_record_status") as mock_update,
+    ):
+        # one of the three batches is left
+        redis_connector.delete.get_remaining.return_value = 1
+        monitor_connector_deletion_taskset(
+            "tenant_1", b"connectordeletion_fence_5", MagicMock()
+        )
+
+        redis_connector.delete.get_remaining.return_value = 0
+        monitor_connector_deletion_taskset(
+            "tenant_1", b"connectordeletion_fence_5", MagicMock()
+        )
+
+    calls: list[Any] = [call.kwargs for call in mock_update.call_args_list]
+    assert [(c["sync_status"], c["num_docs_synced"]) for c in calls] == [
+        (SyncStatus.IN_PROGRESS, 64),
+        (SyncStatus.SUCCESS, 130),
+    ]
+    redis_connector.delete.reset.assert_called_once()
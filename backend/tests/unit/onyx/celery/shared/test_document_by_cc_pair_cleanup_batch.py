@@ -0,0 +1,64 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.background.celery.tasks.shared.tasks import (
+    document_by_cc_pair_cleanup_batch_task,
+)
+from onyx.document_index.interfaces import DocumentBatchResult
+from onyx.document_index.interfaces import DocumentFailureType
+
+_TASKS_MODULE = "onyx.background.celery.tasks.shared.tasks"
+
+
+def _run_cleanup(delete_result: DocumentBatchResult) -> tuple[MagicMock, MagicMock]:
+    retry_index = MagicMock()
+    retry_index.delete_batch.return_value = delete_result
+
+    with (
+        patch(f"{_TASKS_MODULE}.get_session_with_current_tenant"),
+        patch(f"{_TASKS_MODULE}.get_active_search_settings"),
+        patch(f"{_TASKS_MODULE}.get_default_document_index"),
+        patch(f"{_TASKS_MODULE}.HttpxPool"),
+        patch(f"{_TASKS_MODULE}.RetryDocumentIndex", return_value=retry_index),
+        patch(
+            f"{_TASKS_MODULE}.get_document_connector_counts",
+            return_value=[("ok", 1), ("rejected", 1), ("slow", 1)],
+        ),
+        patch(f"{_TASKS_MODULE}.get_documents_by_ids", return_value=[]),
+        patch(f"{_TASKS_MODULE}.delete_documents_complete__no_commit"),
+        patch(f"{_TASKS_MODULE}._mark_documents_dirty") as mock_mark_dirty,
+        patch.object(document_by_cc_pair_cleanup_batch_task, "retry") as mock_retry,
+    ):
+        document_by_cc_pair_cleanup_batch_task.run(
+            document_ids=["ok", "rejected", "slow"],
+            connector_id=1,
+            credential_id=1,
+            tenant_id="public",
+        )
+    return mock_mark_dirty, mock_retry
+
+
+def test_rejected_documents_are_not_retried() -> None:
+    delete_result = DocumentBatchResult(chunks_affected={"ok": 1})
+    delete_result.add_failure(
+        "rejected", "HTTP 400: bad request", DocumentFailureType.CLIENT_ERROR
+    )
+    delete_result.add_failure("slow", "HTTP 503: unavailable")
+
+    mock_mark_dirty, mock_retry = _run_cleanup(delete_result)
+
+    # rejected documents go to reconciliation right away, the rest are retried
+    assert mock_mark_dirty.call_args.args[0] == ["rejected"]
+    assert mock_retry.call_args.kwargs["kwargs"]["document_ids"] == ["slow"]
+
+
+def test_no_retry_when_all_failures_are_rejected() -> None:
+    delete_result = DocumentBatchResult(chunks_affected={"ok": 1, "slow": 1})
+    delete_result.add_failure(
+        "rejected", "HTTP 404: not found", DocumentFailureType.CLIENT_ERROR
+    )
+
+    mock_mark_dirty, mock_retry = _run_cleanup(delete_result)
+
+    assert mock_mark_dirty.call_args.args[0] == ["rejected"]
+    mock_retry.assert_not_called()
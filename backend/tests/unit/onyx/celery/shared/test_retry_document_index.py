@@ -0,0 +1,44 @@
+from collections.abc import Mapping
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.background.celery.tasks.shared.RetryDocumentIndex import RetryDocumentIndex
+from onyx.document_index.interfaces import DocumentBatchResult
+from onyx.document_index.interfaces import DocumentFailureType
+
+
+def test_delete_batch_retries_read_timeouts() -> None:
+    calls: list[list[str]] = []
+
+    def _delete_batch(
+        doc_id_to_chunk_count: Mapping[str, int | None], *, tenant_id: str
+    ) -> DocumentBatchResult:
+        calls.append(sorted(doc_id_to_chunk_count))
+        result = DocumentBatchResult()
+        for doc_id in doc_id_to_chunk_count:
+            if doc_id == "bad":
+                result.add_failure(
+                    doc_id, "HTTP 400: bad request", DocumentFailureType.CLIENT_ERROR
+                )
+            elif doc_id == "slow" and len(calls) == 1:
+                # classified by type, not by the message
+                result.add_failure(
+                    doc_id, "timed out", DocumentFailureType.READ_TIMEOUT
+                )
+            else:
+                result.chunks_affected[doc_id] = 2
+        return result
+
+    index = MagicMock()
+    index.delete_batch.side_effect = _delete_batch
+
+    with patch.object(RetryDocumentIndex, "MAX_WAIT", 0):
+        result = RetryDocumentIndex(index).delete_batch(
+            {"ok": 2, "slow": 2, "bad": None}, tenant_id="public"
+        )
+
+    # only the read timeout is retried
+    assert calls == [["bad", "ok", "slow"], ["slow"]]
+    assert result.chunks_affected == {"ok": 2, "slow": 2}
+    assert result.failures == {"bad": "HTTP 400: bad request"}
+    assert result.failure_types == {"bad": DocumentFailureType.CLIENT_ERROR}
@@ -0,0 +1,36 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.background.celery.tasks.vespa.tasks import monitor_document_set_taskset
+from onyx.db.enums import SyncStatus
+
+_TASKS_MODULE = "onyx.background.celery.tasks.vespa.tasks"
+
+
+def test_monitor_records_document_counts() -> None:
+    rds = MagicMock(taskset_key="documentset_taskset_1")
+    # the fence holds the number of documents to sync
+    rds.payload = 130
+    r = MagicMock()
+
+    with (
+        patch(f"{_TASKS_MODULE}.RedisDocumentSet", return_value=rds),
+        patch(f"{_TASKS_MODULE}.get_document_set_by_id"),
+        patch(f"{_TASKS_MODULE}.mark_document_set_as_synced"),
+        patch(f"{_TASKS_MODULE}.update_sync_record_status") as mock_update,
+    ):
+        # one of the three batches is left
+        r.scard.return_value = 1
+        monitor_document_set_taskset("tenant_1", b"documentset_fence_1", r, MagicMock())
+
+        r.scard.return_value = 0
+        monitor_document_set_taskset("tenant_1", b"documentset_fence_1", r, MagicMock())
+
+    assert [
+        (call.kwargs["sync_status"], call.kwargs["num_docs_synced"])
+        for call in mock_update.call_args_list
+    ] == [
+        (SyncStatus.IN_PROGRESS, 64),
+        (SyncStatus.SUCCESS, 130),
+    ]
+    rds.reset.assert_called_once()
@@ -6,6 +6,9 @@ from onyx.chat.models import CitationInfo
 from onyx.chat.models import LlmDoc
 from onyx.chat.models import OnyxAnswerPiece
 from onyx.chat.stream_processing.citation_processing import CitationProcessor
+from onyx.chat.stream_processing.citation_processing import (
+    ends_with_possible_citation,
+)
 from onyx.chat.stream_processing.utils import DocumentIdOrderMapping
 from onyx.configs.constants import DocumentSource
 
@@ -537,3 +540,38 @@ def test_citation_extraction(
     ] == expected_citations, (
         f"Test '{test_name}' failed: Citations do not match expected output."
     )
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Growth! [", True),
+        ("Growth! [[", True),
+        ("Growth! [1", True),
+        ("Growth! [[12", True),
+        ("Growth! [1,", True),
+        ("Growth! [1, ", True),
+        ("Growth! [1, 2,", True),
+        ("Growth! [1\n", True),
+        ("Growth! [1]", False),
+        ("Growth! [a", False),
+        ("Growth! [1  ", False),
+        ("Growth! [1,,", False),
+        ("Growth! [ 1", False),
+        ("Growth!", False),
+    ],
+)
+def test_ends_with_possible_citation(text: str, expected: bool) -> None:
+    assert ends_with_possible_citation(text) == expected
+
+
+def test_code_fence_split_across_tokens(
+    mock_data: tuple[list[LlmDoc], dict[str, int]],
+) -> None:
+    # the fence state is tracked across tokens, so citations inside the block are
+    # left alone even when the ``` arrives one backtick at a time
+    final_answer_text, citations = process_text(
+        ["Code:\n`", "`", "`\nx = [1]\n`", "``\nSee [", "1", "]."], mock_data
+    )
+    assert final_answer_text == "Code:\n```\nx = [1]\n```\nSee [[1]](https://0.com)."
+    assert [citation.document_id for citation in citations] == ["doc_0"]
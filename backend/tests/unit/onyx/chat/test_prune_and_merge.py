@@ -1,10 +1,14 @@
 import pytest
 
+from onyx.chat import prune_and_merge
+from onyx.chat.prune_and_merge import _apply_pruning
 from onyx.chat.prune_and_merge import _merge_sections
 from onyx.configs.constants import DocumentSource
 from onyx.context.search.models import InferenceChunk
 from onyx.context.search.models import InferenceSection
 from onyx.context.search.utils import inference_section_from_chunks
+from onyx.llm.interfaces import LLMConfig
+from onyx.natural_language_processing.utils import BaseTokenizer
 
 
 # This large test accounts for all of the following:
@@ -224,3 +228,88 @@ def test_merge_minimal_sections(
     merged_sections = _merge_sections(sections)
     assert merged_sections[0].combined_content == expected_content
     assert merged_sections[0].center_chunk == expected_center_chunk
+
+
+class _CharTokenizer(BaseTokenizer):
+    """One token per character, records the strings it encodes"""
+
+    def __init__(self) -> None:
+        self.encoded: list[str] = []
+
+    def encode(self, string: str) -> list[int]:
+        self.encoded.append(string)
+        return [ord(char) for char in string]
+
+    def tokenize(self, string: str) -> list[str]:
+        return list(string)
+
+    def decode(self, tokens: list[int]) -> str:
+        return "".join(chr(token) for token in tokens)
+
+    @property
+    def token_count_key(self) -> str | None:
+        return "chars"
+
+
+def test_apply_pruning_uses_precomputed_token_counts(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    tokenizer = _CharTokenizer()
+    monkeypatch.setattr(prune_and_merge, "get_tokenizer", lambda **_: tokenizer)
+
+    def _section(document_id: str, with_counts: bool) -> InferenceSection:
+        chunks = [
+            create_inference_chunk(
+                document_id, chunk_id, (f"{document_id}_{chunk_id} " * 20)[:100], 1.0
+            )
+            for chunk_id in range(3)
+        ]
+        if with_counts:
+            for chunk in chunks:
+                chunk.llm_token_counts = {"chars": len(chunk.content)}
+        section = inference_section_from_chunks(chunks[0], chunks)
+        assert section is not None
+        return section
+
+    sections = [_section(f"doc{i}", with_counts=i != 1) for i in range(4)]
+    original_contents = [section.combined_content for section in sections]
+
+    header_tokens = len(
+        prune_and_merge.build_doc_context_str(
+            semantic_identifier="doc0_0",
+            source_type=DocumentSource.WEB,
+            content="",
+            metadata_dict={},
+            updated_at=None,
+            ind=0,
+        )
+    )
+    # room for two full sections and 50 tokens of the third one
+    token_limit = 2 * (302 + header_tokens) + header_tokens + 50
+    pruned_sections = _apply_pruning(
+        sections=sections,
+        section_relevance_list=None,
+        keep_sections=[],
+        token_limit=token_limit,
+        is_manually_selected_docs=False,
+        use_sections=True,
+        using_tool_message=False,
+        llm_config=LLMConfig(
+            model_provider="fake",
+            model_name="fake",
+            temperature=0,
+            max_input_tokens=10_000,
+        ),
+    )
+
+    assert [section.combined_content for section in pruned_sections] == [
+        original_contents[0],
+        original_contents[1],
+        original_contents[2][:50],
+    ]
+    # only the section without precomputed counts has its content tokenized, plus
+    # the final section when it's trimmed
+    assert original_contents[0] not in tokenizer.encoded
+    assert original_contents[1] in tokenizer.encoded
+    # the input sections are left untouched
+    assert [section.combined_content for section in sections] == original_contents
@@ -633,6 +633,33 @@ def _test_account_with_children(sf_db: OnyxSalesforceSQLite) -> None:
     print("All account with children tests passed successfully!")
 
 
+def _test_get_records(sf_db: OnyxSalesforceSQLite) -> None:
+    """get_records should return the same records as get_record, in one pass"""
+    object_ids = [
+        object_id
+        for object_type in (ACCOUNT_OBJECT_TYPE, "Contact", "Case", "Opportunity")
+        for object_id in sf_db.find_ids_by_type(object_type)
+    ]
+    unknown_id = "001bm00000zzzzzAAA"
+
+    records = sf_db.get_records(object_ids + [unknown_id])
+    assert set(records) == set(object_ids)
+    for object_id in object_ids:
+        assert records[object_id] == sf_db.get_record(object_id)
+
+    # the parent account is resolved for the children of Acme Inc.
+    account = records[_VALID_SALESFORCE_IDS[0]]
+    for child_id in sf_db.get_child_ids(_VALID_SALESFORCE_IDS[0]):
+        assert records[child_id].data["AccountId"] == account.id
+        assert records[child_id].data[ACCOUNT_OBJECT_TYPE] == account.data["Name"]
+
+    child_records = sf_db.get_records(object_ids, isChild=True)
+    for object_id in object_ids:
+        assert child_records[object_id] == sf_db.get_record(object_id, isChild=True)
+
+    print("All get records tests passed successfully!")
+
+
 def _test_relationship_updates(sf_db: OnyxSalesforceSQLite) -> None:
     """
     Tests that relationships are properly updated when a child object's parent reference changes.
@@ -804,6 +831,8 @@ def test_salesforce_sqlite() -> None:
 
         _test_account_with_children(sf_db)
 
+        _test_get_records(sf_db)
+
         _test_relationship_updates(sf_db)
 
         _test_get_affected_parent_ids(sf_db)
@@ -0,0 +1,169 @@
+import hashlib
+import threading
+from collections.abc import Iterator
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from onyx.configs.app_configs import POLL_CONNECTOR_OFFSET
+from onyx.connectors.web import connector as web_connector_module
+from onyx.connectors.web.connector import WEB_CONNECTOR_VALID_SETTINGS
+from onyx.connectors.web.connector import WebConnector
+from onyx.connectors.web.page_validators import PageValidatorStore
+from onyx.db.models import WebPageValidator
+
+_NUM_PAGES = 20
+_PARAGRAPH = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 10
+# page -> version of its content, changing it changes the page's ETag
+_page_versions: dict[str, int] = {}
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    """Serves /docs/0 ... /docs/N linked from /docs/, every page links to the next
+    two and back to the first one, so that the same links are found by several
+    workers"""
+
+    def do_GET(self) -> None:
+        page = self.path.removeprefix("/docs/")
+        linked_pages = (0, int(page) + 1, int(page) + 2) if page else (0,)
+        links = "".join(
+            f'<a href="/docs/{linked}">page {linked}</a>'
+            for linked in linked_pages
+            if linked < _NUM_PAGES
+        )
+        version = _page_versions.get(page, 0)
+        body = (
+            f"<html><head><title>Page {page or 'index'}</title></head><body>"
+            f"<p>Page {page} version {version}. {_PARAGRAPH}</p>{links}</body></html>"
+        ).encode()
+
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def site_url() -> Iterator[str]:
+    _page_versions.clear()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SiteHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/docs/"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_concurrent_recursive_crawl_indexes_every_page_once(site_url: str) -> None:
+    connector = WebConnector(
+        base_url=site_url,
+        web_connector_type=WEB_CONNECTOR_VALID_SETTINGS.RECURSIVE.value,
+        batch_size=3,
+        max_concurrency=4,
+        http_fast_path=True,
+    )
+
+    doc_ids = [doc.id for batch in connector.load_from_state() for doc in batch]
+
+    assert sorted(doc_ids) == sorted(
+        [site_url] + [f"{site_url}{page_num}" for page_num in range(_NUM_PAGES)]
+    )
+
+
+class _InMemoryPageValidatorStore(PageValidatorStore):
+    validators: dict[tuple[int, int, str], WebPageValidator] = {}
+
+    def _load(self, url: str) -> WebPageValidator | None:
+        return self.validators.get((self.cc_pair_id, self.search_settings_id, url))
+
+    def _save(self, validators: list[WebPageValidator]) -> None:
+        for validator in validators:
+            key = (
+                validator.connector_credential_pair_id,
+                validator.search_settings_id,
+                validator.url,
+            )
+            self.validators[key] = validator
+
+
+def test_recrawl_skips_unchanged_pages(
+    site_url: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(
+        web_connector_module, "PageValidatorStore", _InMemoryPageValidatorStore
+    )
+    monkeypatch.setattr(_InMemoryPageValidatorStore, "validators", {})
+    connector = WebConnector(
+        base_url=site_url,
+        web_connector_type=WEB_CONNECTOR_VALID_SETTINGS.RECURSIVE.value,
+        http_fast_path=True,
+    )
+    connector.set_indexing_context(cc_pair_id=1, search_settings_id=1)
+
+    def poll(
+        last_poll_range_end: datetime | None,
+        poll_range_end: datetime,
+        connector: WebConnector = connector,
+    ) -> list[str]:
+        # same window as the docfetching task
+        start = (
+            last_poll_range_end - timedelta(minutes=POLL_CONNECTOR_OFFSET)
+            if last_poll_range_end
+            else datetime.fromtimestamp(0, tz=timezone.utc)
+        )
+        batches = connector.poll_source(start.timestamp(), poll_range_end.timestamp())
+        return sorted(doc.id for batch in batches for doc in batch)
+
+    first_run_end = datetime.now(timezone.utc)
+    assert len(poll(None, first_run_end)) == _NUM_PAGES + 1
+
+    # nothing changed, no need to fail with "No valid pages found"
+    second_run_end = first_run_end + timedelta(hours=1)
+    assert poll(first_run_end, second_run_end) == []
+
+    # the pages linked from changed pages are still crawled
+    _page_versions["3"] = 1
+    _page_versions["17"] = 1
+    third_run_end = second_run_end + timedelta(hours=1)
+    assert poll(second_run_end, third_run_end) == [f"{site_url}17", f"{site_url}3"]
+
+    # if that run failed, the next one indexes the changed pages again
+    assert poll(second_run_end, third_run_end + timedelta(hours=1)) == [
+        f"{site_url}17",
+        f"{site_url}3",
+    ]
+
+    # full crawl when indexing from the beginning
+    assert len(poll(None, third_run_end)) == _NUM_PAGES + 1
+
+    # other cc-pairs crawling the same site, and the other index of the same cc-pair
+    # during an embedding model swap, don't use these validators
+    other_connector = WebConnector(
+        base_url=site_url,
+        web_connector_type=WEB_CONNECTOR_VALID_SETTINGS.RECURSIVE.value,
+        http_fast_path=True,
+    )
+    fourth_run_end = third_run_end + timedelta(hours=1)
+    assert len(poll(third_run_end, fourth_run_end, other_connector)) == _NUM_PAGES + 1
+    other_connector.set_indexing_context(cc_pair_id=2, search_settings_id=1)
+    assert len(poll(third_run_end, fourth_run_end, other_connector)) == _NUM_PAGES + 1
+    other_connector.set_indexing_context(cc_pair_id=1, search_settings_id=2)
+    assert len(poll(third_run_end, fourth_run_end, other_connector)) == _NUM_PAGES + 1
+    assert poll(third_run_end, fourth_run_end) == []
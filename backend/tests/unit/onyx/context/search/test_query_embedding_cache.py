@@ -0,0 +1,96 @@
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.context.search.query_embedding_cache import build_query_embedding_cache_key
+from onyx.context.search.query_embedding_cache import normalize_query_text
+from onyx.context.search.query_embedding_cache import QueryEmbeddingCache
+
+
+def _search_settings(settings_id: int = 1, query_prefix: str | None = None) -> Any:
+    search_settings = MagicMock()
+    search_settings.id = settings_id
+    search_settings.model_name = "nomic-ai/nomic-embed-text-v1"
+    search_settings.provider_type = None
+    search_settings.deployment_name = None
+    search_settings.query_prefix = query_prefix
+    search_settings.final_embedding_dim = 768
+    search_settings.normalize = True
+    return search_settings
+
+
+def test_cache_key_depends_on_settings_and_normalized_text() -> None:
+    settings = _search_settings()
+    key = build_query_embedding_cache_key(
+        settings, normalize_query_text("  what is   onyx? "), "public"
+    )
+
+    assert key == build_query_embedding_cache_key(
+        settings, normalize_query_text("what is onyx?"), "public"
+    )
+    assert key != build_query_embedding_cache_key(
+        settings, normalize_query_text("what is onyx?"), "tenant_1"
+    )
+    assert key != build_query_embedding_cache_key(
+        _search_settings(settings_id=2), normalize_query_text("what is onyx?"), "public"
+    )
+    assert key != build_query_embedding_cache_key(
+        _search_settings(query_prefix="query: "),
+        normalize_query_text("what is onyx?"),
+        "public",
+    )
+
+
+def test_cache_lru_eviction_and_stats() -> None:
+    cache = QueryEmbeddingCache(max_size=2, ttl_seconds=60, redis_enabled=False)
+    cache.set_many({"a": [0.1], "b": [0.2]})
+    assert cache.get_many(["a"]) == {"a": [0.1]}
+
+    # "b" is the least recently used entry
+    cache.set_many({"c": [0.3]})
+    assert cache.get_many(["a", "b", "c"]) == {"a": [0.1], "c": [0.3]}
+    assert len(cache) == 2
+
+    assert cache.stats.memory_hits == 3
+    assert cache.stats.misses == 1
+    assert cache.stats.hit_rate == 0.75
+
+
+def test_cache_ttl_expiry() -> None:
+    cache = QueryEmbeddingCache(max_size=10, ttl_seconds=60, redis_enabled=False)
+    with patch(
+        "onyx.context.search.query_embedding_cache.time.monotonic", return_value=0
+    ):
+        cache.set_many({"a": [0.1]})
+    with patch(
+        "onyx.context.search.query_embedding_cache.time.monotonic", return_value=61
+    ):
+        assert cache.get_many(["a"]) == {}
+    assert len(cache) == 0
+
+
+def test_cache_redis_tier_promotes_to_memory() -> None:
+    cache = QueryEmbeddingCache(max_size=10, ttl_seconds=60, redis_enabled=True)
+    redis_store: dict[str, bytes] = {}
+
+    pipe = MagicMock()
+    pending: list = []
+    pipe.get.side_effect = lambda key: pending.append(redis_store.get(key))
+    pipe.set.side_effect = lambda key, value, ex: redis_store.__setitem__(key, value)
+    pipe.execute.side_effect = lambda: [pending.pop(0) for _ in list(pending)]
+    redis_client = MagicMock()
+    redis_client.pipeline.return_value = pipe
+
+    with patch(
+        "onyx.context.search.query_embedding_cache.get_shared_redis_client",
+        return_value=redis_client,
+    ):
+        cache.set_many({"a": [0.5, 0.25]})
+        cache.clear()
+
+        assert cache.get_many(["a", "b"]) == {"a": [0.5, 0.25]}
+        assert cache.stats.redis_hits == 1
+        assert cache.stats.misses == 1
+
+        assert cache.get_many(["a"]) == {"a": [0.5, 0.25]}
+        assert cache.stats.memory_hits == 1
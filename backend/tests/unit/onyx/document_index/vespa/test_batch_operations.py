@@ -0,0 +1,120 @@
+import json
+import threading
+from unittest.mock import patch
+
+import httpx
+
+from onyx.access.models import DocumentAccess
+from onyx.document_index.interfaces import DocumentFailureType
+from onyx.document_index.interfaces import VespaDocumentFields
+from onyx.document_index.interfaces import VespaDocumentUpdate
+from onyx.document_index.vespa.index import VespaIndex
+
+
+def _make_index(handler: httpx.MockTransport) -> VespaIndex:
+    return VespaIndex(
+        index_name="test_index",
+        secondary_index_name=None,
+        large_chunks_enabled=False,
+        secondary_large_chunks_enabled=None,
+        httpx_client=httpx.Client(transport=handler),
+        bulk_feed=True,
+    )
+
+
+def test_delete_batch_reports_failures_per_document() -> None:
+    lock = threading.Lock()
+    deleted_urls: list[str] = []
+    failing_urls: set[str] = set()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        with lock:
+            if not failing_urls:
+                # fail the first chunk delete we see, the rest succeed
+                failing_urls.add(url)
+            if url in failing_urls:
+                return httpx.Response(500, text="boom")
+            deleted_urls.append(url)
+        return httpx.Response(200, json={})
+
+    index = _make_index(httpx.MockTransport(handler))
+    result = index.delete_batch({"doc_a": 2, "doc_b": 3}, tenant_id="public")
+
+    assert len(result.failures) == 1
+    failed_doc_id = next(iter(result.failures))
+    assert "HTTP 500" in result.failures[failed_doc_id]
+    assert result.failure_types == {failed_doc_id: DocumentFailureType.OTHER}
+    succeeded_doc_id = ({"doc_a", "doc_b"} - {failed_doc_id}).pop()
+    assert result.chunks_affected == {
+        succeeded_doc_id: {"doc_a": 2, "doc_b": 3}[succeeded_doc_id]
+    }
+    assert len(deleted_urls) == 4
+
+
+def test_delete_batch_classifies_failures() -> None:
+    lock = threading.Lock()
+    rejected_urls: set[str] = set()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        with lock:
+            if not rejected_urls:
+                # reject the first chunk delete we see, the rest time out
+                rejected_urls.add(url)
+            if url in rejected_urls:
+                return httpx.Response(400, text="bad request")
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    index = _make_index(httpx.MockTransport(handler))
+    with patch("onyx.document_index.vespa.feed._BACKOFF_MAX_SECONDS", 0):
+        result = index.delete_batch({"doc_a": 1, "doc_b": 1}, tenant_id="public")
+
+    assert result.chunks_affected == {}
+    assert sorted(result.failure_types.values()) == [
+        DocumentFailureType.CLIENT_ERROR,
+        DocumentFailureType.READ_TIMEOUT,
+    ]
+
+
+def test_update_batch_sends_per_document_fields() -> None:
+    lock = threading.Lock()
+    bodies: list[dict] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.method == "PUT"
+        assert request.url.params["create"] == "true"
+        with lock:
+            bodies.append(json.loads(request.content))
+        return httpx.Response(200, json={})
+
+    index = _make_index(httpx.MockTransport(handler))
+    result = index.update_batch(
+        [
+            VespaDocumentUpdate(
+                doc_id="doc_a",
+                chunk_count=2,
+                fields=VespaDocumentFields(
+                    access=DocumentAccess.build(
+                        user_emails=["a@example.com"],
+                        user_groups=[],
+                        external_user_emails=[],
+                        external_user_group_ids=[],
+                        is_public=False,
+                    ),
+                ),
+            ),
+            VespaDocumentUpdate(
+                doc_id="doc/b", chunk_count=1, fields=VespaDocumentFields(boost=3)
+            ),
+            # nothing to update -> not sent, but not a failure either
+            VespaDocumentUpdate(doc_id="doc_c", chunk_count=5),
+        ],
+        tenant_id="public",
+    )
+
+    assert result.failures == {}
+    assert result.chunks_affected == {"doc_a": 2, "doc/b": 1, "doc_c": 0}
+    assert len(bodies) == 3
+    assert sum("access_control_list" in body["fields"] for body in bodies) == 2
+    assert sum(body["fields"].get("boost") == {"assign": 3} for body in bodies) == 1
@@ -0,0 +1,115 @@
+import threading
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from onyx.document_index.vespa.feed import close_shared_feed_client
+from onyx.document_index.vespa.feed import get_shared_feed_client
+from onyx.document_index.vespa.feed import VespaFeedClient
+from onyx.document_index.vespa.feed import VespaFeedOperation
+from onyx.document_index.vespa.feed import VespaFeedOperationType
+
+
+def _make_operations(count: int) -> list[VespaFeedOperation]:
+    return [
+        VespaFeedOperation(
+            operation_type=VespaFeedOperationType.PUT,
+            url=f"http://vespa/document/v1/default/test/docid/{i}",
+            document_id=f"doc_{i}",
+            body={"fields": {"chunk_id": i}},
+        )
+        for i in range(count)
+    ]
+
+
+def test_feed_bounds_in_flight_requests() -> None:
+    lock = threading.Lock()
+    in_flight = 0
+    max_seen = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_seen
+        with lock:
+            in_flight += 1
+            max_seen = max(max_seen, in_flight)
+        time.sleep(0.005)
+        with lock:
+            in_flight -= 1
+        return httpx.Response(200, json={})
+
+    http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    with VespaFeedClient(http_client, max_in_flight=4) as feed_client:
+        summary = feed_client.feed(iter(_make_operations(50)))
+
+    assert len(summary.results) == 50
+    assert summary.stats.succeeded == 50
+    assert summary.stats.operation_counts[VespaFeedOperationType.PUT] == 50
+    assert max_seen <= 4
+    summary.raise_for_failures()
+
+
+def test_feed_retries_throttled_and_reports_failures() -> None:
+    attempts: dict[str, int] = {}
+    lock = threading.Lock()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        chunk_id = request.url.path.rsplit("/", 1)[-1]
+        with lock:
+            attempts[chunk_id] = attempts.get(chunk_id, 0) + 1
+            attempt = attempts[chunk_id]
+        if chunk_id == "0" and attempt == 1:
+            return httpx.Response(429, text="throttled")
+        if chunk_id == "1":
+            return httpx.Response(400, text="bad request")
+        return httpx.Response(200, json={})
+
+    http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    with (
+        patch("onyx.document_index.vespa.feed.time.sleep"),
+        VespaFeedClient(http_client, max_in_flight=2, max_retries=3) as feed_client,
+    ):
+        summary = feed_client.feed(_make_operations(3))
+
+    assert summary.stats.succeeded == 2
+    assert summary.stats.failed == 1
+    assert summary.stats.retries == 1
+    # non-retryable errors are not retried
+    assert attempts["1"] == 1
+
+    failures = summary.failures
+    assert len(failures) == 1
+    assert failures[0].operation.document_id == "doc_1"
+    assert failures[0].status_code == 400
+
+    with pytest.raises(RuntimeError, match="doc_1"):
+        summary.raise_for_failures()
+
+
+def test_shared_feed_client_feeds_with_the_given_http_client() -> None:
+    seen_urls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_urls.append(str(request.url))
+        return httpx.Response(200, json={})
+
+    try:
+        feed_client = get_shared_feed_client()
+        # reused across calls instead of starting new worker threads
+        assert get_shared_feed_client() is feed_client
+
+        with pytest.raises(ValueError):
+            feed_client.feed(_make_operations(1))
+
+        for _ in range(2):
+            http_client = httpx.Client(transport=httpx.MockTransport(handler))
+            summary = feed_client.feed(_make_operations(2), http_client=http_client)
+            http_client.close()
+            assert summary.stats.succeeded == 2
+    finally:
+        close_shared_feed_client()
+
+    assert len(seen_urls) == 4
+    assert get_shared_feed_client() is not feed_client
+    close_shared_feed_client()
@@ -0,0 +1,85 @@
+from io import BytesIO
+from unittest.mock import patch
+
+from pypdf import PdfReader
+from pypdf import PdfWriter
+from pypdf.generic import ContentStream
+from pypdf.generic import DictionaryObject
+from pypdf.generic import NameObject
+
+from onyx.file_processing.pdf_extraction import iter_pdf_pages
+
+
+def _make_pdf(num_pages: int) -> PdfReader:
+    writer = PdfWriter()
+    font = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica"),
+        }
+    )
+    for i in range(num_pages):
+        page = writer.add_blank_page(612, 792)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})}
+        )
+        content = ContentStream(None, None)
+        content.set_data(f"BT /F1 12 Tf 72 720 Td (page number {i}) Tj ET".encode())
+        page.replace_contents(content)
+
+    pdf_bytes = BytesIO()
+    writer.write(pdf_bytes)
+    pdf_bytes.seek(0)
+    return PdfReader(pdf_bytes)
+
+
+def test_parallel_extraction_matches_serial() -> None:
+    pdf_reader = _make_pdf(6)
+
+    serial_pages = list(iter_pdf_pages(pdf_reader, num_processes=1))
+    parallel_pages = list(
+        iter_pdf_pages(pdf_reader, num_processes=2, parallel_min_pages=1)
+    )
+
+    assert [page.text for page in serial_pages] == [
+        f"page number {i}" for i in range(6)
+    ]
+    assert parallel_pages == serial_pages
+    assert [page.page_num for page in parallel_pages] == list(range(1, 7))
+
+
+# page 2 hangs in the workers
+_STALLING_WORKER_COMMAND = """
+import time
+import onyx.file_processing.pdf_extraction as pdf_extraction
+
+extract_pdf_page = pdf_extraction.extract_pdf_page
+
+def _extract_pdf_page(page, page_num, *args):
+    if page_num == 2:
+        time.sleep(60)
+    return extract_pdf_page(page, page_num, *args)
+
+pdf_extraction.extract_pdf_page = _extract_pdf_page
+pdf_extraction.run_page_worker()
+"""
+
+
+def test_parallel_extraction_skips_pages_that_time_out() -> None:
+    with patch(
+        "onyx.file_processing.pdf_extraction._WORKER_COMMAND", _STALLING_WORKER_COMMAND
+    ):
+        pages = list(
+            iter_pdf_pages(
+                _make_pdf(4), num_processes=2, parallel_min_pages=1, page_timeout=3
+            )
+        )
+
+    # the stuck worker is replaced for the remaining pages
+    assert [(page.page_num, page.text, page.timed_out) for page in pages] == [
+        (1, "page number 0", False),
+        (2, "", True),
+        (3, "page number 2", False),
+        (4, "page number 3", False),
+    ]
@@ -0,0 +1,85 @@
+from onyx.db.models import KGEntity
+from onyx.db.models import KGEntityExtractionStaging
+from onyx.kg.clustering.clustering import _cluster_entities_of_type
+from onyx.kg.clustering.clustering import _EntityCluster
+
+_ENTITY_TYPE = "ACCOUNT"
+
+
+def _staging_entity(
+    id_name: str, name: str, document_id: str | None = None
+) -> KGEntityExtractionStaging:
+    return KGEntityExtractionStaging(
+        id_name=id_name,
+        name=name,
+        entity_type_id_name=_ENTITY_TYPE,
+        document_id=document_id,
+        alternative_names=[],
+        occurrences=1,
+        attributes={"source": id_name},
+        entity_key=None,
+        parent_key=None,
+        event_time=None,
+    )
+
+
+def _entity(id_name: str, name: str, document_id: str | None = None) -> KGEntity:
+    return KGEntity(
+        id_name=id_name,
+        name=name,
+        entity_type_id_name=_ENTITY_TYPE,
+        document_id=document_id,
+        alternative_names=[],
+        occurrences=3,
+        attributes={},
+        entity_key=None,
+        parent_key=None,
+        event_time=None,
+    )
+
+
+def test_cluster_entities_of_type() -> None:
+    acme = _entity("ACCOUNT::acme", "acme corporation")
+    entities = [
+        # similar to an existing entity
+        _staging_entity("s0", "Acme Corporation"),
+        # a new entity, then one similar to it
+        _staging_entity("s1", "Globex"),
+        _staging_entity("s2", "globex"),
+        # names with numbers are never clustered
+        _staging_entity("s3", "version1"),
+        _staging_entity("s4", "version1"),
+        # sets the document of the existing entity, so the next entity of a document
+        # can't be merged into it anymore
+        _staging_entity("s5", "acme corporation", document_id="doc_1"),
+        _staging_entity("s6", "acme corporation", document_id="doc_2"),
+        # same document as the previous entity
+        _staging_entity("s7", "acme corporation", document_id="doc_2"),
+    ]
+    entity_names = [entity.name.lower() for entity in entities]
+    similar_entities = [[acme], [], [], [], [], [acme], [acme], [acme]]
+
+    existing_clusters: dict[str, _EntityCluster] = {}
+    new_clusters = _cluster_entities_of_type(
+        entities, entity_names, similar_entities, existing_clusters
+    )
+
+    assert list(existing_clusters) == ["ACCOUNT::acme"]
+    acme_cluster = existing_clusters["ACCOUNT::acme"]
+    assert acme_cluster.staging_id_names == ["s0", "s5"]
+    assert acme_cluster.occurrences == 5
+    assert acme_cluster.document_id == "doc_1"
+    assert acme_cluster.normalized_document_ids == {"doc_1"}
+    assert acme_cluster.attributes == {"source": "s5"}
+
+    assert [cluster.staging_id_names for cluster in new_clusters] == [
+        ["s1", "s2"],
+        ["s3"],
+        ["s4"],
+        ["s6", "s7"],
+    ]
+    globex_cluster = new_clusters[0]
+    assert globex_cluster.name == "globex"
+    assert globex_cluster.occurrences == 2
+    assert new_clusters[3].document_id == "doc_2"
+    assert new_clusters[3].initial_document_id == "doc_2"
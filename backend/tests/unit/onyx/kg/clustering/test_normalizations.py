@@ -0,0 +1,27 @@
+from onyx.kg.clustering.normalizations import _clean_name
+from onyx.kg.clustering.normalizations import _rerank_candidates
+
+
+def test_rerank_candidates() -> None:
+    candidates = [
+        ("ACCOUNT::1", "Globex Inc"),
+        ("ACCOUNT::2", "Acme Corporation"),
+        ("ACCOUNT::3", "Initech"),
+    ]
+
+    # the closest candidate wins, typos included
+    assert _rerank_candidates(_clean_name("acme corporatoin"), candidates) == (
+        "ACCOUNT::2"
+    )
+    assert _rerank_candidates(_clean_name("GLOBEX, Inc."), candidates) == "ACCOUNT::1"
+    # the first of equally good candidates wins
+    assert (
+        _rerank_candidates(
+            _clean_name("initech"), [("ACCOUNT::4", "initech")] + candidates
+        )
+        == "ACCOUNT::4"
+    )
+
+    # nothing similar enough
+    assert _rerank_candidates(_clean_name("umbrella"), candidates) is None
+    assert _rerank_candidates(_clean_name("acme"), []) is None
@@ -0,0 +1,35 @@
+from unittest.mock import patch
+
+from onyx.natural_language_processing import utils
+from onyx.natural_language_processing.utils import get_llm_token_count_tokenizers
+from onyx.natural_language_processing.utils import get_llm_token_counts
+from onyx.natural_language_processing.utils import get_tokenizer
+
+
+def test_token_counts_default_to_the_llm_tokenizer() -> None:
+    llm_tokenizer = get_tokenizer(model_name="gpt-4o", provider_type="openai")
+
+    with patch.object(utils, "_EXTRA_LLM_TOKEN_COUNT_TOKENIZERS", []):
+        tokenizers = get_llm_token_count_tokenizers(llm_tokenizer)
+        assert tokenizers == [llm_tokenizer]
+        assert get_llm_token_counts("hello world", tokenizers) == {
+            "tiktoken:o200k_base": 2
+        }
+
+        assert get_llm_token_count_tokenizers(None) == []
+
+
+def test_extra_encodings_are_deduplicated() -> None:
+    llm_tokenizer = get_tokenizer(model_name="gpt-4o", provider_type="openai")
+    extra_tokenizers = [
+        utils.TiktokenTokenizer("o200k_base"),
+        utils.TiktokenTokenizer("cl100k_base"),
+    ]
+
+    with patch.object(utils, "_EXTRA_LLM_TOKEN_COUNT_TOKENIZERS", extra_tokenizers):
+        tokenizers = get_llm_token_count_tokenizers(llm_tokenizer)
+
+    assert [tokenizer.token_count_key for tokenizer in tokenizers] == [
+        "tiktoken:o200k_base",
+        "tiktoken:cl100k_base",
+    ]
@@ -0,0 +1,66 @@
+from typing import Any
+from unittest.mock import MagicMock
+
+from onyx.redis.redis_pool import TenantRedis
+from onyx.redis.redis_task_sender import TasksetTaskSender
+
+
+class _RecordingTenantRedis(TenantRedis):
+    """Records the commands instead of sending them to a server"""
+
+    def __init__(self, tenant_id: str, events: list[tuple[Any, ...]]) -> None:
+        super().__init__(tenant_id)
+        self.events = events
+
+    def execute_command(self, *args: Any, **options: Any) -> Any:
+        self.events.append(args)
+        if args[0] == "SCAN":
+            return 0, [b"tenant_1:taskset_1", b"other_key"]
+        return len(args) - 2
+
+
+def test_tenant_redis_prefixes_keys() -> None:
+    events: list[tuple[Any, ...]] = []
+    r = _RecordingTenantRedis("tenant_1", events)
+
+    r.sadd("taskset_1", "a", "b")
+    r.get(name="fence_1")
+    r.delete(b"tenant_1:fence_1")
+    r.ping()
+    assert list(r.scan_iter("taskset_*")) == [b"taskset_1", b"other_key"]
+
+    assert events[:4] == [
+        ("SADD", "tenant_1:taskset_1", "a", "b"),
+        ("GET", "tenant_1:fence_1"),
+        ("DEL", b"tenant_1:fence_1"),
+        ("PING",),
+    ]
+    assert events[4][0] == "SCAN"
+    assert "tenant_1:taskset_*" in events[4]
+
+
+def test_taskset_task_sender_registers_batches_before_sending() -> None:
+    events: list[tuple[Any, ...]] = []
+    r = _RecordingTenantRedis("tenant_1", events)
+    celery_app = MagicMock()
+    celery_app.send_task.side_effect = lambda name, task_id, **_: events.append(
+        ("send_task", task_id)
+    )
+
+    with TasksetTaskSender(r, "taskset_1", celery_app, batch_size=3) as sender:
+        for i in range(5):
+            sender.send_task("cleanup", f"task_{i}", queue="deletion")
+
+    assert sender.num_tasks_sent == 5
+    assert events == [
+        ("SADD", "tenant_1:taskset_1", "task_0", "task_1", "task_2"),
+        ("send_task", "task_0"),
+        ("send_task", "task_1"),
+        ("send_task", "task_2"),
+        ("SADD", "tenant_1:taskset_1", "task_3", "task_4"),
+        ("send_task", "task_3"),
+        ("send_task", "task_4"),
+    ]
+    # one producer per batch
+    assert celery_app.producer_or_acquire.call_count == 2
+    assert celery_app.send_task.call_args.kwargs["queue"] == "deletion"
@@ -0,0 +1,36 @@
+import random
+
+import pytest
+
+from onyx.utils.external_sort import ExternalStringSorter
+from onyx.utils.external_sort import iter_sorted_difference
+
+
+def test_external_string_sorter_spills_and_merges() -> None:
+    rng = random.Random(0)
+    values = [f"doc_{rng.randrange(5000)}" for _ in range(20000)]
+    # line breaks, quotes and non ascii IDs have to round trip through the runs
+    values += ["a\nb", 'quote"d', "ünïcode", "日本語", ""]
+
+    with ExternalStringSorter(max_in_memory=1000) as sorter:
+        for start in range(0, len(values), 64):
+            sorter.add(values[start : start + 64])
+
+        assert sorter.num_spilled_runs > 1
+        assert list(sorter.iter_sorted()) == sorted(set(values))
+
+
+def test_iter_sorted_difference() -> None:
+    indexed = sorted({f"doc_{i}" for i in range(0, 1000, 2)} | {"", "zzz"})
+    in_source = sorted({f"doc_{i}" for i in range(0, 1000, 3)} | {"", "aaa"})
+
+    assert list(iter_sorted_difference(indexed, in_source)) == sorted(
+        set(indexed) - set(in_source)
+    )
+    assert list(iter_sorted_difference(indexed, [])) == indexed
+    assert list(iter_sorted_difference([], in_source)) == []
+
+    with pytest.raises(ValueError):
+        list(iter_sorted_difference(["b", "a"], []))
+    with pytest.raises(ValueError):
+        list(iter_sorted_difference(["c"], ["b", "a"]))
@@ -7,9 +7,12 @@ from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
+from onyx.utils.threadpool_concurrency import get_shared_thread_pool
 from onyx.utils.threadpool_concurrency import parallel_yield
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 from onyx.utils.threadpool_concurrency import run_in_background
 from onyx.utils.threadpool_concurrency import run_with_timeout
+from onyx.utils.threadpool_concurrency import ThreadPoolName
 from onyx.utils.threadpool_concurrency import ThreadSafeDict
 from onyx.utils.threadpool_concurrency import wait_on_background
 
@@ -389,3 +392,58 @@ def test_parallel_yield_non_blocking() -> None:
     # Verify no values are missing
     assert len(results) == 300  # Should have all values from 0 to 299
     assert sorted(results) == list(range(300))
+
+
+def test_run_functions_tuples_in_parallel_bounded_by_shared_pool() -> None:
+    """Test that large fan outs share the bounded pool and respect max_workers."""
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+    thread_names: set[str] = set()
+
+    def track(x: int) -> int:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+            thread_names.add(threading.current_thread().name)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        return x
+
+    pool = get_shared_thread_pool(ThreadPoolName.DEFAULT)
+    num_functions = pool.max_workers * 3
+    results = run_functions_tuples_in_parallel(
+        [(track, (i,)) for i in range(num_functions)]
+    )
+    assert results == list(range(num_functions))
+    assert peak <= pool.max_workers
+    assert all(name.startswith("onyx-default") for name in thread_names)
+
+    peak = 0
+    run_functions_tuples_in_parallel(
+        [(track, (i,)) for i in range(20)], max_workers=3, pool=ThreadPoolName.IO
+    )
+    assert peak <= 3
+
+
+def test_nested_parallel_calls_do_not_deadlock() -> None:
+    """Test that workers waiting on calls queued behind them in the same (saturated)
+    pool run those calls themselves instead of blocking forever."""
+
+    def inner(x: int) -> int:
+        time.sleep(0.01)
+        return x
+
+    def outer(x: int) -> int:
+        return sum(run_functions_tuples_in_parallel([(inner, (x,)) for _ in range(4)]))
+
+    pool = get_shared_thread_pool(ThreadPoolName.DEFAULT)
+    num_outer = pool.max_workers * 2
+    results = run_with_timeout(
+        10.0,
+        run_functions_tuples_in_parallel,
+        [(outer, (i,)) for i in range(num_outer)],
+    )
+    assert results == [4 * i for i in range(num_outer)]